@@ -0,0 +1,446 @@
+"""
+Async database utilities for Supabase integration.
+
+Mirrors the method surface of ``SupabaseClient`` in ``database.py`` but talks to
+PostgREST through a single shared ``httpx.AsyncClient`` with keep-alive pooling,
+so async route handlers can await database round-trips instead of blocking the
+event loop.
+"""
+import os
+import time
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+import httpx
+from postgrest import AsyncPostgrestClient, DEFAULT_POSTGREST_CLIENT_HEADERS
+from dotenv import load_dotenv
+from .utils.config_loader import get_database_config, DatabaseConfig
+
+# Load environment variables
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+class AsyncSupabaseClient:
+    """Async wrapper for Supabase operations backed by a pooled keep-alive HTTP client"""
+
+    def __init__(self, config: Optional[DatabaseConfig] = None):
+        """Initialize with database configuration (HTTP pool is created lazily)"""
+        if config is None:
+            config = get_database_config()
+
+        self.config = config
+        self.url = config.url
+        self.publishable_key = config.publishable_key
+        self.secret_key = config.secret_key
+
+        if not all([self.url, self.publishable_key, self.secret_key]):
+            raise ValueError("Missing Supabase environment variables: SUPABASE_URL, SUPABASE_PUBLISHABLE_KEY, SUPABASE_SECRET_KEY required")
+
+        # Connection pool settings
+        self.pool_size = config.pool_size
+        self.max_overflow = config.pool_max_overflow
+        self.query_timeout = config.query_timeout
+
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[AsyncPostgrestClient] = None
+
+        # Connection pool tracking
+        self._active_connections = 0
+        self._total_connections = 0
+        self._failed_connections = 0
+
+        logger.info(f"Async database client configured - Pool size: {self.pool_size}, Environment: {os.getenv('ENVIRONMENT', 'development')}")
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        """Create the shared HTTP client used for every PostgREST request"""
+        limits = httpx.Limits(
+            max_connections=self.pool_size + self.max_overflow,
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=self.config.pool_keepalive_expiry
+        )
+        timeout = httpx.Timeout(
+            self.query_timeout,
+            connect=self.config.connection_timeout,
+            pool=self.config.pool_timeout
+        )
+        return httpx.AsyncClient(
+            base_url=f"{self.url.rstrip('/')}/rest/v1",
+            headers={
+                **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                "apikey": self.secret_key,
+                "Authorization": f"Bearer {self.secret_key}"
+            },
+            limits=limits,
+            timeout=timeout,
+            follow_redirects=True,
+            http2=True
+        )
+
+    @property
+    def client(self) -> AsyncPostgrestClient:
+        """PostgREST client sharing the pooled HTTP connection (``await client.table(...).execute()``)"""
+        if self._client is None:
+            self._http_client = self._create_http_client()
+            self._client = AsyncPostgrestClient(
+                str(self._http_client.base_url),
+                headers=dict(self._http_client.headers),
+                http_client=self._http_client
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections (call on application shutdown)"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._client = None
+
+    async def _execute_with_retry(self, operation_func, *args, **kwargs):
+        """Execute async database operation with retry logic"""
+        for attempt in range(self.config.retry_attempts):
+            try:
+                self._active_connections += 1
+                self._total_connections += 1
+
+                start_time = time.time()
+                result = await operation_func(*args, **kwargs)
+
+                # Log slow queries
+                execution_time = time.time() - start_time
+                if execution_time > 1.0:  # Log queries taking more than 1 second
+                    logger.warning(f"Slow query detected: {execution_time:.2f}s")
+
+                return result
+
+            except Exception as e:
+                self._failed_connections += 1
+                logger.warning(f"Database operation failed (attempt {attempt + 1}/{self.config.retry_attempts}): {e}")
+
+                if attempt == self.config.retry_attempts - 1:  # Last attempt
+                    raise e
+
+                await asyncio.sleep(self.config.retry_delay)
+            finally:
+                self._active_connections = max(0, self._active_connections - 1)
+
+    async def test_connection(self) -> bool:
+        """Test database connection with retry logic"""
+        async def _test():
+            return await self.client.table("clients").select("count", count="exact").execute()
+
+        try:
+            await self._execute_with_retry(_test)
+            logger.info("Async database connection test successful")
+            return True
+        except Exception as e:
+            logger.error(f"Async connection test failed: {e}")
+            return False
+
+    def get_connection_stats(self) -> Dict[str, int]:
+        """Get connection pool statistics"""
+        return {
+            'active_connections': self._active_connections,
+            'total_connections': self._total_connections,
+            'failed_connections': self._failed_connections,
+            'pool_size': self.pool_size,
+            'max_overflow': self.max_overflow
+        }
+
+    # === Client Management ===
+
+    async def create_client_record(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new client record"""
+        result = await self.client.table("clients").insert(client_data).execute()
+        return result.data[0] if result.data else {}
+
+    async def get_client(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """Get client by ID"""
+        result = await self.client.table("clients").select("*").eq("id", client_id).execute()
+        return result.data[0] if result.data else None
+
+    # === Form Management ===
+
+    async def create_form(self, form_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new form configuration"""
+        result = await self.client.table("forms").insert(form_data).execute()
+        return result.data[0] if result.data else {}
+
+    async def get_form(self, form_id: str) -> Optional[Dict[str, Any]]:
+        """Get form configuration by ID"""
+        result = await self.client.table("forms").select("*").eq("id", form_id).execute()
+        return result.data[0] if result.data else None
+
+    async def get_form_questions(self, form_id: str) -> List[Dict[str, Any]]:
+        """Get all questions for a form"""
+        result = await self.client.table("form_questions").select("*").eq("form_id", form_id).order("question_order").execute()
+        questions = result.data or []
+
+        # Map question_id to id for consistent internal usage (see FIX_DOCUMENTATION.md)
+        for q in questions:
+            if 'question_id' in q and 'id' not in q:
+                q['id'] = q['question_id']
+
+        return questions
+
+    async def get_client_by_form(self, form_id: str) -> Optional[Dict[str, Any]]:
+        """Get client information associated with a form"""
+        form = await self.get_form(form_id)
+        if not form or not form.get('client_id'):
+            return None
+
+        return await self.get_client(form['client_id'])
+
+    async def get_form_with_questions(self, form_id: str) -> Dict[str, Any]:
+        """Get form configuration with all associated questions"""
+        form, questions = await asyncio.gather(
+            self.get_form(form_id),
+            self.get_form_questions(form_id)
+        )
+        if not form:
+            return {}
+
+        return {
+            **form,
+            'questions': questions
+        }
+
+    async def update_question_phrasing_variants(self, form_id: str, question_id: int, phrasing_variants: Dict[str, Any]) -> Dict[str, Any]:
+        """Store precomputed phrasings for one form question"""
+        result = await self.client.table("form_questions")\
+            .update({"phrasing_variants": phrasing_variants})\
+            .eq("form_id", form_id)\
+            .eq("question_id", question_id)\
+            .execute()
+        return result.data[0] if result.data else {}
+
+    async def update_form_engagement_variants(self, form_id: str, engagement_variants: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Store precomputed step headline/message pairs for a form"""
+        result = await self.client.table("forms").update({"engagement_variants": engagement_variants}).eq("id", form_id).execute()
+        return result.data[0] if result.data else {}
+
+    # === Lead Session Management ===
+
+    async def create_lead_session(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new lead session"""
+        result = await self.client.table("lead_sessions").insert(session_data).execute()
+        return result.data[0] if result.data else {}
+
+    async def update_lead_session(self, session_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Update lead session"""
+        result = await self.client.table("lead_sessions").update(updates).eq("session_id", session_id).execute()
+        return result.data[0] if result.data else {}
+
+    async def get_lead_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get lead session by ID"""
+        result = await self.client.table("lead_sessions").select("*").eq("session_id", session_id).execute()
+        return result.data[0] if result.data else None
+
+    # === Response Management ===
+
+    async def create_response(self, response_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new response record"""
+        result = await self.client.table("responses").insert(response_data).execute()
+        return result.data[0] if result.data else {}
+
+    async def get_session_responses(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get all responses for a session"""
+        # First get the database ID from the session_id string
+        session_record = await self.client.table('lead_sessions').select('id').eq('session_id', session_id).execute()
+        if not session_record.data:
+            return []
+
+        session_db_id = session_record.data[0]['id']
+        result = await self.client.table("responses").select("*").eq("session_id", session_db_id).order("created_at").execute()
+        return result.data or []
+
+    async def save_individual_response(self, session_id: str, response_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Save individual response immediately"""
+        # created_at is automatically set by database DEFAULT NOW()
+        response_with_metadata = {
+            **response_data,
+            "session_id": session_id
+        }
+        result = await self.client.table("responses").insert(response_with_metadata).execute()
+        return result.data[0] if result.data else {}
+
+    # === Tracking Data Management ===
+
+    async def save_tracking_data(self, session_id: str, tracking_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Save UTM and tracking parameters"""
+        tracking_with_metadata = {
+            **tracking_data,
+            "session_id": session_id,
+            "created_at": datetime.now().isoformat()
+        }
+        result = await self.client.table("tracking_data").insert(tracking_with_metadata).execute()
+        return result.data[0] if result.data else {}
+
+    async def get_tracking_data(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get tracking data for a session"""
+        result = await self.client.table("tracking_data").select("*").eq("session_id", session_id).execute()
+        return result.data[0] if result.data else None
+
+    # === Session State Management ===
+
+    async def save_session_snapshot(self, session_id: str, full_state: Dict[str, Any], step: int, recovery_reason: str = None, base_id: Optional[str] = None) -> Dict[str, Any]:
+        """Save session state snapshot for recovery (one row per session, upserted)"""
+        snapshot_data = {
+            "session_id": session_id,
+            "base_id": base_id or str(uuid.uuid4()),
+            "step_number": step,
+            "form_state": full_state,
+            "responses_snapshot": full_state.get('responses', {}),
+            "score_snapshot": full_state.get('current_score', 0),
+            "updated_at": datetime.now().isoformat()
+        }
+        result = await self.client.table("session_snapshots").upsert(snapshot_data, on_conflict="session_id").execute()
+        return result.data[0] if result.data else {}
+
+    async def get_latest_session_snapshot(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent snapshot for a session"""
+        result = await self.client.table("session_snapshots")\
+            .select("*")\
+            .eq("session_id", session_id)\
+            .order("created_at", desc=True)\
+            .limit(1)\
+            .execute()
+        return result.data[0] if result.data else None
+
+    async def save_session_snapshot_delta(self, session_id: str, step: int, patch: List[Dict[str, Any]], base_id: Optional[str] = None, sequence: int = 0) -> Dict[str, Any]:
+        """Save a per-step patch on top of the session's base snapshot (``sequence`` orders the patches of one base)"""
+        delta_data = {
+            "session_id": session_id,
+            "base_id": base_id,
+            "sequence": sequence,
+            "step_number": step,
+            "patch": patch
+        }
+        result = await self.client.table("session_snapshot_deltas").insert(delta_data).execute()
+        return result.data[0] if result.data else {}
+
+    async def get_session_snapshot_deltas(self, session_id: str, base_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the patches written on top of base snapshot ``base_id``, oldest first"""
+        query = self.client.table("session_snapshot_deltas")\
+            .select("step_number, sequence, patch")\
+            .eq("session_id", session_id)
+        # Step numbers don't order patches: the step can stay the same across many writes
+        query = query.eq("base_id", base_id) if base_id else query.is_("base_id", "null")
+        result = await query.order("sequence").order("created_at").execute()
+        return result.data or []
+
+    async def delete_session_snapshot_deltas(self, session_id: str) -> None:
+        """Drop patches folded into a new base snapshot (compaction)"""
+        await self.client.table("session_snapshot_deltas").delete().eq("session_id", session_id).execute()
+
+    # === Enhanced Lead Session Management ===
+
+    async def update_lead_session_with_tracking(self, session_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Update lead session with automatic timestamp and abandonment tracking"""
+        updates_with_timestamp = {
+            **updates,
+            "last_updated": datetime.now().isoformat(),
+            "last_activity_timestamp": datetime.now().isoformat()
+        }
+        result = await self.client.table("lead_sessions").update(updates_with_timestamp).eq("session_id", session_id).execute()
+        return result.data[0] if result.data else {}
+
+    async def mark_session_abandoned(self, session_id: str) -> Dict[str, Any]:
+        """Mark session as abandoned with proper metadata"""
+        abandon_data = {
+            "abandonment_status": "abandoned",
+            "abandonment_risk": 1.0,
+            "completed": True,
+            "completion_type": "abandoned",
+            "completed_at": datetime.now().isoformat(),
+            "last_updated": datetime.now().isoformat()
+        }
+        result = await self.client.table("lead_sessions").update(abandon_data).eq("session_id", session_id).execute()
+        return result.data[0] if result.data else {}
+
+    # === Analytics and Reporting ===
+
+    async def get_form_analytics(self, form_id: str, days: int = 30) -> Dict[str, Any]:
+        """Get analytics for a form over the last N days"""
+        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+
+        sessions = await self.client.table("lead_sessions")\
+            .select("*")\
+            .eq("form_id", form_id)\
+            .gte("started_at", cutoff_date)\
+            .execute()
+
+        if not sessions.data:
+            return {"total_sessions": 0}
+
+        total_sessions = len(sessions.data)
+        completed_sessions = len([s for s in sessions.data if s.get('completed')])
+        qualified_leads = len([s for s in sessions.data if s.get('lead_status') == 'yes'])
+        maybe_leads = len([s for s in sessions.data if s.get('lead_status') == 'maybe'])
+        abandoned_sessions = len([s for s in sessions.data if s.get('completion_type') == 'abandoned'])
+
+        return {
+            "total_sessions": total_sessions,
+            "completed_sessions": completed_sessions,
+            "completion_rate": completed_sessions / total_sessions if total_sessions > 0 else 0,
+            "qualified_leads": qualified_leads,
+            "maybe_leads": maybe_leads,
+            "qualified_rate": qualified_leads / completed_sessions if completed_sessions > 0 else 0,
+            "abandoned_sessions": abandoned_sessions,
+            "abandonment_rate": abandoned_sessions / total_sessions if total_sessions > 0 else 0,
+            "avg_steps": sum(s.get('step', 0) for s in sessions.data) / total_sessions if total_sessions > 0 else 0
+        }
+
+    async def get_utm_performance(self, form_id: str = None, days: int = 30) -> List[Dict[str, Any]]:
+        """Get UTM source performance analytics"""
+        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+
+        query = self.client.table("tracking_data")\
+            .select("utm_source, utm_campaign, utm_medium")\
+            .gte("created_at", cutoff_date)
+
+        if form_id:
+            query = query.eq("session_id", f"lead_sessions(form_id.eq.{form_id})")
+
+        result = await query.execute()
+        return result.data or []
+
+    # === Question Tracking Management ===
+
+    async def get_asked_questions(self, session_id: str) -> List[int]:
+        """Get list of question_ids already asked for this session"""
+        try:
+            session_record = await self.client.table('lead_sessions').select('id').eq('session_id', session_id).execute()
+            if not session_record.data:
+                logger.warning(f"Session {session_id} not found in database")
+                return []
+
+            session_db_id = session_record.data[0]['id']
+
+            result = await self.client.table("responses").select("question_id").eq("session_id", session_db_id).execute()
+            asked_questions = [r["question_id"] for r in result.data] if result.data else []
+            return list(set(asked_questions))  # Remove duplicates
+        except Exception as e:
+            logger.error(f"Error getting asked questions for session {session_id}: {e}")
+            return []
+
+    # === Lead Outcome Management ===
+
+    async def create_lead_outcome(self, outcome_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Record lead conversion outcome"""
+        result = await self.client.table("lead_outcomes").insert(outcome_data).execute()
+        return result.data[0] if result.data else {}
+
+    async def get_historical_outcomes(self, form_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get historical conversion data for ML learning"""
+        query = self.client.table("lead_outcomes").select("*")
+        if form_id:
+            query = query.eq("form_id", form_id)
+        result = await query.execute()
+        return result.data or []
+
+# Singleton instance
+db_async = AsyncSupabaseClient()
@@ -4,6 +4,7 @@ Database utilities for Supabase integration with environment-specific configurat
 import os
 import time
 import logging
+import uuid
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from supabase import create_client, Client
@@ -168,6 +169,20 @@ class SupabaseClient:
             'questions': questions
         }
     
+    def update_question_phrasing_variants(self, form_id: str, question_id: int, phrasing_variants: Dict[str, Any]) -> Dict[str, Any]:
+        """Store precomputed phrasings for one form question"""
+        result = self.client.table("form_questions")\
+            .update({"phrasing_variants": phrasing_variants})\
+            .eq("form_id", form_id)\
+            .eq("question_id", question_id)\
+            .execute()
+        return result.data[0] if result.data else {}
+    
+    def update_form_engagement_variants(self, form_id: str, engagement_variants: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Store precomputed step headline/message pairs for a form"""
+        result = self.client.table("forms").update({"engagement_variants": engagement_variants}).eq("id", form_id).execute()
+        return result.data[0] if result.data else {}
+    
     # === Lead Session Management ===
     
     def create_lead_session(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -233,16 +248,18 @@ class SupabaseClient:
     
     # === Session State Management ===
     
-    def save_session_snapshot(self, session_id: str, full_state: Dict[str, Any], step: int, recovery_reason: str = None) -> Dict[str, Any]:
-        """Save session state snapshot for recovery"""
+    def save_session_snapshot(self, session_id: str, full_state: Dict[str, Any], step: int, recovery_reason: str = None, base_id: Optional[str] = None) -> Dict[str, Any]:
+        """Save session state snapshot for recovery (one row per session, upserted)"""
         snapshot_data = {
             "session_id": session_id,
+            "base_id": base_id or str(uuid.uuid4()),
             "step_number": step,
             "form_state": full_state,
             "responses_snapshot": full_state.get('responses', {}),
-            "score_snapshot": full_state.get('current_score', 0)
+            "score_snapshot": full_state.get('current_score', 0),
+            "updated_at": datetime.now().isoformat()
         }
-        result = self.client.table("session_snapshots").insert(snapshot_data).execute()
+        result = self.client.table("session_snapshots").upsert(snapshot_data, on_conflict="session_id").execute()
         return result.data[0] if result.data else {}
     
     def get_latest_session_snapshot(self, session_id: str) -> Optional[Dict[str, Any]]:
@@ -255,6 +272,32 @@ class SupabaseClient:
             .execute()
         return result.data[0] if result.data else None
     
+    def save_session_snapshot_delta(self, session_id: str, step: int, patch: List[Dict[str, Any]], base_id: Optional[str] = None, sequence: int = 0) -> Dict[str, Any]:
+        """Save a per-step patch on top of the session's base snapshot (``sequence`` orders the patches of one base)"""
+        delta_data = {
+            "session_id": session_id,
+            "base_id": base_id,
+            "sequence": sequence,
+            "step_number": step,
+            "patch": patch
+        }
+        result = self.client.table("session_snapshot_deltas").insert(delta_data).execute()
+        return result.data[0] if result.data else {}
+    
+    def get_session_snapshot_deltas(self, session_id: str, base_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the patches written on top of base snapshot ``base_id``, oldest first"""
+        query = self.client.table("session_snapshot_deltas")\
+            .select("step_number, sequence, patch")\
+            .eq("session_id", session_id)
+        # Step numbers don't order patches: the step can stay the same across many writes
+        query = query.eq("base_id", base_id) if base_id else query.is_("base_id", "null")
+        result = query.order("sequence").order("created_at").execute()
+        return result.data or []
+    
+    def delete_session_snapshot_deltas(self, session_id: str) -> None:
+        """Drop patches folded into a new base snapshot (compaction)"""
+        self.client.table("session_snapshot_deltas").delete().eq("session_id", session_id).execute()
+    
     # === Enhanced Lead Session Management ===
     
     def update_lead_session_with_tracking(self, session_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
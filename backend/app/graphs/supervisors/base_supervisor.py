@@ -3,16 +3,22 @@
 from __future__ import annotations
 from typing import Dict, Any, List, Optional, Type, Union
 from abc import ABC, abstractmethod
+import asyncio
 import json
 import logging
+import os
 from datetime import datetime
 
 from ...models import get_chat_model
+from ...utils.llm_cache import llm_cache, make_cache_key
 from ...state import SurveyState
 from ..toolbelts.supervisor_toolbelt import supervisor_toolbelt
 
 logger = logging.getLogger(__name__)
 
+# Cap on simultaneous LLM requests per supervisor fan-out
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+
 
 class SupervisorDecision:
     """Represents a decision made by a supervisor with reasoning and confidence."""
@@ -52,13 +58,19 @@ class SupervisorAgent(ABC):
         model_name: str = "gpt-4o-mini",
         temperature: float = 0.1,
         max_tokens: int = 1000,
-        timeout_seconds: int = 30
+        timeout_seconds: int = 30,
+        max_concurrency: int = LLM_MAX_CONCURRENCY
     ):
         self.name = name
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max(1, max_concurrency)
+        
+        # Event loop that owns the async LLM clients; set by async graph nodes that
+        # run the sync supervisor code in a worker thread
+        self.event_loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Initialize LLM model
         self.model = get_chat_model(
@@ -85,9 +97,18 @@ class SupervisorAgent(ABC):
         self, 
         messages: List[Dict[str, str]], 
         tools: List[Any] = None,
+        model: Any = None,
+        cache_form_id: Optional[str] = None,
+        use_cache: bool = True,
         **kwargs
     ) -> Union[str, Dict[str, Any]]:
-        """Invoke the LLM with proper error handling and logging."""
+        """Invoke the LLM with proper error handling and logging.
+        
+        Responses to identical requests are served from ``llm_cache``; pass
+        ``cache_form_id`` so the entry is dropped when that form is edited.
+        Calls with tools bypass the cache. ``model`` overrides ``self.model``
+        and keeps its own temperature/max_tokens settings.
+        """
         try:
             # Add system message if not present
             if not messages or messages[0].get("role") != "system":
@@ -97,17 +118,29 @@ class SupervisorAgent(ABC):
             logger.debug(f"{self.name}: Invoking LLM with {len(messages)} messages")
             
             # Configure model parameters
-            model_kwargs = {
-                "temperature": self.temperature,
-                "max_tokens": self.max_tokens,
-                **kwargs
-            }
+            if model is None:
+                model = self.model
+                model_kwargs = {
+                    "temperature": self.temperature,
+                    "max_tokens": self.max_tokens,
+                    **kwargs
+                }
+            else:
+                model_kwargs = dict(kwargs)
+            
+            # Serve repeated prompts from the cache
+            cache_key = None
+            if use_cache and not tools:
+                model_name = getattr(model, 'model_name', None) or self.model_name
+                cache_key = make_cache_key(model_name, model_kwargs, messages)
+                cached_content = llm_cache.get(cache_key, form_id=cache_form_id)
+                if cached_content is not None:
+                    logger.debug(f"{self.name}: LLM cache hit ({len(cached_content)} chars)")
+                    return cached_content
             
             # Bind tools if provided
             if tools:
-                model = self.model.bind_tools(tools)
-            else:
-                model = self.model
+                model = model.bind_tools(tools)
             
             # Invoke model
             response = model.invoke(messages, **model_kwargs)
@@ -119,12 +152,83 @@ class SupervisorAgent(ABC):
                 content = str(response)
             
             logger.debug(f"{self.name}: LLM response received ({len(content)} chars)")
+            if cache_key and isinstance(content, str) and content.strip():
+                llm_cache.set(cache_key, content, form_id=cache_form_id)
             return content
             
         except Exception as e:
             logger.error(f"{self.name}: LLM invocation failed: {e}")
             raise SupervisorError(f"LLM invocation failed for {self.name}", e)
     
+    async def ainvoke_llm_concurrently(
+        self,
+        message_batches: List[List[Dict[str, str]]],
+        model: Any = None,
+        timeout_seconds: Optional[float] = None
+    ) -> List[Optional[str]]:
+        """Run independent LLM requests concurrently with ``ainvoke``.
+        
+        At most ``max_concurrency`` requests are in flight at once and each one
+        is bounded by ``timeout_seconds`` (default ``self.timeout_seconds``), so
+        the batch takes about as long as its slowest request. A request that
+        fails or times out yields None at its position; callers apply their own
+        fallback.
+        """
+        model = model or self.model
+        timeout_seconds = timeout_seconds or self.timeout_seconds
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run(index: int, messages: List[Dict[str, str]]) -> Optional[str]:
+            async with semaphore:
+                try:
+                    response = await asyncio.wait_for(model.ainvoke(messages), timeout=timeout_seconds)
+                except asyncio.TimeoutError:
+                    logger.warning(f"{self.name}: LLM request {index} timed out after {timeout_seconds}s")
+                    return None
+                except Exception as e:
+                    logger.error(f"{self.name}: LLM request {index} failed: {e}")
+                    return None
+            return response.content if hasattr(response, 'content') else str(response)
+        
+        return list(await asyncio.gather(*(run(i, m) for i, m in enumerate(message_batches))))
+    
+    def invoke_llm_concurrently(
+        self,
+        message_batches: List[List[Dict[str, str]]],
+        model: Any = None,
+        timeout_seconds: Optional[float] = None
+    ) -> List[Optional[str]]:
+        """Sync entry point for ``ainvoke_llm_concurrently``.
+        
+        From a worker thread the batch is scheduled on ``self.event_loop`` (the
+        loop the async LLM clients belong to); without one a private loop is
+        used. Called on a thread whose loop is running, the requests fall back to
+        sequential ``invoke`` because that loop cannot be blocked on.
+        """
+        coroutine_args = (message_batches, model, timeout_seconds)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            return [self._invoke_content(messages, model) for messages in message_batches]
+        
+        if self.event_loop is not None and self.event_loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(
+                self.ainvoke_llm_concurrently(*coroutine_args), self.event_loop
+            )
+            return future.result()
+        return asyncio.run(self.ainvoke_llm_concurrently(*coroutine_args))
+    
+    def _invoke_content(self, messages: List[Dict[str, str]], model: Any = None) -> Optional[str]:
+        """Single blocking LLM request with the same None-on-failure contract."""
+        try:
+            response = (model or self.model).invoke(messages)
+        except Exception as e:
+            logger.error(f"{self.name}: LLM request failed: {e}")
+            return None
+        return response.content if hasattr(response, 'content') else str(response)
+    
     def load_client_info(self, form_id: str) -> Dict[str, Any]:
         """Load client information for contextualization."""
         try:
@@ -2,17 +2,31 @@
 
 from __future__ import annotations
 from typing import Dict, Any, List, Optional
+import asyncio
 import json
 import logging
+import os
 from datetime import datetime
 
 from .base_supervisor import SupervisorAgent, SupervisorDecision
 from ...state import SurveyState
 from ...models import get_chat_model
+from ...step_context import get_step_context, context_form_questions
 from ..toolbelts.lead_intelligence_toolbelt import lead_intelligence_toolbelt
 
 logger = logging.getLogger(__name__)
 
+# Per-request LLM timeout and cap on concurrent requests during lead finalization
+LEAD_LLM_TIMEOUT_SECONDS = float(os.getenv('LEAD_LLM_TIMEOUT_SECONDS', '10'))
+LEAD_LLM_MAX_CONCURRENCY = int(os.getenv('LEAD_LLM_MAX_CONCURRENCY', '3'))
+
+VALID_TOOL_RECOMMENDATIONS = ["tavily", "maps", "both", "none"]
+VALID_BUSINESS_FITS = ["PERFECT_FIT", "GOOD_FIT", "OKAY_FIT", "POOR_FIT", "BAD_FIT"]
+DEFAULT_COMPLETION_MESSAGE = "Thank you for your interest! We'll be in touch soon."
+
+# "inline": classify during the /step request; "background": queue for the lead scoring worker
+LEAD_SCORING_MODE = os.getenv('LEAD_SCORING_MODE', 'inline').lower()
+
 
 class ConsolidatedLeadIntelligenceAgent(SupervisorAgent):
     """Consolidated agent handling all lead intelligence and processing tasks."""
@@ -23,11 +37,13 @@ class ConsolidatedLeadIntelligenceAgent(SupervisorAgent):
             model_name="gpt-4.1-nano",
             temperature=0.1,
             max_tokens=1500,  # Reduced for faster responses
-            timeout_seconds=10,  # Reduced timeout for faster responses
+            timeout_seconds=LEAD_LLM_TIMEOUT_SECONDS,  # Per-request timeout for faster responses
+            max_concurrency=LEAD_LLM_MAX_CONCURRENCY,
             **kwargs
         )
         self.llm = get_chat_model(model_name="gpt-4.1-nano", temperature=0.1)
         self.toolbelt = lead_intelligence_toolbelt
+        self.background_scoring = LEAD_SCORING_MODE == "background"
     
     def get_system_prompt(self) -> str:
         """System prompt defining the Lead Qualification Specialist role."""
@@ -220,7 +236,7 @@ Write only the completion message, no other text."""
                     
                     # Generate completion message
                     form_id = state.get("core", {}).get("form_id")
-                    business_context = self._get_business_context_from_db(form_id)
+                    business_context = self._get_business_context_from_db(form_id, get_step_context(state))
                     completion_message = self._generate_completion_message_llm(
                         current_lead_status, [], business_context  # No new responses
                     )
@@ -254,32 +270,11 @@ Write only the completion message, no other text."""
             if not save_result["success"]:
                 logger.error(f"Failed to save responses: {save_result.get('error')}")
             
-            # Step 2: Calculate initial mathematical score
-            score_result = self._calculate_lead_score(state)
-            
-            # Step 3: Analyze if tools are needed and make comprehensive decision
-            comprehensive_decision = self._make_comprehensive_lead_decision(
-                state, 
-                score_result["calculated_score"]
-            )
-            
-            # Step 4: Execute tools if recommended
-            tool_results = {}
-            if comprehensive_decision["tools_needed"]:
-                tool_results = self._execute_tools(comprehensive_decision)
-            
-            # Step 5: Validate and adjust score with tool results
-            logger.info(f"🔥 SCORING DEBUG: score_result = {score_result}")
-            final_classification = self._finalize_lead_classification(
-                state,
-                score_result["calculated_score"],
-                comprehensive_decision,
-                tool_results
-            )
-            logger.info(f"🔥 SCORING DEBUG: final_classification = {final_classification}")
-            
-            # Step 6: Update database with final status
-            self._update_database_status(state, final_classification)
+            # Steps 2-6: Score, assess and classify - inline, or queued for the lead scoring worker
+            if self.background_scoring:
+                final_classification = self._provisional_classification(state)
+            else:
+                final_classification = self.classify_responses(state)
             
             # Step 7: Mark questions as asked (convert question_id to question UUID)
             asked_question_uuids = self._mark_questions_as_asked(state)
@@ -289,8 +284,17 @@ Write only the completion message, no other text."""
             # Don't pollute asked_questions with UUIDs - keep only integer question IDs
             # Database tracking handles the actual question marking
             
+            # Keep the prefetched context in step with the responses just saved
+            step_context_update = {}
+            step_context = get_step_context(state)
+            if 'asked_question_ids' in step_context:
+                answered_ids = list(step_context['asked_question_ids'])
+                answered_ids += [q_id for q_id in asked_question_uuids if q_id not in answered_ids]
+                step_context_update['step_context'] = {**step_context, 'asked_question_ids': answered_ids}
+            
             return {
                 **final_classification,
+                **step_context_update,
                 'pending_responses': [],  # Clear after processing
                 'question_strategy': {
                     **current_question_strategy,
@@ -304,6 +308,7 @@ Write only the completion message, no other text."""
                     'final_score': final_classification.get('final_score', 0),
                     'confidence': final_classification.get('confidence', 0),
                     'completion_message': final_classification.get('completion_message', ''),
+                    'scoring_pending': final_classification.get('scoring_pending', False),
                     'last_classification': final_classification,
                     'classification_timestamp': datetime.now().isoformat()
                 }
@@ -319,6 +324,67 @@ Write only the completion message, no other text."""
                 "error": str(e)
             }
     
+    def classify_responses(self, state: SurveyState) -> Dict[str, Any]:
+        """Score and classify saved responses and record the result in the database.
+        
+        Runs inline, or in the lead scoring worker when ``LEAD_SCORING_MODE`` is
+        ``background``; ``state`` needs ``core``, ``pending_responses`` and
+        ``lead_intelligence``.
+        """
+        # Step 2: Calculate initial mathematical score
+        score_result = self._calculate_lead_score(state)
+        
+        # Step 3: Analyze if tools are needed and make comprehensive decision
+        comprehensive_decision = self._make_comprehensive_lead_decision(
+            state, 
+            score_result["calculated_score"]
+        )
+        
+        # Step 4: Execute tools if recommended
+        tool_results = {}
+        if comprehensive_decision["tools_needed"]:
+            tool_results = self._execute_tools(comprehensive_decision)
+        
+        # Step 5: Validate and adjust score with tool results
+        logger.info(f"🔥 SCORING DEBUG: score_result = {score_result}")
+        final_classification = self._finalize_lead_classification(
+            state,
+            score_result["calculated_score"],
+            comprehensive_decision,
+            tool_results
+        )
+        logger.info(f"🔥 SCORING DEBUG: final_classification = {final_classification}")
+        
+        # Step 6: Update database with final status
+        self._update_database_status(state, final_classification)
+        return final_classification
+    
+    def _provisional_classification(self, state: SurveyState) -> Dict[str, Any]:
+        """Classification used while the responses wait for the lead scoring worker.
+        
+        Keeps the status the worker recorded for earlier steps (prefetched
+        ``lead_session``), so a definitive yes/no still ends the survey - one
+        step later than inline scoring would.
+        """
+        lead_session = get_step_context(state).get('lead_session') or {}
+        lead_intelligence = state.get('lead_intelligence', {})
+        lead_status = lead_session.get('lead_status') or lead_intelligence.get('lead_status', 'unknown')
+        route_decision = self._determine_route_decision(state, lead_status)
+        
+        classification = {
+            "lead_status": lead_status,
+            "final_score": lead_session.get('final_score') or lead_intelligence.get('final_score', 0),
+            "confidence": lead_session.get('confidence') or lead_intelligence.get('confidence', 0),
+            "route_decision": route_decision,
+            "completed": route_decision == "end",
+            "scoring_pending": True
+        }
+        # No message yet unless the worker wrote one - callers fall back to their default
+        completion_message = lead_session.get('completion_message') or lead_intelligence.get('completion_message')
+        if completion_message:
+            classification["completion_message"] = completion_message
+        return classification
+    
     def _mark_questions_as_asked(self, state: SurveyState) -> List[int]:
         """Extract integer question_ids from responses for tracking."""
         try:
@@ -419,14 +485,20 @@ Write only the completion message, no other text."""
         
         # Step 1: Get business context from database  
         form_id = state.get("core", {}).get("form_id")
-        business_context = self._get_business_context_from_db(form_id)
+        business_context = self._get_business_context_from_db(form_id, get_step_context(state))
         logger.info(f"📋 Business context: {business_context}")
         
-        # Step 2: Get tool recommendations from LLM (simple prompt)
-        tool_recommendation = self._get_tool_recommendations(pending_responses)
-        
-        # Step 3: Get business fit weighting from LLM (simple prompt)
-        business_fit = self._get_business_fit_assessment(pending_responses, business_context)
+        # Steps 2-3: Tool recommendations and business fit weighting are independent
+        # LLM calls (simple prompts) - run them concurrently
+        tool_content, fit_content = self.invoke_llm_concurrently(
+            [
+                self._build_tool_recommendation_messages(pending_responses),
+                self._build_business_fit_messages(pending_responses, business_context)
+            ],
+            model=self.llm
+        )
+        tool_recommendation = self._parse_tool_recommendation(tool_content)
+        business_fit = self._parse_business_fit(fit_content)
         logger.info(f"🤖 LLM Business Fit Assessment: {business_fit}")
         
         # Step 4: Calculate business fit adjustment (pure logic)
@@ -556,7 +628,7 @@ Write only the completion message, no other text."""
         if lead_status in ["yes", "maybe", "no"] and not decision.get("completion_message"):
             # Get business context and responses for personalized message
             form_id = state.get("core", {}).get("form_id")
-            business_context = self._get_business_context_from_db(form_id)
+            business_context = self._get_business_context_from_db(form_id, get_step_context(state))
             pending_responses = state.get("pending_responses", [])
             
             decision["completion_message"] = self._generate_completion_message_llm(
@@ -608,7 +680,9 @@ Write only the completion message, no other text."""
             # Get available questions from state (provided by Survey Admin)
             all_questions_from_state = question_strategy.get("all_questions", [])
             if not all_questions_from_state:
-                # Fallback to database if not in state
+                all_questions_from_state = context_form_questions(state)
+            if not all_questions_from_state:
+                # Fallback to database if not in state or prefetched context
                 from ...database import db
                 all_questions_from_state = db.get_form_questions(form_id)
             
@@ -756,84 +830,84 @@ Write only the completion message, no other text."""
             logger.error(f"Error checking required questions: {e}")
             return False  # Conservative - don't complete if we can't verify
     
+    def _build_tool_recommendation_messages(self, responses: List[Dict]) -> List[Dict[str, str]]:
+        """Build the tool recommendation prompt."""
+        context = "Recent customer responses:\\n"
+        for r in responses[-5:]:  # Last 5 responses
+            context += f"Q: {r.get('question_text', '')}\\n"
+            context += f"A: {r.get('answer', '')}\\n\\n"
+        
+        return [
+            {"role": "system", "content": self._get_tool_recommendation_prompt()},
+            {"role": "user", "content": context}
+        ]
+    
+    def _parse_tool_recommendation(self, content: Optional[str]) -> str:
+        """Validate the tool recommendation (None means the request failed)."""
+        if content is None:
+            return "none"
+        result = content.strip().lower()
+        if result in VALID_TOOL_RECOMMENDATIONS:
+            return result
+        logger.warning(f"Invalid tool recommendation: {result}, defaulting to 'none'")
+        return "none"
+    
+    def _build_business_fit_messages(self, responses: List[Dict], business_context: str) -> List[Dict[str, str]]:
+        """Build the business fit prompt."""
+        context = f"BUSINESS CONTEXT: {business_context}\\n\\n"
+        context += "Customer responses to analyze:\\n"
+        for r in responses:
+            context += f"Q: {r.get('question_text', '')}\\n"
+            context += f"A: {r.get('answer', '')}\\n\\n"
+        
+        logger.info(f"🔍 Evaluating responses: {[(r.get('question_text'), r.get('answer')) for r in responses]}")
+        
+        return [
+            {"role": "system", "content": self._get_business_weight_prompt()},
+            {"role": "user", "content": context}
+        ]
+    
+    def _parse_business_fit(self, content: Optional[str]) -> str:
+        """Validate the business fit (None means the request failed)."""
+        if content is None:
+            return "OKAY_FIT"
+        result = content.strip().upper()
+        if result in VALID_BUSINESS_FITS:
+            return result
+        logger.warning(f"Invalid business fit: {result}, defaulting to 'OKAY_FIT'")
+        return "OKAY_FIT"
+    
     def _get_tool_recommendations(self, responses: List[Dict]) -> str:
         """Get tool recommendations from LLM."""
-        try:
-            context = "Recent customer responses:\\n"
-            for r in responses[-5:]:  # Last 5 responses
-                context += f"Q: {r.get('question_text', '')}\\n"
-                context += f"A: {r.get('answer', '')}\\n\\n"
-            
-            messages = [
-                {"role": "system", "content": self._get_tool_recommendation_prompt()},
-                {"role": "user", "content": context}
-            ]
-            
-            response = self.llm.invoke(messages)
-            result = response.content.strip().lower()
-            
-            # Validate response
-            if result in ["tavily", "maps", "both", "none"]:
-                return result
-            else:
-                logger.warning(f"Invalid tool recommendation: {result}, defaulting to 'none'")
-                return "none"
-                
-        except Exception as e:
-            logger.error(f"Tool recommendation error: {e}")
-            return "none"
+        content = self.invoke_llm_concurrently(
+            [self._build_tool_recommendation_messages(responses)], model=self.llm
+        )[0]
+        return self._parse_tool_recommendation(content)
     
     def _get_business_fit_assessment(self, responses: List[Dict], business_context: str) -> str:
         """Get business fit assessment from LLM."""
-        try:
-            context = f"BUSINESS CONTEXT: {business_context}\\n\\n"
-            context += "Customer responses to analyze:\\n"
-            for r in responses:
-                context += f"Q: {r.get('question_text', '')}\\n"
-                context += f"A: {r.get('answer', '')}\\n\\n"
-            
-            logger.info(f"🔍 Evaluating responses: {[(r.get('question_text'), r.get('answer')) for r in responses]}")
-            
-            messages = [
-                {"role": "system", "content": self._get_business_weight_prompt()},
-                {"role": "user", "content": context}
-            ]
-            
-            response = self.llm.invoke(messages)
-            result = response.content.strip().upper()
-            
-            # Validate response
-            valid_fits = ["PERFECT_FIT", "GOOD_FIT", "OKAY_FIT", "POOR_FIT", "BAD_FIT"]
-            if result in valid_fits:
-                return result
-            else:
-                logger.warning(f"Invalid business fit: {result}, defaulting to 'OKAY_FIT'")
-                return "OKAY_FIT"
-                
-        except Exception as e:
-            logger.error(f"Business fit assessment error: {e}")
-            return "OKAY_FIT"
+        content = self.invoke_llm_concurrently(
+            [self._build_business_fit_messages(responses, business_context)], model=self.llm
+        )[0]
+        return self._parse_business_fit(content)
     
     def _generate_completion_message_llm(self, lead_status: str, responses: List[Dict], business_context: str) -> str:
         """Generate completion message using LLM."""
-        try:
-            context = f"BUSINESS CONTEXT: {business_context}\\n\\n"
-            context += "Customer information from their responses:\\n"
-            for r in responses:
-                context += f"Q: {r.get('question_text', '')}\\n"
-                context += f"A: {r.get('answer', '')}\\n\\n"
-            
-            messages = [
-                {"role": "system", "content": self._get_completion_message_prompt(lead_status)},
-                {"role": "user", "content": context}
-            ]
-            
-            response = self.llm.invoke(messages)
-            return response.content.strip()
-            
-        except Exception as e:
-            logger.error(f"Completion message generation error: {e}")
-            return f"Thank you for your interest! We'll be in touch soon."
+        context = f"BUSINESS CONTEXT: {business_context}\\n\\n"
+        context += "Customer information from their responses:\\n"
+        for r in responses:
+            context += f"Q: {r.get('question_text', '')}\\n"
+            context += f"A: {r.get('answer', '')}\\n\\n"
+        
+        messages = [
+            {"role": "system", "content": self._get_completion_message_prompt(lead_status)},
+            {"role": "user", "content": context}
+        ]
+        
+        content = self.invoke_llm_concurrently([messages], model=self.llm)[0]
+        if not content or not content.strip():
+            return DEFAULT_COMPLETION_MESSAGE
+        return content.strip()
     
     def _generate_tavily_query(self, responses: List[Dict]) -> str:
         """Generate Tavily search query from responses (pure logic)."""
@@ -885,17 +959,23 @@ Write only the completion message, no other text."""
         
         return base_adjustment
 
-    def _get_business_context_from_db(self, form_id: str) -> str:
-        """Get business context from database for LLM prompts."""
+    def _get_business_context_from_db(self, form_id: str, step_context: Optional[Dict[str, Any]] = None) -> str:
+        """Get business context for LLM prompts from the prefetched step context or the database."""
         try:
-            from ...database import db
+            step_context = step_context or {}
             
             # Get form and client info
-            form = db.get_form(form_id)
+            form = step_context.get('form')
+            if not form:
+                from ...database import db
+                form = db.get_form(form_id)
             if not form or not form.get('client_id'):
                 return "General service business"
             
-            client = db.get_client(form['client_id'])
+            client = step_context.get('client')
+            if not client:
+                from ...database import db
+                client = db.get_client(form['client_id'])
             if not client:
                 return "General service business"
             
@@ -1113,7 +1193,38 @@ Write only the completion message, no other text."""
         }
 
 
-def consolidated_lead_intelligence_node(state: SurveyState) -> Dict[str, Any]:
-    """Node function for Consolidated Lead Intelligence Agent."""
+async def consolidated_lead_intelligence_node(state: SurveyState) -> Dict[str, Any]:
+    """Node function for Consolidated Lead Intelligence Agent.
+    
+    The blocking database work runs in a worker thread; LLM requests are
+    scheduled back on this event loop so independent ones run concurrently.
+    In background scoring mode the saved responses are queued for the lead
+    scoring worker, falling back to inline scoring if the queue is unavailable.
+    """
     agent = ConsolidatedLeadIntelligenceAgent()
-    return agent.process_lead_responses(state)
\ No newline at end of file
+    agent.event_loop = asyncio.get_running_loop()
+    result = await asyncio.to_thread(agent.process_lead_responses, state)
+    
+    if result.get('scoring_pending'):
+        from ...lead_scoring_queue import lead_scoring_queue
+        session_id = state.get("core", {}).get("session_id")
+        try:
+            await lead_scoring_queue.enqueue(session_id, state)
+        except Exception as e:
+            logger.error(f"Could not queue lead scoring for {session_id}, scoring inline: {e}")
+            classification = await asyncio.to_thread(agent.classify_responses, state)
+            result = {
+                **result,
+                **classification,
+                'scoring_pending': False,
+                'lead_intelligence': {
+                    **result.get('lead_intelligence', {}),
+                    'lead_status': classification.get('lead_status', 'unknown'),
+                    'final_score': classification.get('final_score', 0),
+                    'confidence': classification.get('confidence', 0),
+                    'completion_message': classification.get('completion_message', ''),
+                    'scoring_pending': False,
+                    'last_classification': classification
+                }
+            }
+    return result
\ No newline at end of file
@@ -1,17 +1,71 @@
 """Consolidated Survey Administration Supervisor - All survey flow logic in one place."""
 
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional
+import asyncio
 import json
 import logging
+import os
+import re
 from datetime import datetime
 
+from langchain_core.runnables import RunnableConfig
+
 from .base_supervisor import SupervisorAgent, SupervisorDecision
 from ...state import SurveyState
 from ...models import get_chat_model
+from ...step_context import get_step_context
+from ...utils.question_index import FormQuestionIndex, question_index
+from ...utils.phrasing_variants import question_variants, pick_variant
 
 logger = logging.getLogger(__name__)
 
+# "precomputed": use stored phrasing variants when available; "llm": always phrase live
+PHRASING_MODE = os.getenv("QUESTION_PHRASING_MODE", "precomputed").lower()
+
+DEFAULT_ENGAGEMENT_HEADLINE = "Let's get to know you better!"
+DEFAULT_ENGAGEMENT_MESSAGE = "Help us understand your needs better."
+
+
+class EngagementTokenParser:
+    """Split streamed ``HEADLINE:``/``MESSAGE:`` output into per-field tokens.
+
+    Text is held back until a line's label is known, then the rest of the
+    line is passed through token by token.
+    """
+
+    _LABEL = re.compile(r'^\s*(HEADLINE|MESSAGE)\s*:\s*', re.IGNORECASE)
+
+    def __init__(self):
+        self.fields: Dict[str, str] = {"headline": "", "message": ""}
+        self._field: Optional[str] = None
+        self._pending = ""
+
+    def feed(self, text: str) -> List[Dict[str, str]]:
+        """Consume a chunk and return ``{"field", "token"}`` items ready to emit."""
+        tokens = []
+        for part in re.split(r'(\n)', text):
+            if part == "\n":
+                self._field, self._pending = None, ""
+                continue
+            if not part:
+                continue
+            if self._field is None:
+                self._pending += part
+                match = self._LABEL.match(self._pending)
+                if not match:
+                    continue
+                self._field = match.group(1).lower()
+                part = self._pending[match.end():]
+                self._pending = ""
+            if not self.fields[self._field]:
+                part = part.lstrip()
+            if not part:
+                continue
+            self.fields[self._field] += part
+            tokens.append({"field": self._field, "token": part})
+        return tokens
+
 
 class ConsolidatedSurveyAdminSupervisor(SupervisorAgent):
     """Consolidated supervisor handling all survey administration tasks."""
@@ -91,8 +145,13 @@ MESSAGE: [marketing message highlighting business benefits under 50 words]
 
 You create survey experiences that visitors genuinely enjoy while strategically attracting the ideal customers the business seeks."""
 
-    def process_survey_step(self, state: SurveyState) -> Dict[str, Any]:
-        """Main entry point - processes entire survey administration step."""
+    def process_survey_step(self, state: SurveyState, defer_engagement: bool = False) -> Dict[str, Any]:
+        """Main entry point - processes entire survey administration step.
+
+        With ``defer_engagement`` the live LLM call only selects and phrases
+        questions; the headline/message are streamed afterwards by
+        ``astream_engagement``.
+        """
         try:
             logger.info(f"Starting survey administration processing for state: {type(state)}")
             logger.debug(f"State keys: {list(state.keys()) if isinstance(state, dict) else 'Not a dict'}")
@@ -112,8 +171,9 @@ You create survey experiences that visitors genuinely enjoy while strategically
                     }
                 }
 
-            # Load available questions
-            available_questions = self._load_available_questions(state)
+            # Load available questions (required first when selecting locally)
+            precomputed = PHRASING_MODE == "precomputed"
+            available_questions = self._load_available_questions(state, prioritized=precomputed)
             if not available_questions:
                 logger.warning("No available questions found, routing to lead intelligence for completion check")
                 return {
@@ -131,10 +191,18 @@ You create survey experiences that visitors genuinely enjoy while strategically
             logger.debug(f"State analysis: {analysis}")
             logger.info(f"About to call _make_comprehensive_decision with {len(available_questions)} questions")
 
-            # Make comprehensive decision
-            logger.info("🔥 CALLING _make_comprehensive_decision")
-            decision = self._make_comprehensive_decision(state, available_questions, analysis)
-            logger.info("🔥 RETURNED FROM _make_comprehensive_decision")
+            # Use precomputed phrasings when every selected question has them
+            decision = None
+            if precomputed:
+                decision = self._make_precomputed_decision(state, available_questions, analysis)
+
+            # Make comprehensive decision (live LLM selection and phrasing)
+            if decision is None:
+                logger.info("🔥 CALLING _make_comprehensive_decision")
+                decision = self._make_comprehensive_decision(
+                    state, available_questions, analysis, defer_engagement=defer_engagement
+                )
+                logger.info("🔥 RETURNED FROM _make_comprehensive_decision")
             logger.info(f"Decision completed: action={decision.get('action', 'unknown')}, questions={len(decision.get('selected_questions', []))}")
             logger.debug(f"Decision metadata: {decision.get('metadata', {})}")
 
@@ -150,11 +218,14 @@ You create survey experiences that visitors genuinely enjoy while strategically
             logger.error(f"Traceback: {traceback.format_exc()}")
             return self._create_error_response(str(e))
 
-    def _load_form_details(self, form_id: str) -> Dict[str, Any]:
-        """Load form details from database."""
+    def _load_form_details(self, form_id: str, prefetched_form: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Load form details from the prefetched step context or the database."""
         try:
-            from ...database import db
-            form_config = db.get_form(form_id)
+            if prefetched_form:
+                form_config = prefetched_form
+            else:
+                from ...database import db
+                form_config = db.get_form(form_id)
             if form_config:
                 return {
                     "id": form_id,
@@ -179,8 +250,8 @@ You create survey experiences that visitors genuinely enjoy while strategically
                 "client_id": None
             }
 
-    def _load_available_questions(self, state: SurveyState) -> List[Dict]:
-        """Load and filter available questions."""
+    def _load_available_questions(self, state: SurveyState, prioritized: bool = False) -> List[Dict]:
+        """Load and filter available questions, in form order or, when ``prioritized``, required first."""
         try:
             # Get form_id from state
             core = state.get('core', {})
@@ -189,39 +260,32 @@ You create survey experiences that visitors genuinely enjoy while strategically
 
             logger.debug(f"Loading questions for form_id: {form_id}")
 
-            # Load all questions directly from database (same as test implementation)
+            # Shared per-form index: built once per form version, no database read once warm
             from ...database import db
-            all_questions = db.get_form_questions(form_id)
-            logger.debug(f"Loaded {len(all_questions) if all_questions else 0} total questions from database")
-
-            if all_questions:
-                logger.debug(f"Sample question: {all_questions[0] if len(all_questions) > 0 else 'None'}")
+            step_context = get_step_context(state)
+            index = self._question_index(form_id, step_context)
+            logger.debug(f"Question index for form {form_id}: {len(index)} questions (version {index.version})")
 
             # CRITICAL FIX: Get already asked questions from TWO sources (like langgraph_test)
-            # 1. Database tracking (persistent)
-            asked_ids_db = db.get_asked_questions(session_id) if session_id else []
+            # 1. Database tracking (persistent) - prefetched ids already include this step's answers
+            if 'asked_question_ids' in step_context:
+                asked_ids_db = step_context['asked_question_ids']
+            else:
+                asked_ids_db = db.get_asked_questions(session_id) if session_id else []
 
             # 2. State-based tracking (current session)
             asked_ids_state = state.get("question_strategy", {}).get("asked_questions", [])
 
             # Combine both sources (this is what makes langgraph_test work!)
-            asked_ids = list(set(asked_ids_db + asked_ids_state))
+            asked_ids = set(asked_ids_db)
+            asked_ids.update(asked_ids_state)
 
-            logger.info(f"🔥 DUAL TRACKING: DB asked questions: {asked_ids_db}")
-            logger.info(f"🔥 DUAL TRACKING: State asked questions: {asked_ids_state}")
-            logger.info(f"🔥 DUAL TRACKING: Combined asked questions: {asked_ids}")
+            logger.debug(f"🔥 DUAL TRACKING: DB={asked_ids_db}, State={asked_ids_state}, Combined={sorted(asked_ids, key=str)}")
 
             # Filter to available questions using question_id (not database id)
-            available_questions = []
-            for q in all_questions:
-                question_id = q.get('question_id')
-                if question_id is not None:
-                    if question_id not in asked_ids:
-                        available_questions.append(q)
-                    else:
-                        logger.debug(f"🔥 FILTERING: Question ID {question_id} already asked, skipping")
+            available_questions = index.prioritized(asked_ids) if prioritized else index.available(asked_ids)
 
-            logger.info(f"🔥 DATABASE TRACKING: Loaded {len(available_questions)} available questions for form {form_id} (filtered from {len(all_questions)} total, {len(asked_ids)} already asked)")
+            logger.info(f"🔥 DATABASE TRACKING: Loaded {len(available_questions)} available questions for form {form_id} (filtered from {len(index)} total, {len(asked_ids)} already asked)")
             return available_questions
 
         except Exception as e:
@@ -230,6 +294,17 @@ You create survey experiences that visitors genuinely enjoy while strategically
             logger.error(f"Traceback: {traceback.format_exc()}")
             return []
 
+    def _question_index(self, form_id: str, step_context: Dict[str, Any]) -> FormQuestionIndex:
+        """Shared question index for the form, built from prefetched rows or the database on a miss."""
+        index = question_index.peek(form_id)
+        if index is not None:
+            return index
+        prefetched = step_context.get('form_questions')
+        if prefetched:
+            # Not installed: the rows may predate an invalidation the registry already saw
+            return FormQuestionIndex.build(form_id, prefetched, question_index.version(form_id))
+        return question_index.get(form_id)
+
     def _analyze_survey_state(self, state: SurveyState, available_questions: List[Dict]) -> Dict[str, Any]:
         """Analyze current survey state for decision making."""
         responses = state.get('lead_intelligence', {}).get('responses', [])
@@ -286,7 +361,8 @@ You create survey experiences that visitors genuinely enjoy while strategically
         self,
         state: SurveyState,
         available_questions: List[Dict],
-        analysis: Dict[str, Any]
+        analysis: Dict[str, Any],
+        defer_engagement: bool = False
     ) -> Dict[str, Any]:
         """Make comprehensive decision including selection, phrasing, and engagement."""
 
@@ -298,22 +374,8 @@ You create survey experiences that visitors genuinely enjoy while strategically
             responses = state.get('lead_intelligence', {}).get('responses', [])
 
             # Load client info if not already in state
-            core = state.get('core', {})
-            form_id = core.get('form_id')
-            client_info = state.get('client_info', {})
-            if not client_info:
-                try:
-                    from ...tools import load_client_info
-                    client_json = load_client_info.invoke({'form_id': form_id})
-                    client_info = json.loads(client_json) if client_json else {}
-                    logger.debug(f"Loaded client info: {bool(client_info)}")
-                except Exception as e:
-                    logger.warning(f"Failed to load client info: {e}")
-                    client_info = {}
-                    # Continue with default values instead of failing
-
-            business_name = client_info.get('name', 'our business')
-            industry = client_info.get('industry', 'service business')
+            form_id = state.get('core', {}).get('form_id')
+            client_info = self._resolve_client_info(state)
 
             # Create numbered question list for LLM using original question_id as the number
             numbered_questions = []
@@ -345,11 +407,6 @@ You create survey experiences that visitors genuinely enjoy while strategically
                 if answer and answer != "ASKED_PLACEHOLDER":
                     user_info[question_text] = answer
 
-            # Get detailed client info for engagement (using correct database column names)
-            business_background = client_info.get('background', '')
-            business_goals = client_info.get('goals', '')
-            target_audience = client_info.get('target_audience', '')
-
             # USER PROMPT: Simple data + task (no duplicate instructions)
             user_context = f"User: {user_name or 'unknown'}"
             if analysis['questions_asked'] > 0:
@@ -358,13 +415,7 @@ You create survey experiences that visitors genuinely enjoy while strategically
                 user_context += f" | {analysis['risk_level']} engagement"
             
             # Build comprehensive business context using all available database data
-            business_context = f"Business: {business_name} ({industry})"
-            if business_background:
-                business_context += f"\nBackground: {business_background[:100]}"
-            if business_goals:
-                business_context += f"\nGoals: {business_goals[:100]}"
-            if target_audience:
-                business_context += f"\nTarget: {target_audience[:100]}"
+            business_context = self._build_business_context(client_info)
             
             user_prompt = f"""# DATA FOR THIS REQUEST
 {business_context}
@@ -375,6 +426,9 @@ You create survey experiences that visitors genuinely enjoy while strategically
 
 # TASK
 Select and rephrase questions for this survey step. Follow your system instructions for format and rules."""
+            if defer_engagement:
+                # Headline/message are streamed separately once the questions are sent
+                user_prompt += "\nOutput only the SELECTED and QUESTION lines - the HEADLINE and MESSAGE are written separately."
 
             # Get LLM response
             messages = [
@@ -383,12 +437,7 @@ Select and rephrase questions for this survey step. Follow your system instructi
             ]
 
             logger.info("Calling LLM for question selection and rephrasing...")
-            response = self.llm.invoke(messages)
-
-            if hasattr(response, 'content'):
-                llm_content = response.content
-            else:
-                llm_content = str(response)
+            llm_content = self.invoke_llm(messages, model=self.llm, cache_form_id=form_id)
 
             logger.info(f"LLM response received, length: {len(llm_content)}")
             # Log first 1000 chars to avoid truncation in logs
@@ -430,7 +479,8 @@ Select and rephrase questions for this survey step. Follow your system instructi
                 "metadata": {
                     **decision_data.get("metadata", {}),
                     "analysis": analysis,
-                    "llm_decision": True
+                    "llm_decision": True,
+                    "engagement_deferred": defer_engagement
                 }
             }
 
@@ -440,6 +490,162 @@ Select and rephrase questions for this survey step. Follow your system instructi
             logger.error(f"Traceback: {traceback.format_exc()}")
             return self._create_fallback_decision(available_questions, analysis)
 
+    def _resolve_client_info(self, state: SurveyState) -> Dict[str, Any]:
+        """Client info from state, the prefetched step context, or the database."""
+        client_info = state.get('client_info', {})
+        prefetched_client = get_step_context(state).get('client')
+        if not client_info and prefetched_client:
+            # Same shape load_client_info returns
+            client_info = {"client": prefetched_client}
+        if not client_info:
+            try:
+                from ...tools import load_client_info
+                client_json = load_client_info.invoke({'form_id': state.get('core', {}).get('form_id')})
+                client_info = json.loads(client_json) if client_json else {}
+                logger.debug(f"Loaded client info: {bool(client_info)}")
+            except Exception as e:
+                logger.warning(f"Failed to load client info: {e}")
+                client_info = {}
+                # Continue with default values instead of failing
+        return client_info
+
+    def _build_business_context(self, client_info: Dict[str, Any]) -> str:
+        """Business context block for prompts (using correct database column names)."""
+        business_context = f"Business: {client_info.get('name', 'our business')} ({client_info.get('industry', 'service business')})"
+        if client_info.get('background'):
+            business_context += f"\nBackground: {client_info['background'][:100]}"
+        if client_info.get('goals'):
+            business_context += f"\nGoals: {client_info['goals'][:100]}"
+        if client_info.get('target_audience'):
+            business_context += f"\nTarget: {client_info['target_audience'][:100]}"
+        return business_context
+
+    def _build_engagement_messages(self, state: SurveyState, questions: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Prompt for the headline/message of a step whose questions are already chosen."""
+        business_context = self._build_business_context(self._resolve_client_info(state))
+        question_lines = "\n".join(
+            f"- {q.get('phrased_question') or q.get('question', '')}" for q in questions
+        )
+        user_prompt = f"""# DATA FOR THIS REQUEST
+{business_context}
+
+# QUESTIONS IN THIS STEP
+{question_lines}
+
+# TASK
+Write the HEADLINE and MESSAGE lines for this survey step. Output nothing else."""
+        return [
+            {"role": "system", "content": self.get_system_prompt()},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    async def astream_engagement(self, state: SurveyState) -> AsyncIterator[Dict[str, str]]:
+        """Stream the headline/message for a step prepared with ``defer_engagement``.
+
+        Yields ``{"field": "headline"|"message", "token": str}``. If the LLM
+        fails or exceeds ``timeout_seconds``, the default copy is yielded for
+        any field that received no text.
+        """
+        questions = (state.get('frontend_response') or {}).get('questions', [])
+        messages = self._build_engagement_messages(state, questions)
+        parser = EngagementTokenParser()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_seconds
+
+        stream = None
+        try:
+            stream = self.llm.astream(messages)
+            while True:
+                # Bound the wait for each chunk; the timeout must not span the
+                # yield, which suspends into the caller
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        chunk = await anext(stream)
+                except StopAsyncIteration:
+                    break
+                except TimeoutError:
+                    logger.warning(f"{self.name}: engagement stream exceeded {self.timeout_seconds}s, stopping")
+                    break
+                for token in parser.feed(chunk.content if hasattr(chunk, 'content') else str(chunk)):
+                    yield token
+        except Exception as e:
+            logger.error(f"{self.name}: engagement streaming failed: {e}")
+        finally:
+            if stream is not None:
+                await stream.aclose()
+
+        if not parser.fields["headline"].strip():
+            yield {"field": "headline", "token": DEFAULT_ENGAGEMENT_HEADLINE}
+        if not parser.fields["message"].strip():
+            yield {"field": "message", "token": DEFAULT_ENGAGEMENT_MESSAGE}
+
+    def _make_precomputed_decision(
+        self,
+        state: SurveyState,
+        available_questions: List[Dict],
+        analysis: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Select questions locally and use their precomputed phrasings.
+
+        ``available_questions`` are in priority order (required first, then
+        form order, as precomputed by ``FormQuestionIndex.prioritized``).
+        Returns None when a selected question has no stored variants so the
+        caller falls back to live LLM phrasing.
+        """
+        count = min(self._select_question_count(analysis), len(available_questions))
+        if count <= 0:
+            return None
+
+        session_id = state.get('core', {}).get('session_id')
+
+        selected = []
+        for q in available_questions[:count]:
+            variants = question_variants(q)
+            if not variants:
+                logger.info(f"No precomputed phrasing for question {q.get('question_id')}, using live LLM phrasing")
+                return None
+            phrased_text = pick_variant(variants, session_id, q.get("question_id"))
+            selected.append({**q, "phrased_text": phrased_text, "final_text": phrased_text})
+
+        engagement_headline = "Let's learn more about you!"
+        engagement_message = "Help us understand your needs so we can provide you with the best possible service."
+        form = get_step_context(state).get('form') or {}
+        engagement_variants = [v for v in form.get('engagement_variants') or [] if v.get('headline')]
+        if engagement_variants:
+            engagement = pick_variant(engagement_variants, session_id, analysis["questions_asked"])
+            engagement_headline = engagement["headline"]
+            engagement_message = engagement.get("message") or engagement_message
+
+        logger.info(f"Selected {len(selected)} questions with precomputed phrasing")
+        return {
+            "action": "continue",
+            "selected_questions": selected,
+            "engagement_headline": engagement_headline,
+            "engagement_message": engagement_message,
+            "progress_indicator": f"{analysis['progress_percentage']:.0f}% complete",
+            "completion_motivation": "Thank you for your responses! This helps us serve you better.",
+            "metadata": {
+                "analysis": analysis,
+                "llm_decision": False,
+                "phrasing_source": "precomputed"
+            }
+        }
+
+    def _select_question_count(self, analysis: Dict[str, Any]) -> int:
+        """Randomized rule-based question count for a step."""
+        import random
+
+        if analysis["risk_level"] == "high":
+            return 1  # Always 1 for high risk
+
+        # Vary between 1-4 questions based on context
+        questions_asked = analysis.get("questions_asked", 0)
+        if questions_asked == 0:
+            return random.choice([1, 2])  # First step: 1-2 questions
+        elif questions_asked < 4:
+            return random.choice([2, 3])  # Early steps: 2-3 questions
+        return random.choice([1, 2, 3, 4])  # Later steps: vary widely
+
     def _parse_simple_response(self, content: str, available_questions: List[Dict]) -> Dict[str, Any]:
         """Parse structured response from LLM with robust error handling."""
         result = {
@@ -568,17 +774,7 @@ Select and rephrase questions for this survey step. Follow your system instructi
         import random
 
         # Randomized rule-based selection to vary question count
-        if analysis["risk_level"] == "high":
-            count = 1  # Always 1 for high risk
-        else:
-            # Vary between 1-4 questions based on context
-            questions_asked = analysis.get("questions_asked", 0)
-            if questions_asked == 0:
-                count = random.choice([1, 2])  # First step: 1-2 questions
-            elif questions_asked < 4:
-                count = random.choice([2, 3])  # Early steps: 2-3 questions
-            else:
-                count = random.choice([1, 2, 3, 4])  # Later steps: vary widely
+        count = self._select_question_count(analysis)
 
         # Don't select more questions than available
         count = min(count, len(available_questions))
@@ -652,7 +848,11 @@ Select and rephrase questions for this survey step. Follow your system instructi
         # No need to pre-mark questions as asked - tracking happens via real response records
 
         # Get current asked questions from database (source of truth) and state
-        db_asked_questions = db.get_asked_questions(session_id) if session_id else []
+        step_context = get_step_context(state)
+        if 'asked_question_ids' in step_context:
+            db_asked_questions = list(step_context['asked_question_ids'])
+        else:
+            db_asked_questions = db.get_asked_questions(session_id) if session_id else []
         state_asked_questions = question_strategy.get('asked_questions', [])
 
         # Combine database and state (state should now only contain integers)
@@ -686,7 +886,7 @@ Select and rephrase questions for this survey step. Follow your system instructi
 
         # Load form details for proper title/description
         form_id = core.get('form_id')
-        form_details = self._load_form_details(form_id)
+        form_details = self._load_form_details(form_id, step_context.get('form'))
 
         # Prepare the frontend response data
         frontend_data = {
@@ -701,6 +901,9 @@ Select and rephrase questions for this survey step. Follow your system instructi
                 "estimated_remaining": 3
             }
         }
+        if decision.get("metadata", {}).get("engagement_deferred"):
+            # Headline/motivation above are placeholders until astream_engagement runs
+            frontend_data["engagement_pending"] = True
 
         result = {
             # This is the key the API is looking for
@@ -775,13 +978,18 @@ Select and rephrase questions for this survey step. Follow your system instructi
         }
 
 
-def consolidated_survey_admin_node(state: SurveyState) -> Dict[str, Any]:
-    """Node function for Consolidated Survey Administration Supervisor."""
+def consolidated_survey_admin_node(state: SurveyState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """Node function for Consolidated Survey Administration Supervisor.
+
+    ``configurable.defer_engagement`` in the run config leaves the headline and
+    message to be streamed after the questions (see ``astream_engagement``).
+    """
     logger.info("🔥 consolidated_survey_admin_node called by LangGraph!")
     logger.debug(f"🔥 State keys: {list(state.keys()) if isinstance(state, dict) else 'Not a dict'}")
 
+    defer_engagement = bool(((config or {}).get("configurable") or {}).get("defer_engagement", False))
     supervisor = ConsolidatedSurveyAdminSupervisor()
-    result = supervisor.process_survey_step(state)
+    result = supervisor.process_survey_step(state, defer_engagement=defer_engagement)
 
     logger.info(f"🔥 Node result: {type(result)}, keys: {list(result.keys()) if isinstance(result, dict) else 'Not a dict'}")
     if isinstance(result, dict) and 'supervisor_metadata' in result:
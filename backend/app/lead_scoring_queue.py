@@ -0,0 +1,216 @@
+"""
+Redis job queue for background lead scoring.
+
+With ``LEAD_SCORING_MODE=background`` the lead intelligence node saves the
+submitted responses and queues a job here instead of running scoring,
+business-fit assessment, Tavily/Maps lookups and ``lead_outcomes`` creation
+inside the /step request. ``app.lead_scoring_worker`` consumes the jobs and
+publishes each session's latest classification, which the API serves from
+``GET /api/survey/lead-result``.
+
+Keys (prefix ``lead_scoring:``):
+- ``queue``: pending jobs (list)
+- ``processing:<worker_id>``: jobs a worker has taken but not acknowledged,
+  moved back to ``queue`` when that worker restarts
+- ``dead``: jobs that failed ``max_attempts`` times
+- ``result:<session_id>``: latest result, also published on the same channel name
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+# State keys the worker needs to classify a step's responses
+JOB_STATE_KEYS = ('core', 'pending_responses', 'lead_intelligence', 'question_strategy', 'step_context', 'client_info')
+
+
+class LeadScoringQueue:
+    """Reliable Redis list queue (BLMOVE into a per-worker processing list) plus result store"""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        prefix: str = "lead_scoring:",
+        result_ttl: int = 3600,
+        max_attempts: int = 3
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            redis_url: Redis connection URL (defaults to REDIS_URL)
+            prefix: Key prefix
+            result_ttl: Seconds a published result stays readable
+            max_attempts: Deliveries before a failing job goes to the dead-letter list
+        """
+        self.redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379')
+        self.prefix = prefix
+        self.result_ttl = result_ttl
+        self.max_attempts = max_attempts
+        self._redis = None
+
+    async def _get_redis(self):
+        if self._redis is None:
+            self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}{name}"
+
+    def result_channel(self, session_id: str) -> str:
+        """Key and pub/sub channel carrying a session's result"""
+        return self._key(f"result:{session_id}")
+
+    # === Producer ===
+
+    async def enqueue(self, session_id: str, state: Dict[str, Any]) -> str:
+        """
+        Queue a step's responses for scoring and mark the session's result pending.
+
+        Args:
+            session_id: Survey session identifier
+            state: Graph state of the step (only ``JOB_STATE_KEYS`` are kept)
+
+        Returns:
+            Job identifier
+        """
+        job_id = str(uuid.uuid4())
+        job = {
+            "job_id": job_id,
+            "session_id": session_id,
+            "attempts": 0,
+            "enqueued_at": datetime.now().isoformat(),
+            "state": {key: state[key] for key in JOB_STATE_KEYS if state.get(key) is not None}
+        }
+
+        redis_client = await self._get_redis()
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.setex(self.result_channel(session_id), self.result_ttl, json.dumps({"status": "pending", "job_id": job_id}))
+            pipe.rpush(self._key("queue"), json.dumps(job, default=str))
+            await pipe.execute()
+        logger.info(f"Queued lead scoring job {job_id} for session {session_id}")
+        return job_id
+
+    # === Consumer ===
+
+    async def dequeue(self, worker_id: str, timeout: float = 5) -> Optional[Dict[str, Any]]:
+        """
+        Take the next job, moving it to the worker's processing list.
+
+        Returns:
+            Job dictionary (with its raw payload under ``_raw`` for ``ack``), or None on timeout
+        """
+        redis_client = await self._get_redis()
+        raw = await redis_client.blmove(
+            self._key("queue"), self._key(f"processing:{worker_id}"), timeout, "LEFT", "RIGHT"
+        )
+        if raw is None:
+            return None
+        job = json.loads(raw)
+        job["_raw"] = raw
+        return job
+
+    async def ack(self, worker_id: str, job: Dict[str, Any]) -> None:
+        """Remove a finished job from the worker's processing list"""
+        redis_client = await self._get_redis()
+        await redis_client.lrem(self._key(f"processing:{worker_id}"), 1, job["_raw"])
+
+    async def fail(self, worker_id: str, job: Dict[str, Any], error: str) -> None:
+        """Requeue a failed job, or dead-letter it after ``max_attempts`` deliveries"""
+        retry = {k: v for k, v in job.items() if k != "_raw"}
+        retry["attempts"] = job.get("attempts", 0) + 1
+        retry["last_error"] = error
+        target = "queue" if retry["attempts"] < self.max_attempts else "dead"
+
+        redis_client = await self._get_redis()
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.lrem(self._key(f"processing:{worker_id}"), 1, job["_raw"])
+            pipe.rpush(self._key(target), json.dumps(retry, default=str))
+            await pipe.execute()
+        if target == "dead":
+            logger.error(f"Lead scoring job {job['job_id']} dead-lettered after {retry['attempts']} attempts: {error}")
+
+    async def recover(self, worker_id: str) -> int:
+        """
+        Move jobs left in a worker's processing list (crash before ack) back to the queue.
+
+        Returns:
+            Number of jobs recovered
+        """
+        redis_client = await self._get_redis()
+        recovered = 0
+        while await redis_client.lmove(self._key(f"processing:{worker_id}"), self._key("queue"), "RIGHT", "LEFT"):
+            recovered += 1
+        if recovered:
+            logger.warning(f"Recovered {recovered} unacknowledged lead scoring job(s) for worker {worker_id}")
+        return recovered
+
+    async def publish_result(self, session_id: str, result: Dict[str, Any]) -> None:
+        """Store a session's result and notify subscribers (skipped if a newer job is pending)"""
+        current = await self.get_result(session_id)
+        if current and current.get("status") == "pending" and current.get("job_id") != result.get("job_id"):
+            logger.debug(f"Newer lead scoring job pending for {session_id}, not publishing {result.get('job_id')}")
+            return
+
+        payload = json.dumps(result, default=str)
+        redis_client = await self._get_redis()
+        await redis_client.setex(self.result_channel(session_id), self.result_ttl, payload)
+        await redis_client.publish(self.result_channel(session_id), payload)
+
+    # === Result readers ===
+
+    async def get_result(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Latest result for a session (``status`` is ``pending`` or ``ready``), or None"""
+        redis_client = await self._get_redis()
+        raw = await redis_client.get(self.result_channel(session_id))
+        return json.loads(raw) if raw else None
+
+    async def wait_for_result(self, session_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait up to ``timeout`` seconds for a pending result to become ready.
+
+        Returns:
+            Latest result (still ``pending`` on timeout), or None when nothing was queued
+        """
+        redis_client = await self._get_redis()
+        pubsub = redis_client.pubsub()
+        try:
+            # Subscribe before reading so a result published in between is not missed
+            await pubsub.subscribe(self.result_channel(session_id))
+            result = await self.get_result(session_id)
+            if result is None or result.get("status") != "pending":
+                return result
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while (remaining := deadline - loop.time()) > 0:
+                # Returns None early for subscribe confirmations, so keep waiting
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message:
+                    return json.loads(message["data"])
+            return result
+        finally:
+            await pubsub.aclose()
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and dead-letter count"""
+        redis_client = await self._get_redis()
+        return {
+            "queued": await redis_client.llen(self._key("queue")),
+            "dead": await redis_client.llen(self._key("dead"))
+        }
+
+
+# Global instance
+lead_scoring_queue = LeadScoringQueue(
+    result_ttl=int(os.getenv('LEAD_SCORING_RESULT_TTL', '3600')),
+    max_attempts=int(os.getenv('LEAD_SCORING_MAX_ATTEMPTS', '3'))
+)
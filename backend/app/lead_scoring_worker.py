@@ -0,0 +1,155 @@
+"""
+Lead Scoring Worker
+
+Consumes jobs queued by the lead intelligence node when
+``LEAD_SCORING_MODE=background`` and runs
+``ConsolidatedLeadIntelligenceAgent.classify_responses`` for each: scoring,
+business-fit assessment, Tavily/Maps lookups, the lead status update and
+``lead_outcomes`` creation. The result is published through
+``lead_scoring_queue`` for ``GET /api/survey/lead-result``.
+
+Run one or more worker processes alongside the API:
+    python -m app.lead_scoring_worker --concurrency 4
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime
+from typing import Dict, Any, Optional, Set
+
+from .lead_scoring_queue import LeadScoringQueue, lead_scoring_queue
+
+logger = logging.getLogger(__name__)
+
+
+def lead_result_payload(job: Dict[str, Any], classification: Dict[str, Any]) -> Dict[str, Any]:
+    """Result document published for a finished job (field names match the /step response)"""
+    return {
+        "status": "ready",
+        "job_id": job.get("job_id"),
+        "leadStatus": classification.get("lead_status", "unknown"),
+        "score": classification.get("final_score", 0),
+        "confidence": classification.get("confidence", 0),
+        "message": classification.get("completion_message") or None,
+        "nextSteps": classification.get("next_actions", []),
+        "completed": bool(classification.get("completed", False)),
+        "scoredAt": datetime.now().isoformat()
+    }
+
+
+class LeadScoringWorker:
+    """Runs queued lead classifications with bounded concurrency"""
+
+    def __init__(
+        self,
+        queue: Optional[LeadScoringQueue] = None,
+        concurrency: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        agent_factory=None
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            queue: Job queue (defaults to ``lead_scoring_queue``)
+            concurrency: Jobs processed at once (env LEAD_SCORING_WORKER_CONCURRENCY, default 4)
+            worker_id: Stable identifier for this worker's processing list (default: hostname:pid)
+            agent_factory: Callable returning a lead intelligence agent (for tests)
+        """
+        self.queue = queue or lead_scoring_queue
+        self.concurrency = concurrency or int(os.getenv('LEAD_SCORING_WORKER_CONCURRENCY', '4'))
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.agent_factory = agent_factory
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    def _create_agent(self):
+        if self.agent_factory is not None:
+            return self.agent_factory()
+        from .graphs.supervisors.consolidated_lead_intelligence_agent import ConsolidatedLeadIntelligenceAgent
+        return ConsolidatedLeadIntelligenceAgent()
+
+    async def handle(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Classify one job's responses and publish the result.
+
+        Returns:
+            Published result document
+        """
+        agent = self._create_agent()
+        # Blocking database work runs in a thread; concurrent LLM calls come back to this loop
+        agent.event_loop = asyncio.get_running_loop()
+        classification = await asyncio.to_thread(agent.classify_responses, job["state"])
+
+        result = lead_result_payload(job, classification)
+        await self.queue.publish_result(job["session_id"], result)
+        logger.info(f"Scored session {job['session_id']}: {result['leadStatus']} ({result['score']})")
+        return result
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        try:
+            await self.handle(job)
+        except Exception as e:
+            logger.error(f"Lead scoring job {job.get('job_id')} failed: {e}")
+            await self.queue.fail(self.worker_id, job, str(e))
+        else:
+            await self.queue.ack(self.worker_id, job)
+
+    async def run(self) -> None:
+        """Process jobs until ``stop`` is called"""
+        await self.queue.recover(self.worker_id)
+        slots = asyncio.Semaphore(self.concurrency)
+        logger.info(f"Lead scoring worker {self.worker_id} started (concurrency {self.concurrency})")
+
+        while not self._stopping:
+            await slots.acquire()
+            try:
+                job = await self.queue.dequeue(self.worker_id, timeout=1)
+            except Exception as e:
+                slots.release()
+                logger.error(f"Lead scoring dequeue failed: {e}")
+                await asyncio.sleep(1)
+                continue
+            if job is None:
+                slots.release()
+                continue
+
+            task = asyncio.create_task(self._process(job))
+            self._tasks.add(task)
+            task.add_done_callback(lambda t: (self._tasks.discard(t), slots.release()))
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info(f"Lead scoring worker {self.worker_id} stopped")
+
+    def stop(self) -> None:
+        """Stop taking jobs; ``run`` returns once in-flight jobs finish"""
+        self._stopping = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background lead scoring worker")
+    parser.add_argument('--concurrency', type=int, default=None, help="Jobs processed at once")
+    parser.add_argument('--worker-id', default=None, help="Stable worker identifier (enables crash recovery across restarts)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    worker = LeadScoringWorker(concurrency=args.concurrency, worker_id=args.worker_id)
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+
+
+# Export main components
+__all__ = [
+    'LeadScoringWorker',
+    'lead_result_payload'
+]
+
+
+if __name__ == '__main__':
+    main()
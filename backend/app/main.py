@@ -31,13 +31,19 @@ security_config = get_security_config()
 
 # Set up logging with environment-specific settings
 from app.utils.fastapi_logging import setup_fastapi_logging, LoggingMiddleware, log_health_check
+from app.utils.fastapi_logging import DEFAULT_LOG_QUEUE_SIZE, parse_sample_rates
 
+log_sample_rates, ignored_sample_rates = parse_sample_rates(os.getenv('LOG_SAMPLE_RATES'))
 setup_fastapi_logging(
     log_level=os.getenv('LOG_LEVEL', 'INFO'),
-    log_file=os.getenv('LOG_FILE')
+    log_file=os.getenv('LOG_FILE'),
+    queue_size=int(os.getenv('LOG_QUEUE_SIZE', str(DEFAULT_LOG_QUEUE_SIZE))),
+    sample_rates=log_sample_rates
 )
 
 logger = logging.getLogger(__name__)
+if ignored_sample_rates:
+    logger.warning("Ignoring invalid LOG_SAMPLE_RATES entries: %s", ", ".join(ignored_sample_rates))
 
 # Set up tracing
 from app.utils.langsmith_tracing import setup_graph_tracing
@@ -46,7 +52,7 @@ setup_graph_tracing()
 # Import middleware and configuration
 from app.middleware.rate_limiting import create_rate_limit_middleware
 from app.middleware.input_validation import create_input_validation_middleware
-from app.middleware.response_sanitization import create_response_sanitization_middleware
+from app.middleware.response_sanitization import create_response_sanitization_middleware, SanitizedJSONResponse
 from app.middleware.admin_auth import create_admin_auth_middleware
 from app.middleware.security_headers import create_security_headers_middleware
 from app.middleware.request_limits import create_request_limits_middleware
@@ -70,6 +76,8 @@ app = FastAPI(
     version=api_config.version,
     docs_url="/docs",
     redoc_url="/redoc",
+    # Sanitized at render time when response sanitization is enabled
+    default_response_class=SanitizedJSONResponse,
     openapi_tags=[
         {
             "name": "survey",
@@ -138,8 +146,9 @@ app.add_middleware(create_input_validation_middleware())
 # 6. Admin authentication (protect admin endpoints) - DISABLED FOR DEMO
 # app.add_middleware(create_admin_auth_middleware())
 
-# 7. Response sanitization (clean outgoing data) - DISABLED
-# app.add_middleware(create_response_sanitization_middleware())
+# 7. Response sanitization (clean outgoing data) - opt-in via RESPONSE_SANITIZATION_ENABLED
+if os.getenv('RESPONSE_SANITIZATION_ENABLED', 'false').lower() == 'true':
+    app.add_middleware(create_response_sanitization_middleware())
 
 # 8. Logging middleware last (log after all security processing)
 app.add_middleware(LoggingMiddleware)
@@ -166,6 +175,33 @@ app.include_router(files_api.router, tags=["files"])
 
 app.include_router(health.router, tags=["health"])
 
+@app.on_event("startup")
+async def start_snapshot_flusher():
+    """Start write-behind persistence of hot session state to Postgres"""
+    from app.session_state_cache import session_state_cache
+    session_state_cache.start()
+
+@app.on_event("startup")
+async def start_cache_invalidation_listener():
+    """Apply form/client cache invalidations published by other workers"""
+    from app.utils.cache_invalidation import invalidation_bus
+    invalidation_bus.start()
+
+@app.on_event("shutdown")
+async def close_database_pool():
+    """Flush pending session snapshots, then release pooled keep-alive connections"""
+    from app.session_state_cache import session_state_cache
+    from app.async_database import db_async
+    from app.utils.cache_invalidation import invalidation_bus
+    from app.utils.pg_pool import pg_pool
+    await invalidation_bus.stop()
+    try:
+        await session_state_cache.stop()
+    except Exception as e:
+        logger.error(f"Final snapshot flush failed: {e}")
+    await db_async.aclose()
+    await pg_pool.close()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
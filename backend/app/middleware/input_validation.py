@@ -8,12 +8,63 @@ import logging
 from typing import Dict, Any, List, Optional, Union
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.utils.config_loader import get_security_config, SecurityConfig
+from app.middleware.request_body import body_receive, read_body, read_json
 
 logger = logging.getLogger(__name__)
 
 
+# Detection rules as (category, tokens, pattern). Every pattern needs one of its
+# literal tokens in the case-folded text to match, so a string is folded once,
+# scanned for the tokens with substring search, and only the patterns whose
+# token is present are run. Each pattern matches exactly what the corresponding
+# entry of InputSanitizer's pattern lists matches; the two unbounded ``.*``
+# patterns are rewritten so a long run of "select"/"update" stays linear.
+_I = re.IGNORECASE
+SCAN_RULES = (
+    ('xss', ('<script',), re.compile(r'<script[^>]*>.*?</script>', _I | re.DOTALL)),
+    ('xss', ('javascript:',), re.compile(r'javascript:', _I)),
+    ('xss', ('=',), re.compile(r'on\w+\s*=', _I)),
+    ('xss', ('<iframe',), re.compile(r'<iframe[^>]*>.*?</iframe>', _I | re.DOTALL)),
+    ('xss', ('<object',), re.compile(r'<object[^>]*>.*?</object>', _I | re.DOTALL)),
+    ('xss', ('<embed',), re.compile(r'<embed[^>]*>', _I)),
+    ('xss', ('vbscript:',), re.compile(r'vbscript:', _I)),
+    ('xss', ('data:text/html',), re.compile(r'data:text/html', _I)),
+    ('sql', ('union',), re.compile(r'\bunion\s+select\b', _I)),
+    ('sql', ('select',), re.compile(r'\bselect\s+(?:(?!\bselect\s)[^\n])*?\bfrom\b', _I)),
+    ('sql', ('drop',), re.compile(r'\bdrop\s+table\b', _I)),
+    ('sql', ('delete',), re.compile(r'\bdelete\s+from\b', _I)),
+    ('sql', ('insert',), re.compile(r'\binsert\s+into\b', _I)),
+    ('sql', ('update',), re.compile(r'\bupdate\s+(?:(?!\bupdate\s)[^\n])*?\bset\b', _I)),
+    ('sql', ("'", '"', ';'), re.compile(r'[\'";](\s*or\s*1\s*=\s*1|\s*or\s*true)', _I)),
+    ('sql', ('--',), re.compile(r'--\s*$', re.MULTILINE)),
+    ('path_traversal', ('../',), None),
+    ('path_traversal', ('..\\',), None),
+    ('path_traversal', ('%2e%2e%2f',), None),
+    ('path_traversal', ('%2e%2e\\',), None)
+)
+
+
+def scan_text(text: str) -> set:
+    """Categories ('xss', 'sql', 'path_traversal') of the attack patterns found in ``text``"""
+    folded = text.casefold()
+    if not folded.isascii():
+        # IGNORECASE matches dotless i and dotted capital I against "i"; casefold
+        # keeps the first distinct and turns the second into "i" + combining dot
+        folded = folded.replace('i\u0307', 'i').replace('\u0131', 'i')
+    found = set()
+    for category, tokens, pattern in SCAN_RULES:
+        if category in found:
+            continue
+        for token in tokens:
+            if token in folded:
+                if pattern is None or pattern.search(text):
+                    found.add(category)
+                break
+    return found
+
+
 class InputSanitizer:
     """Sanitizes and validates input data based on security configuration"""
     
@@ -54,24 +105,15 @@ class InputSanitizer:
     
     def _detect_xss(self, text: str) -> bool:
         """Detect potential XSS attacks"""
-        for pattern in self.xss_patterns:
-            if pattern.search(text):
-                return True
-        return False
+        return 'xss' in scan_text(text)
     
     def _detect_sql_injection(self, text: str) -> bool:
         """Detect potential SQL injection"""
-        for pattern in self.sql_patterns:
-            if pattern.search(text):
-                return True
-        return False
+        return 'sql' in scan_text(text)
     
     def _detect_path_traversal(self, text: str) -> bool:
         """Detect path traversal attempts"""
-        for pattern in self.path_traversal_patterns:
-            if pattern.search(text):
-                return True
-        return False
+        return 'path_traversal' in scan_text(text)
     
     def _sanitize_string(self, text: str) -> str:
         """Sanitize a string by removing dangerous patterns"""
@@ -93,84 +135,87 @@ class InputSanitizer:
         
         return text
     
-    def validate_and_sanitize(self, data: Any, path: str = "root") -> tuple[bool, Any, List[str]]:
-        """
-        Validate and sanitize input data
-        Returns: (is_valid, sanitized_data, error_messages)
-        """
-        errors = []
-        
+    def _validate_leaf(self, data: Any, path: str, errors: List[str]) -> tuple[bool, Any]:
+        """Validate a string or primitive, appending to ``errors``; returns (is_valid, sanitized)"""
         if isinstance(data, str):
-            # Check length
             if len(data) > self.config.max_input_length:
                 errors.append(f"{path}: Input too long ({len(data)} > {self.config.max_input_length})")
-                return False, data, errors
+                return False, data
+            
+            found = scan_text(data)
+            if not found:
+                # Nothing _sanitize_string would remove is present and the length
+                # is already within bounds, so sanitizing reduces to a strip
+                return True, data.strip() if self.config.sanitize_inputs else data
             
-            # Detect attacks
-            if self._detect_xss(data):
+            if 'xss' in found:
                 errors.append(f"{path}: Potential XSS attack detected")
                 logger.warning(f"XSS attempt blocked: {path}")
-            
-            if self._detect_sql_injection(data):
+            if 'sql' in found:
                 errors.append(f"{path}: Potential SQL injection detected")
                 logger.warning(f"SQL injection attempt blocked: {path}")
-            
-            if self._detect_path_traversal(data):
+            if 'path_traversal' in found:
                 errors.append(f"{path}: Path traversal attempt detected")
                 logger.warning(f"Path traversal attempt blocked: {path}")
-            
-            if errors:
-                return False, data, errors
-            
-            # Sanitize if enabled
-            sanitized = self._sanitize_string(data) if self.config.sanitize_inputs else data
-            return True, sanitized, []
+            return False, data
+        
+        if isinstance(data, (int, float, bool, type(None))):
+            # Primitive types are safe
+            return True, data
+        
+        errors.append(f"{path}: Unsupported data type: {type(data)}")
+        return False, data
+    
+    def validate_and_sanitize(self, data: Any, path: str = "root") -> tuple[bool, Any, List[str]]:
+        """
+        Validate and sanitize input data
+        Returns: (is_valid, sanitized_data, error_messages)
         
-        elif isinstance(data, dict):
-            sanitized_dict = {}
-            for key, value in data.items():
-                # Validate key
-                key_valid, sanitized_key, key_errors = self.validate_and_sanitize(key, f"{path}.{key}")
+        Walks nested dicts and lists with an explicit stack (depth is not bounded
+        by the recursion limit). Errors are reported in document order; when there
+        are any, the returned data is incomplete and must not be used.
+        """
+        errors: List[str] = []
+        root: Dict[str, Any] = {}
+        # (value, path, container, key, validate_key): the sanitized value is stored
+        # as container[key], or appended when key is None (list items)
+        stack = [(data, path, root, 'value', False)]
+        
+        while stack:
+            value, item_path, container, key, validate_key = stack.pop()
+            
+            if validate_key:
+                key_valid, key = self._validate_leaf(key, item_path, errors)
                 if not key_valid:
-                    errors.extend(key_errors)
-                    continue
-                
-                # Validate value
-                value_valid, sanitized_value, value_errors = self.validate_and_sanitize(value, f"{path}.{key}")
-                if not value_valid:
-                    errors.extend(value_errors)
                     continue
-                
-                sanitized_dict[sanitized_key] = sanitized_value
             
-            return len(errors) == 0, sanitized_dict, errors
-        
-        elif isinstance(data, list):
-            sanitized_list = []
-            for i, item in enumerate(data):
-                item_valid, sanitized_item, item_errors = self.validate_and_sanitize(item, f"{path}[{i}]")
-                if not item_valid:
-                    errors.extend(item_errors)
+            if isinstance(value, dict):
+                sanitized = {}
+                children = [(v, f"{item_path}.{k}", sanitized, k, True) for k, v in value.items()]
+            elif isinstance(value, list):
+                sanitized = []
+                children = [(v, f"{item_path}[{i}]", sanitized, None, False) for i, v in enumerate(value)]
+            else:
+                valid, sanitized = self._validate_leaf(value, item_path, errors)
+                if not valid:
                     continue
-                sanitized_list.append(sanitized_item)
+                children = None
             
-            return len(errors) == 0, sanitized_list, errors
-        
-        elif isinstance(data, (int, float, bool, type(None))):
-            # Primitive types are safe
-            return True, data, []
+            if key is None:
+                container.append(sanitized)
+            else:
+                container[key] = sanitized
+            if children:
+                stack.extend(reversed(children))
         
-        else:
-            # Unknown type
-            errors.append(f"{path}: Unsupported data type: {type(data)}")
-            return False, data, errors
+        return not errors, root.get('value', data), errors
 
 
-class InputValidationMiddleware(BaseHTTPMiddleware):
-    """Middleware for validating and sanitizing all input data"""
+class InputValidationMiddleware:
+    """Middleware for validating and sanitizing all input data (pure ASGI)"""
     
-    def __init__(self, app, config: Optional[SecurityConfig] = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, config: Optional[SecurityConfig] = None):
+        self.app = app
         if config is None:
             config = get_security_config()
         
@@ -189,34 +234,36 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
         return request.url.path in self.skip_paths or request.method == "GET"
     
     async def _get_request_body(self, request: Request) -> Optional[Dict[str, Any]]:
-        """Safely extract request body"""
+        """Safely extract request body (parsed once and shared with route handlers)"""
         try:
             if request.headers.get('content-type', '').startswith('application/json'):
-                body = await request.body()
+                # Size is checked while the body streams in
+                body = await read_body(request, limit=self.config.max_file_size)
                 if not body:
                     return None
                 
-                # Check body size
-                if len(body) > self.config.max_file_size:
-                    raise HTTPException(
-                        status_code=413,
-                        detail=f"Request body too large: {len(body)} > {self.config.max_file_size}"
-                    )
-                
-                return json.loads(body.decode('utf-8'))
+                return await read_json(request)
             return None
+        except HTTPException:
+            raise
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid JSON in request body")
         except Exception as e:
             logger.error(f"Error reading request body: {e}")
             raise HTTPException(status_code=400, detail="Error processing request body")
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Apply input validation to requests"""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope, receive)
         
         # Skip validation for certain endpoints
         if self._should_skip_validation(request):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
         
         # Validate query parameters
         if request.query_params:
@@ -225,44 +272,63 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
             
             if not valid:
                 logger.warning(f"Invalid query parameters from {request.client.host}: {errors}")
-                return JSONResponse(
+                response = JSONResponse(
                     status_code=400,
                     content={
                         "error": "Invalid query parameters",
                         "details": errors[:5]  # Limit error details
                     }
                 )
+                await response(scope, receive, send)
+                return
         
         # Validate request body for POST/PUT/PATCH requests
         if request.method in ["POST", "PUT", "PATCH"]:
-            body_data = await self._get_request_body(request)
+            try:
+                body_data = await self._get_request_body(request)
+            except HTTPException as e:
+                response = JSONResponse(status_code=e.status_code, content={"error": e.detail})
+                await response(scope, receive, send)
+                return
             
             if body_data is not None:
                 valid, sanitized_body, errors = self.sanitizer.validate_and_sanitize(body_data, "body")
                 
                 if not valid:
                     logger.warning(f"Invalid request body from {request.client.host}: {errors}")
-                    return JSONResponse(
+                    response = JSONResponse(
                         status_code=400,
                         content={
                             "error": "Invalid request data",
                             "details": errors[:5]  # Limit error details
                         }
                     )
+                    await response(scope, receive, send)
+                    return
                 
                 # Store sanitized body for downstream use
-                request._sanitized_body = sanitized_body
+                request.state.sanitized_body = sanitized_body
+        
+        response_started = False
+        
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started
+            if message['type'] == 'http.response.start':
+                response_started = True
+            await send(message)
         
-        # Process the request
+        # Process the request (replaying the body if it was read above)
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, body_receive(request), send_tracking)
         except Exception as e:
+            if response_started:
+                raise
             logger.error(f"Error processing request: {e}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=500,
                 content={"error": "Internal server error"}
             )
+            await response(scope, receive, send)
 
 
 def create_input_validation_middleware(config: Optional[SecurityConfig] = None):
@@ -279,4 +345,4 @@ def create_input_validation_middleware(config: Optional[SecurityConfig] = None):
 # Helper function to get sanitized request body in route handlers
 def get_sanitized_body(request: Request) -> Optional[Dict[str, Any]]:
     """Get sanitized request body from middleware"""
-    return getattr(request, '_sanitized_body', None)
\ No newline at end of file
+    return getattr(request.state, 'sanitized_body', None)
\ No newline at end of file
@@ -1,94 +1,216 @@
 """
 Rate limiting middleware with environment-specific configuration
+
+Limits use a sliding-window counter: the count of the current fixed window
+plus the previous window's count weighted by its overlap with the last
+``window_seconds``. Each check is O(1). With ``redis_enabled`` the counters
+live in Redis and are updated by one Lua script call, so the limit is shared by
+every worker.
 """
 
+import os
 import time
 import logging
-from collections import defaultdict
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.utils.config_loader import get_rate_limit_config, RateLimitConfig
 
 logger = logging.getLogger(__name__)
 
 
+# Requests beyond the per-window limit are still let through while fewer than
+# burst_size requests arrived in the last BURST_WINDOW_SECONDS
+BURST_WINDOW_SECONDS = 10
+
+
+def _window_estimate(now: float, window: float, index: float, current: int, previous: int) -> tuple:
+    """
+    Sliding-window counter: roll the fixed-window counters to ``now`` and
+    weight the previous window by how much of it still overlaps the sliding window.
+
+    Returns:
+        (window index, current count, previous count, estimated requests in the last ``window`` seconds)
+    """
+    now_index = now // window
+    if now_index > index:
+        previous = current if now_index == index + 1 else 0
+        current = 0
+        index = now_index
+    overlap = 1 - (now - index * window) / window
+    return index, current, previous, previous * overlap + current
+
+
 class InMemoryRateLimiter:
-    """Simple in-memory rate limiter for development/staging"""
+    """
+    Per-process sliding-window-counter rate limiter.
+
+    Each identifier keeps two counters per window (current and previous fixed
+    window) instead of a list of timestamps, so a check is O(1). Idle
+    identifiers are evicted a few at a time on each call, oldest first.
+    """
     
-    def __init__(self, config: RateLimitConfig):
+    def __init__(self, config: RateLimitConfig, max_evictions_per_call: int = 2):
         self.config = config
-        self.requests: Dict[str, List[float]] = defaultdict(list)
-        self.cleanup_interval = 60  # Clean up old records every minute
-        self.last_cleanup = time.time()
+        self.max_evictions_per_call = max_evictions_per_call
+        # identifier -> [window index, count, previous count, burst index, burst count, burst previous, last seen]
+        self.counters: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
     
-    def _cleanup_old_requests(self, current_time: float):
-        """Remove requests older than the window"""
-        if current_time - self.last_cleanup < self.cleanup_interval:
-            return
-            
-        cutoff_time = current_time - self.config.window_seconds
-        for key in list(self.requests.keys()):
-            self.requests[key] = [
-                req_time for req_time in self.requests[key] 
-                if req_time > cutoff_time
-            ]
-            if not self.requests[key]:
-                del self.requests[key]
-        
-        self.last_cleanup = current_time
+    def _evict_idle(self, current_time: float):
+        """Drop identifiers idle for longer than two windows (least recently seen first)"""
+        idle_before = current_time - 2 * self.config.window_seconds
+        for _ in range(self.max_evictions_per_call):
+            if not self.counters:
+                return
+            identifier, counter = next(iter(self.counters.items()))
+            if counter[6] >= idle_before:
+                return
+            del self.counters[identifier]
     
     def is_allowed(self, identifier: str) -> tuple[bool, Dict[str, int]]:
         """Check if request is allowed and return rate limit headers"""
         current_time = time.time()
-        self._cleanup_old_requests(current_time)
+        window = self.config.window_seconds
         
-        # Get requests in the current window
-        cutoff_time = current_time - self.config.window_seconds
-        recent_requests = [
-            req_time for req_time in self.requests[identifier]
-            if req_time > cutoff_time
-        ]
-        
-        # Check if we can allow this request
-        if len(recent_requests) >= self.config.requests_per_minute:
-            # Check if we have burst capacity
-            very_recent = [
-                req_time for req_time in recent_requests
-                if req_time > current_time - 10  # Last 10 seconds
-            ]
-            if len(very_recent) >= self.config.burst_size:
-                return False, {
-                    'limit': self.config.requests_per_minute,
-                    'remaining': 0,
-                    'reset': int(current_time + self.config.window_seconds)
-                }
+        with self._lock:
+            self._evict_idle(current_time)
+            counter = self.counters.pop(identifier, None) or [current_time // window, 0, 0, current_time // BURST_WINDOW_SECONDS, 0, 0, 0]
+            self.counters[identifier] = counter
+            counter[6] = current_time
+            
+            counter[0], counter[1], counter[2], estimate = _window_estimate(
+                current_time, window, counter[0], counter[1], counter[2]
+            )
+            counter[3], counter[4], counter[5], burst_estimate = _window_estimate(
+                current_time, BURST_WINDOW_SECONDS, counter[3], counter[4], counter[5]
+            )
+            
+            allowed = estimate < self.config.requests_per_minute or burst_estimate < self.config.burst_size
+            if allowed:
+                counter[1] += 1
+                counter[4] += 1
         
-        # Allow the request
-        self.requests[identifier].append(current_time)
+        return allowed, _headers(self.config, current_time, estimate, allowed)
+    
+    async def check(self, identifier: str) -> tuple[bool, Dict[str, int]]:
+        """Async interface shared with ``RedisRateLimiter``"""
+        return self.is_allowed(identifier)
+
+
+# KEYS[1]: counter hash; ARGV: window, limit, burst window, burst limit.
+# Uses the Redis clock so every worker agrees on window boundaries.
+SLIDING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local burst_window = tonumber(ARGV[3])
+local burst_limit = tonumber(ARGV[4])
+
+local function roll(prefix, size)
+  local vals = redis.call('HMGET', KEYS[1], prefix .. 'w', prefix .. 'c', prefix .. 'p')
+  local now_index = math.floor(now / size)
+  local index = tonumber(vals[1]) or now_index
+  local current = tonumber(vals[2]) or 0
+  local previous = tonumber(vals[3]) or 0
+  if now_index > index then
+    if now_index == index + 1 then previous = current else previous = 0 end
+    current = 0
+    index = now_index
+  end
+  local estimate = previous * (1 - (now - index * size) / size) + current
+  return index, current, previous, estimate
+end
+
+local mw, mc, mp, estimate = roll('m', window)
+local bw, bc, bp, burst_estimate = roll('b', burst_window)
+local allowed = 0
+if estimate < limit or burst_estimate < burst_limit then
+  allowed = 1
+  mc = mc + 1
+  bc = bc + 1
+end
+redis.call('HSET', KEYS[1], 'mw', mw, 'mc', mc, 'mp', mp, 'bw', bw, 'bc', bc, 'bp', bp)
+redis.call('EXPIRE', KEYS[1], math.ceil(window * 2))
+return {allowed, tostring(estimate), tostring(now)}
+"""
+
+
+class RedisRateLimiter:
+    """
+    Sliding-window-counter rate limiter shared by every worker.
+
+    One Lua script call per request reads, rolls and updates the identifier's
+    counters atomically in Redis. If Redis is unreachable the check falls back
+    to a per-process ``InMemoryRateLimiter`` instead of rejecting traffic.
+    """
+    
+    def __init__(self, config: RateLimitConfig, redis_url: Optional[str] = None, prefix: str = "rate_limit:", redis_client=None):
+        self.config = config
+        self.redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379')
+        self.prefix = prefix
+        self.fallback = InMemoryRateLimiter(config)
+        self._redis = redis_client
+        self._script = None
+    
+    def _get_script(self):
+        if self._script is None:
+            if self._redis is None:
+                import redis.asyncio as redis
+                self._redis = redis.from_url(self.redis_url, decode_responses=True, socket_timeout=0.5)
+            self._script = self._redis.register_script(SLIDING_WINDOW_LUA)
+        return self._script
+    
+    async def check(self, identifier: str) -> tuple[bool, Dict[str, int]]:
+        """Check if request is allowed and return rate limit headers"""
+        try:
+            allowed, estimate, now = await self._get_script()(
+                keys=[f"{self.prefix}{identifier}"],
+                args=[self.config.window_seconds, self.config.requests_per_minute,
+                      BURST_WINDOW_SECONDS, self.config.burst_size]
+            )
+        except Exception as e:
+            logger.warning(f"Redis rate limiting unavailable, using per-process limits: {e}")
+            return self.fallback.is_allowed(identifier)
         
-        remaining = max(0, self.config.requests_per_minute - len(recent_requests) - 1)
-        return True, {
-            'limit': self.config.requests_per_minute,
-            'remaining': remaining,
-            'reset': int(current_time + self.config.window_seconds)
-        }
+        allowed = int(allowed) == 1
+        return allowed, _headers(self.config, float(now), float(estimate), allowed)
+
+
+def _headers(config: RateLimitConfig, current_time: float, estimate: float, allowed: bool) -> Dict[str, int]:
+    """Values for the X-RateLimit-* headers"""
+    used = int(estimate) + (1 if allowed else 0)
+    return {
+        'limit': config.requests_per_minute,
+        'remaining': max(0, config.requests_per_minute - used),
+        'reset': int(current_time + config.window_seconds)
+    }
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware with environment-specific configuration"""
+class RateLimitMiddleware:
+    """Rate limiting middleware with environment-specific configuration (pure ASGI)"""
     
-    def __init__(self, app, config: Optional[RateLimitConfig] = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, config: Optional[RateLimitConfig] = None):
+        self.app = app
         if config is None:
             config = get_rate_limit_config()
         
         self.config = config
-        self.rate_limiter = InMemoryRateLimiter(config) if config.enabled else None
+        if not config.enabled:
+            self.rate_limiter = None
+        elif config.redis_enabled:
+            self.rate_limiter = RedisRateLimiter(config)
+        else:
+            self.rate_limiter = InMemoryRateLimiter(config)
         
         logger.info(f"Rate limiting {'enabled' if config.enabled else 'disabled'} - "
-                   f"Limit: {config.requests_per_minute}/min, Burst: {config.burst_size}")
+                   f"Limit: {config.requests_per_minute}/min, Burst: {config.burst_size}, "
+                   f"Backend: {'redis' if config.redis_enabled else 'memory'}")
     
     def _get_identifier(self, request: Request) -> str:
         """Get identifier for rate limiting (IP address or API key)"""
@@ -118,20 +240,23 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         
         return False
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Apply rate limiting to requests"""
         
         # Skip if rate limiting is disabled
-        if not self.config.enabled or not self.rate_limiter:
-            return await call_next(request)
+        if scope['type'] != 'http' or not self.config.enabled or not self.rate_limiter:
+            await self.app(scope, receive, send)
+            return
         
         # Skip certain endpoints
+        request = Request(scope)
         if self._should_skip_rate_limiting(request):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
         
         # Check rate limit
         identifier = self._get_identifier(request)
-        allowed, headers = self.rate_limiter.is_allowed(identifier)
+        allowed, headers = await self.rate_limiter.check(identifier)
         
         if not allowed:
             logger.warning(f"Rate limit exceeded for {identifier}: {request.url.path}")
@@ -144,7 +269,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     'X-RateLimit-Reset': str(headers['reset']),
                 }
             
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=429,
                 content={
                     'error': 'Rate limit exceeded',
@@ -153,17 +278,23 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 },
                 headers=response_headers
             )
+            await response(scope, receive, send)
+            return
         
-        # Process the request
-        response = await call_next(request)
+        if not self.config.include_headers:
+            await self.app(scope, receive, send)
+            return
         
         # Add rate limit headers to successful responses
-        if self.config.include_headers:
-            response.headers['X-RateLimit-Limit'] = str(headers['limit'])
-            response.headers['X-RateLimit-Remaining'] = str(headers['remaining'])
-            response.headers['X-RateLimit-Reset'] = str(headers['reset'])
+        async def send_with_headers(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                response_headers = MutableHeaders(scope=message)
+                response_headers['X-RateLimit-Limit'] = str(headers['limit'])
+                response_headers['X-RateLimit-Remaining'] = str(headers['remaining'])
+                response_headers['X-RateLimit-Reset'] = str(headers['reset'])
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_headers)
 
 
 def create_rate_limit_middleware(config: Optional[RateLimitConfig] = None):
@@ -0,0 +1,143 @@
+"""
+Shared request body cache
+
+The body of a request is read at most once and parsed at most once, however
+many middlewares and handlers look at it:
+
+- ``read_body`` streams the body, enforcing a byte limit while it arrives, and
+  keeps the bytes on ``request.state``
+- ``read_json`` parses those bytes (with orjson when installed) and keeps the
+  result on ``request.state`` as well
+- ``CachedBodyRoute`` gives route handlers a request whose ``body()``/``json()``
+  come from the cache, so FastAPI validates pydantic request models against the
+  object the middlewares already parsed instead of reading and parsing it again
+
+``request.state`` lives in the ASGI scope, so every middleware and the route
+handler of a request see the same cache. A middleware that read the body
+passes ``body_receive(request)`` to the app it wraps so the body is replayed
+to anything downstream that reads the ASGI stream directly.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+from starlette.types import Message, Receive
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+
+
+def parse_json(body: bytes) -> Any:
+    """Parse a JSON body; errors are ``json.JSONDecodeError`` (orjson's error subclasses it)"""
+    return _loads(body)
+
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Request body too large: exceeds {limit} bytes")
+
+
+async def read_body(request: Request, limit: Optional[int] = None) -> bytes:
+    """
+    Request body bytes, read from the client only the first time.
+
+    Args:
+        request: Incoming request
+        limit: Maximum body size in bytes; raises HTTPException(413) as soon as
+            the streamed body (or the cached one) exceeds it
+    """
+    body = getattr(request.state, 'body_bytes', None)
+    if body is not None:
+        if limit is not None and len(body) > limit:
+            raise _too_large(limit)
+        return body
+
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if limit is not None and size > limit:
+            raise _too_large(limit)
+        chunks.append(chunk)
+    body = b''.join(chunks)
+
+    # Marks the stream as read here; see body_receive
+    request._body = body
+    request.state.body_bytes = body
+    return body
+
+
+async def read_json(request: Request, limit: Optional[int] = None) -> Any:
+    """Parsed JSON body, parsed only the first time (see ``read_body`` for ``limit``)"""
+    parsed = getattr(request.state, 'json_body', _UNSET)
+    if parsed is _UNSET:
+        parsed = parse_json(await read_body(request, limit))
+        request.state.json_body = parsed
+    return parsed
+
+
+def body_receive(request: Request) -> Receive:
+    """
+    ``receive`` callable for the app wrapped by a pure ASGI middleware: replays
+    the body if ``request`` consumed it, then defers to the client (disconnects)
+    """
+    if not hasattr(request, '_body'):
+        return request.receive
+
+    body = request._body
+    replayed = False
+
+    async def receive() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        return await request.receive()
+
+    return receive
+
+
+class CachedBodyRequest(Request):
+    """Request whose ``body()`` and ``json()`` use the shared body cache"""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, '_body'):
+            self._body = await read_body(self)
+        return self._body
+
+    async def json(self) -> Any:
+        if not hasattr(self, '_json'):
+            self._json = await read_json(self)
+        return self._json
+
+
+class CachedBodyRoute(APIRoute):
+    """APIRoute that hands its handler a ``CachedBodyRequest`` (use as an APIRouter ``route_class``)"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def cached_body_handler(request: Request):
+            return await handler(CachedBodyRequest(request.scope, request.receive))
+
+        return cached_body_handler
+
+
+# Export main components
+__all__ = [
+    'parse_json',
+    'read_body',
+    'read_json',
+    'body_receive',
+    'CachedBodyRequest',
+    'CachedBodyRoute'
+]
@@ -1,5 +1,8 @@
 """
 Request size limiting and timeout protection middleware
+
+Pure ASGI middleware. As before, the timeout covers the time until the
+response starts; streaming the response body is not limited.
 """
 
 import asyncio
@@ -8,18 +11,20 @@ import logging
 from typing import Optional, Dict, Any
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.utils.config_loader import get_security_config, SecurityConfig
+from app.middleware.request_body import body_receive, read_body
 
 logger = logging.getLogger(__name__)
 
 
-class RequestLimitsMiddleware(BaseHTTPMiddleware):
+class RequestLimitsMiddleware:
     """Middleware for enforcing request size limits and timeouts"""
     
-    def __init__(self, app, config: Optional[SecurityConfig] = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, config: Optional[SecurityConfig] = None):
+        self.app = app
         if config is None:
             config = get_security_config()
         
@@ -106,38 +111,27 @@ class RequestLimitsMiddleware(BaseHTTPMiddleware):
                     )
             except ValueError:
                 logger.warning(f"Invalid content-length header: {content_length}")
+        else:
+            # Chunked body: enforce the limit while reading it
+            try:
+                await self._read_body_with_limit(request)
+            except HTTPException as e:
+                logger.warning(f"Request size exceeded: {e.detail} from {request.client.host if request.client else 'unknown'}")
+                limit = self._get_size_limit(request)
+                return JSONResponse(
+                    status_code=413,
+                    content={
+                        "error": "Request too large",
+                        "message": f"Request body exceeds limit of {limit} bytes",
+                        "limit": limit
+                    }
+                )
         
         return None
     
     async def _read_body_with_limit(self, request: Request) -> bytes:
-        """Read request body with size limit enforcement"""
-        limit = self._get_size_limit(request)
-        body = b''
-        
-        async def receive():
-            return await request.receive()
-        
-        while True:
-            message = await receive()
-            
-            if message['type'] == 'http.request':
-                chunk = message.get('body', b'')
-                if chunk:
-                    body += chunk
-                    
-                    # Check size while reading
-                    if len(body) > limit:
-                        raise HTTPException(
-                            status_code=413,
-                            detail=f"Request body too large: exceeds {limit} bytes"
-                        )
-                
-                if not message.get('more_body', False):
-                    break
-            else:
-                break
-        
-        return body
+        """Read request body with size limit enforcement (shared with later readers)"""
+        return await read_body(request, limit=self._get_size_limit(request))
     
     def _cleanup_active_requests(self):
         """Clean up old request tracking entries"""
@@ -150,46 +144,61 @@ class RequestLimitsMiddleware(BaseHTTPMiddleware):
         for req_id in expired_requests:
             del self.active_requests[req_id]
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Apply request limits and timeouts"""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope, receive)
         
         # Generate request ID for tracking
         request_id = self._get_request_id(request)
         start_time = time.time()
         self.active_requests[request_id] = start_time
+        response_started = False
         
         try:
             # Check request size limits
             size_check = await self._check_request_size(request)
             if size_check:
-                return size_check
+                await size_check(scope, receive, send)
+                return
             
             # Get timeout for this endpoint
             timeout_limit = self._get_timeout_limit(request)
             
-            # Create timeout task
+            async def send_with_timing(message: Message) -> None:
+                nonlocal response_started
+                if message['type'] == 'http.response.start':
+                    response_started = True
+                    # The response has started; streaming its body is not limited
+                    timeout.reschedule(None)
+                    
+                    # Add timing headers
+                    execution_time = time.time() - start_time
+                    headers = MutableHeaders(scope=message)
+                    headers["X-Request-Duration"] = f"{execution_time:.3f}s"
+                    headers["X-Request-Timeout"] = f"{timeout_limit}s"
+                    
+                    # Log slow requests
+                    if execution_time > timeout_limit * 0.8:  # 80% of timeout
+                        logger.warning(f"Slow request: {request.url.path} took {execution_time:.3f}s "
+                                     f"(timeout: {timeout_limit}s)")
+                await send(message)
+            
             try:
-                response = await asyncio.wait_for(
-                    call_next(request),
-                    timeout=timeout_limit
-                )
-                
-                # Add timing headers
-                execution_time = time.time() - start_time
-                response.headers["X-Request-Duration"] = f"{execution_time:.3f}s"
-                response.headers["X-Request-Timeout"] = f"{timeout_limit}s"
-                
-                # Log slow requests
-                if execution_time > timeout_limit * 0.8:  # 80% of timeout
-                    logger.warning(f"Slow request: {request.url.path} took {execution_time:.3f}s "
-                                 f"(timeout: {timeout_limit}s)")
-                
-                return response
+                async with asyncio.timeout(timeout_limit) as timeout:
+                    await self.app(scope, body_receive(request), send_with_timing)
             
-            except asyncio.TimeoutError:
+            except TimeoutError:
+                # Only our own deadline becomes a 504; a TimeoutError raised by the
+                # app (e.g. a downstream client) or while streaming is not ours to answer
+                if not timeout.expired() or response_started:
+                    raise
                 logger.error(f"Request timeout: {request.url.path} exceeded {timeout_limit}s")
                 
-                return JSONResponse(
+                response = JSONResponse(
                     status_code=504,
                     content={
                         "error": "Request timeout",
@@ -202,21 +211,25 @@ class RequestLimitsMiddleware(BaseHTTPMiddleware):
                         "X-Timeout-Reason": "processing_timeout"
                     }
                 )
+                await response(scope, receive, send)
         
         except HTTPException as e:
             # Re-raise HTTP exceptions
             raise e
         
         except Exception as e:
+            if response_started:
+                raise
             logger.error(f"Error in request limits middleware: {e}")
             
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=500,
                 content={
                     "error": "Internal server error",
                     "message": "Request processing failed"
                 }
             )
+            await response(scope, receive, send)
         
         finally:
             # Clean up tracking
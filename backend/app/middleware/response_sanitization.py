@@ -1,18 +1,44 @@
 """
 Response sanitization middleware to prevent data leakage and ensure secure output
+
+Sanitization runs at the serialization layer: the middleware records the
+request's sanitization context in a context variable, and
+``SanitizedJSONResponse`` (the app's default response class, also used by the
+response helpers) sanitizes the Python object before its one and only encode.
+Key rules are compiled to regexes and memoized per key. JSON responses rendered
+some other way are still sanitized by buffering them in the middleware; every
+other response (files, SSE streams) passes through untouched.
 """
 
 import json
 import logging
-from typing import Dict, Any, List, Optional, Set
+import re
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Set, Tuple
 from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.utils.config_loader import get_security_config, SecurityConfig
 
 logger = logging.getLogger(__name__)
 
+# Strings longer than this are truncated
+MAX_STRING_LENGTH = 10000
+
+# Removed whatever the caller's role
+CRITICAL_FIELDS = ('password', 'secret', 'token', 'api_key', 'private_key')
+
+# Memoized key rules kept per sanitizer before the memo is reset
+MAX_CACHED_KEY_RULES = 4096
+
+
+def _substring_pattern(fields) -> re.Pattern:
+    """Regex matching any of ``fields`` as a substring"""
+    return re.compile('|'.join(re.escape(field) for field in sorted(fields, key=len, reverse=True)))
+
 
 class ResponseSanitizer:
     """Sanitizes response data to prevent information leakage"""
@@ -66,6 +92,11 @@ class ResponseSanitizer:
         self.allowed_admin_fields = {
             'id', 'client_id', 'question_id', 'created_at', 'updated_at', 'status', 'internal_id'
         }
+        
+        # Compiled substring checks and per-key decisions (see _key_rule)
+        self._critical_pattern = _substring_pattern(CRITICAL_FIELDS)
+        self._sensitive_pattern = _substring_pattern(self.sensitive_fields)
+        self._key_rules: Dict[Any, Tuple[bool, bool, Optional[str]]] = {}
     
     def _mask_email(self, email: str) -> str:
         """Mask email address: user@domain.com -> u***@d***.com"""
@@ -96,63 +127,77 @@ class ResponseSanitizer:
             return ip
         return f"{parts[0]}.{parts[1]}.*.***"
     
-    def _should_remove_field(self, key: str, is_admin: bool = False) -> bool:
-        """Determine if a field should be removed"""
-        key_lower = key.lower()
+    def _key_rule(self, key: Any) -> Tuple[bool, bool, Optional[str]]:
+        """(remove, remove_for_admin, mask_type) for a key, computed once per key"""
+        rule = self._key_rules.get(key)
+        if rule is not None:
+            return rule
         
-        # Always allow public fields (business names, etc.)
+        key_lower = str(key).lower()
         if key_lower in self.public_fields:
-            return False
-        
-        # Always remove highly sensitive fields
-        critical_fields = {'password', 'secret', 'token', 'api_key', 'private_key'}
-        if any(critical in key_lower for critical in critical_fields):
-            return True
-        
-        # For admin users, allow some internal fields
-        if is_admin and key_lower in self.allowed_admin_fields:
-            return False
+            # Always allow public fields (business names, etc.)
+            remove = remove_for_admin = False
+        elif self._critical_pattern.search(key_lower):
+            # Always remove highly sensitive fields
+            remove = remove_for_admin = True
+        else:
+            remove = self._sensitive_pattern.search(key_lower) is not None
+            # For admin users, allow some internal fields
+            remove_for_admin = remove and key_lower not in self.allowed_admin_fields
+        mask_type = next((field for field in self.mask_fields if field in key_lower), None)
         
-        # Remove sensitive fields
-        return any(sensitive in key_lower for sensitive in self.sensitive_fields)
+        if len(self._key_rules) >= MAX_CACHED_KEY_RULES:
+            self._key_rules.clear()
+        rule = self._key_rules[key] = (remove, remove_for_admin, mask_type)
+        return rule
+    
+    def _should_remove_field(self, key: str, is_admin: bool = False) -> bool:
+        """Determine if a field should be removed"""
+        return self._key_rule(key)[1 if is_admin else 0]
     
     def _should_mask_field(self, key: str) -> Optional[str]:
         """Determine if a field should be masked"""
-        key_lower = key.lower()
-        for mask_field in self.mask_fields:
-            if mask_field in key_lower:
-                return mask_field
-        return None
+        return self._key_rule(key)[2]
     
     def sanitize_data(self, data: Any, is_admin: bool = False, path: str = "root") -> Any:
         """Sanitize response data recursively"""
+        # Paths are only built for debug logging
+        return self._sanitize(data, is_admin, path if logger.isEnabledFor(logging.DEBUG) else None)
+    
+    def _sanitize(self, data: Any, is_admin: bool, path: Optional[str]) -> Any:
         if isinstance(data, dict):
             sanitized = {}
             for key, value in data.items():
+                remove, remove_for_admin, mask_type = self._key_rule(key)
                 
                 # Check if field should be removed
-                if self._should_remove_field(key, is_admin):
-                    logger.debug(f"Removed sensitive field: {path}.{key}")
+                if remove_for_admin if is_admin else remove:
+                    if path is not None:
+                        logger.debug(f"Removed sensitive field: {path}.{key}")
                     continue
                 
                 # Check if field should be masked
-                mask_type = self._should_mask_field(key)
                 if mask_type and isinstance(value, str):
                     sanitized[key] = self.mask_fields[mask_type](value)
-                    logger.debug(f"Masked field: {path}.{key}")
-                else:
+                    if path is not None:
+                        logger.debug(f"Masked field: {path}.{key}")
+                elif isinstance(value, (dict, list, str)):
                     # Recursively sanitize nested data
-                    sanitized[key] = self.sanitize_data(value, is_admin, f"{path}.{key}")
+                    sanitized[key] = self._sanitize(value, is_admin, None if path is None else f"{path}.{key}")
+                else:
+                    sanitized[key] = value
             
             return sanitized
         
         elif isinstance(data, list):
-            return [self.sanitize_data(item, is_admin, f"{path}[{i}]") for i, item in enumerate(data)]
+            if path is None:
+                return [self._sanitize(item, is_admin, None) for item in data]
+            return [self._sanitize(item, is_admin, f"{path}[{i}]") for i, item in enumerate(data)]
         
         elif isinstance(data, str):
             # Limit string length to prevent data leakage
-            if len(data) > 10000:  # Large text might contain sensitive info
-                return data[:10000] + "... [truncated]"
+            if len(data) > MAX_STRING_LENGTH:  # Large text might contain sensitive info
+                return data[:MAX_STRING_LENGTH] + "... [truncated]"
             return data
         
         else:
@@ -175,11 +220,52 @@ class ResponseSanitizer:
         return data
 
 
-class ResponseSanitizationMiddleware(BaseHTTPMiddleware):
-    """Middleware for sanitizing response data"""
+@dataclass
+class SanitizationContext:
+    """How responses to the current request are sanitized"""
+    sanitizer: ResponseSanitizer
+    is_admin: bool
+    request: Request
+    applied: bool = False
+
+
+_sanitization_context: ContextVar[Optional[SanitizationContext]] = ContextVar('response_sanitization', default=None)
+
+
+def sanitize_response_content(content: Any) -> Any:
+    """
+    Sanitize a response object for the current request before it is encoded.
+    Returns ``content`` unchanged outside ResponseSanitizationMiddleware (or
+    when sanitizing fails, as the middleware always did).
+    """
+    context = _sanitization_context.get()
+    if context is None:
+        return content
+    
+    context.applied = True
+    try:
+        sanitized = context.sanitizer.sanitize_data(content, context.is_admin)
+        # Add security metadata if enabled
+        if context.sanitizer.config.sanitize_inputs and isinstance(sanitized, dict):
+            sanitized = context.sanitizer.add_security_metadata(sanitized, context.request)
+        return sanitized
+    except Exception as e:
+        logger.error(f"Error sanitizing response: {e}")
+        return content
+
+
+class SanitizedJSONResponse(JSONResponse):
+    """JSONResponse that sanitizes its content for the current request before encoding it"""
     
-    def __init__(self, app, config: Optional[SecurityConfig] = None):
-        super().__init__(app)
+    def render(self, content: Any) -> bytes:
+        return super().render(sanitize_response_content(content))
+
+
+class ResponseSanitizationMiddleware:
+    """Middleware for sanitizing response data (pure ASGI)"""
+    
+    def __init__(self, app: ASGIApp, config: Optional[SecurityConfig] = None):
+        self.app = app
         if config is None:
             config = get_security_config()
         
@@ -232,61 +318,68 @@ class ResponseSanitizationMiddleware(BaseHTTPMiddleware):
         
         return False
     
-    async def dispatch(self, request: Request, call_next):
+    def _sanitize_body(self, body: bytes, context: SanitizationContext) -> bytes:
+        """Sanitize an already encoded JSON body (returns it unchanged if that fails)"""
+        try:
+            data = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            logger.warning(f"Failed to parse JSON response for sanitization: {context.request.url.path}")
+            return body
+        return JSONResponse(sanitize_response_content(data)).body
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Apply response sanitization"""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope)
         
         # Skip sanitization for certain endpoints
         if self._should_skip_sanitization(request):
-            return await call_next(request)
-        
-        # Process the request
-        response = await call_next(request)
+            await self.app(scope, receive, send)
+            return
         
-        # Only sanitize JSON responses
-        content_type = response.headers.get('content-type', '')
-        if not content_type.startswith('application/json'):
-            return response
+        context = SanitizationContext(self.sanitizer, bool(self._is_admin_request(request)), request)
+        start_message: Optional[Message] = None
+        chunks: List[bytes] = []
+        passthrough = False
         
-        try:
-            # Get response body
-            body = b''
-            async for chunk in response.body_iterator:
-                body += chunk
-            
-            if not body:
-                return response
-            
-            # Parse JSON
-            try:
-                data = json.loads(body.decode('utf-8'))
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse JSON response for sanitization: {request.url.path}")
-                return response
+        async def send_sanitized(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
             
-            # Determine if admin request
-            is_admin = self._is_admin_request(request)
-            
-            # Sanitize data
-            sanitized_data = self.sanitizer.sanitize_data(data, is_admin)
-            
-            # Add security metadata if enabled
-            if self.config.sanitize_inputs and isinstance(sanitized_data, dict):
-                sanitized_data = self.sanitizer.add_security_metadata(sanitized_data, request)
+            if message['type'] == 'http.response.start':
+                content_type = MutableHeaders(scope=message).get('content-type', '')
+                # Sanitized while rendering, or not JSON (only JSON responses are sanitized)
+                if context.applied or not content_type.startswith('application/json'):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
             
-            # Create new response with sanitized data
-            return JSONResponse(
-                content=sanitized_data,
-                status_code=response.status_code,
-                headers={
-                    key: value for key, value in response.headers.items()
-                    if key.lower() not in {'content-length', 'transfer-encoding'}
-                }
-            )
+            # JSON rendered without SanitizedJSONResponse: buffer it and sanitize the whole body
+            chunks.append(message.get('body', b''))
+            if message.get('more_body', False):
+                return
+            body = b''.join(chunks)
+            if body:
+                body = self._sanitize_body(body, context)
+            headers = MutableHeaders(scope=start_message)
+            headers['content-length'] = str(len(body))
+            if 'transfer-encoding' in headers:
+                del headers['transfer-encoding']
+            await send(start_message)
+            await send({'type': 'http.response.body', 'body': body, 'more_body': False})
         
-        except Exception as e:
-            logger.error(f"Error sanitizing response: {e}")
-            # Return original response if sanitization fails
-            return response
+        token = _sanitization_context.set(context)
+        try:
+            await self.app(scope, receive, send_sanitized)
+        finally:
+            _sanitization_context.reset(token)
 
 
 def create_response_sanitization_middleware(config: Optional[SecurityConfig] = None):
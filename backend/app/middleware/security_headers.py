@@ -1,23 +1,37 @@
 """
 Security headers middleware for enhanced protection
+
+Pure ASGI middleware: the headers are encoded once at startup and added to
+the ``http.response.start`` message of every response.
 """
 
 import os
 import logging
 from typing import Optional, Dict, List
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.utils.config_loader import get_security_config, SecurityConfig
 
 logger = logging.getLogger(__name__)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+# Removed from responses (Server is then set to our own value)
+LEAKY_HEADERS = ("X-Powered-By", "Server")
+
+# Paths that get no-store cache headers
+SENSITIVE_PATH_PARTS = ('/admin', '/api/', '/internal')
+
+
+def _encode_headers(headers: Dict[str, str]) -> List[tuple]:
+    return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+
+
+class SecurityHeadersMiddleware:
     """Middleware that adds security headers to all responses"""
     
-    def __init__(self, app, config: Optional[SecurityConfig] = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, config: Optional[SecurityConfig] = None):
+        self.app = app
         if config is None:
             config = get_security_config()
         
@@ -27,6 +41,17 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         # Determine if we're in production
         self.is_production = self.environment == 'production'
         
+        # Raw header lists for sensitive and other paths
+        self._raw_headers = {
+            sensitive: _encode_headers(self._get_security_headers('/api/' if sensitive else '/'))
+            for sensitive in (True, False)
+        }
+        leaky = {name.lower().encode('latin-1') for name in LEAKY_HEADERS}
+        self._replaced_names = {
+            sensitive: frozenset(name for name, _ in raw) | leaky
+            for sensitive, raw in self._raw_headers.items()
+        }
+        
         logger.info(f"Security headers middleware initialized - "
                    f"environment: {self.environment}, "
                    f"force_https: {config.force_https}, "
@@ -79,16 +104,16 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         ]
         return ", ".join(policies)
     
-    def _should_add_security_headers(self, request: Request) -> bool:
+    def _should_add_security_headers(self, path: str) -> bool:
         """Determine if security headers should be added"""
         # Skip for static files and API docs in development
         skip_paths = {'/docs', '/redoc', '/openapi.json'}
-        if not self.is_production and request.url.path in skip_paths:
+        if not self.is_production and path in skip_paths:
             return False
         
         return True
     
-    def _get_security_headers(self, request: Request, response: Response) -> Dict[str, str]:
+    def _get_security_headers(self, path: str) -> Dict[str, str]:
         """Get all security headers for the response"""
         headers = {}
         
@@ -133,7 +158,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         headers["Server"] = "Dynamic-Survey-API"
         
         # Cache control for sensitive endpoints
-        if any(sensitive in request.url.path for sensitive in ['/admin', '/api/', '/internal']):
+        if any(sensitive in path for sensitive in SENSITIVE_PATH_PARTS):
             headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
             headers["Pragma"] = "no-cache"
             headers["Expires"] = "0"
@@ -172,19 +197,46 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             headers={"Location": str(https_url)}
         )
     
-    async def dispatch(self, request: Request, call_next):
+    def _apply_security_headers(self, path: str, message: Message) -> None:
+        """Set the security headers on a response start message, replacing leaky ones"""
+        sensitive = any(part in path for part in SENSITIVE_PATH_PARTS)
+        replaced = self._replaced_names[sensitive]
+        message['headers'] = [
+            (name, value) for name, value in message.get('headers', [])
+            if name.lower() not in replaced
+        ] + self._raw_headers[sensitive]
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Apply security headers to responses"""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
         
         # Check for HTTPS redirect
         if self.config.force_https:
-            https_redirect = self._check_https_redirect(request)
+            https_redirect = self._check_https_redirect(Request(scope))
             if https_redirect:
-                return https_redirect
+                await https_redirect(scope, receive, send)
+                return
+        
+        path = scope['path']
+        add_headers = self._should_add_security_headers(path)
+        response_started = False
+        
+        async def send_with_headers(message: Message) -> None:
+            nonlocal response_started
+            if message['type'] == 'http.response.start':
+                response_started = True
+                if add_headers:
+                    self._apply_security_headers(path, message)
+            await send(message)
         
         # Process the request
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_headers)
         except Exception as e:
+            if response_started:
+                raise
             logger.error(f"Error processing request: {e}")
             # Even for errors, add basic security headers
             response = Response(
@@ -192,24 +244,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
                 status_code=500,
                 headers={"X-Content-Type-Options": "nosniff"}
             )
-        
-        # Add security headers
-        if self._should_add_security_headers(request):
-            security_headers = self._get_security_headers(request, response)
-            
-            for header_name, header_value in security_headers.items():
-                response.headers[header_name] = header_value
-            
-            # Remove potentially leaky headers
-            headers_to_remove = ["X-Powered-By", "Server"]
-            for header in headers_to_remove:
-                if header in response.headers:
-                    del response.headers[header]
-                    
-            # Override server header
-            response.headers["Server"] = "Dynamic-Survey-API"
-        
-        return response
+            await response(scope, receive, send_with_headers)
 
 
 def create_security_headers_middleware(config: Optional[SecurityConfig] = None):
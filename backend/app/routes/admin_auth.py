@@ -14,12 +14,13 @@ import hashlib
 import secrets
 import jwt
 
+from app.middleware.request_body import CachedBodyRoute
 from app.database import db
 from app.utils.response_helpers import success_response, error_response
 from app.utils.admin_auth_unified import create_access_token, verify_token, hash_password, verify_password
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/admin/auth", tags=["admin-auth"])
+router = APIRouter(prefix="/api/admin/auth", tags=["admin-auth"], route_class=CachedBodyRoute)
 security = HTTPBearer()
 
 # Global variable to store current demo user
@@ -16,12 +16,13 @@ import logging
 from datetime import datetime, timezone
 import uuid
 
+from app.middleware.request_body import CachedBodyRoute
 from app.database import db
 from app.utils.response_helpers import success_response, error_response
 from app.routes.admin_auth import AdminUserResponse, get_current_admin_user
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/admin/client", tags=["admin-client"])
+router = APIRouter(prefix="/api/admin/client", tags=["admin-client"], route_class=CachedBodyRoute)
 
 # === PYDANTIC MODELS ===
 
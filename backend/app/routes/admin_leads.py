@@ -11,15 +11,21 @@ This module provides API endpoints for:
 from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from typing import List, Optional, Literal
+import json
 import logging
 from datetime import datetime, timezone
 
+from app.middleware.request_body import CachedBodyRoute
 from app.database import db
 from app.utils.response_helpers import success_response, error_response
+from app.utils.pagination import PREV, decode_cursor, paginate_rows
 from app.routes.admin_auth import AdminUserResponse, get_current_admin_user
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/admin/leads", tags=["admin-leads"])
+router = APIRouter(prefix="/api/admin/leads", tags=["admin-leads"], route_class=CachedBodyRoute)
+
+# Lead list order (the list_admin_leads keyset)
+LEAD_LIST_ORDER = [("started_at", True), ("id", True)]
 
 # === PYDANTIC MODELS ===
 
@@ -68,106 +74,84 @@ class ConversionUpdate(BaseModel):
 
 # === LEADS MANAGEMENT ENDPOINTS ===
 
+def _lead_list_item(row: dict) -> dict:
+    """Shape a ``list_admin_leads`` row for the admin UI."""
+    # Contact information is stored in lead_outcomes.contact_info JSONB
+    contact_info = row.get('contact_info') or {}
+    if isinstance(contact_info, str):
+        try:
+            contact_info = json.loads(contact_info)
+        except ValueError:
+            contact_info = {}
+    
+    return {
+        "lead_id": row['lead_id'],  # Proper lead UUID from database
+        "form_id": row['form_id'],  # Add form_id for filtering
+        "form_title": row.get('form_title') or 'Unknown Form',
+        "lead_status": row['lead_status'],
+        "final_score": row.get('final_score'),
+        "started_at": row['started_at'],
+        "completed_at": row.get('completed_at'),
+        "utm_source": row.get('utm_source'),
+        "utm_campaign": row.get('utm_campaign'),
+        "utm_medium": row.get('utm_medium'),
+        "contact_name": contact_info.get('name'),
+        "contact_email": contact_info.get('email'),
+        "contact_phone": contact_info.get('phone'),
+        "actual_conversion": row.get('actual_conversion'),
+        "conversion_date": row.get('conversion_date'),
+        "conversion_value": row.get('conversion_value'),
+        "conversion_type": row.get('conversion_type')
+    }
+
 @router.get("/")
 async def get_leads(
     form_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     converted: Optional[str] = Query(None),
     utm_source: Optional[str] = Query(None),
-    limit: int = Query(50, le=1000),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor or prev_cursor from a previous page"),
     current_user: AdminUserResponse = Depends(get_current_admin_user)
 ):
-    """Get leads with filtering and pagination."""
+    """Get leads with filtering and cursor pagination (newest first).
+    
+    One call to the ``list_admin_leads`` database function joins forms,
+    tracking data and outcomes, applies every filter and pages by keyset on
+    (started_at, id), so pages are always full and deep pages cost the same
+    as the first. Pass ``next_cursor`` or ``prev_cursor`` from the response
+    to move between pages.
+    """
+    cursor_values, direction = None, None
+    if cursor:
+        try:
+            cursor_values, direction = decode_cursor(cursor, LEAD_LIST_ORDER)
+        except ValueError as e:
+            return error_response(str(e), 400)
+    
     try:
-        # Base query for lead sessions with all needed fields
-        query = db.client.table('lead_sessions').select(
-            'id, session_id, form_id, lead_status, final_score, started_at, completed_at'
-        ).eq('client_id', current_user.client_id)
-        
-        # Apply filters
-        if form_id:
-            query = query.eq('form_id', form_id)
-        if status:
-            query = query.eq('lead_status', status)
-            
-        # Execute query with pagination
-        lead_sessions = query.order('started_at', desc=True).range(offset, offset + limit - 1).execute()
-        
-        if not lead_sessions.data:
-            return success_response({"leads": []}, "No leads found")
-        
-        session_ids = [session['id'] for session in lead_sessions.data]
-        
-        # Get form titles for each unique form_id
-        form_ids = list(set(session['form_id'] for session in lead_sessions.data))
-        forms_result = db.client.table('forms').select('id, title').in_('id', form_ids).execute()
-        form_titles = {form['id']: form['title'] for form in forms_result.data}
-        
-        # Get tracking data
-        tracking_result = db.client.table('tracking_data').select(
-            'session_id, utm_source, utm_campaign, utm_medium'
-        ).in_('session_id', session_ids).execute()
-        tracking_data = {track['session_id']: track for track in tracking_result.data}
-        
-        # Get conversion data from lead_outcomes
-        outcomes_result = db.client.table('lead_outcomes').select(
-            'session_id, final_status, lead_score, confidence_score, notification_sent, converted, conversion_date, conversion_value, conversion_type, contact_info'
-        ).in_('session_id', session_ids).execute()
-        outcomes_data = {outcome['session_id']: outcome for outcome in outcomes_result.data}
-        
-        # Contact information is already stored in lead_outcomes.contact_info JSONB
-        # No need to extract from individual responses
-        
-        # Build response and apply filters
-        leads = []
-        for session in lead_sessions.data:
-            session_tracking = tracking_data.get(session['id'], {})  # Use UUID id for tracking
-            session_outcome = outcomes_data.get(session['id'], {})   # Use UUID id for outcomes
-            
-            # Extract contact info from lead_outcomes.contact_info JSONB
-            contact_info = session_outcome.get('contact_info', {})
-            if isinstance(contact_info, str):
-                import json
-                try:
-                    contact_info = json.loads(contact_info)
-                except:
-                    contact_info = {}
-            
-            # Apply utm_source filter if specified
-            if utm_source and session_tracking.get('utm_source') != utm_source:
-                continue
-            
-            # Apply converted filter if specified
-            if converted:
-                is_converted = session_outcome.get('converted', False)
-                if converted == 'true' and not is_converted:
-                    continue
-                elif converted == 'false' and is_converted:
-                    continue
-            
-            lead_data = {
-                "lead_id": session['id'],  # Proper lead UUID from database
-                "form_id": session['form_id'],  # Add form_id for filtering
-                "form_title": form_titles.get(session['form_id'], 'Unknown Form'),
-                "lead_status": session['lead_status'],
-                "final_score": session.get('final_score'),
-                "started_at": session['started_at'],
-                "completed_at": session.get('completed_at'),
-                "utm_source": session_tracking.get('utm_source'),
-                "utm_campaign": session_tracking.get('utm_campaign'),
-                "utm_medium": session_tracking.get('utm_medium'),
-                "contact_name": contact_info.get('name'),
-                "contact_email": contact_info.get('email'),  
-                "contact_phone": contact_info.get('phone'),
-                "actual_conversion": session_outcome.get('converted'),
-                "conversion_date": session_outcome.get('conversion_date'),
-                "conversion_value": session_outcome.get('conversion_value'),
-                "conversion_type": session_outcome.get('conversion_type')
-            }
-            leads.append(lead_data)
+        result = db.client.rpc('list_admin_leads', {
+            "p_client_id": current_user.client_id,
+            "p_form_id": form_id,
+            "p_status": status,
+            "p_utm_source": utm_source,
+            "p_converted": {"true": True, "false": False}.get(converted) if converted else None,
+            "p_cursor_started_at": cursor_values[0] if cursor_values else None,
+            "p_cursor_id": cursor_values[1] if cursor_values else None,
+            "p_reverse": direction == PREV,
+            "p_limit": limit + 1
+        }).execute()
+        
+        rows, next_cursor, prev_cursor = paginate_rows(
+            result.data or [], LEAD_LIST_ORDER, limit, direction,
+            key=lambda row: [row['started_at'], row['lead_id']]
+        )
+        leads = [_lead_list_item(row) for row in rows]
         
-        return success_response({"leads": leads}, f"Retrieved {len(leads)} leads")
+        return success_response(
+            {"leads": leads, "next_cursor": next_cursor, "prev_cursor": prev_cursor},
+            f"Retrieved {len(leads)} leads" if leads else "No leads found"
+        )
         
     except Exception as e:
         logger.error(f"Failed to get leads: {e}")
@@ -16,12 +16,13 @@ from datetime import datetime, timezone, timedelta
 import uuid
 import secrets
 
+from app.middleware.request_body import CachedBodyRoute
 from app.database import db
 from app.utils.response_helpers import success_response, error_response
 from app.routes.admin_auth import AdminUserResponse, get_current_admin_user
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/admin/team", tags=["admin-team"])
+router = APIRouter(prefix="/api/admin/team", tags=["admin-team"], route_class=CachedBodyRoute)
 
 # === PYDANTIC MODELS ===
 
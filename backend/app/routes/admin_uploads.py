@@ -14,13 +14,14 @@ import logging
 from datetime import datetime, timezone
 import uuid
 
+from app.middleware.request_body import CachedBodyRoute
 from app.database import db
 from app.utils.file_upload import validate_and_store_logo, remove_logo
 from app.utils.response_helpers import success_response, error_response
 from app.routes.admin_auth import AdminUserResponse, get_current_admin_user
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/admin/upload", tags=["admin-uploads"])
+router = APIRouter(prefix="/api/admin/upload", tags=["admin-uploads"], route_class=CachedBodyRoute)
 
 # === LOGO UPLOAD ENDPOINTS ===
 
@@ -5,19 +5,37 @@ This module provides analytics endpoints for dashboard metrics, form-specific
 analytics, and real-time metrics. All analytics are client-scoped for security.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse, FileResponse
+from pathlib import Path
 from typing import Dict, Any, List, Optional, Literal
 import logging
+import os
+import tempfile
+import uuid
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from app.middleware.request_body import CachedBodyRoute
 from app.database import db
 from app.routes.admin_auth import AdminUserResponse
 from app.routes.admin_auth import get_current_admin_user
 from app.utils.response_helpers import success_response, error_response
+from app.utils.analytics_rollups import fetch_rollups, summarize, group_by, daily_series
+from app.utils.analytics_export import (
+    MEDIA_TYPES,
+    iter_export_rows,
+    stream_csv,
+    write_xlsx,
+    create_export_job,
+    get_export_job,
+    export_file_path,
+    run_export_job
+)
+from app.utils.pg_pool import pg_pool
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+router = APIRouter(prefix="/api/analytics", tags=["analytics"], route_class=CachedBodyRoute)
 
 # === UTILITY FUNCTIONS ===
 
@@ -55,6 +73,30 @@ def get_client_forms(client_id: str) -> List[Dict[str, Any]]:
         logger.error(f"Failed to get client forms: {e}")
         return []
 
+def get_completion_time_stats(client_id: str, start_date: datetime, end_date: datetime, form_id: Optional[str] = None) -> Dict[str, Any]:
+    """Completion time distribution in seconds (mean, p50, p90, p99) over UTC days of started_at."""
+    empty = {"samples": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0}
+    try:
+        result = db.client.rpc("completion_time_stats", {
+            "p_client_id": client_id,
+            "p_start_day": start_date.date().isoformat(),
+            "p_end_day": end_date.date().isoformat(),
+            "p_form_id": form_id
+        }).execute()
+        row = (result.data or [{}])[0]
+        if not row.get("samples"):
+            return empty
+        return {
+            "samples": row["samples"],
+            "mean": round(row["mean_seconds"], 1),
+            "p50": round(row["p50_seconds"], 1),
+            "p90": round(row["p90_seconds"], 1),
+            "p99": round(row["p99_seconds"], 1)
+        }
+    except Exception as e:
+        logger.error(f"Failed to get completion time stats: {e}")
+        return empty
+
 def calculate_dashboard_metrics(client_id: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
     """Calculate dashboard metrics for a client within date range."""
     try:
@@ -73,65 +115,51 @@ def calculate_dashboard_metrics(client_id: str, start_date: datetime, end_date:
                 "total_views": 0,
                 "response_rate": 0.0,
                 "average_completion_time": 0,
-                "top_performing_form": None
+                "top_performing_form": None,
+                "completion_time": {"samples": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0},
+                "qualified_leads": 0,
+                "traffic_sources": []
             }
         
         # Count active forms
         active_forms = len([f for f in forms if f["status"] == "active"])
         
-        # Get lead sessions within date range
-        sessions_result = db.client.table("lead_sessions")\
-            .select("id, form_id, started_at, completed_at, completed, final_score")\
-            .in_("form_id", form_ids)\
-            .gte("started_at", start_date.isoformat())\
-            .lte("started_at", end_date.isoformat())\
-            .execute()
-        
-        sessions = sessions_result.data or []
-        total_views = len(sessions)
-        completed_sessions = [s for s in sessions if s.get("completed")]
-        total_responses = len(completed_sessions)
+        # Daily rollups within date range (maintained by database triggers)
+        rollups = fetch_rollups(client_id, start_date, end_date)
+        totals = summarize(rollups)
+        total_views = totals["views"]
+        total_responses = totals["completions"]
         
         # Calculate metrics
         response_rate = (total_responses / total_views) if total_views > 0 else 0.0
-        
-        # Calculate completion times (mock for now - in reality you'd calculate actual times)
-        completion_times = []
-        for session in completed_sessions:
-            if session.get("started_at") and session.get("completed_at"):
-                # Mock calculation - in reality parse datetime difference
-                completion_times.append(120)  # 2 minutes average
-        
-        avg_completion_time = sum(completion_times) / len(completion_times) if completion_times else 0
+        avg_completion_time = totals["average_completion_time"]
         
         # Find top performing form by conversion rate
-        form_performance = defaultdict(lambda: {"views": 0, "completions": 0, "title": ""})
-        
-        for session in sessions:
-            form_id = session["form_id"]
-            form_performance[form_id]["views"] += 1
-            if session.get("completed"):
-                form_performance[form_id]["completions"] += 1
-        
-        # Add form titles
-        for form in forms:
-            if form["id"] in form_performance:
-                form_performance[form["id"]]["title"] = form["title"]
-        
+        form_titles = {form["id"]: form["title"] for form in forms}
         top_form = None
         best_rate = 0.0
         
-        for form_id, perf in form_performance.items():
+        for form_id, perf in group_by(rollups, "form_id").items():
             if perf["views"] > 0:
                 rate = perf["completions"] / perf["views"]
                 if rate > best_rate and perf["views"] >= 5:  # Minimum threshold
                     best_rate = rate
                     top_form = {
                         "id": form_id,
-                        "title": perf["title"],
+                        "title": form_titles.get(form_id, ""),
                         "conversion_rate": rate
                     }
         
+        traffic_sources = [
+            {
+                "utm_source": source or None,
+                "views": perf["views"],
+                "completions": perf["completions"],
+                "qualified": perf["qualified"]
+            }
+            for source, perf in sorted(group_by(rollups, "utm_source").items(), key=lambda item: -item[1]["views"])
+        ]
+        
         return {
             "total_forms": len(forms),
             "active_forms": active_forms,
@@ -140,7 +168,10 @@ def calculate_dashboard_metrics(client_id: str, start_date: datetime, end_date:
             "total_views": total_views,
             "response_rate": response_rate,
             "average_completion_time": int(avg_completion_time),
-            "top_performing_form": top_form
+            "top_performing_form": top_form,
+            "completion_time": get_completion_time_stats(client_id, start_date, end_date),
+            "qualified_leads": totals["qualified"],
+            "traffic_sources": traffic_sources
         }
         
     except Exception as e:
@@ -153,7 +184,10 @@ def calculate_dashboard_metrics(client_id: str, start_date: datetime, end_date:
             "total_views": 0,
             "response_rate": 0.0,
             "average_completion_time": 0,
-            "top_performing_form": None
+            "top_performing_form": None,
+            "completion_time": {"samples": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0},
+            "qualified_leads": 0,
+            "traffic_sources": []
         }
 
 def calculate_form_analytics(form_id: str, client_id: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
@@ -173,39 +207,26 @@ def calculate_form_analytics(form_id: str, client_id: str, start_date: datetime,
             
         form = form_result.data[0]
         
-        # Get sessions for this form
-        sessions_result = db.client.table("lead_sessions")\
-            .select("id, started_at, completed_at, completed, step, final_score")\
-            .eq("form_id", form_id)\
-            .gte("started_at", start_date.isoformat())\
-            .lte("started_at", end_date.isoformat())\
-            .execute()
-        
-        sessions = sessions_result.data or []
-        total_views = len(sessions)
-        completed_sessions = [s for s in sessions if s.get("completed")]
-        total_responses = len(completed_sessions)
+        # Daily rollups for this form
+        rollups = fetch_rollups(client_id, start_date, end_date, form_id=form_id)
+        totals = summarize(rollups)
+        total_views = totals["views"]
+        total_responses = totals["completions"]
         
         conversion_rate = (total_responses / total_views) if total_views > 0 else 0.0
-        
-        # Mock completion time calculation
-        avg_completion_time = 120  # 2 minutes
-        
-        # Generate daily data for the past week
-        daily_data = []
-        for i in range(7):
-            date = end_date - timedelta(days=i)
-            # Mock data - in reality you'd query by date
-            views = max(0, total_views // 7 + (i % 3))
-            responses = int(views * conversion_rate)
-            daily_data.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "views": views,
-                "responses": responses,
-                "conversion_rate": (responses / views) if views > 0 else 0.0
-            })
-        
-        daily_data.reverse()  # Chronological order
+        avg_completion_time = int(totals["average_completion_time"])
+        
+        # Daily data for the last week of the range
+        week_start = max(start_date.date(), (end_date - timedelta(days=6)).date())
+        daily_data = [
+            {
+                "date": day["date"],
+                "views": day["views"],
+                "responses": day["completions"],
+                "conversion_rate": (day["completions"] / day["views"]) if day["views"] > 0 else 0.0
+            }
+            for day in daily_series(rollups, week_start, end_date.date())
+        ]
         
         # Get form questions for analytics
         questions_result = db.client.table("form_questions")\
@@ -248,6 +269,7 @@ def calculate_form_analytics(form_id: str, client_id: str, start_date: datetime,
             "total_responses": total_responses,
             "conversion_rate": conversion_rate,
             "average_completion_time": avg_completion_time,
+            "completion_time": get_completion_time_stats(client_id, start_date, end_date, form_id=form_id),
             "completions_by_day": daily_data,
             "question_analytics": question_analytics,
             "user_journey": user_journey
@@ -401,47 +423,92 @@ async def get_realtime_metrics(
 
 @router.get("/export")
 async def export_analytics(
+    background_tasks: BackgroundTasks,
     form_id: Optional[str] = Query(None, description="Specific form ID to export"),
     start_date: Optional[str] = Query(None, description="Start date (ISO format)"),
     end_date: Optional[str] = Query(None, description="End date (ISO format)"),
     format: Literal["csv", "xlsx", "pdf"] = Query("csv", description="Export format"),
+    mode: Literal["stream", "background"] = Query("stream", description="stream: download now; background: prepare a file to download later"),
     current_user: AdminUserResponse = Depends(get_current_admin_user)
 ):
-    """Export analytics data in various formats."""
+    """Export lead sessions with their answers and attribution, one row per answer.
+    
+    Rows are read from a server-side cursor in chunks and written as they
+    arrive, so memory does not grow with the export size. Use
+    ``mode=background`` for very large exports and poll ``/exports/{job_id}``.
+    """
+    if format == "pdf":
+        return error_response("PDF export is not available; use csv or xlsx", 400)
+    
+    # The query casts form_id to uuid; a bad value must fail before a stream starts
+    if form_id:
+        try:
+            uuid.UUID(form_id)
+        except ValueError:
+            return error_response("form_id must be a UUID", 400)
+    
+    start, end = parse_date_range(start_date, end_date)
+    filename = f"analytics-{form_id or 'all-forms'}-{start.date()}-{end.date()}.{format}"
+    
     try:
-        # For now, return a mock response indicating the feature is available
-        # In production, this would generate actual files
+        if mode == "background":
+            job = create_export_job(current_user.client_id, format, {
+                "form_id": form_id, "start": start.isoformat(), "end": end.isoformat()
+            })
+            background_tasks.add_task(run_export_job, current_user.client_id, job, start, end, form_id)
+            return success_response(
+                data={**job, "status_url": f"/api/analytics/exports/{job['job_id']}"},
+                message=f"Analytics export queued in {format.upper()} format",
+                status_code=202
+            )
         
-        start, end = parse_date_range(start_date, end_date)
+        # Fail before any headers are sent if the database is unreachable
+        await pg_pool.get_pool()
+        rows = iter_export_rows(current_user.client_id, start, end, form_id)
+        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+        
+        if format == "csv":
+            return StreamingResponse(stream_csv(rows), media_type=MEDIA_TYPES["csv"], headers=headers)
+        
+        # XLSX is a zip archive and cannot be sent before it is complete
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            await write_xlsx(Path(path), rows)
+        except Exception:
+            # Background tasks only run after a response is sent
+            os.unlink(path)
+            raise
+        background_tasks.add_task(os.unlink, path)
+        return FileResponse(path, media_type=MEDIA_TYPES["xlsx"], filename=filename, background=background_tasks)
         
-        if form_id:
-            # Export specific form analytics
-            analytics = calculate_form_analytics(form_id, current_user.client_id, start, end)
-            if not analytics:
-                raise HTTPException(status_code=404, detail="Form not found")
-            export_type = f"form-{form_id}"
-        else:
-            # Export dashboard analytics
-            analytics = calculate_dashboard_metrics(current_user.client_id, start, end)
-            export_type = "dashboard"
-        
-        return success_response(
-            data={
-                "export_type": export_type,
-                "format": format,
-                "date_range": {
-                    "start": start.isoformat(),
-                    "end": end.isoformat()
-                },
-                "download_url": f"/api/analytics/download/{export_type}-{format}",
-                "expires_at": (datetime.now() + timedelta(hours=1)).isoformat(),
-                "file_size_bytes": 1024 * (50 if format == "pdf" else 20)
-            },
-            message=f"Analytics export prepared successfully in {format.upper()} format"
-        )
-        
-    except HTTPException:
-        raise
     except Exception as e:
         logger.error(f"Failed to export analytics: {e}")
-        raise HTTPException(status_code=500, detail="Failed to export analytics")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to export analytics")
+
+@router.get("/exports/{job_id}")
+async def get_export_status(
+    job_id: str,
+    current_user: AdminUserResponse = Depends(get_current_admin_user)
+):
+    """Status of a background export (pending, running, ready or failed)."""
+    job = get_export_job(current_user.client_id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    
+    if job["status"] == "ready":
+        job["download_url"] = f"/api/analytics/exports/{job_id}/download"
+    return success_response(data=job, message=f"Export {job['status']}")
+
+@router.get("/exports/{job_id}/download")
+async def download_export(
+    job_id: str,
+    current_user: AdminUserResponse = Depends(get_current_admin_user)
+):
+    """Download the file of a finished background export."""
+    job = get_export_job(current_user.client_id, job_id)
+    if not job or job["status"] != "ready":
+        raise HTTPException(status_code=404, detail="Export not ready")
+    
+    path = export_file_path(current_user.client_id, job_id, job["format"])
+    return FileResponse(path, media_type=MEDIA_TYPES[job["format"]], filename=f"analytics-export-{job_id}.{job['format']}")
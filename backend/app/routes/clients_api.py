@@ -14,11 +14,13 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from typing import Dict, Any, Optional
 import logging
 
+from app.middleware.request_body import CachedBodyRoute
 from app.database import db
 from app.routes.admin_auth import AdminUserResponse
 # from app.routes.admin_api import get_current_admin_user  # TODO: Re-enable when auth is ready
 from app.routes.admin_auth import get_current_admin_user
 from app.utils.response_helpers import success_response, error_response
+from app.utils.cache_invalidation import invalidation_bus
 from pydantic_models import (
     ClientResponse,
     ClientUpdateRequest,
@@ -26,7 +28,7 @@ from pydantic_models import (
 )
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/clients", tags=["clients"])
+router = APIRouter(prefix="/api/clients", tags=["clients"], route_class=CachedBodyRoute)
 
 # === RESTful ENDPOINTS ===
 
@@ -160,6 +162,9 @@ async def update_client(
         if not result.data:
             raise HTTPException(status_code=404, detail="Failed to update client")
         
+        # Drop cached client info on every worker
+        await invalidation_bus.apublish("client", client_id)
+        
         # Return updated client
         return await get_client(client_id, current_user)
             
@@ -259,6 +264,9 @@ async def patch_client(
                 if not settings_insert_result.data:
                     logger.warning(f"Failed to create client_settings record for client {client_id}")
         
+        # Drop cached client info on every worker
+        await invalidation_bus.apublish("client", client_id)
+        
         # Return updated client
         return await get_client(client_id, current_user)
             
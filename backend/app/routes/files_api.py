@@ -16,10 +16,11 @@ from fastapi import APIRouter, HTTPException, status, Response, Request, UploadF
 from fastapi.responses import FileResponse
 from fastapi.security import HTTPBearer
 
+from app.middleware.request_body import CachedBodyRoute
 from app.utils.file_upload import file_upload_handler
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/files", tags=["files"])
+router = APIRouter(prefix="/api/files", tags=["files"], route_class=CachedBodyRoute)
 security = HTTPBearer()
 
 # Load upload configuration with fallback
@@ -11,17 +11,22 @@ SECURITY: All endpoints enforce row-level security - each client can only
 access their own forms. Cross-client access attempts return 404.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status, BackgroundTasks
 from typing import Dict, Any, List, Optional, Literal
 import logging
 from datetime import datetime
 import uuid
 
+from app.middleware.request_body import CachedBodyRoute
 from app.database import db
 from app.routes.admin_auth import AdminUserResponse
 # from app.routes.admin_api import get_current_admin_user  # TODO: Re-enable when auth is ready
 from app.routes.admin_auth import get_current_admin_user
 from app.utils.response_helpers import success_response, error_response
+from app.utils.llm_cache import llm_cache
+from app.utils.pagination import apply_keyset, paginate_rows
+from app.utils.phrasing_variants import generate_form_variants_safe
+from app.utils.cache_invalidation import invalidation_bus
 from pydantic_models import (
     FormQuestionConfig,
     FormCreateRequest, 
@@ -32,7 +37,7 @@ from pydantic_models import (
 )
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/forms", tags=["forms"])
+router = APIRouter(prefix="/api/forms", tags=["forms"], route_class=CachedBodyRoute)
 
 # === UTILITY FUNCTIONS WITH CLIENT SCOPING ===
 
@@ -211,19 +216,23 @@ def save_form_questions(form_id: str, questions: List[FormQuestionConfig], clien
 
 @router.get("")
 async def list_forms(
-    page: int = Query(1, ge=1, description="Page number"),
+    cursor: Optional[str] = Query(None, description="next_cursor or prev_cursor from a previous page"),
     page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
     status: Optional[str] = Query(None, description="Filter by status"),
     search: Optional[str] = Query(None, description="Search in title and description"),
     tags: Optional[str] = Query(None, description="Filter by tags (comma-separated)"),
-    sort_by: str = Query("updated_at", description="Sort by field"),
+    sort_by: Literal["updated_at", "created_at", "title"] = Query("updated_at", description="Sort by field"),
     sort_order: Literal["asc", "desc"] = Query("desc", description="Sort order"),
     current_user: AdminUserResponse = Depends(get_current_admin_user)
 ):
     """
     Get paginated list of forms for the authenticated client.
     Each client can only see their own forms.
+    
+    Pages by keyset on (sort_by, id); pass ``next_cursor`` or ``prev_cursor``
+    from the response to move between pages.
     """
+    order = [(sort_by, sort_order == "desc"), ("id", sort_order == "desc")]
     try:
         # Use Supabase client
         
@@ -263,15 +272,17 @@ async def list_forms(
         count_result = count_result.execute()
         total_count = count_result.count or 0
         
-        # Get paginated results with ordering
-        offset = (page - 1) * page_size
-        query = query.order(sort_by, desc=(sort_order == "desc"))\
-            .range(offset, offset + page_size - 1)
+        # Get one keyset page with ordering
+        try:
+            query, direction = apply_keyset(query, order, page_size, cursor)
+        except ValueError as e:
+            return error_response(str(e), 400)
         
         result = query.execute()
+        rows, next_cursor, prev_cursor = paginate_rows(result.data or [], order, page_size, direction)
         
         forms = []
-        for row in result.data or []:
+        for row in rows:
             form_id = str(row["id"])
             client_id = str(row["client_id"])
             stats = get_form_statistics(form_id, current_user.client_id)
@@ -301,15 +312,13 @@ async def list_forms(
                 questions=questions
             ))
         
-        total_pages = (total_count + page_size - 1) // page_size
-        
         return success_response(
             data={
                 "forms": [form.model_dump(mode='json') for form in forms],
                 "total_count": total_count,
-                "page": page,
                 "page_size": page_size,
-                "total_pages": total_pages
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
             },
             message="Forms retrieved successfully"
         )
@@ -383,6 +392,7 @@ async def get_form(
 @router.post("", response_model=FormResponse, status_code=status.HTTP_201_CREATED)
 async def create_form(
     form_request: FormCreateRequest,
+    background_tasks: BackgroundTasks,
     current_user: AdminUserResponse = Depends(get_current_admin_user)
 ):
     """
@@ -422,6 +432,8 @@ async def create_form(
         # Save questions if provided
         if form_request.questions:
             save_form_questions(form_id, form_request.questions, current_user.client_id)
+            # Precompute question phrasings off the request path
+            background_tasks.add_task(generate_form_variants_safe, form_id)
         
         form_response = FormResponse(
             id=form_id,
@@ -499,6 +511,10 @@ async def update_form(
         if not result.data:
             raise HTTPException(status_code=404, detail="Form not found")
         
+        # Cached question selections were generated from the old form
+        llm_cache.invalidate_form(form_id)
+        await invalidation_bus.apublish("form", form_id)
+        
         # Return updated form
         return await get_form(form_id, current_user)
             
@@ -544,6 +560,10 @@ async def patch_form(
             
             if not result.data:
                 raise HTTPException(status_code=404, detail="Form not found")
+            
+            # Cached question selections were generated from the old form
+            llm_cache.invalidate_form(form_id)
+            await invalidation_bus.apublish("form", form_id)
         
         # Return updated form
         return await get_form(form_id, current_user)
@@ -579,6 +599,9 @@ async def delete_form(
         if not result.data:
             raise HTTPException(status_code=404, detail="Form not found")
         
+        llm_cache.invalidate_form(form_id)
+        await invalidation_bus.apublish("form", form_id)
+        
         return success_response(
             message="Form deleted successfully",
             status_code=204
@@ -611,6 +634,7 @@ async def get_form_questions_endpoint(
 async def update_form_questions_endpoint(
     form_id: str,
     questions: List[FormQuestionConfig],
+    background_tasks: BackgroundTasks,
     current_user: AdminUserResponse = Depends(get_current_admin_user)
 ):
     """
@@ -619,6 +643,14 @@ async def update_form_questions_endpoint(
     """
     try:
         save_form_questions(form_id, questions, current_user.client_id)
+        
+        # Cached question selections and every worker's form caches were built from the old question set
+        llm_cache.invalidate_form(form_id)
+        await invalidation_bus.apublish("form", form_id)
+        
+        # Rows were replaced, so their precomputed phrasings are gone - regenerate off the request path
+        background_tasks.add_task(generate_form_variants_safe, form_id)
+        
         return success_response(
             message="Questions updated successfully",
             data={"form_id": form_id, "question_count": len(questions)}
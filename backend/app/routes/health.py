@@ -10,36 +10,27 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
+from app.middleware.request_body import CachedBodyRoute
 from app.database import db
+from app.async_database import db_async
+from app.utils.llm_cache import llm_cache
+from app.utils.lru_cache import LRUTTLCache
+from app.utils.cached_data_loader import data_loader
 from app.utils.config_loader import get_database_config, get_security_config
 from app.middleware.admin_auth import get_admin_user
 from app.middleware.request_limits import RequestLimitsMiddleware
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/health", tags=["health"])
+router = APIRouter(prefix="/health", tags=["health"], route_class=CachedBodyRoute)
 
-# Cache system metrics for better performance
-_metrics_cache = {}
-_cache_ttl = 30  # seconds
+# Cache system metrics for better performance: one computation per TTL however
+# many probes arrive, and a just-expired value is served while it is recomputed
+_metrics_cache = LRUTTLCache(default_ttl=30, stale_ttl=30, max_size=16, name="health_metrics")
 
 
 def _get_cached_metrics(metric_name: str, compute_func):
     """Get cached metrics with TTL"""
-    now = time.time()
-    cache_key = f"{metric_name}_{now // _cache_ttl}"
-    
-    if cache_key not in _metrics_cache:
-        _metrics_cache[cache_key] = {
-            'data': compute_func(),
-            'timestamp': now
-        }
-        
-        # Clean old cache entries
-        old_keys = [k for k in _metrics_cache.keys() if _metrics_cache[k]['timestamp'] < now - _cache_ttl * 2]
-        for old_key in old_keys:
-            del _metrics_cache[old_key]
-    
-    return _metrics_cache[cache_key]['data']
+    return _metrics_cache.get_or_load(metric_name, compute_func)
 
 
 def _get_system_metrics() -> Dict[str, Any]:
@@ -79,6 +70,7 @@ def _get_application_metrics() -> Dict[str, Any]:
     try:
         # Database connection stats
         db_stats = db.get_connection_stats()
+        async_db_stats = db_async.get_connection_stats()
         
         # Environment info
         environment = os.getenv('ENVIRONMENT', 'unknown')
@@ -98,6 +90,10 @@ def _get_application_metrics() -> Dict[str, Any]:
             'python_version': f"{psutil.sys.version_info.major}.{psutil.sys.version_info.minor}.{psutil.sys.version_info.micro}",
             'uptime_seconds': time.time() - psutil.Process().create_time(),
             'database': db_stats,
+            'async_database': async_db_stats,
+            'llm_cache': llm_cache.get_stats(),
+            'data_cache': data_loader.get_cache_stats(),
+            'metrics_cache': _metrics_cache.get_stats(),
             'configuration': config_status,
             'log_level': os.getenv('LOG_LEVEL', 'INFO')
         }
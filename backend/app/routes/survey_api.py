@@ -1,9 +1,10 @@
 """Survey API endpoints with consistent response format and fastapi-sessions."""
 
 from fastapi import APIRouter, HTTPException, Request, Header, Response, Cookie
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+import asyncio
 import logging
 from datetime import datetime
 import os
@@ -24,17 +25,20 @@ from pydantic_models import (
     LeadStatus,
     CompletionType
 )
+from app.middleware.request_body import CachedBodyRoute
 from app.graphs.simplified_survey_graph import (
     simplified_survey_graph as intelligent_survey_graph,
     start_simplified_survey as start_intelligent_survey,
     process_survey_step as process_survey_responses,
     check_abandonment as check_survey_abandonment
 )
+from app.graphs.supervisors.consolidated_survey_admin_supervisor import ConsolidatedSurveyAdminSupervisor
 from app.utils.response_helpers import (
     success_response,
     error_response,
     not_found_response,
-    server_error_response
+    server_error_response,
+    sse_event
 )
 from app.session_manager import (
     create_survey_session,
@@ -43,10 +47,15 @@ from app.session_manager import (
     delete_survey_session,
     set_session_cookie
 )
-from app.database import db
+from app.async_database import db_async
+from app.step_context import prefetch_step_context, graph_step_context
+from app.session_state_cache import session_state_cache
+from app.snapshot_delta import load_snapshot_state, persist_snapshot
+from app.snapshot_serializer import build_session_snapshot
+from app.lead_scoring_queue import lead_scoring_queue
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/survey", tags=["survey"])
+router = APIRouter(prefix="/api/survey", tags=["survey"], route_class=CachedBodyRoute)
 
 
 @router.post("/start")
@@ -77,7 +86,7 @@ async def start_session(
         # Look up client_id from form if not provided in request
         client_id = request.client_id
         if not client_id:
-            form = db.get_form(request.form_id)
+            form = await db_async.get_form(request.form_id)
             if not form:
                 return error_response(
                     f"Form {request.form_id} not found",
@@ -122,7 +131,7 @@ async def start_session(
                 'abandonment_risk': 0.3
             }
             
-            result = db.client.table("lead_sessions").insert(db_session_data).execute()
+            result = await db_async.create_lead_session(db_session_data)
             logger.info(f"🔥 START: Created session {session_id} in database")
         except Exception as e:
             logger.error(f"🔥 START: Failed to create database session: {e}")
@@ -155,8 +164,9 @@ async def start_session(
         result = await intelligent_survey_graph.ainvoke(initial_state)
         logger.info(f"🔥 START: Graph invocation completed for session: {session_id}")
         
-        logger.debug(f"Graph result type: {type(result)}")
-        logger.debug(f"Graph result keys: {list(result.keys()) if isinstance(result, dict) else 'Not a dict'}")
+        logger.debug("Graph result type: %s", type(result))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Graph result keys: %s", list(result.keys()) if isinstance(result, dict) else 'Not a dict')
         
         # Check if graph returned None or invalid result
         if result is None:
@@ -169,7 +179,7 @@ async def start_session(
         
         # Extract frontend response
         frontend_data = result.get('frontend_response', {})
-        logger.debug(f"Frontend data: {frontend_data}")
+        logger.debug("Frontend data: %s", frontend_data)
             
         # Extract form details from graph response
         form_details = result.get('form_details', {})
@@ -178,7 +188,7 @@ async def start_session(
         if not form_details and frontend_data:
             form_details = frontend_data.get('form_details', {})
             
-        logger.debug(f"Extracted form_details: {form_details}")
+        logger.debug("Extracted form_details: %s", form_details)
         
         # Load business name and logo from client_id (server-side only)
         business_name = None
@@ -187,14 +197,15 @@ async def start_session(
         logger.info(f"🏢 Loading business info for client_id: {client_id}")
         if client_id:
             try:
-                # Get business name from clients table
-                client_data = db.client.table('clients').select('name').eq('id', client_id).execute()
-                logger.info(f"🏢 Client query result: {client_data.data}")
+                # Get business name and logo URL concurrently from clients / client_settings
+                client_data, settings_data = await asyncio.gather(
+                    db_async.client.table('clients').select('name').eq('id', client_id).execute(),
+                    db_async.client.table('client_settings').select('logo_url').eq('client_id', client_id).execute()
+                )
+                logger.debug("🏢 Client query result: %s", client_data.data)
                 if client_data.data and len(client_data.data) > 0:
                     business_name = client_data.data[0].get('name')
                     
-                # Get logo URL from client_settings table
-                settings_data = db.client.table('client_settings').select('logo_url').eq('client_id', client_id).execute()
                 if settings_data.data and len(settings_data.data) > 0:
                     logo_url = settings_data.data[0].get('logo_url')
                     
@@ -240,6 +251,189 @@ async def start_session(
         return server_error_response("Failed to initialize survey session")
 
 
+async def _build_step_state(
+    session_id: str,
+    session_data: Dict[str, Any],
+    responses: List[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Assemble the graph input for a step: hot (or persisted) state plus the new responses.
+    
+    Returns:
+        Graph input state, or None when the session does not exist in the database
+    """
+    # Hot state comes from Redis; prefetch session, form, questions, asked questions and client concurrently
+    logger.debug("🔥 STEP: Prefetching step context for session %s...", session_id)
+    hot_state, step_context = await asyncio.gather(
+        session_state_cache.load(session_id),
+        prefetch_step_context(
+            session_id,
+            form_id=session_data.get('form_id'),
+            client_id=session_data.get('client_id'),
+            include_snapshot=False
+        )
+    )
+    db_session_data = step_context['lead_session']
+    if not db_session_data:
+        logger.error("🔥 STEP: Session %s NOT FOUND in database!", session_id)
+        # Try to list recent sessions for debugging
+        try:
+            recent = await db_async.client.table('lead_sessions').select('session_id, started_at').order('started_at', desc=True).limit(5).execute()
+            logger.error("🔥 STEP: Recent sessions in DB: %s", recent.data)
+        except:
+            pass
+        return None
+    logger.debug("🔥 STEP: Found session in database: %s", db_session_data)
+    
+    # Hot state holds the full state including question_strategy; fall back to
+    # the persisted snapshot when the Redis copy has expired or Redis is down
+    if hot_state is None:
+        hot_state = await load_snapshot_state(db_async, session_id)
+    
+    if hot_state:
+        # Restore full state from snapshot
+        logger.debug("🔥 API DEBUG: Loaded session snapshot with state")
+        state_update = hot_state
+        logger.debug("🔥 SNAPSHOT LOADED: asked_questions = %s", state_update.get('question_strategy', {}).get('asked_questions', []))
+        
+        # Update core data with latest from database
+        state_update['core'] = {
+            **state_update.get('core', {}),
+            'session_id': session_id,
+            'form_id': db_session_data.get('form_id'),
+            'step': db_session_data.get('step', 0),
+            'client_id': db_session_data.get('client_id')
+        }
+        
+        # Add new responses
+        state_update['pending_responses'] = responses
+    else:
+        # First time - create minimal state
+        logger.debug("🔥 API DEBUG: No session snapshot found, creating new state")
+        state_update = {
+            'core': {
+                'session_id': session_id,
+                'form_id': db_session_data.get('form_id'),
+                'step': db_session_data.get('step', 0),
+                'client_id': db_session_data.get('client_id')
+            },
+            'question_strategy': {
+                'asked_questions': [],
+                'current_questions': [],
+                'selection_history': []
+            },
+            'lead_intelligence': {
+                'responses': [],
+                'current_score': 0,
+                'lead_status': 'unknown'
+            },
+            'pending_responses': responses
+        }
+    
+    # Hand the prefetched reads to the graph so nodes don't query them again
+    state_update['step_context'] = graph_step_context(step_context)
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("🔥 API DEBUG: state_update keys = %s", list(state_update.keys()))
+        logger.debug("🔥 API DEBUG: asked_questions = %s", state_update.get('question_strategy', {}).get('asked_questions', []))
+        logger.debug("🔥 API DEBUG: pending_responses = %s", responses)
+    return state_update
+
+
+async def _save_step_snapshot(session_id: str, result: Dict[str, Any]) -> None:
+    """Save session snapshot for state persistence (errors are logged, not raised)."""
+    try:
+        current_step = result.get('core', {}).get('step', 0)
+        
+        # Debug: Check what's in the result before creating snapshot
+        logger.debug(
+            "🔥 RESULT DEBUG: asked_questions in result = %s",
+            result.get('question_strategy', {}).get('asked_questions', [])
+        )
+        
+        # Typed snapshot of critical state, encoded once to JSON bytes for Redis
+        snapshot = build_session_snapshot(result)
+        
+        # Redis keeps the hot copy; Postgres is updated by the write-behind flusher
+        if not await session_state_cache.save(session_id, snapshot, current_step):
+            await persist_snapshot(
+                db_async, session_id, snapshot.model_dump(mode='json', fallback=str), current_step
+            )
+        logger.info(
+            "🔥 SNAPSHOT: Saved session snapshot for step %s with %d asked questions",
+            current_step, len(snapshot.question_strategy.asked_questions)
+        )
+    except Exception as e:
+        logger.error("Failed to save session snapshot: %s", e, exc_info=True)
+
+
+def _is_step_complete(result: Dict[str, Any]) -> bool:
+    """Whether the graph result ends the survey."""
+    # Check if survey is complete
+    core = result.get('core', {})
+    completed = core.get('completed', False)
+    
+    # CRITICAL FIX: Also check if Survey Admin indicates completion
+    step_type = result.get('step_type')
+    if step_type == "completion":
+        completed = True
+        logger.info("🏁 Survey marked as completed by Survey Admin (step_type: completion)")
+    
+    # CRITICAL FIX: Check if Lead Intelligence indicates completion
+    route_decision = result.get('route_decision')
+    if route_decision == "end":
+        completed = True
+        logger.info("🏁 Survey marked as completed by Lead Intelligence (route_decision: end)")
+    
+    return completed
+
+
+def _next_step_data(frontend_data: Dict[str, Any]) -> Dict[str, Any]:
+    """``nextStep`` payload for the frontend."""
+    return {
+        "stepNumber": frontend_data.get('step', 1),
+        "totalSteps": frontend_data.get('total_steps', 1),
+        "questions": frontend_data.get('questions', []),
+        "headline": frontend_data.get('headline', ''),
+        "subheading": frontend_data.get('motivation'),
+        "isComplete": False
+    }
+
+
+def _step_response_data(result: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """Build the step response data and message from the graph result."""
+    completed = _is_step_complete(result)
+    
+    # Get frontend response data
+    frontend_data = result.get('frontend_response', {})
+    
+    # Prepare response data
+    response_data = {
+        "isComplete": completed
+    }
+    
+    if completed:
+        # Form is complete - return completion data
+        # CRITICAL FIX: Get leadStatus and score from lead_intelligence section
+        lead_intelligence = result.get('lead_intelligence', {})
+        response_data["completionData"] = {
+            "leadStatus": lead_intelligence.get('lead_status', 'unknown'),
+            "score": lead_intelligence.get('final_score', 0),
+            "message": result.get('completion_message') or 'Thank you for your time and interest.',
+            "nextSteps": result.get('next_steps', [])
+        }
+        if lead_intelligence.get('scoring_pending'):
+            # Final classification comes from the lead scoring worker via /lead-result
+            response_data["completionData"]["scoringPending"] = True
+        message = "Form completed successfully"
+    else:
+        # Continue with next step
+        response_data["nextStep"] = _next_step_data(frontend_data)
+        message = "Responses submitted successfully"
+    
+    return response_data, message
+
+
 @router.post("/step")
 async def submit_and_continue(
     request: SubmitResponsesRequest,
@@ -266,178 +460,132 @@ async def submit_and_continue(
             )
             
         session_id = session_data.get('session_id')
-        logger.info(f"🔥 STEP: Processing step for session: {session_id}")
-        logger.info(f"🔥 STEP: Full session_data from cookie: {session_data}")
+        logger.info("🔥 STEP: Processing step for session: %s", session_id)
+        logger.debug("🔥 STEP: Full session_data from cookie: %s", session_data)
         
-        # Load existing session data from database to get form_id and other state
-        logger.info(f"🔥 STEP: Looking for session {session_id} in database...")
-        db_session_data = db.get_lead_session(session_id)
-        if not db_session_data:
-            logger.error(f"🔥 STEP: Session {session_id} NOT FOUND in database!")
-            # Try to list recent sessions for debugging
-            try:
-                recent = db.client.table('lead_sessions').select('session_id, started_at').order('started_at', desc=True).limit(5).execute()
-                logger.error(f"🔥 STEP: Recent sessions in DB: {recent.data}")
-            except:
-                pass
+        state_update = await _build_step_state(session_id, session_data, request.responses)
+        if state_update is None:
             return not_found_response("Session", session_id)
-        logger.info(f"🔥 STEP: Found session in database: {db_session_data}")
-        
-        # Load latest session snapshot to get full state including question_strategy
-        session_snapshot = db.get_latest_session_snapshot(session_id)
-        
-        if session_snapshot:
-            # Restore full state from snapshot
-            logger.info(f"🔥 API DEBUG: Loaded session snapshot with state")
-            state_update = session_snapshot.get('full_state', {})
-            logger.info(f"🔥 SNAPSHOT LOADED: asked_questions = {state_update.get('question_strategy', {}).get('asked_questions', [])}")
-            
-            # Update core data with latest from database
-            state_update['core'] = {
-                **state_update.get('core', {}),
-                'session_id': session_id,
-                'form_id': db_session_data.get('form_id'),
-                'step': db_session_data.get('step', 0),
-                'client_id': db_session_data.get('client_id')
-            }
-            
-            # Add new responses
-            state_update['pending_responses'] = request.responses
-        else:
-            # First time - create minimal state
-            logger.info(f"🔥 API DEBUG: No session snapshot found, creating new state")
-            state_update = {
-                'core': {
-                    'session_id': session_id,
-                    'form_id': db_session_data.get('form_id'),
-                    'step': db_session_data.get('step', 0),
-                    'client_id': db_session_data.get('client_id')
-                },
-                'question_strategy': {
-                    'asked_questions': [],
-                    'current_questions': [],
-                    'selection_history': []
-                },
-                'lead_intelligence': {
-                    'responses': [],
-                    'current_score': 0,
-                    'lead_status': 'unknown'
-                },
-                'pending_responses': request.responses
-            }
-        
-        logger.info(f"🔥 API DEBUG: state_update keys = {list(state_update.keys())}")
-        logger.info(f"🔥 API DEBUG: asked_questions = {state_update.get('question_strategy', {}).get('asked_questions', [])}")
-        logger.info(f"🔥 API DEBUG: pending_responses = {request.responses}")
         
         # Run the graph starting from response processing
-        logger.info(f"🔥 STEP: About to invoke graph with pending_responses: {request.responses}")
+        logger.debug("🔥 STEP: About to invoke graph with pending_responses: %s", request.responses)
         result = await intelligent_survey_graph.ainvoke(
             state_update,
             {"recursion_limit": 25}
         )
-        logger.info(f"🔥 STEP: Graph invocation complete!")
-        logger.info(f"🔥 STEP RESULT: lead_intelligence = {result.get('lead_intelligence', {})}")
-        logger.info(f"🔥 STEP RESULT: route_decision = {result.get('route_decision')}")
-        logger.info(f"🔥 STEP RESULT: step_type = {result.get('step_type')}")
+        logger.debug("🔥 STEP: Graph invocation complete!")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔥 STEP RESULT: lead_intelligence = %s", result.get('lead_intelligence', {}))
+            logger.debug("🔥 STEP RESULT: route_decision = %s", result.get('route_decision'))
+            logger.debug("🔥 STEP RESULT: step_type = %s", result.get('step_type'))
         
-        # Save session snapshot for state persistence
-        try:
-            current_step = result.get('core', {}).get('step', 0)
-            
-            # Debug: Check what's in the result before creating snapshot
-            result_asked_questions = result.get('question_strategy', {}).get('asked_questions', [])
-            logger.info(f"🔥 RESULT DEBUG: asked_questions in result = {result_asked_questions}")
-            
-            # Create JSON-serializable snapshot of critical state
-            snapshot_state = {
-                'core': result.get('core', {}),
-                'question_strategy': {
-                    'asked_questions': result.get('question_strategy', {}).get('asked_questions', []),
-                    'current_questions': result.get('question_strategy', {}).get('current_questions', []),
-                    'selection_history': result.get('question_strategy', {}).get('selection_history', [])
-                },
-                'lead_intelligence': {
-                    'responses': result.get('lead_intelligence', {}).get('responses', []),
-                    'current_score': result.get('lead_intelligence', {}).get('current_score', 0),
-                    'lead_status': result.get('lead_intelligence', {}).get('lead_status', 'unknown')
-                }
-            }
-            
-            # Convert any remaining non-serializable objects to strings
-            import json
-            snapshot_json = json.dumps(snapshot_state, default=str)  # Test serialization
-            snapshot_state = json.loads(snapshot_json)  # Parse back to ensure clean dict
-            
-            db.save_session_snapshot(
-                session_id=session_id, 
-                full_state=snapshot_state, 
-                step=current_step,
-                recovery_reason="after_step_processing"
-            )
-            logger.info(f"🔥 SNAPSHOT: Saved session snapshot for step {current_step} with {len(snapshot_state.get('question_strategy', {}).get('asked_questions', []))} asked questions")
-        except Exception as e:
-            logger.error(f"Failed to save session snapshot: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
-        
-        # Check if survey is complete
-        core = result.get('core', {})
-        completed = core.get('completed', False)
-        
-        # CRITICAL FIX: Also check if Survey Admin indicates completion
-        step_type = result.get('step_type')
-        if step_type == "completion":
-            completed = True
-            logger.info(f"🏁 Survey marked as completed by Survey Admin (step_type: completion)")
-        
-        # CRITICAL FIX: Check if Lead Intelligence indicates completion
-        route_decision = result.get('route_decision')
-        if route_decision == "end":
-            completed = True
-            logger.info(f"🏁 Survey marked as completed by Lead Intelligence (route_decision: end)")
-        
-        # Get frontend response data
-        frontend_data = result.get('frontend_response', {})
-        
-        # Prepare response data
-        response_data = {
-            "isComplete": completed
-        }
-        
-        if completed:
-            # Form is complete - return completion data
-            # CRITICAL FIX: Get leadStatus and score from lead_intelligence section
-            lead_intelligence = result.get('lead_intelligence', {})
-            response_data["completionData"] = {
-                "leadStatus": lead_intelligence.get('lead_status', 'unknown'),
-                "score": lead_intelligence.get('final_score', 0),
-                "message": result.get('completion_message', 'Thank you for your time and interest.'),
-                "nextSteps": result.get('next_steps', [])
-            }
-            message = "Form completed successfully"
-        else:
-            # Continue with next step
-            response_data["nextStep"] = {
-                "stepNumber": frontend_data.get('step', 1),
-                "totalSteps": frontend_data.get('total_steps', 1),
-                "questions": frontend_data.get('questions', []),
-                "headline": frontend_data.get('headline', ''),
-                "subheading": frontend_data.get('motivation'),
-                "isComplete": False
-            }
-            message = "Responses submitted successfully"
+        await _save_step_snapshot(session_id, result)
         
+        response_data, message = _step_response_data(result)
         return success_response(
             data=response_data,
             message=message
         )
         
     except Exception as e:
-        logger.error(f"Failed to process step: {e}")
+        logger.error("Failed to process step: %s", e)
         return server_error_response("Failed to process survey step")
 
 
+async def _stream_step_events(session_id: str, state_update: Dict[str, Any]) -> AsyncIterator[str]:
+    """
+    Run the survey graph with ``astream`` and yield SSE messages.
+    
+    Events:
+    - ``questions``: ``{"nextStep": ...}`` as soon as the survey admin node has
+      prepared the frontend data (headline/subheading may be placeholders)
+    - ``engagement``: ``{"field": "headline"|"message", "token": str}`` while the
+      engagement copy is generated
+    - ``complete``: the same body ``/step`` returns
+    - ``error``: ``{"success": false, "data": null, "message": str}``
+    """
+    try:
+        result = None
+        questions_sent = False
+        config = {"recursion_limit": 25, "configurable": {"defer_engagement": True}}
+        
+        async for mode, chunk in intelligent_survey_graph.astream(
+            state_update, config, stream_mode=["updates", "values"]
+        ):
+            if mode == "values":
+                result = chunk
+                continue
+            frontend_data = (chunk.get("survey_administration") or {}).get("frontend_response")
+            if frontend_data and frontend_data.get("questions") and not questions_sent:
+                questions_sent = True
+                logger.info("🔥 STREAM: Sending %d questions for %s", len(frontend_data['questions']), session_id)
+                yield sse_event("questions", {"nextStep": _next_step_data(frontend_data)})
+        
+        if result is None:
+            raise RuntimeError("Survey graph returned no state")
+        
+        await _save_step_snapshot(session_id, result)
+        
+        frontend_data = result.get('frontend_response') or {}
+        if frontend_data.get('engagement_pending') and not _is_step_complete(result):
+            fields = {"headline": "", "message": ""}
+            async for token in ConsolidatedSurveyAdminSupervisor().astream_engagement(result):
+                fields[token["field"]] += token["token"]
+                yield sse_event("engagement", token)
+            result['frontend_response'] = {
+                **frontend_data,
+                "headline": fields["headline"].strip(),
+                "motivation": fields["message"].strip(),
+                "engagement_pending": False
+            }
+        
+        response_data, message = _step_response_data(result)
+        yield sse_event("complete", {"success": True, "data": response_data, "message": message})
+        
+    except Exception as e:
+        logger.error("Failed to stream step for %s: %s", session_id, e)
+        yield sse_event("error", {"success": False, "data": None, "message": "Failed to process survey step"})
+
+
+@router.post("/step/stream")
+async def submit_and_stream(
+    request: SubmitResponsesRequest,
+    http_request: Request
+):
+    """
+    Submit responses and stream the next step as Server-Sent Events.
+    
+    Same processing as ``/step``, but the next questions are sent as soon as
+    they are selected and the engagement headline/message follow token by
+    token. The final ``complete`` event carries the ``/step`` response body.
+    
+    Security: Session managed by fastapi-sessions.
+    """
+    session_data = await get_session_from_request(http_request)
+    if not session_data:
+        return error_response(
+            "No survey session found. Please start a new survey.",
+            status_code=401
+        )
+    
+    session_id = session_data.get('session_id')
+    logger.info("🔥 STREAM: Processing step for session: %s", session_id)
+    
+    try:
+        state_update = await _build_step_state(session_id, session_data, request.responses)
+    except Exception as e:
+        logger.error("Failed to prepare streamed step: %s", e)
+        return server_error_response("Failed to process survey step")
+    if state_update is None:
+        return not_found_response("Session", session_id)
+    
+    return StreamingResponse(
+        _stream_step_events(session_id, state_update),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/abandon")
 async def mark_abandoned(request: Request):
     """
@@ -459,7 +607,7 @@ async def mark_abandoned(request: Request):
         logger.info(f"Marking session as abandoned: {session_id}")
         
         # Load existing session data from database to get form_id and other state
-        db_session_data = db.get_lead_session(session_id)
+        db_session_data = await db_async.get_lead_session(session_id)
         if not db_session_data:
             return not_found_response("Session", session_id)
         
@@ -510,13 +658,13 @@ async def get_session_status(request: Request):
         
         # Load session from database
         
-        db_session_data = db.get_lead_session(session_id)
+        db_session_data, responses = await asyncio.gather(
+            db_async.get_lead_session(session_id),
+            db_async.get_session_responses(session_id)
+        )
         if not db_session_data:
             return not_found_response("Session", session_id)
         
-        # Get additional data
-        responses = db.get_session_responses(session_id)
-        
         return success_response(
             data={
                 "status": "completed" if db_session_data.get('completed', False) else "active",
@@ -539,16 +687,53 @@ async def get_session_status(request: Request):
         return server_error_response("Failed to retrieve session status")
 
 
+@router.get("/lead-result")
+async def get_lead_result(request: Request, wait: float = 0):
+    """
+    Get the lead classification produced by the background lead scoring worker.
+    
+    With ``wait`` (seconds, max 25) the request is held until a pending result
+    is ready, so clients can long-poll instead of re-requesting.
+    Security: Session managed by fastapi-sessions.
+    """
+    try:
+        session_data = await get_session_from_request(request)
+        if not session_data:
+            return error_response(
+                "No survey session found. Please start a new survey.",
+                status_code=401
+            )
+        
+        session_id = session_data.get('session_id')
+        wait = min(max(wait, 0), 25)
+        if wait:
+            result = await lead_scoring_queue.wait_for_result(session_id, wait)
+        else:
+            result = await lead_scoring_queue.get_result(session_id)
+        
+        if result is None:
+            return not_found_response("Lead result", session_id)
+        
+        return success_response(
+            data={k: v for k, v in result.items() if k != 'job_id'},
+            message="Lead result ready" if result.get('status') == 'ready' else "Lead scoring in progress"
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to get lead result: {e}")
+        return server_error_response("Failed to retrieve lead result")
+
+
 @router.get("/debug-session/{session_id}")
 async def debug_session(session_id: str):
     """Debug endpoint to check if a session exists in the database."""
     try:
         
         # Try to find the session
-        session = db.get_lead_session(session_id)
+        session = await db_async.get_lead_session(session_id)
         
         # Also get recent sessions
-        recent = db.client.table('lead_sessions').select('session_id, started_at').order('started_at', desc=True).limit(10).execute()
+        recent = await db_async.client.table('lead_sessions').select('session_id, started_at').order('started_at', desc=True).limit(10).execute()
         
         return success_response(
             data={
@@ -574,14 +759,14 @@ async def database_health_check():
         import json
         
         # Test basic database connection
-        db_connected = db.test_connection()
+        db_connected = await db_async.test_connection()
         
         # Test survey-specific functionality
         forms_accessible = False
         sample_form = None
         try:
             # Try to load a sample form
-            sample_form = db.get_form("dogwalk_demo_form") 
+            sample_form = await db_async.get_form("dogwalk_demo_form") 
             forms_accessible = sample_form is not None
         except Exception:
             pass
@@ -625,7 +810,7 @@ async def validate_form(form_id: str):
         import json
         
         # Check if form exists
-        form = db.get_form(form_id)
+        form = await db_async.get_form(form_id)
         if not form:
             return not_found_response("Form", form_id)
         
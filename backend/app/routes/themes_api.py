@@ -17,15 +17,21 @@ import logging
 from datetime import datetime
 import uuid
 
+from app.middleware.request_body import CachedBodyRoute
 from app.database import db
 from app.routes.admin_auth import AdminUserResponse
 from app.routes.admin_auth import get_current_admin_user
 from app.utils.response_helpers import success_response, error_response
+from app.utils.pagination import apply_keyset, paginate_rows
+from app.utils.cache_invalidation import invalidation_bus
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/themes", tags=["themes"])
+router = APIRouter(prefix="/api/themes", tags=["themes"], route_class=CachedBodyRoute)
+
+# Theme list order: default theme first, then by name (id breaks ties)
+THEME_LIST_ORDER = [("is_default", True), ("name", False), ("id", False)]
 
 # === PYDANTIC MODELS ===
 
@@ -232,10 +238,10 @@ def verify_theme_ownership(theme_id: str, client_id: str) -> bool:
 async def list_themes(
     include_system: bool = Query(True, description="Include system themes"),
     limit: int = Query(50, ge=1, le=100, description="Number of themes to return"),
-    offset: int = Query(0, ge=0, description="Number of themes to skip"),
+    cursor: Optional[str] = Query(None, description="next_cursor or prev_cursor from a previous page"),
     current_user: AdminUserResponse = Depends(get_current_admin_user)
 ):
-    """List all themes for the authenticated client."""
+    """List all themes for the authenticated client (default first, then by name), cursor-paged."""
     try:
         # Use Supabase client
         
@@ -247,11 +253,14 @@ async def list_themes(
         else:
             query = query.eq("client_id", current_user.client_id)
         
-        # Execute query with pagination
-        result = query.order("is_default", desc=True)\
-                     .order("name")\
-                     .range(offset, offset + limit - 1)\
-                     .execute()
+        # Execute query with keyset pagination
+        try:
+            query, direction = apply_keyset(query, THEME_LIST_ORDER, limit, cursor)
+        except ValueError as e:
+            return error_response(str(e), 400)
+        
+        result = query.execute()
+        rows, next_cursor, prev_cursor = paginate_rows(result.data or [], THEME_LIST_ORDER, limit, direction)
         
         # Count total themes
         count_query = db.client.table("client_themes").select("id", count="exact")
@@ -265,7 +274,7 @@ async def list_themes(
         
         # Format response
         themes = []
-        for theme_data in result.data:
+        for theme_data in rows:
             themes.append({
                 "id": theme_data["id"],
                 "client_id": theme_data["client_id"],
@@ -286,7 +295,8 @@ async def list_themes(
                 "themes": themes,
                 "total_count": total_count,
                 "limit": limit,
-                "offset": offset
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
             },
             message="Themes retrieved successfully"
         )
@@ -340,6 +350,9 @@ async def create_theme(
         
         created_theme = result.data[0]
         
+        # Themes are client-scoped: drop the client's cached form configs on every worker
+        await invalidation_bus.apublish("client", current_user.client_id)
+        
         return success_response(
             data={
                 "id": created_theme["id"],
@@ -468,6 +481,9 @@ async def update_theme(
         
         updated_theme = result.data[0]
         
+        # Themes are client-scoped: drop the client's cached form configs on every worker
+        await invalidation_bus.apublish("client", current_user.client_id)
+        
         return success_response(
             data={
                 "id": updated_theme["id"],
@@ -531,6 +547,8 @@ async def delete_theme(
             .eq("id", theme_id)\
             .execute()
         
+        await invalidation_bus.apublish("client", current_user.client_id)
+        
         return success_response(
             data={"theme_id": theme_id},
             message="Theme deleted successfully"
@@ -4,12 +4,13 @@ Handles recovery of interrupted sessions, state restoration, and continuation lo
 Enables users to resume where they left off even after browser crashes or timeouts.
 """
 
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 from datetime import datetime, timedelta
 
 from .database import db
 from .state import SurveyGraphState
+from .snapshot_delta import snapshot_base_state, rebuild_state
 
 logger = logging.getLogger(__name__)
 
@@ -85,7 +86,10 @@ class SessionRecoveryManager:
             snapshot = self.db.get_latest_session_snapshot(session_id)
             if snapshot:
                 logger.info(f"Recovering session {session_id} from snapshot")
-                return self._restore_from_snapshot(snapshot)
+                deltas = self.db.get_session_snapshot_deltas(
+                    session_id, base_id=snapshot.get('base_id')
+                )
+                return self._restore_from_snapshot(snapshot, deltas)
             
             # Fallback: reconstruct from database records
             logger.info(f"Reconstructing session {session_id} from database")
@@ -95,14 +99,16 @@ class SessionRecoveryManager:
             logger.error(f"Error recovering session {session_id}: {e}")
             return None
     
-    def _restore_from_snapshot(self, snapshot: Dict[str, Any]) -> SurveyGraphState:
-        """Restore state from saved snapshot"""
-        full_state = snapshot.get('full_state', {})
+    def _restore_from_snapshot(self, snapshot: Dict[str, Any], deltas: Optional[List[Dict[str, Any]]] = None) -> SurveyGraphState:
+        """Restore state from saved base snapshot plus the per-step deltas written after it"""
+        full_state, _ = snapshot_base_state(snapshot)
         
         # Ensure we have the right type structure
         if not isinstance(full_state, dict):
             raise ValueError("Invalid snapshot state format")
         
+        full_state = rebuild_state(full_state, deltas or [])
+        
         # Update activity timestamp to now
         if 'engagement' in full_state:
             full_state['engagement']['last_activity_timestamp'] = datetime.now().isoformat()
@@ -232,13 +238,14 @@ class SessionRecoveryManager:
             core = state.get('core', {})
             step = core.get('step', 0)
             
-            # Save snapshot
+            # Save full state as a new base snapshot; earlier deltas are folded into it
             self.db.save_session_snapshot(
                 session_id=session_id,
                 full_state=state,
                 step=step,
                 recovery_reason=reason
             )
+            self.db.delete_session_snapshot_deltas(session_id)
             
             # Also update session table with current data
             session_updates = {
@@ -0,0 +1,176 @@
+"""
+Hot survey state cache backed by Redis.
+
+The /step endpoint used to read the latest row from ``session_snapshots`` and
+insert a new one on every step. The working copy of the graph state now lives
+in Redis: steps read and write it there, and a background flusher persists the
+latest copy of each changed session to Postgres (write-behind) as a delta
+against the previously persisted copy (see ``snapshot_delta``). Postgres keeps
+the state for recovery once the Redis key has expired.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, Any, Optional, Union
+
+from .session_store import RedisSessionStore
+from .async_database import db_async
+from .snapshot_delta import persist_snapshot
+from .snapshot_serializer import encode_session_state_entry
+from pydantic_models import SessionSnapshot
+
+logger = logging.getLogger(__name__)
+
+DIRTY_SET = "dirty"
+PERSISTED_SUFFIX = ":persisted"
+
+
+class SessionStateCache:
+    """Redis hot copy of survey graph state with write-behind snapshot persistence"""
+
+    def __init__(
+        self,
+        store: Optional[RedisSessionStore] = None,
+        database=None,
+        flush_interval: Optional[float] = None,
+        flush_batch_size: int = 100
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            store: Redis store for hot state (default: ``graph_state:`` prefix, 30 minute TTL)
+            database: Async database client used for snapshot persistence
+            flush_interval: Seconds between write-behind flushes (env SNAPSHOT_FLUSH_INTERVAL, default 5)
+            flush_batch_size: Maximum sessions persisted per flush round
+        """
+        self.store = store or RedisSessionStore(prefix="graph_state:", ttl=1800)
+        self.database = database or db_async
+        self.flush_interval = flush_interval or float(os.getenv('SNAPSHOT_FLUSH_INTERVAL', '5'))
+        self.flush_batch_size = flush_batch_size
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the hot state for a session.
+
+        Returns:
+            State dictionary, or None on a cache miss or Redis error
+        """
+        try:
+            entry = await self.store.read(session_id)
+        except Exception as e:
+            logger.warning(f"Session state cache read failed for {session_id}: {e}")
+            return None
+        return entry.get('state') if entry else None
+
+    async def save(self, session_id: str, snapshot: Union[SessionSnapshot, Dict[str, Any]], step: int) -> bool:
+        """
+        Store the hot state and mark the session for write-behind persistence.
+
+        Args:
+            session_id: Survey session identifier
+            snapshot: Snapshot of the graph state (dicts are validated into SessionSnapshot)
+            step: Current step number
+
+        Returns:
+            True if cached; False on Redis error (caller should persist directly)
+        """
+        if not isinstance(snapshot, SessionSnapshot):
+            snapshot = SessionSnapshot.model_validate(snapshot)
+        try:
+            await self.store.write_raw(session_id, encode_session_state_entry(snapshot, step))
+            await self.store.add_to_set(DIRTY_SET, session_id)
+            return True
+        except Exception as e:
+            logger.warning(f"Session state cache write failed for {session_id}: {e}")
+            return False
+
+    async def _persist(self, session_id: str) -> bool:
+        """Write the current hot state of one session to Postgres as a delta snapshot"""
+        entry = await self.store.read(session_id)
+        if not entry:
+            # Key expired before the flush - nothing newer than the last persisted snapshot
+            return True
+
+        # Last persisted state lets the flush write only what changed since then
+        persisted_key = f"{session_id}{PERSISTED_SUFFIX}"
+        previous = await self.store.read(persisted_key) or None
+        try:
+            record = await persist_snapshot(
+                self.database,
+                session_id,
+                entry['state'],
+                entry.get('step', 0),
+                previous=previous
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist snapshot for {session_id}: {e}")
+            return False
+
+        if record is not previous:
+            await self.store.write(persisted_key, record)
+        return True
+
+    async def flush(self) -> int:
+        """
+        Persist every session changed since the last flush.
+
+        Returns:
+            Number of sessions persisted
+        """
+        persisted = 0
+        while True:
+            try:
+                session_ids = await self.store.pop_from_set(DIRTY_SET, self.flush_batch_size)
+            except Exception as e:
+                logger.warning(f"Session state flush could not read dirty sessions: {e}")
+                return persisted
+            if not session_ids:
+                return persisted
+
+            results = await asyncio.gather(
+                *(self._persist(session_id) for session_id in session_ids),
+                return_exceptions=True
+            )
+            failed = [sid for sid, ok in zip(session_ids, results) if ok is not True]
+            persisted += len(session_ids) - len(failed)
+
+            if failed:
+                # Retry on the next round rather than spinning on a failing database
+                try:
+                    await self.store.add_to_set(DIRTY_SET, *failed)
+                except Exception as e:
+                    logger.error(f"Could not requeue {len(failed)} snapshot(s): {e}")
+                return persisted
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                persisted = await self.flush()
+                if persisted:
+                    logger.debug(f"Write-behind flushed {persisted} session snapshot(s)")
+            except Exception as e:
+                logger.error(f"Session state flush failed: {e}")
+
+    def start(self) -> None:
+        """Start the background flusher (call from application startup)"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the background flusher and persist anything still pending"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+
+# Global instance
+session_state_cache = SessionStateCache()
@@ -82,6 +82,23 @@ class RedisSessionStore:
         # Store data with TTL
         await redis_client.setex(key, self.ttl, json.dumps(data))
     
+    async def write_raw(self, session_id: str, payload: bytes) -> None:
+        """
+        Write pre-encoded JSON session data to Redis.
+        
+        Args:
+            session_id: Session identifier
+            payload: JSON document already encoded to bytes
+        """
+        if not session_id:
+            return
+            
+        redis_client = await self._get_redis()
+        key = self._make_key(session_id)
+        
+        # Store data with TTL
+        await redis_client.setex(key, self.ttl, payload)
+    
     async def remove(self, session_id: str) -> None:
         """
         Remove session data from Redis.
@@ -96,6 +113,35 @@ class RedisSessionStore:
         key = self._make_key(session_id)
         await redis_client.delete(key)
     
+    async def add_to_set(self, name: str, *members: str) -> None:
+        """
+        Add members to a Redis set stored under this store's prefix.
+        
+        Args:
+            name: Set name (prefixed like session keys)
+            members: Values to add
+        """
+        if not members:
+            return
+            
+        redis_client = await self._get_redis()
+        await redis_client.sadd(self._make_key(name), *members)
+    
+    async def pop_from_set(self, name: str, count: int) -> list:
+        """
+        Remove and return up to ``count`` members of a Redis set.
+        
+        Args:
+            name: Set name (prefixed like session keys)
+            count: Maximum number of members to pop
+            
+        Returns:
+            List of popped members (empty when the set is empty)
+        """
+        redis_client = await self._get_redis()
+        members = await redis_client.spop(self._make_key(name), count)
+        return list(members or [])
+    
     async def generate_id(self) -> str:
         """Generate a new session ID."""
         return str(uuid.uuid4())
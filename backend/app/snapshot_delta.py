@@ -0,0 +1,186 @@
+"""
+Delta snapshots for survey session state.
+
+A session's persisted state is a base snapshot (``session_snapshots``) plus a
+list of per-step patches (``session_snapshot_deltas``). Most of the state grows
+by appending - ``lead_intelligence.responses``, ``selection_history`` and
+``asked_questions`` - so a patch usually carries only the new list items and a
+few changed scalars instead of the whole state. Every
+``SNAPSHOT_COMPACTION_INTERVAL`` patches the full state is written as a new
+base and the patches are dropped.
+
+Each base write gets a new ``base_id``; its patches carry that id and their
+position in the chain (``sequence``). Patches are read by base id and sequence,
+never by step number - the step can stay the same for many writes.
+
+Patch format: a list of operations, each ``{"op", "path", "value"}`` where
+``op`` is ``set``, ``append`` or ``unset``. ``append`` also records the list
+length it extends from (``index``) so re-applying a patch never duplicates items.
+"""
+
+import copy
+import logging
+import os
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COMPACTION_INTERVAL = int(os.getenv('SNAPSHOT_COMPACTION_INTERVAL', '10'))
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any], path: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Compute the operations that turn ``old`` into ``new``.
+
+    Args:
+        old: Previously persisted state
+        new: Current state
+        path: Key path of ``old``/``new`` inside the full state (used for recursion)
+
+    Returns:
+        List of patch operations (empty when nothing changed)
+    """
+    path = path or []
+    ops: List[Dict[str, Any]] = []
+
+    for key, value in new.items():
+        key_path = path + [key]
+        if key not in old:
+            ops.append({'op': 'set', 'path': key_path, 'value': value})
+            continue
+
+        previous = old[key]
+        if previous == value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            ops.extend(diff_state(previous, value, key_path))
+        elif (isinstance(previous, list) and isinstance(value, list)
+              and len(value) > len(previous) and value[:len(previous)] == previous):
+            ops.append({'op': 'append', 'path': key_path, 'index': len(previous), 'value': value[len(previous):]})
+        else:
+            ops.append({'op': 'set', 'path': key_path, 'value': value})
+
+    for key in old:
+        if key not in new:
+            ops.append({'op': 'unset', 'path': path + [key]})
+
+    return ops
+
+
+def apply_patch(state: Dict[str, Any], patch: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply patch operations to a copy of ``state``.
+
+    Args:
+        state: State to start from (not modified)
+        patch: Operations produced by ``diff_state``
+
+    Returns:
+        Patched state
+    """
+    patched = copy.deepcopy(state)
+
+    for operation in patch:
+        *parents, key = operation['path']
+        target = patched
+        for parent in parents:
+            target = target.setdefault(parent, {})
+
+        op = operation['op']
+        if op == 'set':
+            target[key] = copy.deepcopy(operation['value'])
+        elif op == 'append':
+            # Replace from the recorded index so re-applying a patch never duplicates items
+            items = target.setdefault(key, [])
+            del items[operation.get('index', len(items)):]
+            items.extend(copy.deepcopy(operation['value']))
+        elif op == 'unset':
+            target.pop(key, None)
+        else:
+            raise ValueError(f"Unknown snapshot patch operation: {op}")
+
+    return patched
+
+
+def rebuild_state(base_state: Dict[str, Any], deltas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reconstruct the current state from a base snapshot and its deltas (oldest first)"""
+    state = base_state
+    for delta in deltas:
+        state = apply_patch(state, delta.get('patch') or [])
+    return state
+
+
+def snapshot_base_state(snapshot: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], int]:
+    """Base state and step of a ``session_snapshots`` row (None, -1 when absent)"""
+    if not snapshot:
+        return None, -1
+    # Older code wrote/read the state under 'full_state'; the column is form_state
+    state = snapshot.get('form_state') or snapshot.get('full_state')
+    return state, snapshot.get('step_number', -1)
+
+
+async def load_snapshot_state(database, session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Read base snapshot + deltas through the async database client and rebuild the state.
+
+    Returns:
+        Current persisted state, or None when the session has no snapshot
+    """
+    snapshot = await database.get_latest_session_snapshot(session_id)
+    base_state, _ = snapshot_base_state(snapshot)
+    if base_state is None:
+        return None
+
+    deltas = await database.get_session_snapshot_deltas(session_id, base_id=snapshot.get('base_id'))
+    return rebuild_state(base_state, deltas)
+
+
+async def persist_snapshot(
+    database,
+    session_id: str,
+    state: Dict[str, Any],
+    step: int,
+    previous: Optional[Dict[str, Any]] = None,
+    compaction_interval: int = COMPACTION_INTERVAL
+) -> Dict[str, Any]:
+    """
+    Persist ``state`` as a delta against the last persisted state, compacting periodically.
+
+    Args:
+        database: Async database client
+        session_id: Survey session identifier
+        state: State to persist
+        step: Current step number
+        previous: Record returned by the previous call for this session
+            (``{"state", "delta_count", "base_id"}``); None (or a record without
+            a base id) forces a full base snapshot
+        compaction_interval: Deltas allowed before the state is written as a new base
+
+    Returns:
+        Record to pass as ``previous`` on the next call
+    """
+    if (previous is not None and previous.get('base_id')
+            and previous.get('delta_count', 0) < compaction_interval):
+        patch = diff_state(previous['state'], state)
+        if not patch:
+            return previous
+        sequence = previous.get('delta_count', 0) + 1
+        await database.save_session_snapshot_delta(
+            session_id, step, patch, base_id=previous['base_id'], sequence=sequence
+        )
+        return {'state': state, 'delta_count': sequence, 'base_id': previous['base_id']}
+
+    # Base snapshot: write the full state under a new base id, then drop the
+    # patches it replaces (patches of an older base are never read again anyway)
+    base_id = str(uuid.uuid4())
+    await database.save_session_snapshot(
+        session_id=session_id,
+        full_state=state,
+        step=step,
+        recovery_reason="compaction" if previous is not None else "base_snapshot",
+        base_id=base_id
+    )
+    await database.delete_session_snapshot_deltas(session_id)
+    logger.debug(f"Wrote base snapshot for {session_id} at step {step}")
+    return {'state': state, 'delta_count': 0, 'base_id': base_id}
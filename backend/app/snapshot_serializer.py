@@ -0,0 +1,60 @@
+"""
+Typed serializer for session snapshots.
+
+The snapshot written after every step is the ``core``, ``question_strategy``
+and ``lead_intelligence`` slices of the graph state. They are validated into
+``SessionSnapshot`` once and encoded straight to JSON bytes by pydantic-core;
+values JSON has no type for (datetimes, enums, custom objects) are stringified
+during that single pass instead of through a ``json.dumps``/``json.loads``
+round trip.
+"""
+
+from datetime import datetime
+from typing import Dict, Any
+
+from pydantic_core import to_json
+
+from pydantic_models import SessionSnapshot, SessionStateEntry
+
+
+def build_session_snapshot(state: Dict[str, Any]) -> SessionSnapshot:
+    """
+    Take the persisted slices of a graph state.
+
+    Args:
+        state: Graph state returned by the survey graph
+
+    Returns:
+        Validated SessionSnapshot
+    """
+    question_strategy = state.get('question_strategy') or {}
+    lead_intelligence = state.get('lead_intelligence') or {}
+
+    return SessionSnapshot.model_validate({
+        'core': state.get('core') or {},
+        'question_strategy': {
+            'asked_questions': question_strategy.get('asked_questions', []),
+            'current_questions': question_strategy.get('current_questions', []),
+            'selection_history': question_strategy.get('selection_history', [])
+        },
+        'lead_intelligence': {
+            'responses': lead_intelligence.get('responses', []),
+            'current_score': lead_intelligence.get('current_score', 0) or 0,
+            'lead_status': lead_intelligence.get('lead_status', 'unknown') or 'unknown'
+        }
+    })
+
+
+def encode_session_snapshot(snapshot: SessionSnapshot) -> bytes:
+    """Encode a snapshot to JSON bytes (non-JSON values are stringified)"""
+    return to_json(snapshot, fallback=str)
+
+
+def encode_session_state_entry(snapshot: SessionSnapshot, step: int) -> bytes:
+    """Encode the Redis hot state entry for a snapshot to JSON bytes"""
+    entry = SessionStateEntry(
+        state=snapshot,
+        step=step,
+        updated_at=datetime.now().isoformat()
+    )
+    return to_json(entry, fallback=str)
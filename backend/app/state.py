@@ -85,6 +85,7 @@ class LeadIntelligenceState(TypedDict):
     qualification_reasoning: List[Dict[str, Any]]
     risk_factors: List[str]
     positive_indicators: List[str]
+    scoring_pending: bool  # Classification queued for the lead scoring worker
 
 # Engagement supervisor state
 class EngagementState(TypedDict):
@@ -121,6 +122,7 @@ class SurveyGraphState(TypedDict):
     # API interaction fields
     pending_responses: List[Dict[str, Any]]  # Responses waiting to be processed
     frontend_response: Optional[Dict[str, Any]]  # Data prepared for frontend
+    step_context: Optional[Dict[str, Any]]  # Reads prefetched concurrently by the API (see step_context.py)
     
     # Routing control flags
     route_to_lead_intelligence: Optional[bool]  # Flag to route to lead intelligence
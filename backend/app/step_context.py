@@ -0,0 +1,134 @@
+"""
+Step context prefetch for the survey flow.
+
+Every /step request needs the same handful of independent reads (lead session,
+latest snapshot, form, form questions, answered questions and client record).
+They are issued concurrently here and handed to the graph as ``step_context``
+so graph nodes can reuse them instead of querying the database one by one.
+Form questions come from the shared question index and are only read from the
+database when the form's index is cold or was invalidated.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .async_database import db_async
+from .utils.question_index import question_index
+
+logger = logging.getLogger(__name__)
+
+
+async def _none() -> None:
+    return None
+
+
+async def _fetch_form_context(session_id: str, form_id: str, client_id: Optional[str]) -> Dict[str, Any]:
+    """Fetch form, questions, answered question ids and client concurrently"""
+    form, questions, asked_question_ids, client = await asyncio.gather(
+        db_async.get_form(form_id),
+        question_index.aget(form_id, db_async.get_form_questions),
+        db_async.get_asked_questions(session_id),
+        db_async.get_client(client_id) if client_id else _none()
+    )
+
+    # Client id was not known up front - resolve it through the form
+    if client is None and form and form.get('client_id'):
+        client = await db_async.get_client(form['client_id'])
+
+    return {
+        'form': form,
+        'form_questions': questions.questions(),
+        'asked_question_ids': asked_question_ids,
+        'client': client
+    }
+
+
+async def prefetch_step_context(
+    session_id: str,
+    form_id: Optional[str] = None,
+    client_id: Optional[str] = None,
+    include_snapshot: bool = True
+) -> Dict[str, Any]:
+    """
+    Load everything a survey step needs in one concurrent round.
+
+    Args:
+        session_id: Survey session identifier
+        form_id: Form id from the HTTP session, if known
+        client_id: Client id from the HTTP session, if known
+        include_snapshot: Also read the latest snapshot row (skip when the
+            hot state comes from the Redis session state cache)
+
+    Returns:
+        Dictionary with ``lead_session``, ``snapshot``, ``form``,
+        ``form_questions``, ``asked_question_ids``, ``client`` and ``fetched_at``
+    """
+    start = datetime.now()
+
+    snapshot_read = db_async.get_latest_session_snapshot(session_id) if include_snapshot else _none()
+
+    if form_id:
+        lead_session, snapshot, form_context = await asyncio.gather(
+            db_async.get_lead_session(session_id),
+            snapshot_read,
+            _fetch_form_context(session_id, form_id, client_id)
+        )
+    else:
+        lead_session, snapshot = await asyncio.gather(
+            db_async.get_lead_session(session_id),
+            snapshot_read
+        )
+        form_context = {}
+
+    # The HTTP session did not carry the form (or carried a stale one) - use the database row
+    db_form_id = lead_session.get('form_id') if lead_session else None
+    if db_form_id and db_form_id != form_id:
+        form_context = await _fetch_form_context(
+            session_id, db_form_id, lead_session.get('client_id')
+        )
+
+    elapsed_ms = (datetime.now() - start).total_seconds() * 1000
+    logger.debug(f"Prefetched step context for {session_id} in {elapsed_ms:.1f}ms")
+
+    return {
+        'lead_session': lead_session,
+        'snapshot': snapshot,
+        'form': form_context.get('form'),
+        'form_questions': form_context.get('form_questions', []),
+        'asked_question_ids': form_context.get('asked_question_ids', []),
+        'client': form_context.get('client'),
+        'fetched_at': datetime.now().isoformat()
+    }
+
+
+# lead_sessions columns the graph reads; the lead scoring worker records its result in them
+LEAD_SESSION_GRAPH_FIELDS = ('lead_status', 'final_score', 'confidence', 'completion_message')
+
+
+def graph_step_context(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Slice of the prefetched context that is passed into the graph state"""
+    lead_session = context.get('lead_session') or {}
+    return {
+        # Only the scoring fields: routing uses the worker's latest classification
+        'lead_session': {field: lead_session.get(field) for field in LEAD_SESSION_GRAPH_FIELDS if field in lead_session},
+        'form': context.get('form'),
+        'form_questions': context.get('form_questions', []),
+        'asked_question_ids': context.get('asked_question_ids', []),
+        'client': context.get('client'),
+        'fetched_at': context.get('fetched_at')
+    }
+
+
+def get_step_context(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the prefetched step context from graph state ({} when absent)"""
+    return state.get('step_context') or {}
+
+
+def context_form_questions(state: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Prefetched form questions (copied so callers may annotate them), or None"""
+    questions = get_step_context(state).get('form_questions')
+    if not questions:
+        return None
+    return [dict(q) for q in questions]
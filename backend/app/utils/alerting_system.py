@@ -524,11 +524,10 @@ class AlertManager:
             # Import here to avoid circular dependencies
             from .analytics_queries import SurveyAnalytics
             from .database_monitoring import monitor
-            from ..database import db
             
             # Check for high abandonment rates
-            analytics = SurveyAnalytics(db)
-            abandonment_alerts = analytics.check_abandonment_alerts()
+            analytics = SurveyAnalytics()
+            abandonment_alerts = await analytics.check_abandonment_alerts()
             
             for alert_data in abandonment_alerts:
                 await self.send_alert(
@@ -540,7 +539,7 @@ class AlertManager:
                 )
             
             # Check for performance issues
-            performance_alerts = analytics.check_performance_alerts()
+            performance_alerts = await analytics.check_performance_alerts()
             
             for alert_data in performance_alerts:
                 await self.send_alert(
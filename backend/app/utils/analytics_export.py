@@ -0,0 +1,299 @@
+"""
+Analytics Export
+
+Streams one row per answered question (sessions without answers get one row
+with empty question columns) joining ``lead_sessions``, ``responses``,
+``form_questions`` and the session's first ``tracking_data`` row. Rows come
+from a server-side cursor in ``chunk_size`` batches through the asyncpg pool,
+so memory stays constant however many rows a client has:
+
+- CSV is encoded batch by batch into a ``StreamingResponse``
+- XLSX goes through an openpyxl write-only workbook into a temporary file
+- Background jobs write either format under ``ANALYTICS_EXPORT_DIR`` with a
+  JSON status file next to it, readable from any API worker sharing the directory
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from .pg_pool import PostgresPool, pg_pool
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = Path(os.getenv('ANALYTICS_EXPORT_DIR', 'uploads/exports'))
+EXPORT_CHUNK_SIZE = int(os.getenv('ANALYTICS_EXPORT_CHUNK_SIZE', '2000'))
+
+EXPORT_COLUMNS = [
+    "lead_id", "session_id", "form_id", "form_title", "started_at", "completed_at", "completed",
+    "lead_status", "final_score", "utm_source", "utm_medium", "utm_campaign",
+    "question_id", "question_text", "answer", "answer_score", "answered_at"
+]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+# $1 client id, $2 form id (or NULL), $3 start, $4 end
+EXPORT_SQL = """
+SELECT
+    ls.id,
+    ls.session_id,
+    ls.form_id,
+    f.title,
+    ls.started_at,
+    ls.completed_at,
+    ls.completed,
+    ls.lead_status,
+    ls.final_score,
+    td.utm_source,
+    td.utm_medium,
+    td.utm_campaign,
+    r.question_id,
+    fq.question_text,
+    r.answer,
+    r.score,
+    r.created_at
+FROM lead_sessions ls
+JOIN forms f ON f.id = ls.form_id
+LEFT JOIN LATERAL (
+    SELECT t.utm_source, t.utm_medium, t.utm_campaign
+    FROM tracking_data t
+    WHERE t.session_id = ls.id
+    ORDER BY t.created_at, t.id
+    LIMIT 1
+) td ON true
+LEFT JOIN responses r ON r.session_id = ls.id
+LEFT JOIN form_questions fq ON fq.form_id = ls.form_id AND fq.question_id = r.question_id
+WHERE f.client_id = $1::uuid
+  AND ($2::uuid IS NULL OR ls.form_id = $2::uuid)
+  AND ls.started_at >= $3
+  AND ls.started_at <= $4
+ORDER BY ls.started_at, ls.id, r.created_at
+"""
+
+
+# Text starting with one of these is run as a formula when a CSV is opened
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _cell(value: Any) -> Any:
+    """Spreadsheet-friendly value: ISO timestamps, UUIDs as text"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_row(row: Sequence[Any]) -> List[Any]:
+    """Quote formula-like text; a leading ' makes Excel and Sheets show it instead of evaluating it"""
+    return [f"'{value}" if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES) else value for value in row]
+
+
+async def iter_export_rows(
+    client_id: str,
+    start: datetime,
+    end: datetime,
+    form_id: Optional[str] = None,
+    pool: Optional[PostgresPool] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[List[Any]]:
+    """
+    Export rows in ``EXPORT_COLUMNS`` order, read through a server-side cursor.
+
+    Args:
+        client_id: Client whose forms are exported
+        start: Earliest started_at
+        end: Latest started_at
+        form_id: Restrict to one form
+        pool: Postgres pool (defaults to ``pg_pool``)
+        chunk_size: Rows fetched per cursor round trip
+    """
+    pool = pool or pg_pool
+    connection_pool = await pool.get_pool()
+    async with connection_pool.acquire() as conn:
+        # Cursors only live inside a transaction
+        async with conn.transaction(readonly=True):
+            cursor = conn.cursor(EXPORT_SQL, client_id, form_id, start.astimezone(), end.astimezone(), prefetch=chunk_size)
+            async for record in cursor:
+                yield [_cell(value) for value in record]
+
+
+async def stream_csv(rows: AsyncIterator[Sequence[Any]], batch_size: int = 500) -> AsyncIterator[bytes]:
+    """Encode rows as CSV (header first), yielding one chunk per ``batch_size`` rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    pending = 0
+
+    async for row in rows:
+        writer.writerow(_csv_row(row))
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+async def _batches(rows: AsyncIterator[Sequence[Any]], batch_size: int) -> AsyncIterator[List[Sequence[Any]]]:
+    """Group rows into lists of up to ``batch_size``"""
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def write_csv(path: Path, rows: AsyncIterator[Sequence[Any]], batch_size: int = 500) -> int:
+    """
+    Write rows to a CSV file; returns the number of data rows.
+
+    File writes run in a worker thread, one call per ``batch_size`` rows.
+    """
+    count = 0
+    f = await asyncio.to_thread(open, path, "w", newline="", encoding="utf-8")
+    try:
+        writer = csv.writer(f)
+        await asyncio.to_thread(writer.writerow, EXPORT_COLUMNS)
+        async for batch in _batches(rows, batch_size):
+            await asyncio.to_thread(writer.writerows, [_csv_row(row) for row in batch])
+            count += len(batch)
+    finally:
+        await asyncio.to_thread(f.close)
+    return count
+
+
+def _append_rows(sheet, batch: List[Sequence[Any]]) -> None:
+    from openpyxl.cell import WriteOnlyCell
+
+    for row in batch:
+        cells = list(row)
+        for i, value in enumerate(cells):
+            # openpyxl stores text starting with "=" as a formula; keep it a string
+            if isinstance(value, str) and value.startswith("="):
+                cells[i] = WriteOnlyCell(sheet, value)
+                cells[i].data_type = "s"
+        sheet.append(cells)
+
+
+async def write_xlsx(path: Path, rows: AsyncIterator[Sequence[Any]], batch_size: int = 500) -> int:
+    """
+    Write rows to an XLSX file with a write-only (streaming) workbook; returns
+    the number of data rows.
+
+    openpyxl serializes and compresses synchronously, so appends (one call per
+    ``batch_size`` rows) and the final save run in a worker thread.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Leads")
+    await asyncio.to_thread(sheet.append, EXPORT_COLUMNS)
+    count = 0
+    async for batch in _batches(rows, batch_size):
+        await asyncio.to_thread(_append_rows, sheet, batch)
+        count += len(batch)
+    await asyncio.to_thread(workbook.save, path)
+    return count
+
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx}
+
+
+# === Background jobs ===
+
+def _job_dir(client_id: str) -> Path:
+    return EXPORT_DIR / str(client_id)
+
+
+def _status_path(client_id: str, job_id: str) -> Path:
+    return _job_dir(client_id) / f"{job_id}.json"
+
+
+def export_file_path(client_id: str, job_id: str, export_format: str) -> Path:
+    """Where a job's export file is written"""
+    return _job_dir(client_id) / f"{job_id}.{export_format}"
+
+
+def _save_status(client_id: str, job: Dict[str, Any]) -> None:
+    path = _status_path(client_id, job["job_id"])
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(job, default=str))
+    tmp.replace(path)
+
+
+def create_export_job(client_id: str, export_format: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Record a pending export job; run it with ``run_export_job``"""
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "status": "pending",
+        "format": export_format,
+        "params": params,
+        "created_at": datetime.now().isoformat()
+    }
+    _job_dir(client_id).mkdir(parents=True, exist_ok=True)
+    _save_status(client_id, job)
+    return job
+
+
+def get_export_job(client_id: str, job_id: str) -> Optional[Dict[str, Any]]:
+    """Job status for a client's export, or None"""
+    try:
+        uuid.UUID(job_id)
+        return json.loads(_status_path(client_id, job_id).read_text())
+    except (ValueError, FileNotFoundError):
+        return None
+
+
+async def run_export_job(
+    client_id: str,
+    job: Dict[str, Any],
+    start: datetime,
+    end: datetime,
+    form_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Write a job's export file and mark it ready (or failed)"""
+    path = export_file_path(client_id, job["job_id"], job["format"])
+    job = {**job, "status": "running", "started_at": datetime.now().isoformat()}
+    _save_status(client_id, job)
+    try:
+        row_count = await WRITERS[job["format"]](path, iter_export_rows(client_id, start, end, form_id))
+        job.update(status="ready", row_count=row_count, file_size_bytes=path.stat().st_size,
+                   finished_at=datetime.now().isoformat())
+        logger.info(f"Export {job['job_id']} ready: {row_count} rows, {job['file_size_bytes']} bytes")
+    except Exception as e:
+        logger.error(f"Export {job['job_id']} failed: {e}")
+        path.unlink(missing_ok=True)
+        job.update(status="failed", error=str(e), finished_at=datetime.now().isoformat())
+    _save_status(client_id, job)
+    return job
+
+
+# Export main components
+__all__ = [
+    'EXPORT_COLUMNS',
+    'MEDIA_TYPES',
+    'iter_export_rows',
+    'stream_csv',
+    'write_csv',
+    'write_xlsx',
+    'create_export_job',
+    'get_export_job',
+    'export_file_path',
+    'run_export_job'
+]
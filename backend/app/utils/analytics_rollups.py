@@ -0,0 +1,150 @@
+"""
+Daily Analytics Rollups
+
+Readers for ``form_daily_rollups``: one row per form, UTC day and
+first-touch ``utm_source`` with view, completion, qualified and completion
+time counters. Database triggers on ``lead_sessions`` and ``tracking_data``
+keep the table current (migration 113), so dashboards aggregate a few rows
+per form and day instead of every session.
+
+Migration 113 fills the table from existing sessions. Rebuild rollups from the
+raw tables to repair drift:
+    python -m app.utils.analytics_rollups --all
+    python -m app.utils.analytics_rollups --form-id <uuid> --start-day 2026-01-01
+"""
+
+import argparse
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLUMNS = "form_id, day, utm_source, views, completions, qualified, completion_seconds_total, timed_completions"
+COUNTERS = ("views", "completions", "qualified", "completion_seconds_total", "timed_completions")
+
+# PostgREST caps a response at 1000 rows (max-rows), so larger reads are paged
+ROLLUP_PAGE_SIZE = 1000
+
+
+def fetch_rollups(
+    client_id: str,
+    start: datetime,
+    end: datetime,
+    form_id: Optional[str] = None,
+    database=None
+) -> List[Dict[str, Any]]:
+    """
+    Rollup rows of a client (optionally one form) for the UTC days from ``start`` to ``end``,
+    read in pages of ``ROLLUP_PAGE_SIZE``.
+
+    Args:
+        client_id: Client identifier (rollups are always client-scoped)
+        start: First day of the range (inclusive)
+        end: Last day of the range (inclusive)
+        form_id: Restrict to one form
+        database: Sync database client (defaults to ``db``)
+    """
+    if database is None:
+        from ..database import db as database
+
+    rows = []
+    while True:
+        query = database.client.table("form_daily_rollups")\
+            .select(ROLLUP_COLUMNS)\
+            .eq("client_id", client_id)\
+            .gte("day", start.date().isoformat())\
+            .lte("day", end.date().isoformat())
+        if form_id:
+            query = query.eq("form_id", form_id)
+        # Primary key order keeps pages stable
+        page = query.order("day").order("form_id").order("utm_source")\
+            .range(len(rows), len(rows) + ROLLUP_PAGE_SIZE - 1)\
+            .execute().data or []
+        rows.extend(page)
+        if len(page) < ROLLUP_PAGE_SIZE:
+            return rows
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum rollup counters; adds ``average_completion_time`` in seconds"""
+    totals = {counter: 0 for counter in COUNTERS}
+    for row in rows:
+        for counter in COUNTERS:
+            totals[counter] += row.get(counter) or 0
+    totals["average_completion_time"] = (
+        totals["completion_seconds_total"] / totals["timed_completions"] if totals["timed_completions"] else 0
+    )
+    return totals
+
+
+def group_by(rows: List[Dict[str, Any]], column: str) -> Dict[Any, Dict[str, Any]]:
+    """``summarize`` per distinct value of ``column`` (e.g. ``form_id``, ``day``, ``utm_source``)"""
+    groups = defaultdict(list)
+    for row in rows:
+        groups[row.get(column)].append(row)
+    return {key: summarize(group) for key, group in groups.items()}
+
+
+def daily_series(rows: List[Dict[str, Any]], start: date, end: date) -> List[Dict[str, Any]]:
+    """Per-day totals from ``start`` to ``end`` inclusive, zero-filled, in chronological order"""
+    by_day = group_by(rows, "day")
+    series = []
+    day = start
+    while day <= end:
+        totals = by_day.get(day.isoformat()) or summarize([])
+        series.append({"date": day.isoformat(), **totals})
+        day += timedelta(days=1)
+    return series
+
+
+def backfill_rollups(
+    form_id: Optional[str] = None,
+    start_day: Optional[str] = None,
+    end_day: Optional[str] = None,
+    database=None
+) -> int:
+    """
+    Recompute rollups from ``lead_sessions`` (``backfill_form_daily_rollups``).
+
+    Returns:
+        Number of rollup rows written
+    """
+    if database is None:
+        from ..database import db as database
+
+    result = database.client.rpc("backfill_form_daily_rollups", {
+        "p_form_id": form_id,
+        "p_start_day": start_day,
+        "p_end_day": end_day
+    }).execute()
+    return result.data or 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild daily analytics rollups")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--form-id', help="Form to rebuild")
+    target.add_argument('--all', action='store_true', help="Every form")
+    parser.add_argument('--start-day', help="First day to rebuild (YYYY-MM-DD)")
+    parser.add_argument('--end-day', help="Last day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    written = backfill_rollups(None if args.all else args.form_id, args.start_day, args.end_day)
+    logger.info(f"Rebuilt {written} rollup rows")
+
+
+# Export main components
+__all__ = [
+    'fetch_rollups',
+    'summarize',
+    'group_by',
+    'daily_series',
+    'backfill_rollups'
+]
+
+
+if __name__ == '__main__':
+    main()
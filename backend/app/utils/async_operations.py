@@ -13,8 +13,13 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 import threading
 
+from .lru_cache import LRUTTLCache
+
 logger = logging.getLogger(__name__)
 
+# Previous name of the shared cache class
+TTLCache = LRUTTLCache
+
 # Global thread pool for fire-and-forget operations
 _thread_pool: Optional[ThreadPoolExecutor] = None
 _thread_pool_lock = threading.Lock()
@@ -281,64 +286,10 @@ async def run_parallel_non_blocking(tasks: List[Callable], timeout: float = 30.0
         logger.warning(f"Parallel execution timed out after {timeout}s")
         return []
 
-# Caching utilities for performance
-
-class TTLCache:
-    """Simple TTL (Time To Live) cache for expensive operations"""
-    
-    def __init__(self, default_ttl: float = 300.0):  # 5 minutes default
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self.default_ttl = default_ttl
-        self._lock = threading.Lock()
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get item from cache if not expired"""
-        with self._lock:
-            if key not in self.cache:
-                return None
-                
-            item = self.cache[key]
-            if time.time() > item['expires_at']:
-                del self.cache[key]
-                return None
-                
-            return item['value']
-    
-    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
-        """Set item in cache with TTL"""
-        ttl = ttl or self.default_ttl
-        expires_at = time.time() + ttl
-        
-        with self._lock:
-            self.cache[key] = {
-                'value': value,
-                'expires_at': expires_at
-            }
-    
-    def clear(self) -> None:
-        """Clear entire cache"""
-        with self._lock:
-            self.cache.clear()
-    
-    def cleanup_expired(self) -> int:
-        """Remove expired items and return count removed"""
-        now = time.time()
-        expired_keys = []
-        
-        with self._lock:
-            for key, item in self.cache.items():
-                if now > item['expires_at']:
-                    expired_keys.append(key)
-            
-            for key in expired_keys:
-                del self.cache[key]
-        
-        return len(expired_keys)
-
 # Global instances
 async_db = AsyncDatabaseOps()
 batch_manager = BatchOperationManager()
-cache = TTLCache()
+cache = LRUTTLCache(name="async_operations")
 
 # Cleanup function
 def cleanup_resources():
@@ -358,6 +309,7 @@ __all__ = [
     'AsyncDatabaseOps',
     'BatchOperationManager',
     'TTLCache',
+    'LRUTTLCache',
     'run_parallel_non_blocking',
     'async_db',
     'batch_manager',
@@ -0,0 +1,229 @@
+"""
+Cache Invalidation Bus
+
+Per-process caches (``CachedDataLoader``, the form question index, the LLM
+response cache) are invalidated on every worker when an admin edits a form,
+client or theme:
+
+- Writers call ``invalidation_bus.publish(kind, id)`` (``await
+  invalidation_bus.apublish(kind, id)`` from async code). Local handlers run
+  immediately and the event is published on a Redis pub/sub channel.
+- Every worker runs a subscriber (started from application startup) that
+  applies events published by other workers to its own handlers.
+- After the subscription drops and reconnects, events may have been missed,
+  so every registered reset handler clears its cache.
+
+Kinds:
+- ``form``: id is a form id (form settings or questions changed)
+- ``client``: id is a client id (client profile or themes changed)
+
+With the bus enabled (CACHE_INVALIDATION_ENABLED=true) caches can keep
+entries for hours instead of minutes. Without it, ``publish`` only
+invalidates the local process.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+KINDS = ("form", "client")
+
+
+class CacheInvalidationBus:
+    """Redis pub/sub fan-out of cache invalidation events to every worker"""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        channel: str = CHANNEL,
+        enabled: bool = False,
+        redis_client=None
+    ):
+        """
+        Initialize the bus.
+
+        Args:
+            redis_url: Redis connection URL (defaults to REDIS_URL)
+            channel: Pub/sub channel name
+            enabled: Publish to and subscribe on Redis (local-only otherwise)
+            redis_client: Sync Redis client used for publishing (created lazily)
+        """
+        self.redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379')
+        self.channel = channel
+        self.enabled = enabled
+        self.origin = uuid.uuid4().hex
+        self._redis = redis_client
+        self._handlers: Dict[str, List[Callable[[str], Any]]] = defaultdict(list)
+        self._reset_handlers: List[Callable[[], Any]] = []
+        self._listen_task: Optional[asyncio.Task] = None
+        self.stats = {'published': 0, 'received': 0, 'publish_errors': 0, 'handler_errors': 0, 'resyncs': 0}
+
+    def _get_redis(self):
+        """Get sync Redis client (writers run in sync route code)"""
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, decode_responses=True, socket_timeout=0.5)
+        return self._redis
+
+    # === Registration ===
+
+    def register(self, kind: str, handler: Callable[[str], Any]) -> None:
+        """Call ``handler(id)`` for every ``kind`` event, local or remote"""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown invalidation kind: {kind}")
+        self._handlers[kind].append(handler)
+
+    def register_reset(self, handler: Callable[[], Any]) -> None:
+        """Call ``handler()`` when events may have been missed (subscription reconnected)"""
+        self._reset_handlers.append(handler)
+
+    # === Publishing ===
+
+    def publish(self, kind: str, entity_id: str) -> None:
+        """
+        Invalidate ``kind``/``entity_id`` in this process and on every other worker.
+
+        Redis failures are logged, not raised: the write that triggered the
+        event has already happened and local caches are invalidated either way.
+        Async callers use ``apublish``.
+        """
+        message = self._invalidate_local(kind, entity_id)
+        if message is not None:
+            self._broadcast(message)
+
+    async def apublish(self, kind: str, entity_id: str) -> None:
+        """``publish`` for async route handlers: the blocking Redis call runs in a worker thread"""
+        message = self._invalidate_local(kind, entity_id)
+        if message is not None:
+            await asyncio.to_thread(self._broadcast, message)
+
+    def _invalidate_local(self, kind: str, entity_id: str) -> Optional[str]:
+        """Run local handlers; returns the message to broadcast (None when the bus is disabled)"""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown invalidation kind: {kind}")
+        entity_id = str(entity_id)
+        self._dispatch(kind, entity_id)
+
+        if not self.enabled:
+            return None
+        return json.dumps({"kind": kind, "id": entity_id, "origin": self.origin})
+
+    def _broadcast(self, message: str) -> None:
+        try:
+            self._get_redis().publish(self.channel, message)
+            self.stats['published'] += 1
+        except Exception as e:
+            self.stats['publish_errors'] += 1
+            logger.warning(f"Could not publish cache invalidation {message}: {e}")
+
+    # === Subscribing ===
+
+    def handle_message(self, data: str) -> bool:
+        """
+        Apply an event received on the channel.
+
+        Returns:
+            True when handlers ran (False for own, malformed or unknown events)
+        """
+        try:
+            event = json.loads(data)
+            kind, entity_id, origin = event["kind"], str(event["id"]), event.get("origin")
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed cache invalidation message: {data!r}")
+            return False
+        if origin == self.origin or kind not in KINDS:
+            return False
+        self.stats['received'] += 1
+        self._dispatch(kind, entity_id)
+        return True
+
+    def reset(self) -> None:
+        """Run every reset handler"""
+        self.stats['resyncs'] += 1
+        for handler in self._reset_handlers:
+            try:
+                handler()
+            except Exception as e:
+                self.stats['handler_errors'] += 1
+                logger.error(f"Cache reset handler failed: {e}")
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+
+        subscribed_before = False
+        backoff = 1.0
+        while True:
+            client = aioredis.from_url(self.redis_url, decode_responses=True)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                if subscribed_before:
+                    logger.info("Cache invalidation subscription restored, clearing local caches")
+                    self.reset()
+                subscribed_before = True
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation subscription lost ({e}), retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+
+    def start(self) -> None:
+        """Start the subscriber (call from application startup)"""
+        if not self.enabled:
+            return
+        if self._listen_task is None or self._listen_task.done():
+            self._listen_task = asyncio.create_task(self._listen())
+            logger.info(f"Listening for cache invalidations on Redis channel {self.channel}")
+
+    async def stop(self) -> None:
+        """Stop the subscriber"""
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+            self._listen_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Bus statistics"""
+        return {**self.stats, 'enabled': self.enabled, 'subscribed': self._listen_task is not None and not self._listen_task.done()}
+
+    def _dispatch(self, kind: str, entity_id: str) -> None:
+        for handler in self._handlers.get(kind, []):
+            try:
+                handler(entity_id)
+            except Exception as e:
+                self.stats['handler_errors'] += 1
+                logger.error(f"Cache invalidation handler for {kind} {entity_id} failed: {e}")
+
+
+# Global instance
+invalidation_bus = CacheInvalidationBus(
+    enabled=os.getenv('CACHE_INVALIDATION_ENABLED', 'false').lower() == 'true'
+)
+
+
+# Export main components
+__all__ = [
+    'CacheInvalidationBus',
+    'invalidation_bus'
+]
@@ -3,36 +3,48 @@ Cached Data Loader for Survey Operations
 
 Provides cached versions of frequently accessed data like questions,
 client info, and form configurations to improve performance.
+
+Entries are dropped on every worker when forms or clients change (see
+``cache_invalidation``); with the invalidation bus enabled they are kept for
+DATA_CACHE_TTL_SECONDS (default 24 hours) instead of 30-60 minutes.
 """
 
 import json
 import logging
+import os
 from typing import Dict, List, Any, Optional
 import time
 from functools import wraps
 
-from .async_operations import cache, TTLCache
+from .lru_cache import LRUTTLCache
+from .cache_invalidation import invalidation_bus
 
 logger = logging.getLogger(__name__)
 
 class CachedDataLoader:
     """Cached data loader with automatic cache management"""
     
-    def __init__(self):
-        # Separate caches for different data types with appropriate TTLs
-        self.questions_cache = TTLCache(default_ttl=1800.0)  # 30 minutes
-        self.client_cache = TTLCache(default_ttl=3600.0)    # 1 hour
-        self.form_cache = TTLCache(default_ttl=1800.0)      # 30 minutes
-        
-        # Statistics
-        self.stats = {
-            'questions_hits': 0,
-            'questions_misses': 0,
-            'client_hits': 0,
-            'client_misses': 0,
-            'form_hits': 0,
-            'form_misses': 0
-        }
+    def __init__(
+        self,
+        questions_ttl: float = 1800.0,
+        client_ttl: float = 3600.0,
+        form_ttl: float = 1800.0,
+        max_entries: int = 1000,
+        stale_ttl: float = 300.0
+    ):
+        # Separate caches for different data types with appropriate TTLs.
+        # Concurrent misses for one form share a single load, and expired
+        # entries are served for stale_ttl seconds while one reload runs.
+        self.questions_cache = LRUTTLCache(default_ttl=questions_ttl, max_size=max_entries, stale_ttl=stale_ttl, name="questions")
+        self.client_cache = LRUTTLCache(default_ttl=client_ttl, max_size=max_entries, stale_ttl=stale_ttl, name="client")
+        self.form_cache = LRUTTLCache(default_ttl=form_ttl, max_size=max_entries, stale_ttl=stale_ttl, name="form")
+    
+    def _get_cached(self, cache_instance: LRUTTLCache, cache_key: str, loader, force_refresh: bool, label: str, default):
+        try:
+            return cache_instance.get_or_load(cache_key, loader, force=force_refresh)
+        except Exception as e:
+            logger.error(f"Failed to load {label}: {e}")
+            return default
     
     def get_questions(self, form_id: str, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """
@@ -45,34 +57,16 @@ class CachedDataLoader:
         Returns:
             List of question dictionaries
         """
-        cache_key = f"questions_{form_id}"
-        
-        if not force_refresh:
-            cached_questions = self.questions_cache.get(cache_key)
-            if cached_questions is not None:
-                self.stats['questions_hits'] += 1
-                logger.debug(f"Cache hit for questions: {form_id}")
-                return cached_questions
-        
-        self.stats['questions_misses'] += 1
-        logger.debug(f"Cache miss for questions: {form_id}, loading from database")
-        
-        try:
+        def load():
             # Load from database/tools
             from ..tools import load_questions
             
             questions_json = load_questions.invoke({'form_id': form_id})
             questions = json.loads(questions_json) if questions_json else []
-            
-            # Cache the result
-            self.questions_cache.set(cache_key, questions)
-            
             logger.info(f"Loaded and cached {len(questions)} questions for form {form_id}")
             return questions
-            
-        except Exception as e:
-            logger.error(f"Failed to load questions for {form_id}: {e}")
-            return []
+        
+        return self._get_cached(self.questions_cache, f"questions_{form_id}", load, force_refresh, f"questions for {form_id}", [])
     
     def get_client_info(self, form_id: str, force_refresh: bool = False) -> Dict[str, Any]:
         """
@@ -85,34 +79,16 @@ class CachedDataLoader:
         Returns:
             Client info dictionary
         """
-        cache_key = f"client_{form_id}"
-        
-        if not force_refresh:
-            cached_client = self.client_cache.get(cache_key)
-            if cached_client is not None:
-                self.stats['client_hits'] += 1
-                logger.debug(f"Cache hit for client info: {form_id}")
-                return cached_client
-        
-        self.stats['client_misses'] += 1
-        logger.debug(f"Cache miss for client info: {form_id}, loading from database")
-        
-        try:
+        def load():
             # Load from database/tools
             from ..tools import load_client_info
             
             client_json = load_client_info.invoke({'form_id': form_id})
             client_info = json.loads(client_json) if client_json else {}
-            
-            # Cache the result
-            self.client_cache.set(cache_key, client_info)
-            
             logger.info(f"Loaded and cached client info for form {form_id}")
             return client_info
-            
-        except Exception as e:
-            logger.error(f"Failed to load client info for {form_id}: {e}")
-            return {}
+        
+        return self._get_cached(self.client_cache, f"client_{form_id}", load, force_refresh, f"client info for {form_id}", {})
     
     def get_form_config(self, form_id: str, force_refresh: bool = False) -> Dict[str, Any]:
         """
@@ -125,35 +101,15 @@ class CachedDataLoader:
         Returns:
             Form configuration dictionary
         """
-        cache_key = f"form_{form_id}"
-        
-        if not force_refresh:
-            cached_form = self.form_cache.get(cache_key)
-            if cached_form is not None:
-                self.stats['form_hits'] += 1
-                logger.debug(f"Cache hit for form config: {form_id}")
-                return cached_form
-        
-        self.stats['form_misses'] += 1
-        logger.debug(f"Cache miss for form config: {form_id}, loading from database")
-        
-        try:
+        def load():
             # Load from database
             from ..database import db
             
-            form_config = db.get_form(form_id)
-            if not form_config:
-                form_config = {}
-            
-            # Cache the result
-            self.form_cache.set(cache_key, form_config)
-            
+            form_config = db.get_form(form_id) or {}
             logger.info(f"Loaded and cached form config for {form_id}")
             return form_config
-            
-        except Exception as e:
-            logger.error(f"Failed to load form config for {form_id}: {e}")
-            return {}
+        
+        return self._get_cached(self.form_cache, f"form_{form_id}", load, force_refresh, f"form config for {form_id}", {})
     
     def invalidate_form_data(self, form_id: str) -> None:
         """
@@ -168,12 +124,32 @@ class CachedDataLoader:
             (self.client_cache, "client_"),
             (self.form_cache, "form_")
         ]:
-            cache_key = f"{prefix}{form_id}"
-            if cache_key in cache_instance.cache:
-                del cache_instance.cache[cache_key]
+            cache_instance.delete(f"{prefix}{form_id}")
         
         logger.info(f"Invalidated all cached data for form {form_id}")
     
+    def invalidate_client_data(self, client_id: str) -> int:
+        """
+        Invalidate cached client info and form configs of every form owned by a client.
+        
+        Args:
+            client_id: Client identifier to invalidate
+            
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for cache_instance, owner in [
+            (self.client_cache, lambda value: (value.get('client') or {}).get('id')),
+            (self.form_cache, lambda value: value.get('client_id'))
+        ]:
+            removed += cache_instance.delete_where(
+                lambda key, value: isinstance(value, dict) and str(owner(value)) == str(client_id)
+            )
+        
+        logger.info(f"Invalidated {removed} cached entries for client {client_id}")
+        return removed
+    
     def preload_form_data(self, form_id: str) -> Dict[str, Any]:
         """
         Preload all data for a form to warm the cache.
@@ -209,34 +185,35 @@ class CachedDataLoader:
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics"""
-        total_hits = self.stats['questions_hits'] + self.stats['client_hits'] + self.stats['form_hits']
-        total_misses = self.stats['questions_misses'] + self.stats['client_misses'] + self.stats['form_misses']
+        caches = {
+            'questions': self.questions_cache.get_stats(),
+            'client': self.client_cache.get_stats(),
+            'form': self.form_cache.get_stats()
+        }
+        # Stale entries served during a background reload count as hits
+        total_hits = sum(stats['hits'] + stats['stale_hits'] for stats in caches.values())
+        total_misses = sum(stats['misses'] for stats in caches.values())
         total_requests = total_hits + total_misses
         
         hit_rate = (total_hits / total_requests * 100) if total_requests > 0 else 0
         
-        return {
+        result = {
             'total_requests': total_requests,
             'total_hits': total_hits,
             'total_misses': total_misses,
-            'hit_rate_percent': round(hit_rate, 2),
-            'questions_hits': self.stats['questions_hits'],
-            'questions_misses': self.stats['questions_misses'],
-            'client_hits': self.stats['client_hits'],
-            'client_misses': self.stats['client_misses'],
-            'form_hits': self.stats['form_hits'],
-            'form_misses': self.stats['form_misses']
+            'hit_rate_percent': round(hit_rate, 2)
         }
+        for name, stats in caches.items():
+            result[f'{name}_hits'] = stats['hits'] + stats['stale_hits']
+            result[f'{name}_misses'] = stats['misses']
+        result['caches'] = caches
+        return result
     
     def clear_all_caches(self) -> None:
         """Clear all caches"""
-        self.questions_cache.clear()
-        self.client_cache.clear()
-        self.form_cache.clear()
-        
-        # Reset stats
-        for key in self.stats:
-            self.stats[key] = 0
+        for cache_instance in (self.questions_cache, self.client_cache, self.form_cache):
+            cache_instance.clear()
+            cache_instance.reset_stats()
         
         logger.info("Cleared all data caches")
     
@@ -254,7 +231,16 @@ class CachedDataLoader:
         return total_removed
 
 # Global instance
-data_loader = CachedDataLoader()
+_cache_settings = {'max_entries': int(os.getenv('DATA_CACHE_MAX_ENTRIES', '1000'))}
+if invalidation_bus.enabled:
+    # Every worker hears about edits, so entries can live much longer
+    _cache_ttl = float(os.getenv('DATA_CACHE_TTL_SECONDS', '86400'))
+    _cache_settings.update(questions_ttl=_cache_ttl, client_ttl=_cache_ttl, form_ttl=_cache_ttl)
+data_loader = CachedDataLoader(**_cache_settings)
+
+invalidation_bus.register("form", data_loader.invalidate_form_data)
+invalidation_bus.register("client", data_loader.invalidate_client_data)
+invalidation_bus.register_reset(data_loader.clear_all_caches)
 
 # Convenience functions that match the tool interface
 
@@ -20,6 +20,7 @@ class DatabaseConfig:
     pool_max_overflow: int
     pool_timeout: int
     pool_recycle: int
+    pool_keepalive_expiry: int
     query_timeout: int
     connection_timeout: int
     retry_attempts: int
@@ -133,6 +134,7 @@ class ConfigLoader:
             pool_max_overflow=pool_config.get('max_overflow', 10),
             pool_timeout=pool_config.get('timeout', 30),
             pool_recycle=pool_config.get('recycle', 3600),
+            pool_keepalive_expiry=pool_config.get('keepalive_expiry', 30),
             query_timeout=query_config.get('timeout', 30),
             connection_timeout=query_config.get('connection_timeout', 10),
             retry_attempts=query_config.get('retry_attempts', 3),
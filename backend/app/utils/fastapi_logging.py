@@ -9,21 +9,201 @@ Implements FastAPI best practices for logging:
 - Error tracking
 """
 
+import atexit
+import copy
 import logging
 import json
+import queue
+import random
 import time
 import uuid
-from typing import Optional, Dict, Any
-from datetime import datetime
+from collections import Counter
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timezone
 
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import Message
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import uvicorn
 
+# Bounded log buffer; records beyond it are dropped rather than blocking a request
+DEFAULT_LOG_QUEUE_SIZE = 10000
+
+# Whether the current request keeps its sampled (DEBUG) lines - set by LoggingMiddleware
+_log_sampled: ContextVar[bool] = ContextVar('log_sampled', default=True)
+
+
+def parse_sample_rates(spec: Optional[str]) -> Tuple[Dict[str, float], List[str]]:
+    """
+    Parse ``"/api/survey/step=0.1,/api/survey/stream=0.1"`` into {path prefix: rate}.
+    
+    Returns the rates and the entries that could not be parsed, so the caller
+    can report them once logging is configured.
+    """
+    rates = {}
+    ignored = []
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        prefix, separator, rate = item.partition('=')
+        try:
+            if not separator:
+                raise ValueError(item)
+            rates[prefix.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            ignored.append(item)
+    return rates, ignored
+
+
+class RouteSampler:
+    """
+    Per-route sampling of high-volume debug lines.
+    
+    The decision is made once per request, so a sampled request keeps all of
+    its debug lines and the others keep none.
+    """
+    
+    def __init__(self, rates: Optional[Dict[str, float]] = None, level: int = logging.DEBUG):
+        self.level = level
+        self.configure(rates)
+    
+    def configure(self, rates: Optional[Dict[str, float]]):
+        # Longest prefix wins
+        self.rates = sorted((rates or {}).items(), key=lambda item: len(item[0]), reverse=True)
+    
+    def rate_for(self, path: str) -> float:
+        for prefix, rate in self.rates:
+            if path.startswith(prefix):
+                return rate
+        return 1.0
+    
+    def sample(self, path: str) -> bool:
+        rate = self.rate_for(path)
+        return rate >= 1.0 or random.random() < rate
+
+
+class SamplingFilter(logging.Filter):
+    """Drops records at or below the sampler's level for requests that were not sampled"""
+    
+    def __init__(self, sampler: RouteSampler):
+        super().__init__()
+        self.sampler = sampler
+        self.sampled_out = 0
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.sampler.level or _log_sampled.get():
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler over a bounded queue that never blocks the caller.
+    
+    When the queue is full the record is dropped and counted per level; the
+    listener reports the drops once it catches up.
+    """
+    
+    def __init__(self, maxsize: int = DEFAULT_LOG_QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = Counter()
+        self._reported_drops = 0
+    
+    def emit(self, record: logging.LogRecord):
+        # Runs under the handler lock (Handler.handle), so the counters need no lock of their own
+        if self.queue.full():
+            self.dropped[record.levelname] += 1
+            return
+        try:
+            self.enqueue(self.prepare(record))
+        except queue.Full:
+            self.dropped[record.levelname] += 1
+        except Exception:
+            self.handleError(record)
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the message arguments now, so later changes to them can't alter
+        the line, and leave the formatting (timestamps, JSON, tracebacks) to
+        the listener thread.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+    
+    def take_unreported_drops(self) -> int:
+        """Records dropped since the last call"""
+        with self.lock:
+            total = sum(self.dropped.values())
+            unreported = total - self._reported_drops
+            self._reported_drops = total
+        return unreported
+
+
+class LogQueueListener(QueueListener):
+    """QueueListener that logs a warning with the number of records dropped while the queue was full"""
+    
+    def __init__(self, queue_handler: DroppingQueueHandler, *handlers: logging.Handler):
+        super().__init__(queue_handler.queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+    
+    def enqueue_sentinel(self):
+        # Wait for room: the queue may be full when stopping
+        self.queue.put(self._sentinel)
+    
+    def handle(self, record: logging.LogRecord):
+        super().handle(record)
+        dropped = self.queue_handler.take_unreported_drops()
+        if dropped:
+            super().handle(logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": "Log queue full: dropped %d records",
+                "args": (dropped,),
+                "event_type": "log_records_dropped"
+            }))
+
+
+# Global pipeline state
+route_sampler = RouteSampler()
+sampling_filter = SamplingFilter(route_sampler)
+_queue_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[LogQueueListener] = None
+_installed_handlers: List[logging.Handler] = []
+
+LOGGER_NAMES = [
+    "uvicorn.access",
+    "uvicorn.error", 
+    "fastapi",
+    "survey_api",
+    "survey_system"
+]
+
 # Configure standard Python logging
-def setup_fastapi_logging(log_level: str = "INFO", log_file: Optional[str] = None):
-    """Set up logging configuration for FastAPI application"""
+def setup_fastapi_logging(
+    log_level: str = "INFO",
+    log_file: Optional[str] = None,
+    queue_size: int = DEFAULT_LOG_QUEUE_SIZE,
+    sample_rates: Optional[Dict[str, float]] = None
+):
+    """
+    Set up logging configuration for FastAPI application
+    
+    Loggers only put records on a bounded queue; a background listener thread
+    formats and writes them, so handler I/O never runs on the request path.
+    ``queue_size=0`` writes synchronously instead. ``sample_rates`` maps route
+    prefixes to the fraction of requests whose DEBUG lines are kept.
+    """
+    global _queue_handler, _listener, _installed_handlers
+    
+    stop_log_pipeline()
+    level = getattr(logging, log_level.upper())
     
     # Create formatters
     console_formatter = logging.Formatter(
@@ -33,46 +213,89 @@ def setup_fastapi_logging(log_level: str = "INFO", log_file: Optional[str] = Non
     
     json_formatter = JSONFormatter()
     
-    # Configure root logger
-    logging.basicConfig(level=getattr(logging, log_level.upper()))
-    
     # Create console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(console_formatter)
-    
-    # Configure loggers
-    loggers = [
-        "uvicorn.access",
-        "uvicorn.error", 
-        "fastapi",
-        "survey_api",
-        "survey_system"
-    ]
-    
-    for logger_name in loggers:
-        logger = logging.getLogger(logger_name)
-        logger.handlers.clear()
-        logger.addHandler(console_handler)
-        logger.setLevel(getattr(logging, log_level.upper()))
-        logger.propagate = False
+    output_handlers = [console_handler]
     
     # Add file handler if specified
     if log_file:
         file_handler = logging.FileHandler(log_file)
         file_handler.setFormatter(json_formatter)
-        
-        for logger_name in loggers:
-            logger = logging.getLogger(logger_name)
-            logger.addHandler(file_handler)
+        output_handlers.append(file_handler)
+    
+    route_sampler.configure(sample_rates)
+    if queue_size > 0:
+        _queue_handler = DroppingQueueHandler(queue_size)
+        _listener = LogQueueListener(_queue_handler, *output_handlers)
+        _listener.start()
+        handlers = [_queue_handler]
+    else:
+        handlers = output_handlers
+    for handler in handlers:
+        handler.addFilter(sampling_filter)
+    _installed_handlers = handlers
+    
+    # Configure root logger (like basicConfig: only when nothing else configured it)
+    root = logging.getLogger()
+    if not root.handlers:
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+    
+    # Configure loggers
+    for logger_name in LOGGER_NAMES:
+        logger = logging.getLogger(logger_name)
+        logger.handlers.clear()
+        for handler in handlers:
+            logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
     
     print(f"✅ FastAPI logging configured - Level: {log_level}")
 
+
+def stop_log_pipeline():
+    """Write out queued records and detach the handlers installed by setup_fastapi_logging"""
+    global _queue_handler, _listener, _installed_handlers
+    
+    if _listener is not None:
+        _listener.stop()
+    for logger in [logging.getLogger()] + [logging.getLogger(name) for name in LOGGER_NAMES]:
+        for handler in _installed_handlers:
+            logger.removeHandler(handler)
+    for handler in _installed_handlers:
+        if handler is not _queue_handler:
+            handler.close()
+    _queue_handler = None
+    _listener = None
+    _installed_handlers = []
+
+
+atexit.register(stop_log_pipeline)
+
+
+def get_log_pipeline_stats() -> Dict[str, Any]:
+    """Queue depth, drop and sampling counters of the logging pipeline"""
+    stats = {
+        "async": _queue_handler is not None,
+        "sampled_out": sampling_filter.sampled_out
+    }
+    if _queue_handler is not None:
+        stats.update({
+            "queued": _queue_handler.queue.qsize(),
+            "capacity": _queue_handler.queue.maxsize,
+            "dropped": dict(_queue_handler.dropped)
+        })
+    return stats
+
 class JSONFormatter(logging.Formatter):
     """JSON formatter for structured logging"""
     
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # When the record was created, not when the listener got to it
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).replace(tzinfo=None).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -95,16 +318,29 @@ class JSONFormatter(logging.Formatter):
         
         return json.dumps(log_data)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging requests and responses with correlation IDs"""
+class LoggingMiddleware:
+    """Middleware for logging requests and responses with correlation IDs (pure ASGI)"""
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope)
+        path = request.url.path
+        
         # Generate correlation ID
         correlation_id = str(uuid.uuid4())[:8]
         
         # Add to request state
         request.state.correlation_id = correlation_id
         
+        # Decide once whether this request keeps its high-volume debug lines
+        sampled_token = _log_sampled.set(route_sampler.sample(path))
+        
         # Log request start
         start_time = time.time()
         
@@ -112,56 +348,61 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         client_ip = self._get_client_ip(request)
         
         logger = logging.getLogger("survey_api")
-        logger.info(
-            f"Request started: {request.method} {request.url.path}",
-            extra={
-                "correlation_id": correlation_id,
-                "method": request.method,
-                "path": request.url.path,
-                "query_params": dict(request.query_params),
-                "client_ip": client_ip,
-                "user_agent": request.headers.get("user-agent", "unknown"),
-                "event_type": "request_started"
-            }
-        )
-        
-        try:
-            # Process request
-            response = await call_next(request)
-            
-            # Calculate duration
-            duration_ms = (time.time() - start_time) * 1000
-            
-            # Log response
+        if logger.isEnabledFor(logging.INFO):
             logger.info(
-                f"Request completed: {request.method} {request.url.path} - {response.status_code}",
+                "Request started: %s %s", request.method, path,
                 extra={
                     "correlation_id": correlation_id,
                     "method": request.method,
-                    "path": request.url.path,
-                    "status_code": response.status_code,
-                    "duration_ms": round(duration_ms, 2),
+                    "path": path,
+                    "query_params": dict(request.query_params),
                     "client_ip": client_ip,
-                    "event_type": "request_completed",
-                    "success": response.status_code < 400
+                    "user_agent": request.headers.get("user-agent", "unknown"),
+                    "event_type": "request_started"
                 }
             )
-            
-            # Add correlation ID to response headers
-            response.headers["X-Correlation-ID"] = correlation_id
-            
-            return response
+        
+        async def send_with_correlation_id(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                
+                # Log response
+                if logger.isEnabledFor(logging.INFO):
+                    # Calculate duration
+                    duration_ms = (time.time() - start_time) * 1000
+                    
+                    logger.info(
+                        "Request completed: %s %s - %s", request.method, path, status_code,
+                        extra={
+                            "correlation_id": correlation_id,
+                            "method": request.method,
+                            "path": path,
+                            "status_code": status_code,
+                            "duration_ms": round(duration_ms, 2),
+                            "client_ip": client_ip,
+                            "event_type": "request_completed",
+                            "success": status_code < 400
+                        }
+                    )
+                
+                # Add correlation ID to response headers
+                MutableHeaders(scope=message)["X-Correlation-ID"] = correlation_id
+            await send(message)
+        
+        try:
+            # Process request
+            await self.app(scope, receive, send_with_correlation_id)
             
         except Exception as e:
             # Calculate duration for error case
             duration_ms = (time.time() - start_time) * 1000
             
             logger.error(
-                f"Request failed: {request.method} {request.url.path}",
+                "Request failed: %s %s", request.method, path,
                 extra={
                     "correlation_id": correlation_id,
                     "method": request.method,
-                    "path": request.url.path,
+                    "path": path,
                     "duration_ms": round(duration_ms, 2),
                     "client_ip": client_ip,
                     "error": str(e),
@@ -170,6 +411,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 exc_info=True
             )
             raise
+        finally:
+            _log_sampled.reset(sampled_token)
     
     def _get_client_ip(self, request: Request) -> str:
         """Extract client IP from request headers"""
@@ -204,6 +447,10 @@ class SurveyAPILogger:
         **extra_data
     ):
         """Log with survey context"""
+        log_level = getattr(logging, level.upper())
+        if not self.logger.isEnabledFor(log_level):
+            return
+        
         extra = {}
         if correlation_id:
             extra["correlation_id"] = correlation_id
@@ -216,8 +463,7 @@ class SurveyAPILogger:
         
         extra.update(extra_data)
         
-        log_method = getattr(self.logger, level.lower())
-        log_method(message, extra=extra)
+        self.logger.log(log_level, message, extra=extra)
     
     def session_started(
         self,
@@ -441,6 +687,14 @@ performance_logger = PerformanceLogger()
 # Export main components
 __all__ = [
     'setup_fastapi_logging',
+    'stop_log_pipeline',
+    'get_log_pipeline_stats',
+    'parse_sample_rates',
+    'RouteSampler',
+    'SamplingFilter',
+    'DroppingQueueHandler',
+    'LogQueueListener',
+    'JSONFormatter',
     'LoggingMiddleware',
     'SurveyAPILogger',
     'PerformanceLogger',
@@ -0,0 +1,260 @@
+"""
+LLM Response Cache
+
+Prompt-keyed cache in front of supervisor LLM calls. Identical requests (same
+model settings and messages) return the stored completion instead of making a
+multi-second LLM call.
+
+Two tiers:
+- In-process LRU with per-entry TTL
+- Optional Redis tier shared by all workers (LLM_CACHE_REDIS_ENABLED=true)
+
+Entries are grouped by form so ``invalidate_form`` can drop every completion
+generated for a form after its questions or settings change. In Redis this is
+done with a per-form generation counter that is part of the key, so
+invalidation is a single INCR and stale keys simply expire. Other workers drop
+their in-process entries for the form through the cache invalidation bus.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set
+
+from .cache_invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_NAMESPACE = "_global"
+
+
+def make_cache_key(model_name: str, params: Dict[str, Any], messages: List[Dict[str, Any]]) -> str:
+    """Stable hash of everything that determines an LLM completion"""
+    payload = json.dumps(
+        {"model": model_name, "params": params, "messages": messages},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier (LRU + optional Redis) cache of LLM completions with per-form invalidation"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        default_ttl: float = 3600.0,
+        redis_url: Optional[str] = None,
+        redis_enabled: bool = False,
+        enabled: bool = True
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self.redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379')
+        self.redis_enabled = redis_enabled
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._form_keys: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._redis = None
+
+        # Statistics
+        self.stats = {
+            'memory_hits': 0,
+            'redis_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'redis_errors': 0
+        }
+
+    # === Redis tier ===
+
+    def _get_redis(self):
+        """Get sync Redis client (LLM calls run in sync supervisor code)"""
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, decode_responses=True, socket_timeout=0.5)
+        return self._redis
+
+    def _redis_key(self, namespace: str, key: str) -> Optional[str]:
+        """Redis key including the form's current generation (None if Redis failed)"""
+        try:
+            generation = self._get_redis().get(f"llm_cache:gen:{namespace}") or "0"
+        except Exception as e:
+            self.stats['redis_errors'] += 1
+            logger.debug(f"LLM cache Redis generation lookup failed: {e}")
+            return None
+        return f"llm_cache:{namespace}:{generation}:{key}"
+
+    # === Public interface ===
+
+    def get(self, key: str, form_id: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a cached completion.
+
+        Args:
+            key: Key from ``make_cache_key``
+            form_id: Form the prompt was built for (None for prompts not tied to a form)
+
+        Returns:
+            Cached completion text or None
+        """
+        if not self.enabled:
+            return None
+
+        namespace = form_id or GLOBAL_NAMESPACE
+        memory_key = f"{namespace}:{key}"
+
+        with self._lock:
+            entry = self._entries.get(memory_key)
+            if entry is not None:
+                if time.time() <= entry['expires_at']:
+                    self._entries.move_to_end(memory_key)
+                    self.stats['memory_hits'] += 1
+                    return entry['value']
+                self._remove(memory_key, namespace)
+
+        if self.redis_enabled:
+            redis_key = self._redis_key(namespace, key)
+            if redis_key:
+                try:
+                    value = self._get_redis().get(redis_key)
+                except Exception as e:
+                    self.stats['redis_errors'] += 1
+                    logger.debug(f"LLM cache Redis read failed: {e}")
+                    value = None
+                if value is not None:
+                    self.stats['redis_hits'] += 1
+                    self._store_memory(memory_key, namespace, value, self.default_ttl)
+                    return value
+
+        self.stats['misses'] += 1
+        return None
+
+    def set(self, key: str, value: str, form_id: Optional[str] = None, ttl: Optional[float] = None) -> None:
+        """
+        Store a completion.
+
+        Args:
+            key: Key from ``make_cache_key``
+            value: Completion text
+            form_id: Form the prompt was built for
+            ttl: Seconds to keep the entry (defaults to ``default_ttl``)
+        """
+        if not self.enabled or not value:
+            return
+
+        ttl = ttl or self.default_ttl
+        namespace = form_id or GLOBAL_NAMESPACE
+        self._store_memory(f"{namespace}:{key}", namespace, value, ttl)
+        self.stats['stores'] += 1
+
+        if self.redis_enabled:
+            redis_key = self._redis_key(namespace, key)
+            if redis_key:
+                try:
+                    self._get_redis().setex(redis_key, int(ttl), value)
+                except Exception as e:
+                    self.stats['redis_errors'] += 1
+                    logger.debug(f"LLM cache Redis write failed: {e}")
+
+    def invalidate_form(self, form_id: str) -> int:
+        """
+        Drop every cached completion generated for a form.
+
+        Returns:
+            Number of in-process entries removed
+        """
+        removed = self.forget_form(form_id)
+
+        if self.redis_enabled:
+            try:
+                self._get_redis().incr(f"llm_cache:gen:{form_id}")
+            except Exception as e:
+                self.stats['redis_errors'] += 1
+                logger.warning(f"LLM cache Redis invalidation failed for form {form_id}: {e}")
+
+        self.stats['invalidations'] += 1
+        logger.info(f"Invalidated {removed} cached LLM responses for form {form_id}")
+        return removed
+
+    def forget_form(self, form_id: str) -> int:
+        """
+        Drop a form's completions from the in-process tier only.
+
+        Other workers run this from the cache invalidation bus; the Redis
+        generation is bumped once, by the worker calling ``invalidate_form``.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = self._form_keys.pop(form_id, set())
+            for memory_key in keys:
+                self._entries.pop(memory_key, None)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Clear the in-process tier"""
+        with self._lock:
+            self._entries.clear()
+            self._form_keys.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate counters"""
+        hits = self.stats['memory_hits'] + self.stats['redis_hits']
+        total_requests = hits + self.stats['misses']
+        hit_rate = (hits / total_requests * 100) if total_requests > 0 else 0
+
+        return {
+            **self.stats,
+            'total_requests': total_requests,
+            'total_hits': hits,
+            'hit_rate_percent': round(hit_rate, 2),
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'redis_enabled': self.redis_enabled
+        }
+
+    # === Internals ===
+
+    def _store_memory(self, memory_key: str, namespace: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[memory_key] = {'value': value, 'expires_at': time.time() + ttl}
+            self._entries.move_to_end(memory_key)
+            self._form_keys.setdefault(namespace, set()).add(memory_key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key, _ = self._entries.popitem(last=False)
+                self._form_keys.get(oldest_key.split(':', 1)[0], set()).discard(oldest_key)
+                self.stats['evictions'] += 1
+
+    def _remove(self, memory_key: str, namespace: str) -> None:
+        self._entries.pop(memory_key, None)
+        self._form_keys.get(namespace, set()).discard(memory_key)
+
+
+# Global instance
+llm_cache = LLMResponseCache(
+    max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '512')),
+    default_ttl=float(os.getenv('LLM_CACHE_TTL_SECONDS', '3600')),
+    redis_enabled=os.getenv('LLM_CACHE_REDIS_ENABLED', 'false').lower() == 'true',
+    enabled=os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+)
+invalidation_bus.register("form", llm_cache.forget_form)
+invalidation_bus.register_reset(llm_cache.clear)
+
+# Export main components
+__all__ = [
+    'LLMResponseCache',
+    'llm_cache',
+    'make_cache_key'
+]
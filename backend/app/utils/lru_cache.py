@@ -0,0 +1,354 @@
+"""
+Bounded LRU + TTL Cache
+
+In-process cache for expensive reads (form questions, client info, health
+metrics):
+
+- At most ``max_size`` entries; the least recently used entry is evicted
+- Per-entry TTL, after which an entry may still be served for ``stale_ttl``
+  seconds while one background reload refreshes it (stale-while-revalidate)
+- ``get_or_load`` / ``aget_or_load`` coalesce concurrent misses for a key
+  into a single loader call (single-flight), so an expiring popular entry
+  causes one reload instead of a thundering herd
+- A load that races ``delete``/``clear`` is returned to its callers but not stored
+- Hit, miss, stale, load, coalesce and eviction counters via ``get_stats``
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'stale_until')
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class _Flight:
+    """One in-progress sync load that other callers wait on"""
+    __slots__ = ('event', 'value', 'error', 'invalidated')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+        self.invalidated = False
+
+
+class LRUTTLCache:
+    """Thread-safe bounded LRU cache with TTL, single-flight loading and stale-while-revalidate"""
+
+    def __init__(self, default_ttl: float = 300.0, max_size: int = 1024, stale_ttl: float = 0.0, name: str = "cache"):
+        """
+        Initialize the cache.
+
+        Args:
+            default_ttl: Seconds an entry is fresh
+            max_size: Maximum number of entries (least recently used are evicted)
+            stale_ttl: Seconds past expiry an entry is still served by
+                ``get_or_load``/``aget_or_load`` while it is reloaded in the background
+            name: Label used in logs and stats
+        """
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._async_flights: Dict[Hashable, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._refreshing: set = set()
+        self._tasks: set = set()
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {
+            'hits': 0, 'misses': 0, 'stale_hits': 0, 'loads': 0, 'load_errors': 0,
+            'coalesced': 0, 'refreshes': 0, 'evictions': 0, 'expirations': 0
+        }
+
+    # === Basic operations ===
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Fresh value for ``key``, or None"""
+        with self._lock:
+            entry, fresh = self._lookup(key, time.monotonic())
+            if entry is not None and fresh:
+                self.stats['hits'] += 1
+                return entry.value
+            self.stats['misses'] += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` for ``ttl`` seconds (``default_ttl`` when omitted)"""
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove ``key``; a load already running for it will not be stored"""
+        with self._lock:
+            self._invalidate_flight(key)
+            return self._entries.pop(key, None) is not None
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Remove every entry for which ``predicate(key, value)`` is true; returns the count"""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if predicate(key, entry.value)]
+            for key in keys:
+                self._invalidate_flight(key)
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove every entry; loads already running will not be stored"""
+        with self._lock:
+            self._entries.clear()
+            for key in list(self._flights) + list(self._async_flights):
+                self._invalidate_flight(key)
+
+    def cleanup_expired(self) -> int:
+        """Remove entries past their stale window and return the count"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if now >= entry.stale_until]
+            for key in expired:
+                del self._entries[key]
+            self.stats['expirations'] += len(expired)
+        return len(expired)
+
+    def keys(self) -> List[Hashable]:
+        """Snapshot of the cached keys, least recently used first"""
+        with self._lock:
+            return list(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # === Loading ===
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None, force: bool = False) -> Any:
+        """
+        Cached value for ``key``, calling ``loader()`` once on a miss however
+        many threads ask concurrently. Loader exceptions propagate to every
+        waiting caller and nothing is cached; a None result is not cached.
+
+        Args:
+            key: Cache key
+            loader: Zero-argument function producing the value
+            ttl: Entry lifetime (``default_ttl`` when omitted)
+            force: Ignore the cached entry and reload (still single-flight)
+        """
+        with self._lock:
+            if not force:
+                entry, fresh = self._lookup(key, time.monotonic())
+                if entry is not None:
+                    if fresh:
+                        self.stats['hits'] += 1
+                    else:
+                        self.stats['stale_hits'] += 1
+                        self._schedule_refresh(key, loader, ttl)
+                    return entry.value
+            self.stats['misses'] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.stats['load_errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self.stats['loads'] += 1
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if flight.error is None and not flight.invalidated and flight.value is not None:
+                    self._store(key, flight.value, ttl)
+            flight.event.set()
+        return flight.value
+
+    async def aget_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        force: bool = False
+    ) -> Any:
+        """``get_or_load`` for coroutine loaders; concurrent misses on one event loop share a single load"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not force:
+                entry, fresh = self._lookup(key, time.monotonic())
+                if entry is not None:
+                    if fresh:
+                        self.stats['hits'] += 1
+                    else:
+                        self.stats['stale_hits'] += 1
+                        self._schedule_async_refresh(key, loader, ttl, loop)
+                    return entry.value
+            self.stats['misses'] += 1
+            in_flight = self._async_flights.get(key)
+            if in_flight is not None and in_flight[0] is loop:
+                self.stats['coalesced'] += 1
+                future = in_flight[1]
+            else:
+                future = loop.create_future()
+                self._async_flights[key] = (loop, future)
+                in_flight = None
+
+        if in_flight is not None:
+            # shield: a cancelled waiter must not cancel the shared load
+            return await asyncio.shield(future)
+
+        try:
+            value = await loader()
+        except BaseException as e:
+            with self._lock:
+                self.stats['loads'] += 1
+                self.stats['load_errors'] += 1
+                self._finish_async_flight(key, future)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Waiters re-raise it; mark it retrieved when nobody was waiting
+                future.exception()
+            raise
+        with self._lock:
+            self.stats['loads'] += 1
+            stored = self._finish_async_flight(key, future)
+            if stored and value is not None:
+                self._store(key, value, ttl)
+        future.set_result(value)
+        return value
+
+    # === Metrics ===
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus size and hit rate"""
+        stats = dict(self.stats)
+        served = stats['hits'] + stats['stale_hits']
+        requests = served + stats['misses']
+        stats.update(
+            name=self.name,
+            size=len(self._entries),
+            max_size=self.max_size,
+            hit_rate_percent=round(served / requests * 100, 2) if requests else 0
+        )
+        return stats
+
+    def reset_stats(self) -> None:
+        """Zero the counters"""
+        self.stats = self._empty_stats()
+
+    # === Internals (call with the lock held) ===
+
+    def _lookup(self, key: Hashable, now: float) -> Tuple[Optional[_Entry], bool]:
+        """(entry, fresh) for a usable entry, (None, False) otherwise"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        if now >= entry.stale_until:
+            del self._entries[key]
+            self.stats['expirations'] += 1
+            return None, False
+        self._entries.move_to_end(key)
+        return entry, now < entry.expires_at
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.monotonic()
+        self._entries[key] = _Entry(value, now + ttl, now + ttl + self.stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _invalidate_flight(self, key: Hashable) -> None:
+        flight = self._flights.pop(key, None)
+        if flight is not None:
+            flight.invalidated = True
+        # A later load for the key starts a new flight instead of joining this one
+        self._async_flights.pop(key, None)
+
+    def _finish_async_flight(self, key: Hashable, future: asyncio.Future) -> bool:
+        """Drop the flight record; False if it was invalidated while loading"""
+        in_flight = self._async_flights.get(key)
+        if in_flight is not None and in_flight[1] is future:
+            del self._async_flights[key]
+            return True
+        return False
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float]) -> None:
+        if key in self._refreshing or key in self._flights:
+            return
+        self._refreshing.add(key)
+        self.stats['refreshes'] += 1
+
+        def refresh():
+            try:
+                self.get_or_load(key, loader, ttl, force=True)
+            except Exception as e:
+                logger.warning(f"{self.name}: background refresh of {key!r} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        from .async_operations import get_thread_pool
+        get_thread_pool().submit(refresh)
+
+    def _schedule_async_refresh(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+        loop: asyncio.AbstractEventLoop
+    ) -> None:
+        if key in self._refreshing or key in self._async_flights:
+            return
+        self._refreshing.add(key)
+        self.stats['refreshes'] += 1
+
+        async def refresh():
+            try:
+                await self.aget_or_load(key, loader, ttl, force=True)
+            except Exception as e:
+                logger.warning(f"{self.name}: background refresh of {key!r} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        task = loop.create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+# Export main components
+__all__ = [
+    'LRUTTLCache'
+]
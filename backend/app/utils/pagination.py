@@ -0,0 +1,166 @@
+"""
+Keyset (cursor) pagination for admin listings.
+
+Offset paging (``.range(offset, offset + limit - 1)``) makes the database read
+and discard every row before the requested page, so deep pages on large
+clients get slower the further they go. Keyset paging instead filters on the
+sort key of the last row seen - ``(created_at, id) < (:created_at, :id)`` - and
+always reads just one page from the index.
+
+Cursors are opaque to clients: a URL-safe base64 JSON document holding the
+sort values of the boundary row, the paging direction and the sort the cursor
+was issued for. Every listing orders on a unique ``id`` tiebreak so the order
+is total and no row is skipped or repeated between pages. Sort columns must be
+NOT NULL (migration 116): a NULL cannot be compared with ``lt``/``gt``, so
+cursors holding one are rejected.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# (column, descending) pairs, most significant first; the last is the unique tiebreak
+SortOrder = Sequence[Tuple[str, bool]]
+
+NEXT = "next"
+PREV = "prev"
+
+
+def sort_signature(order: SortOrder) -> str:
+    """Identify a sort order so a cursor cannot be replayed against another one"""
+    return ",".join(f"{column}:{'desc' if descending else 'asc'}" for column, descending in order)
+
+
+def encode_cursor(values: Sequence[Any], direction: str, order: SortOrder) -> str:
+    """
+    Build an opaque cursor.
+
+    Args:
+        values: Sort values of the boundary row, in ``order`` order
+        direction: ``next`` (rows after the boundary) or ``prev`` (rows before it)
+        order: Sort order of the listing
+    """
+    payload = json.dumps({"v": list(values), "d": direction, "s": sort_signature(order)}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order: SortOrder) -> Tuple[List[Any], str]:
+    """
+    Read a cursor produced by ``encode_cursor``.
+
+    Returns:
+        (boundary sort values, direction)
+
+    Raises:
+        ValueError: The cursor is malformed or was issued for a different sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError("Malformed cursor") from e
+
+    if not isinstance(payload, dict) or payload.get("d") not in (NEXT, PREV):
+        raise ValueError("Malformed cursor")
+    if payload.get("s") != sort_signature(order):
+        raise ValueError("Cursor does not match the requested sort order")
+    values = payload.get("v")
+    if not isinstance(values, list) or len(values) != len(order) or any(v is None for v in values):
+        raise ValueError("Malformed cursor")
+    return values, payload["d"]
+
+
+def _filter_value(value: Any) -> str:
+    """Quote a value for a PostgREST logic-tree filter (timestamps contain reserved characters)"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def keyset_filter(order: SortOrder, values: Sequence[Any], direction: str) -> str:
+    """
+    PostgREST ``or`` filter selecting rows after (``next``) or before (``prev``) a boundary row.
+
+    For ``[(created_at, desc), (id, desc)]`` and direction ``next`` this is
+    ``created_at.lt.X,and(created_at.eq.X,id.lt.Y)``.
+    """
+    branches = []
+    for depth, (column, descending) in enumerate(order):
+        after = descending == (direction == NEXT)
+        terms = [f"{c}.eq.{_filter_value(v)}" for (c, _), v in zip(order[:depth], values[:depth])]
+        terms.append(f"{column}.{'lt' if after else 'gt'}.{_filter_value(values[depth])}")
+        branches.append(terms[0] if len(terms) == 1 else f"and({','.join(terms)})")
+    return ",".join(branches)
+
+
+def apply_keyset(query, order: SortOrder, limit: int, cursor: Optional[str] = None):
+    """
+    Order, filter and limit a PostgREST query for one page.
+
+    One row more than ``limit`` is requested so ``paginate_rows`` can tell
+    whether another page exists. ``prev`` pages are read in reverse order.
+
+    Returns:
+        (query, direction or None when no cursor was given)
+
+    Raises:
+        ValueError: Invalid cursor
+    """
+    direction = None
+    if cursor:
+        values, direction = decode_cursor(cursor, order)
+        query = query.or_(keyset_filter(order, values, direction))
+
+    reverse = direction == PREV
+    for column, descending in order:
+        query = query.order(column, desc=descending != reverse)
+    return query.limit(limit + 1), direction
+
+
+def paginate_rows(
+    rows: List[Dict[str, Any]],
+    order: SortOrder,
+    limit: int,
+    direction: Optional[str],
+    key: Optional[Callable[[Dict[str, Any]], Sequence[Any]]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+    """
+    Trim a fetched page and build its cursors.
+
+    Args:
+        rows: Up to ``limit + 1`` rows as returned by the query (reversed for ``prev``)
+        order: Sort order of the listing
+        limit: Page size
+        direction: Direction of the cursor the page was requested with, or None
+        key: Sort values of a row (defaults to the ``order`` columns)
+
+    Returns:
+        (page rows in listing order, next_cursor, prev_cursor)
+    """
+    key = key or (lambda row: [row[column] for column, _ in order])
+    has_more = len(rows) > limit
+    page = rows[:limit]
+    if direction == PREV:
+        page.reverse()
+    if not page:
+        return page, None, None
+
+    # Moving backwards proves there is a page after; moving forwards, one before
+    more_after = has_more if direction != PREV else True
+    more_before = has_more if direction == PREV else direction == NEXT
+
+    next_cursor = encode_cursor(key(page[-1]), NEXT, order) if more_after else None
+    prev_cursor = encode_cursor(key(page[0]), PREV, order) if more_before else None
+    return page, next_cursor, prev_cursor
+
+
+# Export main components
+__all__ = [
+    'encode_cursor',
+    'decode_cursor',
+    'keyset_filter',
+    'apply_keyset',
+    'paginate_rows'
+]
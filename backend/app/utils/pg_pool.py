@@ -0,0 +1,110 @@
+"""
+Pooled Async Postgres Connections
+
+Direct Postgres access for analytical SQL that PostgREST cannot express
+(CTEs, ``GROUP BY`` with ``HAVING``, window functions). Queries run through an
+asyncpg pool; asyncpg prepares every statement server-side and keeps it in a
+per-connection cache keyed by the statement text, so parameterized queries
+with constant SQL are parsed and planned once per connection and then only
+bound and executed.
+
+Requires ``asyncpg`` and ``DATABASE_URL`` (the Supabase direct or session-mode
+pooler connection string - transaction-mode pooling on port 6543 does not keep
+prepared statements between transactions).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresPool:
+    """Lazily created asyncpg pools, one per event loop that uses them"""
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        min_size: int = 1,
+        max_size: int = 5,
+        statement_cache_size: int = 100,
+        command_timeout: float = 30
+    ):
+        """
+        Initialize the pool settings.
+
+        Args:
+            dsn: Postgres connection string (defaults to DATABASE_URL)
+            min_size: Connections opened up front (per event loop)
+            max_size: Maximum pooled connections (per event loop)
+            statement_cache_size: Prepared statements kept per connection
+            command_timeout: Seconds before a query is cancelled
+        """
+        self.dsn = dsn or os.getenv('DATABASE_URL')
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.command_timeout = command_timeout
+        # asyncpg connections belong to the loop they were opened on, so a second
+        # loop (e.g. a background thread's asyncio.run) gets its own pool rather
+        # than replacing the one the request loop is using
+        self._pools: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+
+    def _forget_closed_loops(self) -> None:
+        # Nothing can run on a closed loop, so its pool can only be dropped
+        for loop in [loop for loop in self._pools if loop.is_closed()]:
+            del self._pools[loop]
+        for loop in [loop for loop in self._locks if loop.is_closed()]:
+            del self._locks[loop]
+
+    async def get_pool(self):
+        """Pool bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is not None:
+            return pool
+
+        self._forget_closed_loops()
+        lock = self._locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            pool = self._pools.get(loop)
+            if pool is not None:
+                return pool
+            if not self.dsn:
+                raise RuntimeError("DATABASE_URL is not configured")
+
+            import asyncpg
+
+            pool = self._pools[loop] = await asyncpg.create_pool(
+                self.dsn,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                statement_cache_size=self.statement_cache_size,
+                command_timeout=self.command_timeout
+            )
+            logger.info(f"Postgres pool created ({self.min_size}-{self.max_size} connections)")
+        return pool
+
+    async def fetch(self, query: str, *args: Any) -> List[Any]:
+        """Run a parameterized query (``$1``, ``$2``, ...) and return its records"""
+        pool = await self.get_pool()
+        return await pool.fetch(query, *args)
+
+    async def close(self) -> None:
+        """Close the running event loop's pool"""
+        loop = asyncio.get_running_loop()
+        self._locks.pop(loop, None)
+        pool = self._pools.pop(loop, None)
+        if pool is not None:
+            await pool.close()
+        self._forget_closed_loops()
+
+
+# Global instance
+pg_pool = PostgresPool(
+    min_size=int(os.getenv('DATABASE_POOL_MIN_SIZE', '1')),
+    max_size=int(os.getenv('DATABASE_POOL_MAX_SIZE', '5'))
+)
@@ -0,0 +1,221 @@
+"""
+Precomputed Question Phrasing Variants
+
+Generates several marketing rephrasings of every question of a form in one LLM
+call and stores them on the ``form_questions`` rows (``phrasing_variants``),
+together with a few step headline/message pairs on the form
+(``engagement_variants``). The survey admin supervisor picks a stored variant
+at runtime and only calls the LLM when a selected question has none.
+
+Run for one form or every active form:
+    python -m app.utils.phrasing_variants --form-id <uuid>
+    python -m app.utils.phrasing_variants --all
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_PER_QUESTION = int(os.getenv('PHRASING_VARIANTS_PER_QUESTION', '3'))
+
+SYSTEM_PROMPT = """You are a Marketing Copywriting Expert who rephrases survey questions for service businesses.
+Rephrase each question in a conversational, benefit-focused way that keeps its original intent.
+Do not address the visitor by name and do not refer to earlier answers - each phrasing must work at any point in the survey.
+
+OUTPUT FORMAT (one item per line, nothing else):
+QUESTION_[number]_VARIANT_[n]: [rephrased question]
+HEADLINE_[n]: [compelling, benefit-focused step headline]
+MESSAGE_[n]: [marketing message highlighting business benefits under 50 words]"""
+
+_QUESTION_LINE = re.compile(r'^QUESTION[_\s]*(\d+)[_\s]*VARIANT[_\s]*(\d+)\s*:\s*(.+)$', re.IGNORECASE)
+_HEADLINE_LINE = re.compile(r'^HEADLINE[_\s]*(\d+)\s*:\s*(.+)$', re.IGNORECASE)
+_MESSAGE_LINE = re.compile(r'^MESSAGE[_\s]*(\d+)\s*:\s*(.+)$', re.IGNORECASE)
+
+
+# === Runtime helpers ===
+
+def question_variants(question: Dict[str, Any]) -> List[str]:
+    """
+    Stored phrasings for a question row.
+
+    Variants generated from a different question_text (the question was edited
+    after generation) are ignored.
+    """
+    stored = question.get('phrasing_variants') or {}
+    if not isinstance(stored, dict) or stored.get('question_text') != question.get('question_text'):
+        return []
+    return [v for v in stored.get('variants', []) if isinstance(v, str) and v.strip()]
+
+
+def pick_variant(variants: List[Any], session_id: Optional[str], salt: Any = "") -> Any:
+    """Pick a variant, stable for the same session so repeated renders match"""
+    digest = hashlib.sha1(f"{session_id or ''}:{salt}".encode("utf-8")).hexdigest()
+    return variants[int(digest, 16) % len(variants)]
+
+
+# === Generation ===
+
+def build_variants_prompt(client: Dict[str, Any], questions: List[Dict[str, Any]], count: int) -> str:
+    """User prompt asking for ``count`` variants per question plus engagement copy"""
+    business_context = f"Business: {client.get('name', 'our business')} ({client.get('industry', 'service business')})"
+    if client.get('background'):
+        business_context += f"\nBackground: {client['background'][:100]}"
+    if client.get('target_audience'):
+        business_context += f"\nTarget: {client['target_audience'][:100]}"
+
+    numbered = "\n".join(f"{q['question_id']}. {q.get('question_text', '')}" for q in questions)
+
+    return f"""# DATA FOR THIS REQUEST
+{business_context}
+
+# QUESTIONS
+{numbered}
+
+# TASK
+Write {count} different rephrasings of every question, and {count} headline/message pairs."""
+
+
+def parse_variants_response(content: str) -> Dict[str, Any]:
+    """
+    Parse the LLM output.
+
+    Returns:
+        ``{"questions": {question_id: [variant, ...]}, "engagement": [{"headline", "message"}, ...]}``
+    """
+    questions: Dict[int, List[str]] = {}
+    headlines: Dict[int, str] = {}
+    messages: Dict[int, str] = {}
+
+    for line in (l.strip() for l in content.split('\n')):
+        if not line:
+            continue
+        match = _QUESTION_LINE.match(line)
+        if match:
+            questions.setdefault(int(match.group(1)), []).append(match.group(3).strip())
+            continue
+        match = _HEADLINE_LINE.match(line)
+        if match:
+            headlines[int(match.group(1))] = match.group(2).strip()
+            continue
+        match = _MESSAGE_LINE.match(line)
+        if match:
+            messages[int(match.group(1))] = match.group(2).strip()
+
+    engagement = [
+        {"headline": headlines[n], "message": messages.get(n, "")}
+        for n in sorted(headlines)
+    ]
+    return {"questions": questions, "engagement": engagement}
+
+
+def generate_form_variants(form_id: str, count: int = VARIANTS_PER_QUESTION, database=None, llm=None) -> Dict[str, Any]:
+    """
+    Generate and store phrasing variants for every question of a form.
+
+    Args:
+        form_id: Form identifier
+        count: Variants per question
+        database: Sync database client (defaults to ``db``)
+        llm: Chat model (defaults to the supervisor's model)
+
+    Returns:
+        Summary with the number of questions updated
+    """
+    if database is None:
+        from ..database import db as database
+    if llm is None:
+        from ..models import get_chat_model
+        llm = get_chat_model(model_name="gpt-4.1-nano")
+
+    questions = database.get_form_questions(form_id)
+    if not questions:
+        logger.info(f"No questions to phrase for form {form_id}")
+        return {"form_id": form_id, "questions_updated": 0, "engagement_variants": 0}
+
+    client = database.get_client_by_form(form_id) or {}
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_variants_prompt(client, questions, count)}
+    ]
+
+    start_time = datetime.now()
+    response = llm.invoke(messages)
+    content = response.content if hasattr(response, 'content') else str(response)
+    parsed = parse_variants_response(content)
+
+    generated_at = datetime.now().isoformat()
+    updated = 0
+    for question in questions:
+        variants = parsed["questions"].get(question.get('question_id'))
+        if not variants:
+            continue
+        database.update_question_phrasing_variants(form_id, question['question_id'], {
+            "question_text": question.get('question_text'),
+            "variants": variants,
+            "generated_at": generated_at
+        })
+        updated += 1
+
+    if parsed["engagement"]:
+        database.update_form_engagement_variants(form_id, parsed["engagement"])
+
+    if updated:
+        # Cached question rows do not carry the new phrasings yet
+        from .cache_invalidation import invalidation_bus
+        invalidation_bus.publish("form", form_id)
+
+    duration = (datetime.now() - start_time).total_seconds()
+    logger.info(
+        f"Generated phrasing variants for form {form_id} in {duration:.1f}s: "
+        f"{updated}/{len(questions)} questions, {len(parsed['engagement'])} engagement variants"
+    )
+    return {"form_id": form_id, "questions_updated": updated, "engagement_variants": len(parsed["engagement"])}
+
+
+def generate_form_variants_safe(form_id: str, count: int = VARIANTS_PER_QUESTION) -> None:
+    """Background-task wrapper: log failures instead of raising"""
+    try:
+        generate_form_variants(form_id, count)
+    except Exception as e:
+        logger.error(f"Failed to generate phrasing variants for form {form_id}: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute question phrasing variants")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--form-id', help="Form to generate variants for")
+    target.add_argument('--all', action='store_true', help="Every active form")
+    parser.add_argument('--count', type=int, default=VARIANTS_PER_QUESTION, help="Variants per question")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.all:
+        from ..database import db
+        form_ids = [f['id'] for f in db.client.table("forms").select("id").eq("is_active", True).execute().data or []]
+    else:
+        form_ids = [args.form_id]
+
+    for form_id in form_ids:
+        generate_form_variants_safe(form_id, args.count)
+
+
+# Export main components
+__all__ = [
+    'question_variants',
+    'pick_variant',
+    'build_variants_prompt',
+    'parse_variants_response',
+    'generate_form_variants',
+    'generate_form_variants_safe'
+]
+
+
+if __name__ == '__main__':
+    main()
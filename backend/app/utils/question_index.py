@@ -0,0 +1,205 @@
+"""
+Form Question Index
+
+Process-wide, immutable index of each form's questions, built once per form
+version and shared by every request:
+
+- ``by_id``: question_id -> question (read-only mappings)
+- ``order``: question_ids in form order (``question_order``)
+- ``priority``: question_ids with required questions first, then form order
+- ``required``: frozenset of required question_ids
+
+Question availability is then a set difference against the asked ids already
+carried by the step context and graph state, with no database read on the hot
+path. ``invalidate`` bumps the form's version when its questions are saved (or
+their phrasings regenerated), on every worker through the cache invalidation
+bus; an index loaded under an older version is never installed. Indexes also
+expire after ``QUESTION_INDEX_TTL_SECONDS`` as a bound on staleness when the
+bus is disabled.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .cache_invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+
+def _freeze(question: Dict[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType(dict(question))
+
+
+@dataclass(frozen=True)
+class FormQuestionIndex:
+    """Immutable view of one version of a form's questions"""
+
+    form_id: str
+    version: int
+    by_id: Mapping[Any, Mapping[str, Any]]
+    order: Tuple[Any, ...]
+    priority: Tuple[Any, ...]
+    required: frozenset
+    built_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def build(cls, form_id: str, questions: Iterable[Dict[str, Any]], version: int = 0) -> "FormQuestionIndex":
+        """Index rows as returned by ``get_form_questions`` (rows without a question_id are skipped)"""
+        rows = [q for q in questions if q.get('question_id') is not None]
+        rows.sort(key=lambda q: q.get('question_order') or 0)
+
+        order = tuple(q['question_id'] for q in rows)
+        priority = tuple(
+            q['question_id'] for q in sorted(rows, key=lambda q: not q.get('is_required', False))
+        )
+        return cls(
+            form_id=form_id,
+            version=version,
+            by_id=MappingProxyType({q['question_id']: _freeze(q) for q in rows}),
+            order=order,
+            priority=priority,
+            required=frozenset(q['question_id'] for q in rows if q.get('is_required', False))
+        )
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def questions(self) -> List[Dict[str, Any]]:
+        """All questions in form order (copies, so callers may annotate them)"""
+        return [dict(self.by_id[question_id]) for question_id in self.order]
+
+    def available(self, asked: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Questions not yet asked, in form order (copies)"""
+        asked = asked if isinstance(asked, (set, frozenset)) else set(asked)
+        return [dict(self.by_id[question_id]) for question_id in self.order if question_id not in asked]
+
+    def prioritized(self, asked: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Questions not yet asked, required first, then form order (copies)"""
+        asked = asked if isinstance(asked, (set, frozenset)) else set(asked)
+        return [dict(self.by_id[question_id]) for question_id in self.priority if question_id not in asked]
+
+
+class QuestionIndexRegistry:
+    """Versioned per-form ``FormQuestionIndex`` store with explicit invalidation"""
+
+    def __init__(self, ttl_seconds: float = 300.0):
+        """
+        Initialize the registry.
+
+        Args:
+            ttl_seconds: Seconds an index is served before it is rebuilt
+                (bounds staleness for edits made by other workers; 0 disables expiry)
+        """
+        self.ttl_seconds = ttl_seconds
+        self._indexes: Dict[str, FormQuestionIndex] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'builds': 0, 'stale_builds': 0, 'invalidations': 0}
+
+    def version(self, form_id: str) -> int:
+        """Current version of a form's questions in this process"""
+        return self._versions.get(form_id, 0)
+
+    def peek(self, form_id: str) -> Optional[FormQuestionIndex]:
+        """Current index for a form, or None when it is missing or expired"""
+        index = self._indexes.get(form_id)
+        if index is None or index.version != self.version(form_id) or self._expired(index):
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return index
+
+    def store(self, form_id: str, questions: Iterable[Dict[str, Any]], version: Optional[int] = None) -> FormQuestionIndex:
+        """
+        Build an index from freshly loaded question rows and install it.
+
+        Args:
+            form_id: Form identifier
+            questions: Rows from ``get_form_questions``
+            version: ``version(form_id)`` read before the rows were loaded; if the
+                form was invalidated in between, the index is returned but not installed
+        """
+        with self._lock:
+            current = self.version(form_id)
+            index = FormQuestionIndex.build(form_id, questions, current if version is None else version)
+            self.stats['builds'] += 1
+            if index.version == current:
+                self._indexes[form_id] = index
+            else:
+                self.stats['stale_builds'] += 1
+                logger.debug(f"Question index for form {form_id} was invalidated while loading, not caching it")
+        return index
+
+    def get(self, form_id: str, loader: Optional[Callable[[str], List[Dict[str, Any]]]] = None) -> FormQuestionIndex:
+        """Index for a form, loading its questions with ``loader`` (default ``db.get_form_questions``) on a miss"""
+        index = self.peek(form_id)
+        if index is not None:
+            return index
+        if loader is None:
+            from ..database import db
+            loader = db.get_form_questions
+        version = self.version(form_id)
+        return self.store(form_id, loader(form_id) or [], version)
+
+    async def aget(
+        self,
+        form_id: str,
+        loader: Optional[Callable[[str], Awaitable[List[Dict[str, Any]]]]] = None
+    ) -> FormQuestionIndex:
+        """``get`` for async callers (default loader ``db_async.get_form_questions``)"""
+        index = self.peek(form_id)
+        if index is not None:
+            return index
+        if loader is None:
+            from ..async_database import db_async
+            loader = db_async.get_form_questions
+        version = self.version(form_id)
+        return self.store(form_id, await loader(form_id) or [], version)
+
+    def invalidate(self, form_id: str) -> int:
+        """
+        Drop a form's index and bump its version.
+
+        Returns:
+            The new version
+        """
+        with self._lock:
+            version = self.version(form_id) + 1
+            self._versions[form_id] = version
+            self._indexes.pop(form_id, None)
+        self.stats['invalidations'] += 1
+        logger.info(f"Invalidated question index for form {form_id} (version {version})")
+        return version
+
+    def clear(self) -> None:
+        """Drop every index (versions are kept so in-flight loads are still discarded)"""
+        with self._lock:
+            self._indexes.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Registry statistics"""
+        return {**self.stats, 'forms': len(self._indexes)}
+
+    def _expired(self, index: FormQuestionIndex) -> bool:
+        return bool(self.ttl_seconds) and time.monotonic() - index.built_at > self.ttl_seconds
+
+
+# Global instance
+question_index = QuestionIndexRegistry(
+    ttl_seconds=float(os.getenv('QUESTION_INDEX_TTL_SECONDS', '300'))
+)
+invalidation_bus.register("form", question_index.invalidate)
+invalidation_bus.register_reset(question_index.clear)
+
+
+# Export main components
+__all__ = [
+    'FormQuestionIndex',
+    'QuestionIndexRegistry',
+    'question_index'
+]
@@ -7,10 +7,15 @@ All API endpoints should use these helpers to ensure consistent format:
   "data": object | null,
   "message": string
 }
+
+Responses are SanitizedJSONResponse, so with ResponseSanitizationMiddleware
+enabled their content is sanitized before it is encoded.
 """
+import json
 from typing import Any, Dict, Optional
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
+from app.middleware.response_sanitization import SanitizedJSONResponse
 
 
 def success_response(
@@ -29,7 +34,7 @@ def success_response(
     Returns:
         JSONResponse with consistent format
     """
-    return JSONResponse(
+    return SanitizedJSONResponse(
         content={
             "success": True,
             "data": data,
@@ -55,7 +60,7 @@ def error_response(
     Returns:
         JSONResponse with consistent format
     """
-    return JSONResponse(
+    return SanitizedJSONResponse(
         content={
             "success": False,
             "data": data,
@@ -79,7 +84,7 @@ def validation_error_response(
     Returns:
         JSONResponse with validation errors
     """
-    return JSONResponse(
+    return SanitizedJSONResponse(
         content={
             "success": False,
             "data": {
@@ -107,7 +112,7 @@ def server_error_response(
     """
     data = {"error_id": error_id} if error_id else None
     
-    return JSONResponse(
+    return SanitizedJSONResponse(
         content={
             "success": False,
             "data": data,
@@ -135,11 +140,25 @@ def not_found_response(
     if resource_id:
         message += f": {resource_id}"
         
-    return JSONResponse(
+    return SanitizedJSONResponse(
         content={
             "success": False,
             "data": {"resource": resource, "resource_id": resource_id} if resource_id else None,
             "message": message
         },
         status_code=404
-    )
\ No newline at end of file
+    )
+
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Format one Server-Sent Events message.
+    
+    Args:
+        event: Event name (the client's ``addEventListener`` type)
+        data: JSON-serializable payload
+        
+    Returns:
+        Message text including the terminating blank line
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
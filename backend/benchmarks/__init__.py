@@ -0,0 +1 @@
+"""Micro-benchmarks for hot paths. Run from backend/: ``python -m benchmarks.<name>``."""
@@ -0,0 +1,193 @@
+"""
+SurveyAnalytics query cost: literal SQL vs prepared, parameterized statements.
+
+Before: values were formatted into the SQL text, so every call with different
+values was a new statement that Postgres parsed and planned from scratch.
+After: constant SQL with ``$n`` parameters through the asyncpg pool, prepared
+once per connection and re-executed with new values.
+
+Builds a synthetic dataset in its own schema (``bench_analytics``, dropped at
+the end unless ``--keep``) and needs a Postgres you can create schemas in:
+
+Usage (from backend/):
+    DATABASE_URL=postgresql://... python -m benchmarks.analytics_queries [--sessions 1000000] [--iterations 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import time
+from decimal import Decimal
+
+import asyncpg
+
+from app.utils.analytics_queries import (
+    ABANDONMENT_ALERTS_SQL,
+    ABANDONMENT_BY_STEP_SQL,
+    CONVERSION_BY_UTM_SOURCE_SQL,
+    DAILY_PERFORMANCE_SQL
+)
+
+SCHEMA = "bench_analytics"
+
+SETUP_SQL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TABLE {SCHEMA}.lead_sessions (
+    id UUID PRIMARY KEY,
+    form_id UUID NOT NULL,
+    session_id TEXT NOT NULL,
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    completed BOOLEAN NOT NULL,
+    step INTEGER NOT NULL,
+    final_score INTEGER,
+    lead_status TEXT NOT NULL,
+    abandonment_status TEXT NOT NULL
+);
+CREATE TABLE {SCHEMA}.tracking_data (
+    session_id UUID NOT NULL,
+    utm_source TEXT,
+    utm_campaign TEXT,
+    utm_medium TEXT
+);
+"""
+
+POPULATE_SQL = f"""
+WITH forms AS (
+    SELECT array_agg(gen_random_uuid()) AS ids FROM generate_series(1, 50)
+)
+INSERT INTO {SCHEMA}.lead_sessions
+SELECT
+    gen_random_uuid(),
+    forms.ids[1 + (n % 50)],
+    'session-' || n,
+    started,
+    CASE WHEN n % 3 = 0 THEN started + (30 + random() * 600) * interval '1 second' END,
+    n % 3 = 0,
+    1 + (n % 8),
+    (random() * 100)::int,
+    (ARRAY['yes', 'maybe', 'no', 'unknown'])[1 + (n % 4)],
+    CASE WHEN n % 5 = 0 THEN 'abandoned' ELSE 'active' END
+FROM forms,
+     generate_series(1, $1::int) AS n,
+     -- references n so random() is evaluated per row
+     LATERAL (SELECT NOW() - random() * interval '90 days' + n * interval '0 seconds' AS started) s;
+
+INSERT INTO {SCHEMA}.tracking_data
+SELECT
+    id,
+    (ARRAY['google', 'facebook', 'linkedin', 'newsletter', 'bing'])[1 + (abs(hashtext(session_id)) % 5)],
+    'campaign-' || (abs(hashtext(session_id)) % 20),
+    (ARRAY['cpc', 'social', 'email'])[1 + (abs(hashtext(session_id)) % 3)]
+FROM {SCHEMA}.lead_sessions
+WHERE abs(hashtext(session_id)) % 10 < 7;
+
+CREATE INDEX ON {SCHEMA}.lead_sessions(started_at);
+CREATE INDEX ON {SCHEMA}.lead_sessions(form_id);
+CREATE INDEX ON {SCHEMA}.tracking_data(session_id);
+ANALYZE {SCHEMA}.lead_sessions;
+ANALYZE {SCHEMA}.tracking_data;
+"""
+
+_PARAM = re.compile(r"\$(\d+)(::[a-z]+(?:\[\])?)?")
+
+
+def literal(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, (list, tuple)):
+        return "ARRAY[" + ", ".join(literal(v) for v in value) + "]"
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def inline(sql: str, args: tuple) -> str:
+    """SQL with the values formatted into the text (the previous f-string approach)"""
+    return _PARAM.sub(lambda m: literal(args[int(m.group(1)) - 1]) + (m.group(2) or ""), sql)
+
+
+def cases(i: int, form_ids: list):
+    """Query/argument pairs for iteration ``i`` (values vary like real dashboard calls)"""
+    sources = [["google", "facebook"], ["linkedin"], None][i % 3]
+    return {
+        "conversion_by_utm_source": (CONVERSION_BY_UTM_SOURCE_SQL, (7 + i % 24, sources)),
+        "abandonment_by_step": (ABANDONMENT_BY_STEP_SQL, (7 + i % 24, form_ids[i % len(form_ids)])),
+        "daily_performance": (DAILY_PERFORMANCE_SQL, (3 + i % 5,)),
+        "abandonment_alerts": (ABANDONMENT_ALERTS_SQL, (12 + i % 24, 20, Decimal("15.5") + i % 10))
+    }
+
+
+async def plan_and_execution_ms(conn, sql: str, args: tuple):
+    """(planning, execution) milliseconds reported by EXPLAIN ANALYZE for the literal query"""
+    plan = json.loads(await conn.fetchval(f"EXPLAIN (ANALYZE, FORMAT JSON) {inline(sql, args)}"))[0]
+    return plan["Planning Time"], plan["Execution Time"]
+
+
+async def run(dsn: str, sessions: int, iterations: int, keep: bool):
+    settings = {"search_path": SCHEMA}
+    setup = await asyncpg.connect(dsn)
+    try:
+        print(f"Building {sessions:,} synthetic sessions in schema {SCHEMA}...")
+        started = time.perf_counter()
+        await setup.execute(SETUP_SQL)
+        for statement in POPULATE_SQL.split(";\n\n"):
+            if "$1" in statement:
+                await setup.execute(statement, sessions)
+            else:
+                await setup.execute(statement)
+        print(f"  done in {time.perf_counter() - started:.1f}s")
+        form_ids = [str(r[0]) for r in await setup.fetch(f"SELECT DISTINCT form_id FROM {SCHEMA}.lead_sessions LIMIT 10")]
+
+        # Before: no statement cache, literal text per call
+        literal_conn = await asyncpg.connect(dsn, statement_cache_size=0, server_settings=settings)
+        # After: pooled connections with the default prepared statement cache
+        pool = await asyncpg.create_pool(dsn, min_size=1, max_size=1, server_settings=settings)
+
+        print(f"\n{'query':<26} {'literal ms':>11} {'prepared ms':>12} {'plan ms':>9} {'exec ms':>9}")
+        for name in cases(0, form_ids):
+            literal_times, prepared_times = [], []
+            for i in range(iterations):
+                sql, args = cases(i, form_ids)[name]
+
+                t0 = time.perf_counter()
+                await literal_conn.fetch(inline(sql, args))
+                literal_times.append((time.perf_counter() - t0) * 1000)
+
+                t0 = time.perf_counter()
+                await pool.fetch(sql, *args)
+                prepared_times.append((time.perf_counter() - t0) * 1000)
+
+            plan_ms, exec_ms = await plan_and_execution_ms(literal_conn, *cases(1, form_ids)[name])
+            print(
+                f"{name:<26} {statistics.median(literal_times):>11.2f} {statistics.median(prepared_times):>12.2f}"
+                f" {plan_ms:>9.2f} {exec_ms:>9.2f}"
+            )
+
+        print("\nliteral/prepared: median wall time per call; plan/exec: EXPLAIN ANALYZE of one literal call")
+        await literal_conn.close()
+        await pool.close()
+    finally:
+        if not keep:
+            await setup.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await setup.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dsn', default=os.getenv('DATABASE_URL'), help="Postgres connection string (default DATABASE_URL)")
+    parser.add_argument('--sessions', type=int, default=1_000_000)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--keep', action='store_true', help="Keep the synthetic schema for further runs")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("set DATABASE_URL or pass --dsn")
+    asyncio.run(run(args.dsn, args.sessions, args.iterations, args.keep))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Request-path cost of the logging done by one survey step.
+
+Before: every record was formatted and written by the calling thread, through
+the console and JSON file handlers. ``submit_and_continue`` built more than a
+dozen INFO lines per step with f-strings, including dumps of the session data,
+pending responses and graph result.
+After: loggers put records on a bounded queue and a listener thread formats
+and writes them. The dumps are DEBUG lines with lazy ``%s`` arguments, so at
+INFO they cost a level check. At DEBUG they can be sampled per route.
+
+Both configurations write to a temporary log file and to a discarded console
+stream. Only the time spent in the logging calls on the calling thread is
+measured. For the queued runs that time includes contention for the GIL with
+the listener thread, but not the listener's formatting and writes. The
+"same lines" row isolates the queue from the changes to the step's lines. The
+file here is on a local disk; slower sinks (network log shippers, contended
+disks) only add to the synchronous cost.
+
+Usage (from backend/):
+    python -m benchmarks.logging_pipeline [--steps 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+
+from app.utils.fastapi_logging import JSONFormatter, setup_fastapi_logging, stop_log_pipeline
+
+SESSION_ID = "6f1c2b9e-4d7a-4c55-9b1e-0a3f5e8d7c21"
+SESSION_DATA = {"session_id": SESSION_ID, "form_id": "form-42", "client_id": "client-7", "started_at": "2026-10-01T12:00:00"}
+RESPONSES = [{"question_id": q, "answer": "A reasonably detailed answer about the business"} for q in range(3)]
+STATE = {
+    "core": {"session_id": SESSION_ID, "form_id": "form-42", "step": 3, "client_id": "client-7"},
+    "question_strategy": {"asked_questions": list(range(12)), "current_questions": [13, 14], "selection_history": []},
+    "lead_intelligence": {"responses": RESPONSES * 4, "current_score": 42, "lead_status": "warm"},
+    "pending_responses": RESPONSES
+}
+
+
+def step_logging_before(logger):
+    """The step's log lines as they were: f-string INFO lines, dumps included"""
+    logger.info(f"🔥 STEP: Processing step for session: {SESSION_ID}")
+    logger.info(f"🔥 STEP: Full session_data from cookie: {SESSION_DATA}")
+    logger.info(f"🔥 STEP: Prefetching step context for session {SESSION_ID}...")
+    logger.info(f"🔥 STEP: Found session in database: {SESSION_DATA}")
+    logger.info(f"🔥 API DEBUG: Loaded session snapshot with state")
+    logger.info(f"🔥 SNAPSHOT LOADED: asked_questions = {STATE.get('question_strategy', {}).get('asked_questions', [])}")
+    logger.info(f"🔥 API DEBUG: state_update keys = {list(STATE.keys())}")
+    logger.info(f"🔥 API DEBUG: asked_questions = {STATE.get('question_strategy', {}).get('asked_questions', [])}")
+    logger.info(f"🔥 API DEBUG: pending_responses = {RESPONSES}")
+    logger.info(f"🔥 STEP: About to invoke graph with pending_responses: {RESPONSES}")
+    logger.info(f"🔥 STEP: Graph invocation complete!")
+    logger.info(f"🔥 STEP RESULT: lead_intelligence = {STATE.get('lead_intelligence', {})}")
+    logger.info(f"🔥 STEP RESULT: route_decision = {STATE.get('route_decision')}")
+    logger.info(f"🔥 STEP RESULT: step_type = {STATE.get('step_type')}")
+    logger.info(f"🔥 RESULT DEBUG: asked_questions in result = {STATE['question_strategy']['asked_questions']}")
+    logger.info(f"🔥 SNAPSHOT: Saved session snapshot for step 3 with 12 asked questions")
+
+
+def step_logging_after(logger):
+    """The step's log lines now: INFO progress lines, DEBUG dumps with lazy arguments"""
+    logger.info("🔥 STEP: Processing step for session: %s", SESSION_ID)
+    logger.debug("🔥 STEP: Full session_data from cookie: %s", SESSION_DATA)
+    logger.debug("🔥 STEP: Prefetching step context for session %s...", SESSION_ID)
+    logger.debug("🔥 STEP: Found session in database: %s", SESSION_DATA)
+    logger.debug("🔥 API DEBUG: Loaded session snapshot with state")
+    logger.debug("🔥 SNAPSHOT LOADED: asked_questions = %s", STATE.get('question_strategy', {}).get('asked_questions', []))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("🔥 API DEBUG: state_update keys = %s", list(STATE.keys()))
+        logger.debug("🔥 API DEBUG: asked_questions = %s", STATE.get('question_strategy', {}).get('asked_questions', []))
+        logger.debug("🔥 API DEBUG: pending_responses = %s", RESPONSES)
+    logger.debug("🔥 STEP: About to invoke graph with pending_responses: %s", RESPONSES)
+    logger.debug("🔥 STEP: Graph invocation complete!")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("🔥 STEP RESULT: lead_intelligence = %s", STATE.get('lead_intelligence', {}))
+        logger.debug("🔥 STEP RESULT: route_decision = %s", STATE.get('route_decision'))
+        logger.debug("🔥 STEP RESULT: step_type = %s", STATE.get('step_type'))
+    logger.debug("🔥 RESULT DEBUG: asked_questions in result = %s", STATE['question_strategy']['asked_questions'])
+    logger.info("🔥 SNAPSHOT: Saved session snapshot for step %s with %d asked questions", 3, 12)
+
+
+def synchronous_logger(log_file: str) -> logging.Logger:
+    """The previous setup: console and JSON file handlers called inline"""
+    console = logging.StreamHandler(io.StringIO())
+    console.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(JSONFormatter())
+    logger = logging.getLogger("bench.sync")
+    logger.handlers = [console, file_handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def measure(step_logging, logger, steps: int) -> float:
+    """Mean microseconds per step spent in the logging calls"""
+    started = time.perf_counter()
+    for _ in range(steps):
+        step_logging(logger)
+    return (time.perf_counter() - started) / steps * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--steps', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "app.log")
+
+        sync_logger = synchronous_logger(log_file)
+        before = measure(step_logging_before, sync_logger, args.steps)
+        for handler in sync_logger.handlers:
+            handler.close()
+
+        # Queue large enough that nothing is dropped, so the same lines are written;
+        # the console handler writes to stderr, which is discarded here
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            setup_fastapi_logging("INFO", log_file, queue_size=args.steps * 20)
+            after_same_lines = measure(step_logging_before, logging.getLogger("survey_api"), args.steps)
+            stop_log_pipeline()
+
+            setup_fastapi_logging("INFO", log_file, queue_size=args.steps * 20)
+            after = measure(step_logging_after, logging.getLogger("survey_api"), args.steps)
+            stop_log_pipeline()
+
+    print(f"{'configuration':<42} {'us per step':>12}")
+    print(f"{'before (sync handlers, INFO dumps)':<42} {before:>12.1f}")
+    print(f"{'queued handlers, same lines':<42} {after_same_lines:>12.1f}")
+    print(f"{'after (queued, DEBUG dumps, lazy args)':<42} {after:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Per-request cost of the middleware stack: BaseHTTPMiddleware vs pure ASGI.
+
+Before: the security headers, request limits, rate limit, input validation
+and logging middlewares were ``BaseHTTPMiddleware`` subclasses. Each one ran
+the rest of the stack in a separate task, with memory streams between the
+two, and wrapped the response in a new streaming response.
+After: they are pure ASGI middlewares that only wrap ``send``.
+
+The "before" stack wraps each of those five middlewares in a pass-through
+``BaseHTTPMiddleware``. Both stacks run the same middleware logic, so the
+difference is exactly the task hop and response wrapping that the rewrite
+removed. The stack order matches main.py, including SessionMiddleware.
+Requests go through httpx's in-process ASGI transport, so no network time
+is measured. The routes are ``/health/ping`` and ``/api/survey/step``. For
+the step route, the session lookup, state building, survey graph and
+snapshot save are stubbed. Application logging is disabled for the run.
+
+Usage (from backend/):
+    python -m benchmarks.middleware_throughput [--requests 2000] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.sessions import SessionMiddleware
+
+import app.routes.survey_api as survey_api
+from app.middleware.input_validation import create_input_validation_middleware
+from app.middleware.rate_limiting import create_rate_limit_middleware
+from app.middleware.request_limits import create_request_limits_middleware
+from app.middleware.security_headers import create_security_headers_middleware
+from app.routes import health
+from app.utils.config_loader import RateLimitConfig
+from app.utils.fastapi_logging import LoggingMiddleware
+
+STEP_BODY = {
+    "responses": [
+        {"question_id": 1, "answer": "About 40 people across two offices"},
+        {"question_id": 2, "answer": "We'd like to start next quarter"}
+    ]
+}
+
+# High enough that no benchmark request is rejected
+RATE_LIMIT = RateLimitConfig(
+    enabled=True, requests_per_minute=10 ** 9, burst_size=10 ** 9, window_seconds=60,
+    per_ip=True, redis_enabled=False, include_headers=True
+)
+
+
+class PassThroughMiddleware(BaseHTTPMiddleware):
+    """The per-layer cost of a BaseHTTPMiddleware, with no work of its own"""
+
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+class StubGraph:
+    async def ainvoke(self, state, config=None):
+        return {
+            'core': {'step': 2},
+            'frontend_response': {
+                'step': 2, 'total_steps': 5, 'headline': 'Nearly there',
+                'questions': [{'question_id': 3, 'phrased_question': 'What is your budget?'}]
+            },
+            'lead_intelligence': {'current_score': 10}
+        }
+
+
+def stub_step_dependencies():
+    async def get_session(request):
+        return {'session_id': 'bench', 'form_id': 'form'}
+
+    async def build_state(session_id, session_data, responses):
+        return {'core': {'session_id': session_id}, 'pending_responses': responses}
+
+    async def save_snapshot(session_id, result):
+        return None
+
+    survey_api.get_session_from_request = get_session
+    survey_api._build_step_state = build_state
+    survey_api._save_step_snapshot = save_snapshot
+    survey_api.intelligent_survey_graph = StubGraph()
+
+
+def build_app(base_http: bool) -> FastAPI:
+    app = FastAPI()
+    app.include_router(survey_api.router)
+    app.include_router(health.router)
+
+    # Same order as main.py (each add_middleware wraps the previous ones)
+    layers = [
+        create_security_headers_middleware(),
+        None,  # SessionMiddleware
+        create_request_limits_middleware(),
+        create_rate_limit_middleware(RATE_LIMIT),
+        create_input_validation_middleware(),
+        LoggingMiddleware
+    ]
+    for layer in layers:
+        if layer is None:
+            app.add_middleware(SessionMiddleware, secret_key='bench-secret')
+            continue
+        app.add_middleware(layer)
+        if base_http:
+            app.add_middleware(PassThroughMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, method: str, path: str, total: int, concurrency: int) -> float:
+    """Requests per second for ``total`` requests issued by ``concurrency`` concurrent clients"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(count: int):
+            for _ in range(count):
+                if method == "POST":
+                    response = await client.post(path, json=STEP_BODY)
+                else:
+                    response = await client.get(path)
+                assert response.status_code == 200, response.text
+
+        await worker(20)  # warm up
+        per_worker = total // concurrency
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        return per_worker * concurrency / (time.perf_counter() - started)
+
+
+async def run(total: int, concurrency: int):
+    stub_step_dependencies()
+    apps = {"before": build_app(base_http=True), "after": build_app(base_http=False)}
+
+    print(f"{'route':<22} {'before req/s':>13} {'after req/s':>12} {'per-request saving':>19}")
+    for method, path in (("GET", "/health/ping"), ("POST", "/api/survey/step")):
+        before = await measure(apps["before"], method, path, total, concurrency)
+        after = await measure(apps["after"], method, path, total, concurrency)
+        saving_us = (1 / before - 1 / after) * 1e6
+        print(f"{method + ' ' + path:<22} {before:>13.0f} {after:>12.0f} {saving_us:>16.0f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Response sanitization cost per JSON response.
+
+Before: the route's response was encoded and streamed through the middleware,
+which concatenated the body chunk by chunk with ``body += chunk``. It then
+parsed the body, sanitized it recursively (re-scanning every key against the
+substring rules and building a debug path string for every value), and
+encoded the result again.
+After: ``SanitizedJSONResponse`` sanitizes the object with memoized, compiled
+key rules and encodes it once.
+
+Usage (from backend/):
+    python -m benchmarks.response_sanitization [--rows 1000] [--iterations 20]
+"""
+
+import argparse
+import json
+import timeit
+
+from fastapi.responses import JSONResponse
+
+from app.middleware.response_sanitization import ResponseSanitizer, SanitizationContext, _sanitization_context
+from app.middleware.response_sanitization import SanitizedJSONResponse
+from app.utils.config_loader import SecurityConfig
+
+CONFIG = SecurityConfig(
+    max_input_length=5000, max_file_size=1024 * 1024, sanitize_inputs=False, auth_enabled=False,
+    jwt_expire_minutes=60, require_api_key=False, admin_key_required=False, force_https=False,
+    hsts_enabled=False, csp_enabled=False, session_timeout=3600, max_sessions_per_ip=10
+)
+
+CHUNK_SIZE = 4096
+
+
+def make_payload(rows: int) -> dict:
+    """Admin leads listing shaped like the API's success_response body"""
+    return {
+        "success": True,
+        "message": "Success",
+        "data": {
+            "leads": [
+                {
+                    "lead_id": f"lead-{i}", "session_id": f"session-{i}", "form_title": "Pet insurance quote",
+                    "contact_email": f"user{i}@example.com", "phone": "+15551234567", "status": "qualified",
+                    "final_score": i % 100, "created_at": "2026-10-01T12:00:00",
+                    "responses": [{"question_id": q, "answer": "A reasonably detailed answer"} for q in range(5)]
+                }
+                for i in range(rows)
+            ],
+            "total": rows
+        }
+    }
+
+
+def legacy_sanitize(sanitizer: ResponseSanitizer, data, is_admin=False, path="root"):
+    """Previous recursive sanitize: rules re-evaluated for every key"""
+    if isinstance(data, dict):
+        out = {}
+        for key, value in data.items():
+            key_lower = key.lower()
+            if key_lower in sanitizer.public_fields:
+                remove = False
+            elif any(c in key_lower for c in {'password', 'secret', 'token', 'api_key', 'private_key'}):
+                remove = True
+            elif is_admin and key_lower in sanitizer.allowed_admin_fields:
+                remove = False
+            else:
+                remove = any(s in key_lower for s in sanitizer.sensitive_fields)
+            if remove:
+                continue
+            mask = next((m for m in sanitizer.mask_fields if m in key_lower), None)
+            if mask and isinstance(value, str):
+                out[key] = sanitizer.mask_fields[mask](value)
+            else:
+                out[key] = legacy_sanitize(sanitizer, value, is_admin, f"{path}.{key}")
+        return out
+    if isinstance(data, list):
+        return [legacy_sanitize(sanitizer, item, is_admin, f"{path}[{i}]") for i, item in enumerate(data)]
+    if isinstance(data, str) and len(data) > 10000:
+        return data[:10000] + "... [truncated]"
+    return data
+
+
+def before(sanitizer: ResponseSanitizer, payload: dict) -> bytes:
+    encoded = JSONResponse(payload).body
+    body = b''
+    for start in range(0, len(encoded), CHUNK_SIZE):
+        body += encoded[start:start + CHUNK_SIZE]
+    return JSONResponse(legacy_sanitize(sanitizer, json.loads(body.decode('utf-8')))).body
+
+
+def after(context: SanitizationContext, payload: dict) -> bytes:
+    token = _sanitization_context.set(context)
+    try:
+        return SanitizedJSONResponse(payload).body
+    finally:
+        _sanitization_context.reset(token)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    sanitizer = ResponseSanitizer(CONFIG)
+    context = SanitizationContext(sanitizer, is_admin=False, request=None)
+
+    print(f"{'rows':>7} {'body KB':>8} {'before ms':>10} {'after ms':>9} {'unsanitized ms':>15}")
+    for rows in (10, args.rows // 10, args.rows):
+        payload = make_payload(rows)
+        assert before(sanitizer, payload) == after(context, payload)
+        size_kb = len(JSONResponse(payload).body) / 1024
+        before_ms = timeit.timeit(lambda: before(sanitizer, payload), number=args.iterations) / args.iterations * 1000
+        after_ms = timeit.timeit(lambda: after(context, payload), number=args.iterations) / args.iterations * 1000
+        plain_ms = timeit.timeit(lambda: JSONResponse(payload).body, number=args.iterations) / args.iterations * 1000
+        print(f"{rows:>7} {size_kb:>8.0f} {before_ms:>10.2f} {after_ms:>9.2f} {plain_ms:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
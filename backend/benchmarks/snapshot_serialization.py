@@ -0,0 +1,83 @@
+"""
+Per-step snapshot serialization cost.
+
+Before: build the snapshot dict, ``json.dumps(default=str)`` + ``json.loads``
+to clean it, then ``json.dumps`` again when the client sends it.
+After: validate into ``SessionSnapshot`` and encode once to bytes.
+
+Usage (from backend/):
+    python -m benchmarks.snapshot_serialization [--steps 10] [--iterations 2000]
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime
+
+from app.snapshot_serializer import build_session_snapshot, encode_session_state_entry
+
+
+def make_state(steps: int) -> dict:
+    """Graph state shaped like the result of a survey step after ``steps`` answers"""
+    responses = [
+        {
+            'question_id': i,
+            'question_text': f"Question {i} about the customer's needs?",
+            'phrased_question': f"Could you tell us a little more about need {i}?",
+            'answer': "A reasonably detailed answer " * 4,
+            'timestamp': datetime.now(),
+            'step': i,
+            'score_awarded': 5
+        }
+        for i in range(steps)
+    ]
+    return {
+        'core': {'session_id': 'bench', 'form_id': 'form', 'step': steps, 'started_at': datetime.now()},
+        'question_strategy': {
+            'asked_questions': list(range(steps)),
+            'current_questions': [{'question_id': steps, 'question_text': 'Next?', 'options': ['a', 'b', 'c']}],
+            'selection_history': [{'step': i, 'selected': [i], 'reasoning': 'Highest value'} for i in range(steps)]
+        },
+        'lead_intelligence': {'responses': responses, 'current_score': steps * 5, 'lead_status': 'qualified'}
+    }
+
+
+def before(result: dict) -> str:
+    snapshot_state = {
+        'core': result.get('core', {}),
+        'question_strategy': {
+            'asked_questions': result.get('question_strategy', {}).get('asked_questions', []),
+            'current_questions': result.get('question_strategy', {}).get('current_questions', []),
+            'selection_history': result.get('question_strategy', {}).get('selection_history', [])
+        },
+        'lead_intelligence': {
+            'responses': result.get('lead_intelligence', {}).get('responses', []),
+            'current_score': result.get('lead_intelligence', {}).get('current_score', 0),
+            'lead_status': result.get('lead_intelligence', {}).get('lead_status', 'unknown')
+        }
+    }
+    snapshot_state = json.loads(json.dumps(snapshot_state, default=str))
+    # Serialized again on the way to storage
+    return json.dumps({'state': snapshot_state, 'step': result['core']['step'], 'updated_at': datetime.now().isoformat()})
+
+
+def after(result: dict) -> bytes:
+    return encode_session_state_entry(build_session_snapshot(result), result['core']['step'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--steps', type=int, nargs='+', default=[5, 10, 25])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'answers':>8} {'before (us)':>12} {'after (us)':>11} {'speedup':>8}")
+    for steps in args.steps:
+        state = make_state(steps)
+        before_us = min(timeit.repeat(lambda: before(state), number=args.iterations, repeat=5)) / args.iterations * 1e6
+        after_us = min(timeit.repeat(lambda: after(state), number=args.iterations, repeat=5)) / args.iterations * 1e6
+        print(f"{steps:>8} {before_us:>12.1f} {after_us:>11.1f} {before_us / after_us:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
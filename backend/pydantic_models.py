@@ -231,6 +231,7 @@ class LeadIntelligenceState(BaseModel):
     qualification_reasoning: List[str] = Field(default_factory=list, description="Qualification logic")
     risk_factors: List[str] = Field(default_factory=list, description="Negative indicators")
     positive_indicators: List[str] = Field(default_factory=list, description="Positive indicators")
+    scoring_pending: bool = Field(default=False, description="Classification queued for the lead scoring worker")
 
 class EngagementState(BaseModel):
     """User engagement and abandonment tracking state."""
@@ -268,6 +269,7 @@ class SurveyGraphState(BaseModel):
     # API interaction
     pending_responses: List[Dict[str, Any]] = Field(default_factory=list, description="Pending user responses")
     frontend_response: Optional[Dict[str, Any]] = Field(None, description="Response for frontend")
+    step_context: Optional[Dict[str, Any]] = Field(None, description="Prefetched form, questions, asked ids and client for this step")
     
     # Routing control flags  
     route_to_lead_intelligence: Optional[bool] = Field(None, description="Flag to route to lead intelligence")
@@ -294,6 +296,32 @@ class SurveyGraphState(BaseModel):
             raise ValueError('Required state component cannot be None')
         return v
 
+# === SESSION SNAPSHOT MODELS ===
+
+class SnapshotQuestionStrategy(BaseModel):
+    """Question strategy slice kept in the session snapshot."""
+    asked_questions: List[Any] = Field(default_factory=list, description="Question IDs already asked")
+    current_questions: List[Dict[str, Any]] = Field(default_factory=list, description="Current step questions")
+    selection_history: List[Dict[str, Any]] = Field(default_factory=list, description="Selection history")
+
+class SnapshotLeadIntelligence(BaseModel):
+    """Lead intelligence slice kept in the session snapshot."""
+    responses: List[Dict[str, Any]] = Field(default_factory=list, description="All responses")
+    current_score: Union[int, float] = Field(default=0, description="Current lead score")
+    lead_status: str = Field(default=LeadStatus.UNKNOWN.value, description="Lead qualification")
+
+class SessionSnapshot(BaseModel):
+    """Persisted subset of SurveyGraphState restored at the start of each step."""
+    core: Dict[str, Any] = Field(default_factory=dict, description="Core survey state")
+    question_strategy: SnapshotQuestionStrategy = Field(default_factory=SnapshotQuestionStrategy, description="Question strategy slice")
+    lead_intelligence: SnapshotLeadIntelligence = Field(default_factory=SnapshotLeadIntelligence, description="Lead intelligence slice")
+
+class SessionStateEntry(BaseModel):
+    """Hot session state entry stored in Redis."""
+    state: SessionSnapshot = Field(..., description="Session snapshot")
+    step: int = Field(default=0, description="Step the snapshot was taken at")
+    updated_at: str = Field(..., description="Write timestamp")
+
 # === DATABASE MODELS ===
 
 class ClientModel(BaseModel):
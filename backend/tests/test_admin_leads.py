@@ -0,0 +1,106 @@
+"""
+Tests for the admin lead listing (single database call, cursor pages).
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import app.routes.admin_leads as admin_leads
+from app.utils.pagination import NEXT, encode_cursor
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self.rows))
+
+
+def _row(lead_id, started_at):
+    return {
+        "lead_id": lead_id, "form_id": "f-1", "form_title": "Intake", "lead_status": "yes",
+        "final_score": 80, "started_at": started_at, "completed_at": None,
+        "utm_source": "google", "utm_campaign": None, "utm_medium": None,
+        "contact_info": json.dumps({"name": "Sam", "email": "sam@example.com"}),
+        "actual_conversion": False, "conversion_date": None, "conversion_value": None, "conversion_type": None
+    }
+
+
+USER = SimpleNamespace(client_id="c-1")
+
+
+async def _get_leads(**kwargs):
+    params = dict(form_id=None, status=None, converted=None, utm_source=None, limit=2,
+                  cursor=None, current_user=USER)
+    params.update(kwargs)
+    response = await admin_leads.get_leads(**params)
+    return json.loads(response.body)["data"]
+
+
+@pytest.mark.asyncio
+async def test_filters_are_sent_to_the_database(monkeypatch):
+    client = FakeClient([_row("l-1", "2026-01-02T00:00:00+00:00")])
+    monkeypatch.setattr(admin_leads.db, "client", client)
+
+    data = await _get_leads(utm_source="google", converted="false", status="yes")
+
+    name, params = client.calls[0]
+    assert name == "list_admin_leads"
+    assert (params["p_client_id"], params["p_utm_source"], params["p_converted"], params["p_status"]) == ("c-1", "google", False, "yes")
+    assert data["leads"][0]["contact_name"] == "Sam"
+    assert params["p_limit"] == 3
+    assert data["next_cursor"] is None and data["prev_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_extra_row_yields_next_cursor(monkeypatch):
+    client = FakeClient([
+        _row("l-3", "2026-01-03T00:00:00+00:00"),
+        _row("l-2", "2026-01-02T00:00:00+00:00"),
+        _row("l-1", "2026-01-01T00:00:00+00:00")
+    ])
+    monkeypatch.setattr(admin_leads.db, "client", client)
+
+    data = await _get_leads()
+    assert [lead["lead_id"] for lead in data["leads"]] == ["l-3", "l-2"]
+
+    client.rows = [_row("l-1", "2026-01-01T00:00:00+00:00")]
+    data = await _get_leads(cursor=data["next_cursor"])
+
+    params = client.calls[1][1]
+    assert (params["p_cursor_started_at"], params["p_cursor_id"], params["p_reverse"]) == ("2026-01-02T00:00:00+00:00", "l-2", False)
+    assert data["next_cursor"] is None
+    assert data["prev_cursor"] is not None
+
+
+@pytest.mark.asyncio
+async def test_prev_cursor_reads_backwards_and_restores_order(monkeypatch):
+    client = FakeClient([_row("l-1", "2026-01-01T00:00:00+00:00")])
+    monkeypatch.setattr(admin_leads.db, "client", client)
+    prev_cursor = (await _get_leads(cursor=encode_cursor(["2026-01-02T00:00:00+00:00", "l-2"], NEXT, admin_leads.LEAD_LIST_ORDER)))["prev_cursor"]
+
+    # Newer rows come back oldest first
+    client.rows = [_row("l-2", "2026-01-02T00:00:00+00:00"), _row("l-3", "2026-01-03T00:00:00+00:00")]
+    data = await _get_leads(cursor=prev_cursor)
+
+    assert client.calls[-1][1]["p_reverse"] is True
+    assert [lead["lead_id"] for lead in data["leads"]] == ["l-3", "l-2"]
+    assert data["prev_cursor"] is None
+    assert data["next_cursor"] is not None
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(monkeypatch):
+    client = FakeClient([])
+    monkeypatch.setattr(admin_leads.db, "client", client)
+
+    response = await admin_leads.get_leads(form_id=None, status=None, converted=None, utm_source=None,
+                                           limit=2, cursor="not-a-cursor", current_user=USER)
+
+    assert response.status_code == 400
+    assert client.calls == []
@@ -0,0 +1,152 @@
+"""
+Tests for the streaming analytics export.
+"""
+
+import csv
+import io
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+
+import app.routes.analytics_api as analytics_api
+import app.utils.analytics_export as analytics_export
+from app.routes.admin_auth import get_current_admin_user
+from app.utils.analytics_export import EXPORT_COLUMNS, stream_csv, write_xlsx
+
+
+async def _rows(count):
+    for n in range(count):
+        yield [f"l-{n}", f"s-{n}", "f-1", "Intake", "2026-01-01T00:00:00+00:00", None, False,
+               "unknown", 0, "google", None, None, 1, "Budget?", "a, \"quoted\" answer", 5, None]
+
+
+@pytest.mark.asyncio
+async def test_csv_is_streamed_in_batches():
+    chunks = [chunk async for chunk in stream_csv(_rows(5), batch_size=2)]
+
+    assert len(chunks) == 3
+    parsed = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert parsed[0] == EXPORT_COLUMNS
+    assert len(parsed) == 6
+    assert parsed[1][14] == 'a, "quoted" answer'
+
+
+async def _answers(*answers):
+    for n, answer in enumerate(answers):
+        yield [f"l-{n}", f"s-{n}", "f-1", "Intake", "2026-01-01T00:00:00+00:00", None, False,
+               "unknown", 0, "google", None, None, 1, "Phone?", answer, 5, None]
+
+
+FORMULA_LIKE = ['=HYPERLINK("http://x")', "+1 555 0100", "-2", "@SUM(A1)", "\tx", "plain answer"]
+
+
+@pytest.mark.asyncio
+async def test_csv_quotes_formula_like_text():
+    body = b"".join([chunk async for chunk in stream_csv(_answers(*FORMULA_LIKE))]).decode("utf-8")
+
+    answers = [row[14] for row in csv.reader(io.StringIO(body))][1:]
+    assert answers == ['\'=HYPERLINK("http://x")', "'+1 555 0100", "'-2", "'@SUM(A1)", "'\tx", "plain answer"]
+
+
+@pytest.mark.asyncio
+async def test_xlsx_keeps_text_and_stores_formula_like_text_as_strings(tmp_path):
+    path = tmp_path / "export.xlsx"
+
+    await write_xlsx(path, _answers(*FORMULA_LIKE))
+
+    cells = [row[14] for row in load_workbook(path)["Leads"].iter_rows(min_row=2)]
+    assert [cell.value for cell in cells] == FORMULA_LIKE
+    assert {cell.data_type for cell in cells} == {"s"}
+
+
+def _sheet_rows(source):
+    workbook = load_workbook(source, read_only=True)
+    assert workbook.sheetnames == ["Leads"]
+    return [list(row) for row in workbook["Leads"].iter_rows(values_only=True)]
+
+
+@pytest.mark.asyncio
+async def test_xlsx_file_reopens_with_all_rows(tmp_path):
+    path = tmp_path / "export.xlsx"
+
+    assert await write_xlsx(path, _rows(3), batch_size=2) == 3
+
+    rows = _sheet_rows(path)
+    assert rows[0] == EXPORT_COLUMNS
+    assert len(rows) == 4
+    assert rows[1][:2] == ["l-0", "s-0"]
+    assert rows[3][14] == 'a, "quoted" answer'
+
+
+@pytest.fixture
+def export_client(monkeypatch, tmp_path):
+    """Client for the export endpoint with rows from ``_rows`` and temp files under ``tmp_path``"""
+    async def get_pool():
+        return None
+
+    mkstemp = analytics_api.tempfile.mkstemp
+    monkeypatch.setattr(analytics_api.pg_pool, "get_pool", get_pool)
+    monkeypatch.setattr(analytics_api, "iter_export_rows", lambda *args, **kwargs: _rows(2))
+    monkeypatch.setattr(analytics_api.tempfile, "mkstemp", lambda suffix: mkstemp(suffix=suffix, dir=tmp_path))
+    app = FastAPI()
+    app.include_router(analytics_api.router)
+    app.dependency_overrides[get_current_admin_user] = lambda: SimpleNamespace(client_id="c-1")
+    return TestClient(app)
+
+
+def test_export_endpoint_returns_xlsx(export_client, tmp_path):
+    response = export_client.get("/api/analytics/export", params={
+        "format": "xlsx", "start_date": "2026-01-01", "end_date": "2026-01-31"
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == analytics_export.MEDIA_TYPES["xlsx"]
+    assert "analytics-all-forms-2026-01-01-2026-01-31.xlsx" in response.headers["content-disposition"]
+    rows = _sheet_rows(io.BytesIO(response.content))
+    assert rows[0] == EXPORT_COLUMNS
+    assert [row[0] for row in rows[1:]] == ["l-0", "l-1"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_xlsx_export_removes_temp_file(export_client, monkeypatch, tmp_path):
+    async def failing_write(path, rows):
+        path.write_bytes(b"partial")
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(analytics_api, "write_xlsx", failing_write)
+
+    response = export_client.get("/api/analytics/export", params={"format": "xlsx"})
+
+    assert response.status_code == 500
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("format", ["csv", "xlsx"])
+def test_malformed_form_id_is_rejected_before_streaming(export_client, monkeypatch, format):
+    monkeypatch.setattr(analytics_api, "iter_export_rows", lambda *args, **kwargs: pytest.fail("query started"))
+
+    response = export_client.get("/api/analytics/export", params={"format": format, "form_id": "not-a-uuid"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_background_job_writes_file_and_status(monkeypatch, tmp_path):
+    monkeypatch.setattr(analytics_export, "EXPORT_DIR", tmp_path)
+    monkeypatch.setattr(analytics_export, "iter_export_rows", lambda *args, **kwargs: _rows(3))
+
+    job = analytics_export.create_export_job("c-1", "csv", {})
+    assert analytics_export.get_export_job("c-1", job["job_id"])["status"] == "pending"
+
+    await analytics_export.run_export_job("c-1", job, datetime(2026, 1, 1), datetime(2026, 1, 31))
+
+    status = analytics_export.get_export_job("c-1", job["job_id"])
+    assert (status["status"], status["row_count"]) == ("ready", 3)
+    assert analytics_export.export_file_path("c-1", job["job_id"], "csv").stat().st_size == status["file_size_bytes"]
+    # Other clients cannot see the job, and ids must be UUIDs
+    assert analytics_export.get_export_job("c-2", job["job_id"]) is None
+    assert analytics_export.get_export_job("c-1", "../c-2/x") is None
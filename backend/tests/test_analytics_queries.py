@@ -0,0 +1,60 @@
+"""
+Tests for SurveyAnalytics parameterized queries.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from app.utils.analytics_queries import (
+    ABANDONMENT_ALERTS_SQL,
+    CONVERSION_BY_UTM_SOURCE_SQL,
+    SurveyAnalytics,
+    create_analytics_dashboard_data
+)
+
+
+class FakePool:
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.calls = []
+
+    async def fetch(self, query, *args):
+        self.calls.append((query, args))
+        return self.rows
+
+
+@pytest.mark.asyncio
+async def test_values_are_bound_not_formatted():
+    pool = FakePool()
+    analytics = SurveyAnalytics(pool)
+
+    await analytics.get_conversion_by_utm_source(days_back=14, utm_sources=["google", "o'reilly"])
+    await analytics.get_conversion_by_utm_source(days_back=30)
+
+    assert [query for query, _ in pool.calls] == [CONVERSION_BY_UTM_SOURCE_SQL] * 2
+    assert pool.calls[0][1] == (14, ["google", "o'reilly"])
+    assert pool.calls[1][1] == (30, None)
+    assert "o'reilly" not in CONVERSION_BY_UTM_SOURCE_SQL
+
+
+@pytest.mark.asyncio
+async def test_numeric_results_become_floats():
+    pool = FakePool([("f-1", 40, 30, Decimal("75.00"))])
+
+    alerts = await SurveyAnalytics(pool).check_abandonment_alerts(abandonment_threshold=60)
+
+    query, args = pool.calls[0]
+    assert query == ABANDONMENT_ALERTS_SQL and args == (24, 20, Decimal("60"))
+    assert alerts[0]["abandonment_rate"] == 75.0 and isinstance(alerts[0]["abandonment_rate"], float)
+    assert alerts[0]["severity"] == "medium"
+
+
+@pytest.mark.asyncio
+async def test_dashboard_data_runs_every_query():
+    pool = FakePool()
+
+    data = await create_analytics_dashboard_data(SurveyAnalytics(pool), days_back=3)
+
+    assert len(pool.calls) == 5
+    assert data["period_days"] == 3 and data["overview"] == []
@@ -0,0 +1,122 @@
+"""
+Tests for analytics read from daily rollups.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import app.routes.analytics_api as analytics_api
+from app.utils.analytics_rollups import daily_series, fetch_rollups, summarize
+
+
+def _rollup(form_id, day, utm_source="", views=0, completions=0, qualified=0, seconds=0.0, timed=0):
+    return {
+        "form_id": form_id, "day": day, "utm_source": utm_source, "views": views, "completions": completions,
+        "qualified": qualified, "completion_seconds_total": seconds, "timed_completions": timed
+    }
+
+
+class FakeQuery:
+    """Records calls; like PostgREST, returns at most 1000 rows of the requested range"""
+
+    def __init__(self, rows, log):
+        self.rows = rows
+        self.log = log
+        self.start, self.end = 0, None
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.log.append((name, args))
+            return self
+        return record
+
+    def range(self, start, end):
+        self.log.append(("range", (start, end)))
+        self.start, self.end = start, end
+        return self
+
+    def execute(self):
+        end = len(self.rows) if self.end is None else self.end + 1
+        return SimpleNamespace(data=self.rows[self.start:end][:1000])
+
+
+class FakeClient:
+    def __init__(self, tables, stats=None):
+        self.tables = tables
+        self.stats = stats or [{"samples": 0, "mean_seconds": None, "p50_seconds": None, "p90_seconds": None, "p99_seconds": None}]
+        self.log = []
+
+    def rpc(self, name, params):
+        self.log.append(("rpc", (name, params)))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self.stats))
+
+    def table(self, name):
+        self.log.append(("table", (name,)))
+        return FakeQuery(self.tables[name], self.log)
+
+
+def test_summarize_weights_completion_time_by_timed_completions():
+    totals = summarize([
+        _rollup("f-1", "2026-01-01", views=10, completions=4, seconds=400.0, timed=4),
+        _rollup("f-1", "2026-01-02", views=5, completions=1, seconds=200.0, timed=1)
+    ])
+    assert (totals["views"], totals["completions"]) == (15, 5)
+    assert totals["average_completion_time"] == 120.0
+
+
+def test_daily_series_fills_missing_days():
+    series = daily_series([_rollup("f-1", "2026-01-02", views=3)], datetime(2026, 1, 1).date(), datetime(2026, 1, 3).date())
+    assert [(d["date"], d["views"]) for d in series] == [("2026-01-01", 0), ("2026-01-02", 3), ("2026-01-03", 0)]
+
+
+def test_dashboard_metrics_read_rollups_not_sessions(monkeypatch):
+    client = FakeClient({
+        "forms": [{"id": "f-1", "title": "Intake", "status": "active", "created_at": None},
+                  {"id": "f-2", "title": "Quote", "status": "draft", "created_at": None}],
+        "form_daily_rollups": [
+            _rollup("f-1", "2026-01-01", "google", views=8, completions=6, qualified=2, seconds=600.0, timed=6),
+            _rollup("f-1", "2026-01-02", "", views=2, completions=0),
+            _rollup("f-2", "2026-01-01", "google", views=10, completions=2, qualified=1, seconds=300.0, timed=2)
+        ]
+    })
+    monkeypatch.setattr(analytics_api.db, "client", client)
+
+    metrics = analytics_api.calculate_dashboard_metrics("c-1", datetime(2026, 1, 1), datetime(2026, 1, 31))
+
+    assert ("table", ("lead_sessions",)) not in client.log
+    assert (metrics["total_views"], metrics["total_responses"], metrics["qualified_leads"]) == (20, 8, 3)
+    assert metrics["average_completion_time"] == 112
+    assert metrics["top_performing_form"]["id"] == "f-1"
+    assert metrics["traffic_sources"][0] == {"utm_source": "google", "views": 18, "completions": 8, "qualified": 3}
+
+
+def test_fetch_rollups_reads_past_the_row_cap():
+    # 12 forms x 90 days x 2 sources
+    rows = [
+        _rollup(f"f-{form}", f"day-{day}", source, views=1)
+        for day in range(90) for form in range(12) for source in ("", "google")
+    ]
+    client = FakeClient({"form_daily_rollups": rows})
+
+    fetched = fetch_rollups("c-1", datetime(2026, 1, 1), datetime(2026, 3, 31), database=SimpleNamespace(client=client))
+
+    assert fetched == rows
+    assert summarize(fetched)["views"] == 2160
+    assert [args for name, args in client.log if name == "range"] == [(0, 999), (1000, 1999), (2000, 2999)]
+
+
+def test_completion_time_distribution_comes_from_the_database(monkeypatch):
+    client = FakeClient({}, stats=[{"samples": 40, "mean_seconds": 95.25, "p50_seconds": 80.0, "p90_seconds": 150.5, "p99_seconds": 301.04}])
+    monkeypatch.setattr(analytics_api.db, "client", client)
+
+    stats = analytics_api.get_completion_time_stats("c-1", datetime(2026, 1, 1, 15), datetime(2026, 1, 31), form_id="f-1")
+
+    name, params = client.log[0][1]
+    assert name == "completion_time_stats"
+    assert (params["p_start_day"], params["p_end_day"], params["p_form_id"]) == ("2026-01-01", "2026-01-31", "f-1")
+    assert stats == {"samples": 40, "mean": 95.2, "p50": 80.0, "p90": 150.5, "p99": 301.0}
+
+
+def test_no_completions_yield_zero_distribution(monkeypatch):
+    monkeypatch.setattr(analytics_api.db, "client", FakeClient({}))
+    assert analytics_api.get_completion_time_stats("c-1", datetime(2026, 1, 1), datetime(2026, 1, 2))["samples"] == 0
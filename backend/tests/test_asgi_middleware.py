@@ -0,0 +1,192 @@
+"""
+Tests for the pure ASGI security, limits, rate limit, validation and logging middlewares.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.input_validation import InputValidationMiddleware, get_sanitized_body
+from app.middleware.rate_limiting import RateLimitMiddleware
+from app.middleware.request_body import CachedBodyRoute
+from app.middleware.request_limits import RequestLimitsMiddleware
+from app.middleware.security_headers import SecurityHeadersMiddleware
+from app.utils.config_loader import RateLimitConfig, SecurityConfig
+from app.utils.fastapi_logging import LoggingMiddleware
+
+
+def make_security_config(**overrides):
+    values = dict(
+        max_input_length=5000, max_file_size=1024 * 1024, sanitize_inputs=True, auth_enabled=False,
+        jwt_expire_minutes=60, require_api_key=False, admin_key_required=False, force_https=False,
+        hsts_enabled=False, csp_enabled=True, session_timeout=3600, max_sessions_per_ip=10
+    )
+    values.update(overrides)
+    return SecurityConfig(**values)
+
+
+RATE_LIMIT = RateLimitConfig(
+    enabled=True, requests_per_minute=100, burst_size=10, window_seconds=60,
+    per_ip=True, redis_enabled=False, include_headers=True
+)
+
+
+def make_app(security=None, rate_limit=RATE_LIMIT) -> FastAPI:
+    security = security or make_security_config()
+    app = FastAPI()
+    router = APIRouter(route_class=CachedBodyRoute)
+
+    @router.get("/public")
+    async def public():
+        return {"ok": True}
+
+    @router.get("/api/data")
+    async def data():
+        return {"ok": True}
+
+    @router.post("/api/echo")
+    async def echo(request: Request):
+        return {"sanitized": get_sanitized_body(request), "raw": (await request.body()).decode()}
+
+    @router.get("/api/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                await asyncio.sleep(0.05)
+                yield f"chunk{i};"
+        return StreamingResponse(chunks())
+
+    @router.get("/api/slow")
+    async def slow():
+        await asyncio.sleep(1)
+        return {"ok": True}
+
+    @router.get("/api/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.include_router(router)
+    # Same order as main.py
+    app.add_middleware(SecurityHeadersMiddleware, config=security)
+    app.add_middleware(RequestLimitsMiddleware, config=security)
+    app.add_middleware(RateLimitMiddleware, config=rate_limit)
+    app.add_middleware(InputValidationMiddleware, config=security)
+    app.add_middleware(LoggingMiddleware)
+    return app
+
+
+def run_asgi(app, path="/api/data"):
+    """Call an ASGI app for one GET request; returns the messages it sent"""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "server": ("testserver", 80), "client": ("testclient", 50000),
+        "root_path": "", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [(b"host", b"testserver")]
+    }
+    try:
+        asyncio.run(app(scope, receive, send))
+    finally:
+        # A response is never started twice
+        assert [m["type"] for m in messages].count("http.response.start") <= 1
+    return messages
+
+
+@pytest.fixture
+def client():
+    return TestClient(make_app())
+
+
+class TestPureASGI:
+    """Test the middlewares keep their behavior without BaseHTTPMiddleware."""
+
+    def test_no_base_http_middleware(self):
+        for cls in (SecurityHeadersMiddleware, RequestLimitsMiddleware, RateLimitMiddleware,
+                    InputValidationMiddleware, LoggingMiddleware):
+            assert not issubclass(cls, BaseHTTPMiddleware)
+
+    def test_response_headers(self, client):
+        response = client.get("/api/data")
+        assert response.status_code == 200
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert response.headers["server"] == "Dynamic-Survey-API"
+        assert "content-security-policy" in response.headers
+        assert response.headers["cache-control"].startswith("no-store")
+        assert response.headers["x-ratelimit-limit"] == "100"
+        assert response.headers["x-request-timeout"] == "30s"
+        assert response.headers["x-request-duration"].endswith("s")
+        assert len(response.headers["x-correlation-id"]) == 8
+
+    def test_non_sensitive_path_has_no_cache_headers(self, client):
+        response = client.get("/public")
+        assert "cache-control" not in response.headers
+        assert response.headers["x-frame-options"] == "DENY"
+
+    def test_body_replayed_and_sanitized_body_shared(self, client):
+        response = client.post("/api/echo", json={"name": "  Ada  "})
+        assert response.status_code == 200
+        assert response.json() == {"sanitized": {"name": "Ada"}, "raw": '{"name":"  Ada  "}'}
+
+    def test_invalid_body_rejected(self, client):
+        response = client.post("/api/echo", json={"name": "<script>x</script>"})
+        assert response.status_code == 400
+        assert response.json()["error"] == "Invalid request data"
+        assert response.headers["x-correlation-id"]
+
+    def test_rate_limited(self):
+        config = RateLimitConfig(
+            enabled=True, requests_per_minute=1, burst_size=1, window_seconds=60,
+            per_ip=True, redis_enabled=False, include_headers=True
+        )
+        client = TestClient(make_app(rate_limit=config))
+        assert client.get("/api/data").status_code == 200
+        response = client.get("/api/data")
+        assert response.status_code == 429
+        assert response.headers["x-ratelimit-remaining"] == "0"
+
+    def test_timeout_before_response_start(self, monkeypatch):
+        monkeypatch.setattr(RequestLimitsMiddleware, "_get_timeout_limit", lambda self, request: 0.1)
+        response = TestClient(make_app()).get("/api/slow")
+        assert response.status_code == 504
+        assert response.headers["x-timeout-reason"] == "processing_timeout"
+
+    def test_timeout_does_not_cut_streaming_body(self, monkeypatch):
+        monkeypatch.setattr(RequestLimitsMiddleware, "_get_timeout_limit", lambda self, request: 0.1)
+        response = TestClient(make_app()).get("/api/stream")
+        assert response.status_code == 200
+        assert response.text == "chunk0;chunk1;chunk2;"
+
+    def test_app_timeout_error_is_not_a_504(self):
+        async def app(scope, receive, send):
+            raise TimeoutError("upstream service timed out")
+
+        messages = run_asgi(RequestLimitsMiddleware(app, config=make_security_config()))
+
+        assert messages[0]["status"] == 500
+
+    def test_timeout_error_after_response_start_is_not_answered_again(self):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"chunk0;", "more_body": True})
+            raise TimeoutError("upstream service timed out")
+
+        with pytest.raises(TimeoutError):
+            run_asgi(RequestLimitsMiddleware(app, config=make_security_config()))
+
+    def test_route_error_handled_by_innermost_middleware(self, client):
+        response = client.get("/api/boom")
+        assert response.status_code == 500
+        assert response.text == "Internal Server Error"
+        assert response.headers["server"] == "Dynamic-Survey-API"
+        assert response.headers["x-correlation-id"]
@@ -0,0 +1,127 @@
+"""
+Tests for the async Supabase client.
+
+Uses an httpx mock transport so no real PostgREST instance is required.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.async_database import AsyncSupabaseClient
+from app.utils.config_loader import DatabaseConfig
+
+
+@pytest.fixture
+def database_config():
+    """Database configuration with a small pool."""
+    return DatabaseConfig(
+        url="https://test.supabase.co",
+        publishable_key="sb_publishable_test",
+        secret_key="sb_secret_test",
+        pool_size=4,
+        pool_max_overflow=6,
+        pool_timeout=5,
+        pool_recycle=3600,
+        pool_keepalive_expiry=30,
+        query_timeout=10,
+        connection_timeout=3,
+        retry_attempts=2,
+        retry_delay=0,
+        health_check_enabled=False,
+        health_check_interval=300,
+        health_check_timeout=10,
+    )
+
+
+def _mock_client(config, handler):
+    """Build an AsyncSupabaseClient whose HTTP pool routes to ``handler``."""
+    client = AsyncSupabaseClient(config)
+    real_http_client = client._create_http_client()
+    client._create_http_client = lambda: httpx.AsyncClient(
+        base_url=real_http_client.base_url,
+        headers=real_http_client.headers,
+        transport=httpx.MockTransport(handler),
+    )
+    return client
+
+
+class TestAsyncSupabaseClient:
+    """Test suite for AsyncSupabaseClient."""
+
+    def test_missing_config_raises_error(self, database_config):
+        database_config.secret_key = ""
+        with pytest.raises(ValueError, match="Missing Supabase environment variables"):
+            AsyncSupabaseClient(database_config)
+
+    @pytest.mark.asyncio
+    async def test_http_pool_uses_config_limits(self, database_config):
+        client = AsyncSupabaseClient(database_config)
+        http_client = client._create_http_client()
+        try:
+            pool = http_client._transport._pool
+            assert pool._max_connections == 10
+            assert pool._max_keepalive_connections == 4
+            assert str(http_client.base_url) == "https://test.supabase.co/rest/v1/"
+            assert http_client.headers["apikey"] == "sb_secret_test"
+        finally:
+            await http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_get_lead_session(self, database_config):
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=[{"session_id": "abc", "step": 2}])
+
+        client = _mock_client(database_config, handler)
+        try:
+            session = await client.get_lead_session("abc")
+        finally:
+            await client.aclose()
+
+        assert session == {"session_id": "abc", "step": 2}
+        assert requests[0].url.path == "/rest/v1/lead_sessions"
+        assert requests[0].url.params["session_id"] == "eq.abc"
+        assert requests[0].headers["Authorization"] == "Bearer sb_secret_test"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_http_client(self, database_config):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=[{"id": request.url.params.get("id", "").removeprefix("eq.")}])
+
+        client = _mock_client(database_config, handler)
+        try:
+            first = client.client
+            results = await asyncio.gather(*(client.get_client(f"c{i}") for i in range(20)))
+            assert client.client is first
+        finally:
+            await client.aclose()
+
+        assert [r["id"] for r in results] == [f"c{i}" for i in range(20)]
+
+    @pytest.mark.asyncio
+    async def test_save_session_snapshot_upserts_form_state(self, database_config):
+        bodies = []
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            bodies.append(json.loads(request.content))
+            return httpx.Response(201, json=[{"id": "snap-1"}])
+
+        client = _mock_client(database_config, handler)
+        try:
+            result = await client.save_session_snapshot("abc", {"core": {"step": 1}}, step=1)
+        finally:
+            await client.aclose()
+
+        assert result == {"id": "snap-1"}
+        assert bodies[0]["form_state"] == {"core": {"step": 1}}
+        assert bodies[0]["step_number"] == 1
+        # One row per session: upsert on session_id instead of a new row per step
+        assert requests[0].url.params["on_conflict"] == "session_id"
+        assert "resolution=merge-duplicates" in requests[0].headers["Prefer"]
@@ -0,0 +1,220 @@
+"""
+Tests for the cross-worker cache invalidation bus.
+
+Redis is replaced with in-memory fakes: a sync client recording publishes and
+an async pub/sub feeding the subscriber.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.utils import cache_invalidation
+from app.utils.cache_invalidation import CacheInvalidationBus
+from app.utils.cached_data_loader import CachedDataLoader
+
+
+class FakeRedis:
+    """Sync Redis stand-in recording published messages"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.published = []
+
+    def publish(self, channel, message):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.published.append((channel, json.loads(message)))
+        return 1
+
+
+class FakePubSub:
+    """Async pub/sub delivering queued messages, then idling"""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.channels = []
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def listen(self):
+        yield {"type": "subscribe", "data": 1}
+        for data in self.messages:
+            yield {"type": "message", "data": data}
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        pass
+
+
+class FakeAsyncRedis:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def pubsub(self):
+        return self._pubsub
+
+    async def aclose(self):
+        pass
+
+
+def remote_event(kind, entity_id):
+    return json.dumps({"kind": kind, "id": entity_id, "origin": "other-worker"})
+
+
+class TestCacheInvalidationBus:
+    """Test local dispatch, publishing and remote delivery."""
+
+    def test_publish_runs_local_handlers_and_broadcasts(self):
+        fake = FakeRedis()
+        bus = CacheInvalidationBus(enabled=True, redis_client=fake)
+        seen = []
+        bus.register("form", seen.append)
+
+        bus.publish("form", "form-1")
+
+        assert seen == ["form-1"]
+        assert fake.published == [("cache_invalidation", {"kind": "form", "id": "form-1", "origin": bus.origin})]
+
+    def test_disabled_bus_is_local_only(self):
+        fake = FakeRedis()
+        bus = CacheInvalidationBus(enabled=False, redis_client=fake)
+        seen = []
+        bus.register("client", seen.append)
+
+        bus.publish("client", "client-1")
+
+        assert seen == ["client-1"]
+        assert fake.published == []
+
+    def test_redis_failure_does_not_raise(self):
+        bus = CacheInvalidationBus(enabled=True, redis_client=FakeRedis(fail=True))
+        seen = []
+        bus.register("form", seen.append)
+
+        bus.publish("form", "form-1")
+
+        assert seen == ["form-1"]
+        assert bus.get_stats()["publish_errors"] == 1
+
+    def test_remote_events_dispatched_and_own_events_ignored(self):
+        bus = CacheInvalidationBus()
+        seen = []
+        bus.register("form", seen.append)
+
+        assert bus.handle_message(remote_event("form", "form-2")) is True
+        assert bus.handle_message(json.dumps({"kind": "form", "id": "form-3", "origin": bus.origin})) is False
+        assert bus.handle_message("not json") is False
+        assert seen == ["form-2"]
+
+    def test_failing_handler_does_not_block_others(self):
+        bus = CacheInvalidationBus()
+        seen = []
+
+        def broken(entity_id):
+            raise RuntimeError("boom")
+
+        bus.register("form", broken)
+        bus.register("form", seen.append)
+        bus.publish("form", "form-1")
+
+        assert seen == ["form-1"]
+        assert bus.get_stats()["handler_errors"] == 1
+
+    def test_unknown_kind_rejected(self):
+        with pytest.raises(ValueError):
+            CacheInvalidationBus().publish("theme", "t-1")
+
+    @pytest.mark.asyncio
+    async def test_apublish_sends_off_the_event_loop(self):
+        import threading
+
+        loop_thread = threading.get_ident()
+        senders = []
+
+        class ThreadRecordingRedis(FakeRedis):
+            def publish(self, channel, message):
+                senders.append(threading.get_ident())
+                return super().publish(channel, message)
+
+        fake = ThreadRecordingRedis()
+        bus = CacheInvalidationBus(enabled=True, redis_client=fake)
+        seen = []
+        bus.register("form", seen.append)
+
+        await bus.apublish("form", "form-1")
+
+        assert seen == ["form-1"]
+        assert fake.published == [("cache_invalidation", {"kind": "form", "id": "form-1", "origin": bus.origin})]
+        assert senders and senders[0] != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_subscriber_applies_remote_events(self, monkeypatch):
+        import redis.asyncio as aioredis
+
+        pubsub = FakePubSub([remote_event("client", "client-9")])
+        monkeypatch.setattr(aioredis, "from_url", lambda *args, **kwargs: FakeAsyncRedis(pubsub))
+
+        bus = CacheInvalidationBus(enabled=True, redis_client=FakeRedis())
+        seen = []
+        bus.register("client", seen.append)
+
+        bus.start()
+        for _ in range(20):
+            if seen:
+                break
+            await asyncio.sleep(0.01)
+        await bus.stop()
+
+        assert pubsub.channels == ["cache_invalidation"]
+        assert seen == ["client-9"]
+
+
+class TestLoaderInvalidation:
+    """Test CachedDataLoader handlers for bus events."""
+
+    def make_loader(self):
+        loader = CachedDataLoader()
+        loader.questions_cache.set("questions_form-1", [{"question_id": 1}])
+        loader.client_cache.set("client_form-1", {"client": {"id": "client-1"}})
+        loader.client_cache.set("client_form-2", {"client": {"id": "client-2"}})
+        loader.form_cache.set("form_form-1", {"id": "form-1", "client_id": "client-1"})
+        loader.form_cache.set("form_form-3", {"id": "form-3", "client_id": "client-1"})
+        return loader
+
+    def test_form_event_drops_form_entries(self):
+        loader = self.make_loader()
+
+        loader.invalidate_form_data("form-1")
+
+        assert loader.questions_cache.get("questions_form-1") is None
+        assert loader.form_cache.get("form_form-1") is None
+        assert loader.form_cache.get("form_form-3") is not None
+
+    def test_client_event_drops_entries_of_the_client(self):
+        loader = self.make_loader()
+
+        assert loader.invalidate_client_data("client-1") == 3
+        assert loader.client_cache.get("client_form-2") is not None
+        assert loader.questions_cache.get("questions_form-1") is not None
+
+    def test_global_loader_subscribed(self):
+        from app.utils.cached_data_loader import data_loader
+
+        data_loader.form_cache.set("form_form-x", {"id": "form-x"})
+        cache_invalidation.invalidation_bus.handle_message(remote_event("form", "form-x"))
+
+        assert data_loader.form_cache.get("form_form-x") is None
+
+    def test_global_llm_cache_subscribed(self):
+        from app.utils.llm_cache import llm_cache
+
+        llm_cache.set("k", "stale selection", form_id="form-y")
+        llm_cache.set("k", "other form", form_id="form-z")
+        cache_invalidation.invalidation_bus.handle_message(remote_event("form", "form-y"))
+
+        assert llm_cache.get("k", form_id="form-y") is None
+        assert llm_cache.get("k", form_id="form-z") == "other form"
+        llm_cache.clear()
@@ -0,0 +1,153 @@
+"""
+Tests for the compiled input scanner and InputSanitizer traversal.
+"""
+
+import random
+import time
+
+import pytest
+
+from app.middleware.input_validation import InputSanitizer, scan_text
+from app.utils.config_loader import SecurityConfig
+
+
+def make_config(**overrides):
+    values = dict(
+        max_input_length=5000, max_file_size=1024 * 1024, sanitize_inputs=True, auth_enabled=False,
+        jwt_expire_minutes=60, require_api_key=False, admin_key_required=False, force_https=False,
+        hsts_enabled=False, csp_enabled=False, session_timeout=3600, max_sessions_per_ip=10
+    )
+    values.update(overrides)
+    return SecurityConfig(**values)
+
+
+@pytest.fixture
+def sanitizer():
+    return InputSanitizer(make_config())
+
+
+def legacy_categories(sanitizer, text):
+    """Categories found by running every pattern list in full (the previous detection)"""
+    groups = {
+        'xss': sanitizer.xss_patterns,
+        'sql': sanitizer.sql_patterns,
+        'path_traversal': sanitizer.path_traversal_patterns
+    }
+    return {category for category, patterns in groups.items() if any(p.search(text) for p in patterns)}
+
+
+ATTACKS = [
+    ("<script>alert(1)</script>", {'xss'}),
+    ("<SCRIPT src=x>\n</Script>", {'xss'}),
+    ("JavaScript:void(0)", {'xss'}),
+    ("<img src=x onerror=alert(1)>", {'xss'}),
+    ("<iframe src=evil></iframe>", {'xss'}),
+    ("<embed src=x>", {'xss'}),
+    ("data:text/html;base64,xyz", {'xss'}),
+    ("1 UNION SELECT password", {'sql'}),
+    ("select name\n  from users", set()),
+    ("select name from users", {'sql'}),
+    ("Robert'); DROP TABLE students", {'sql'}),
+    ("update users set admin=1", {'sql'}),
+    ("' or 1=1", {'sql'}),
+    ("x\" OR true", {'sql'}),
+    ("admin'--", {'sql'}),
+    ("../../etc/passwd", {'path_traversal'}),
+    ("..\\windows", {'path_traversal'}),
+    ("%2E%2E%2Fetc", {'path_traversal'}),
+    ("I'd like to update my plan so we can select from several vendors", {'sql'}),
+    ("We need help with onboarding; about 40 people, budget is flexible.", set()),
+    ("", set()),
+    # Dotted capital I (U+0130) matches "i" under IGNORECASE but case-folds to two characters
+    ("UN\u0130ON SELECT a", {'sql'}),
+    ("\u0130NSERT INTO x", {'sql'}),
+    ("<scr\u0130pt>alert(1)</script>", {'xss'}),
+    ("javascr\u0130pt:alert(1)", {'xss'}),
+    ("<\u0130frame></iframe>", {'xss'})
+]
+
+
+class TestScanText:
+    """Test the scanner finds exactly what the pattern lists find."""
+
+    @pytest.mark.parametrize("text,expected", ATTACKS)
+    def test_known_inputs(self, sanitizer, text, expected):
+        assert scan_text(text) == expected
+        assert legacy_categories(sanitizer, text) == expected
+
+    def test_matches_pattern_lists_on_random_text(self, sanitizer):
+        rng = random.Random(7)
+        fragments = [
+            "select ", "from ", "update ", " set", "union ", "drop table", "delete from", "insert into",
+            "'", '"', ";", " or 1=1", " or true", "--", "\n", " ", "on", "click", "=", "<script>",
+            "</script>", "<iframe>", "<object>", "</object>", "<embed", "javascript:", "VBScript:",
+            "../", "..\\", "%2e%2E%2f", "Data:Text/HTML", "ı", "İ", "ſ", "hello", "Need", "x",
+            "un\u0130on ", "\u0130nsert into", "<scr\u0130pt>", "javascr\u0130pt:", "sel\u0131ct ", "i\u0307"
+        ]
+        for _ in range(3000):
+            text = "".join(rng.choice(fragments) for _ in range(rng.randint(1, 12)))
+            assert scan_text(text) == legacy_categories(sanitizer, text), text
+
+    def test_repeated_keywords_are_linear(self, sanitizer):
+        text = "select " * 4000
+        started = time.perf_counter()
+        assert scan_text(text) == set()
+        assert time.perf_counter() - started < 0.5
+
+    def test_detect_methods(self, sanitizer):
+        assert sanitizer._detect_xss("<script>x</script>")
+        assert sanitizer._detect_sql_injection("' or 1=1")
+        assert sanitizer._detect_path_traversal("../x")
+        assert not sanitizer._detect_xss("plain answer")
+
+
+class TestValidateAndSanitize:
+    """Test traversal, sanitizing and error reporting."""
+
+    def test_valid_payload_is_stripped(self, sanitizer):
+        data = {"responses": [{"question_id": 1, "answer": "  Yes please  "}, {"question_id": 2, "answer": None}]}
+        valid, sanitized, errors = sanitizer.validate_and_sanitize(data, "body")
+        assert valid and errors == []
+        assert sanitized == {"responses": [{"question_id": 1, "answer": "Yes please"}, {"question_id": 2, "answer": None}]}
+
+    def test_sanitize_disabled_keeps_strings(self):
+        sanitizer = InputSanitizer(make_config(sanitize_inputs=False))
+        assert sanitizer.validate_and_sanitize(["  a  "]) == (True, ["  a  "], [])
+
+    def test_errors_in_document_order(self, sanitizer):
+        data = {
+            "a": "<script>x</script>",
+            "b": ["ok", "../etc", {"c": "' or 1=1"}],
+            "<script>k</script>": "value",
+            "d": "x" * 5001,
+            "e": object()
+        }
+        valid, _, errors = sanitizer.validate_and_sanitize(data, "body")
+        assert not valid
+        assert errors[:4] == [
+            "body.a: Potential XSS attack detected",
+            "body.b[1]: Path traversal attempt detected",
+            "body.b[2].c: Potential SQL injection detected",
+            "body.<script>k</script>: Potential XSS attack detected"
+        ]
+        assert errors[4] == "body.d: Input too long (5001 > 5000)"
+        assert errors[5].startswith("body.e: Unsupported data type")
+
+    def test_string_with_multiple_categories(self, sanitizer):
+        valid, _, errors = sanitizer.validate_and_sanitize("<script>x</script> ../ ' or 1=1", "q")
+        assert not valid
+        assert errors == [
+            "q: Potential XSS attack detected",
+            "q: Potential SQL injection detected",
+            "q: Path traversal attempt detected"
+        ]
+
+    def test_deep_nesting(self, sanitizer):
+        data = "leaf"
+        for _ in range(5000):
+            data = [data]
+        valid, sanitized, errors = sanitizer.validate_and_sanitize(data)
+        assert valid and errors == []
+        for _ in range(5000):
+            sanitized = sanitized[0]
+        assert sanitized == "leaf"
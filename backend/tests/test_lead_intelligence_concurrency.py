@@ -0,0 +1,115 @@
+"""
+Tests for concurrent LLM requests in the lead intelligence agent.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.graphs.supervisors.consolidated_lead_intelligence_agent import (
+    ConsolidatedLeadIntelligenceAgent, DEFAULT_COMPLETION_MESSAGE
+)
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class SlowLLM:
+    """Answers by system prompt after a fixed delay and records peak concurrency"""
+
+    def __init__(self, delay=0.2, answers=None):
+        self.delay = delay
+        self.answers = answers or {}
+        self.in_flight = 0
+        self.peak = 0
+
+    async def ainvoke(self, messages):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        system_prompt = messages[0]["content"]
+        for marker, answer in self.answers.items():
+            if marker in system_prompt:
+                return FakeResponse(answer)
+        return FakeResponse("")
+
+    def invoke(self, messages):
+        time.sleep(self.delay)
+        return FakeResponse("")
+
+
+def _agent(llm, timeout_seconds=5, max_concurrency=3):
+    agent = ConsolidatedLeadIntelligenceAgent.__new__(ConsolidatedLeadIntelligenceAgent)
+    agent.name = "ConsolidatedLeadIntelligenceAgent"
+    agent.model = llm
+    agent.llm = llm
+    agent.timeout_seconds = timeout_seconds
+    agent.max_concurrency = max_concurrency
+    agent.event_loop = None
+    return agent
+
+
+RESPONSES = [{"question_text": "Where do you live?", "answer": "Austin"}]
+
+
+def test_independent_calls_take_max_not_sum_latency():
+    llm = SlowLLM(delay=0.3, answers={"TOOL RECOMMENDATION": "maps", "BUSINESS FIT ASSESSMENT": "GOOD_FIT"})
+    agent = _agent(llm)
+
+    start = time.perf_counter()
+    tool_content, fit_content = agent.invoke_llm_concurrently(
+        [
+            agent._build_tool_recommendation_messages(RESPONSES),
+            agent._build_business_fit_messages(RESPONSES, "Pet sitting in Austin")
+        ],
+        model=llm
+    )
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.55
+    assert llm.peak == 2
+    assert agent._parse_tool_recommendation(tool_content) == "maps"
+    assert agent._parse_business_fit(fit_content) == "GOOD_FIT"
+
+
+def test_concurrency_cap_is_respected():
+    llm = SlowLLM(delay=0.05)
+    agent = _agent(llm, max_concurrency=2)
+
+    results = agent.invoke_llm_concurrently([[{"role": "user", "content": str(i)}] for i in range(5)])
+
+    assert len(results) == 5
+    assert llm.peak == 2
+
+
+def test_timeout_falls_back_to_defaults():
+    llm = SlowLLM(delay=1.0, answers={"TOOL RECOMMENDATION": "both"})
+    agent = _agent(llm, timeout_seconds=0.1)
+
+    start = time.perf_counter()
+    assert agent._get_tool_recommendations(RESPONSES) == "none"
+    assert agent._get_business_fit_assessment(RESPONSES, "") == "OKAY_FIT"
+    assert agent._generate_completion_message_llm("yes", RESPONSES, "") == DEFAULT_COMPLETION_MESSAGE
+    assert time.perf_counter() - start < 1.0
+
+
+@pytest.mark.asyncio
+async def test_worker_thread_schedules_requests_on_owning_loop():
+    llm = SlowLLM(delay=0.2, answers={"TOOL RECOMMENDATION": "tavily"})
+    agent = _agent(llm)
+    agent.event_loop = asyncio.get_running_loop()
+
+    start = time.perf_counter()
+    results = await asyncio.to_thread(
+        agent.invoke_llm_concurrently,
+        [agent._build_tool_recommendation_messages(RESPONSES)] * 3
+    )
+
+    assert time.perf_counter() - start < 0.5
+    assert [agent._parse_tool_recommendation(r) for r in results] == ["tavily"] * 3
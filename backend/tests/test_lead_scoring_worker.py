@@ -0,0 +1,221 @@
+"""
+Tests for background lead scoring (queue producer path and worker).
+"""
+
+import asyncio
+
+import pytest
+
+from app.lead_scoring_worker import LeadScoringWorker, lead_result_payload
+from app.graphs.supervisors import consolidated_lead_intelligence_agent as agent_module
+from app.graphs.supervisors.consolidated_lead_intelligence_agent import ConsolidatedLeadIntelligenceAgent
+
+
+class MemoryQueue:
+    """In-process stand-in for LeadScoringQueue"""
+
+    def __init__(self, jobs=None, fail_enqueue=False):
+        self.jobs = list(jobs or [])
+        self.fail_enqueue = fail_enqueue
+        self.enqueued = []
+        self.results = {}
+        self.acked = []
+        self.failed = []
+
+    async def enqueue(self, session_id, state):
+        if self.fail_enqueue:
+            raise ConnectionError("redis down")
+        self.enqueued.append((session_id, state))
+        return "job-1"
+
+    async def recover(self, worker_id):
+        return 0
+
+    async def dequeue(self, worker_id, timeout=5):
+        if self.jobs:
+            return self.jobs.pop(0)
+        await asyncio.sleep(0.01)
+        return None
+
+    async def ack(self, worker_id, job):
+        self.acked.append(job["job_id"])
+
+    async def fail(self, worker_id, job, error):
+        self.failed.append((job["job_id"], error))
+
+    async def publish_result(self, session_id, result):
+        self.results[session_id] = result
+
+
+class FakeAgent:
+    def __init__(self, classification=None, error=None):
+        self.classification = classification or {
+            "lead_status": "yes", "final_score": 82, "confidence": 0.8,
+            "completion_message": "We'll call you today!", "next_actions": ["call"], "completed": True
+        }
+        self.error = error
+        self.event_loop = None
+
+    def classify_responses(self, state):
+        if self.error:
+            raise self.error
+        return self.classification
+
+
+def _job(job_id, session_id="s-1"):
+    return {"job_id": job_id, "session_id": session_id, "state": {"core": {"session_id": session_id}}, "_raw": job_id}
+
+
+async def _run_until_drained(worker, queue, expected):
+    task = asyncio.create_task(worker.run())
+    for _ in range(200):
+        if len(queue.acked) + len(queue.failed) >= expected:
+            break
+        await asyncio.sleep(0.01)
+    worker.stop()
+    await task
+
+
+def test_result_payload_uses_step_response_field_names():
+    payload = lead_result_payload({"job_id": "j"}, FakeAgent().classification)
+
+    assert payload["status"] == "ready"
+    assert (payload["leadStatus"], payload["score"], payload["message"]) == ("yes", 82, "We'll call you today!")
+    assert payload["nextSteps"] == ["call"]
+
+
+@pytest.mark.asyncio
+async def test_worker_publishes_and_acks():
+    queue = MemoryQueue(jobs=[_job("j1", "s-1"), _job("j2", "s-2")])
+    worker = LeadScoringWorker(queue=queue, concurrency=2, worker_id="w", agent_factory=FakeAgent)
+
+    await _run_until_drained(worker, queue, expected=2)
+
+    assert sorted(queue.acked) == ["j1", "j2"]
+    assert queue.results["s-1"]["leadStatus"] == "yes"
+    assert queue.results["s-2"]["job_id"] == "j2"
+
+
+@pytest.mark.asyncio
+async def test_worker_reports_failed_jobs():
+    queue = MemoryQueue(jobs=[_job("j1")])
+    worker = LeadScoringWorker(
+        queue=queue, concurrency=1, worker_id="w",
+        agent_factory=lambda: FakeAgent(error=RuntimeError("llm down"))
+    )
+
+    await _run_until_drained(worker, queue, expected=1)
+
+    assert queue.failed == [("j1", "llm down")]
+    assert queue.acked == []
+
+
+def _background_agent(monkeypatch, route="continue"):
+    agent = ConsolidatedLeadIntelligenceAgent.__new__(ConsolidatedLeadIntelligenceAgent)
+    agent.name = "ConsolidatedLeadIntelligenceAgent"
+    agent.background_scoring = True
+    agent.event_loop = None
+    monkeypatch.setattr(agent, "_save_responses", lambda state: {"success": True})
+    monkeypatch.setattr(agent, "_determine_route_decision", lambda state, status: route)
+    monkeypatch.setattr(agent, "classify_responses", lambda state: pytest.fail("scored inline"))
+    return agent
+
+
+STATE = {
+    "core": {"session_id": "s-1", "form_id": "f-1"},
+    "pending_responses": [{"question_id": 3, "answer": "Austin"}],
+    "question_strategy": {"asked_questions": [1, 2]},
+    "lead_intelligence": {"lead_status": "unknown"},
+    "step_context": {"lead_session": {"lead_status": "maybe", "final_score": 55}}
+}
+
+
+def test_background_mode_skips_inline_scoring(monkeypatch):
+    agent = _background_agent(monkeypatch)
+
+    result = agent.process_lead_responses(STATE)
+
+    assert result["scoring_pending"] is True
+    assert result["lead_intelligence"]["scoring_pending"] is True
+    # Status recorded by the worker for earlier steps is kept
+    assert (result["lead_status"], result["final_score"]) == ("maybe", 55)
+    assert result["pending_responses"] == []
+
+
+@pytest.mark.asyncio
+async def test_node_queues_job(monkeypatch):
+    import app.lead_scoring_queue as queue_module
+    queue = MemoryQueue()
+    monkeypatch.setattr(queue_module, "lead_scoring_queue", queue)
+    monkeypatch.setattr(agent_module, "ConsolidatedLeadIntelligenceAgent", lambda: _background_agent(monkeypatch))
+
+    result = await agent_module.consolidated_lead_intelligence_node(STATE)
+
+    assert result["scoring_pending"] is True
+    assert queue.enqueued[0][0] == "s-1"
+
+
+@pytest.mark.asyncio
+async def test_node_scores_inline_when_queue_unavailable(monkeypatch):
+    import app.lead_scoring_queue as queue_module
+    monkeypatch.setattr(queue_module, "lead_scoring_queue", MemoryQueue(fail_enqueue=True))
+    agent = _background_agent(monkeypatch)
+    monkeypatch.setattr(agent, "classify_responses", lambda state: FakeAgent().classification)
+    monkeypatch.setattr(agent_module, "ConsolidatedLeadIntelligenceAgent", lambda: agent)
+
+    result = await agent_module.consolidated_lead_intelligence_node(STATE)
+
+    assert result["scoring_pending"] is False
+    assert result["lead_intelligence"]["lead_status"] == "yes"
+
+
+class ScoredSessionDB:
+    """Async database stand-in whose lead_sessions row holds the worker's classification"""
+
+    def __init__(self, lead_status, final_score=0, confidence=0.0):
+        self.row = {
+            "session_id": "s-1", "form_id": None, "client_id": None, "step": 0,
+            "lead_status": lead_status, "final_score": final_score, "confidence": confidence
+        }
+
+    async def get_lead_session(self, session_id):
+        return self.row
+
+
+async def _state_with_prefetched_context(monkeypatch, db):
+    from app import step_context
+    monkeypatch.setattr(step_context, "db_async", db)
+    context = await step_context.prefetch_step_context("s-1", include_snapshot=False)
+    return {
+        **{key: value for key, value in STATE.items() if key != "step_context"},
+        "step_context": step_context.graph_step_context(context)
+    }
+
+
+@pytest.mark.asyncio
+async def test_worker_classification_reaches_routing(monkeypatch):
+    state = await _state_with_prefetched_context(monkeypatch, ScoredSessionDB("no", 12, 0.9))
+    agent = _background_agent(monkeypatch)
+    monkeypatch.setattr(
+        agent, "_determine_route_decision",
+        lambda state, status: "end" if status in ("yes", "no") else "continue"
+    )
+
+    result = agent.process_lead_responses(state)
+
+    # The definitive "no" the worker recorded ends the survey
+    assert (result["lead_status"], result["final_score"], result["confidence"]) == ("no", 12, 0.9)
+    assert result["route_decision"] == "end" and result["completed"] is True
+
+
+@pytest.mark.asyncio
+async def test_pending_completion_uses_default_message(monkeypatch):
+    from app.routes.survey_api import _step_response_data
+    state = await _state_with_prefetched_context(monkeypatch, ScoredSessionDB("yes", 90))
+    result = _background_agent(monkeypatch, route="end").process_lead_responses(state)
+
+    response_data, _ = _step_response_data({**result, "route_decision": "end"})
+
+    completion = response_data["completionData"]
+    assert completion["message"] == "Thank you for your time and interest."
+    assert completion["scoringPending"] is True
@@ -0,0 +1,147 @@
+"""
+Tests for the LLM response cache and its use in SupervisorAgent.invoke_llm.
+"""
+
+import pytest
+
+from app.utils.llm_cache import LLMResponseCache, make_cache_key
+from app.graphs.supervisors import base_supervisor
+from app.graphs.supervisors.base_supervisor import SupervisorAgent
+
+
+MESSAGES = [{"role": "system", "content": "You pick questions."}, {"role": "user", "content": "Questions: 1, 2"}]
+
+
+class TestLLMResponseCache:
+    """Test LRU, TTL, invalidation and stats."""
+
+    def test_key_depends_on_model_params_and_messages(self):
+        key = make_cache_key("gpt-4.1-nano", {"temperature": 0.3}, MESSAGES)
+
+        assert key == make_cache_key("gpt-4.1-nano", {"temperature": 0.3}, list(MESSAGES))
+        assert key != make_cache_key("gpt-4o-mini", {"temperature": 0.3}, MESSAGES)
+        assert key != make_cache_key("gpt-4.1-nano", {"temperature": 0.7}, MESSAGES)
+        assert key != make_cache_key("gpt-4.1-nano", {"temperature": 0.3}, MESSAGES[:1])
+
+    def test_hit_and_miss_counters(self):
+        cache = LLMResponseCache()
+
+        assert cache.get("k", form_id="f1") is None
+        cache.set("k", "answer", form_id="f1")
+        assert cache.get("k", form_id="f1") == "answer"
+
+        stats = cache.get_stats()
+        assert stats['memory_hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate_percent'] == 50.0
+
+    def test_entries_expire(self, monkeypatch):
+        cache = LLMResponseCache(default_ttl=10)
+        now = [1000.0]
+        monkeypatch.setattr("app.utils.llm_cache.time.time", lambda: now[0])
+
+        cache.set("k", "answer")
+        now[0] += 11
+
+        assert cache.get("k") is None
+        assert cache.get_stats()['entries'] == 0
+
+    def test_lru_eviction(self):
+        cache = LLMResponseCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_invalidate_form_only_drops_that_form(self):
+        cache = LLMResponseCache()
+        cache.set("k", "form one", form_id="f1")
+        cache.set("k", "form two", form_id="f2")
+
+        assert cache.invalidate_form("f1") == 1
+        assert cache.get("k", form_id="f1") is None
+        assert cache.get("k", form_id="f2") == "form two"
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = LLMResponseCache(enabled=False)
+        cache.set("k", "answer")
+
+        assert cache.get("k") is None
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeModel:
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        return FakeResponse(f"reply {self.calls}")
+
+    def bind_tools(self, tools):
+        return self
+
+
+class EchoSupervisor(SupervisorAgent):
+    def __init__(self, model):
+        self.name = "EchoSupervisor"
+        self.model_name = "fake-model"
+        self.temperature = 0.3
+        self.max_tokens = 100
+        self.model = model
+        self.decision_history = []
+
+    def get_system_prompt(self):
+        return "System"
+
+    def make_decision(self, state, context=None):
+        return None
+
+
+class TestInvokeLLMCache:
+    """Test that invoke_llm serves repeated prompts from the cache."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        cache = LLMResponseCache()
+        monkeypatch.setattr(base_supervisor, "llm_cache", cache)
+        return cache
+
+    def test_repeated_prompt_skips_llm_call(self):
+        model = FakeModel()
+        supervisor = EchoSupervisor(model)
+
+        first = supervisor.invoke_llm(MESSAGES, cache_form_id="f1")
+        second = supervisor.invoke_llm(MESSAGES, cache_form_id="f1")
+
+        assert first == second == "reply 1"
+        assert model.calls == 1
+
+    def test_form_invalidation_forces_new_call(self, fresh_cache):
+        model = FakeModel()
+        supervisor = EchoSupervisor(model)
+
+        supervisor.invoke_llm(MESSAGES, cache_form_id="f1")
+        fresh_cache.invalidate_form("f1")
+
+        assert supervisor.invoke_llm(MESSAGES, cache_form_id="f1") == "reply 2"
+
+    def test_tool_calls_and_opt_out_bypass_cache(self):
+        model = FakeModel()
+        supervisor = EchoSupervisor(model)
+
+        supervisor.invoke_llm(MESSAGES, tools=[object()])
+        supervisor.invoke_llm(MESSAGES, tools=[object()])
+        supervisor.invoke_llm(MESSAGES, use_cache=False)
+
+        assert model.calls == 3
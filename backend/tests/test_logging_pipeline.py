@@ -0,0 +1,197 @@
+"""
+Tests for the queued, sampled logging pipeline.
+"""
+
+import logging
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils import fastapi_logging
+from app.utils.fastapi_logging import (
+    DroppingQueueHandler, LogQueueListener, LoggingMiddleware, RouteSampler, SamplingFilter,
+    get_log_pipeline_stats, parse_sample_rates, setup_fastapi_logging, stop_log_pipeline
+)
+
+
+class RecordingHandler(logging.Handler):
+    """Collects formatted lines; optionally blocks until released"""
+
+    def __init__(self, gate: threading.Event = None):
+        super().__init__()
+        self.lines = []
+        self.threads = set()
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.threads.add(threading.get_ident())
+        self.lines.append(self.format(record))
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+class TestQueueHandler:
+    """Test records are written off the calling thread and never block it."""
+
+    def test_written_by_listener_thread(self):
+        output = RecordingHandler()
+        queue_handler = DroppingQueueHandler(100)
+        listener = LogQueueListener(queue_handler, output)
+        listener.start()
+        logger = make_logger("test.pipeline.thread", queue_handler)
+
+        logger.info("hello %s", "world")
+        listener.stop()
+
+        assert output.lines == ["hello world"]
+        assert threading.get_ident() not in output.threads
+
+    def test_arguments_merged_at_call_time(self):
+        output = RecordingHandler()
+        queue_handler = DroppingQueueHandler(100)
+        logger = make_logger("test.pipeline.args", queue_handler)
+
+        state = {"step": 1}
+        logger.info("state = %s", state)
+        state["step"] = 2
+
+        listener = LogQueueListener(queue_handler, output)
+        listener.start()
+        listener.stop()
+        assert output.lines == ["state = {'step': 1}"]
+
+    def test_full_queue_drops_and_reports(self):
+        gate = threading.Event()
+        output = RecordingHandler(gate)
+        queue_handler = DroppingQueueHandler(2)
+        listener = LogQueueListener(queue_handler, output)
+        listener.start()
+        logger = make_logger("test.pipeline.drops", queue_handler)
+
+        # The listener holds the first record until released, then the queue fills
+        for i in range(10):
+            logger.info("line %d", i)
+        dropped = sum(queue_handler.dropped.values())
+        assert dropped >= 10 - 3
+        assert queue_handler.dropped.keys() == {"INFO"}
+
+        gate.set()
+        listener.stop()
+        assert len(output.lines) == 10 - dropped + 1
+        assert output.lines.count(f"Log queue full: dropped {dropped} records") == 1
+
+    def test_exception_formatted_by_listener(self):
+        output = RecordingHandler()
+        output.setFormatter(logging.Formatter("%(message)s"))
+        queue_handler = DroppingQueueHandler(100)
+        logger = make_logger("test.pipeline.exc", queue_handler)
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            logger.error("failed", exc_info=True)
+
+        listener = LogQueueListener(queue_handler, output)
+        listener.start()
+        listener.stop()
+        assert output.lines[0].startswith("failed\nTraceback")
+        assert "ValueError: bad" in output.lines[0]
+
+
+class TestSampling:
+    """Test per-route sampling of debug lines."""
+
+    def test_parse_sample_rates(self):
+        assert parse_sample_rates("/api/survey/step=0.1, /api=2,bad,/x=nan?,") == (
+            {"/api/survey/step": 0.1, "/api": 1.0}, ["bad", "/x=nan?"]
+        )
+        assert parse_sample_rates(None) == ({}, [])
+
+    def test_longest_prefix_wins(self):
+        sampler = RouteSampler({"/api": 0.5, "/api/survey/step": 0.0})
+        assert sampler.rate_for("/api/survey/step") == 0.0
+        assert sampler.rate_for("/api/analytics") == 0.5
+        assert sampler.rate_for("/health") == 1.0
+        assert not sampler.sample("/api/survey/step")
+        assert sampler.sample("/health")
+
+    def test_unsampled_request_drops_only_debug(self):
+        output = RecordingHandler()
+        sampling_filter = SamplingFilter(RouteSampler({"/api/survey/step": 0.0}))
+        output.addFilter(sampling_filter)
+        logger = make_logger("test.pipeline.sampling", output)
+        app = FastAPI()
+
+        @app.post("/api/survey/step")
+        async def step():
+            logger.debug("state dump")
+            logger.info("step processed")
+            return {"ok": True}
+
+        @app.get("/health")
+        async def health():
+            logger.debug("health detail")
+            return {"ok": True}
+
+        app.add_middleware(LoggingMiddleware)
+        monkeypatch = pytest.MonkeyPatch()
+        monkeypatch.setattr(fastapi_logging, "route_sampler", sampling_filter.sampler)
+        try:
+            client = TestClient(app)
+            client.post("/api/survey/step")
+            client.get("/health")
+        finally:
+            monkeypatch.undo()
+
+        assert output.lines == ["step processed", "health detail"]
+        assert sampling_filter.sampled_out == 1
+
+
+class TestSetup:
+    """Test setup_fastapi_logging wires the named loggers through the queue."""
+
+    @pytest.fixture(autouse=True)
+    def restore_loggers(self):
+        saved = {
+            name: (logging.getLogger(name).handlers[:], logging.getLogger(name).level, logging.getLogger(name).propagate)
+            for name in fastapi_logging.LOGGER_NAMES
+        }
+        yield
+        stop_log_pipeline()
+        for name, (handlers, level, propagate) in saved.items():
+            logger = logging.getLogger(name)
+            logger.handlers = handlers
+            logger.setLevel(level)
+            logger.propagate = propagate
+
+    def test_queued_setup(self, tmp_path):
+        log_file = tmp_path / "app.log"
+        setup_fastapi_logging("INFO", str(log_file), queue_size=50)
+
+        logger = logging.getLogger("survey_api")
+        assert len(logger.handlers) == 1
+        assert isinstance(logger.handlers[0], DroppingQueueHandler)
+        logger.info("queued line", extra={"correlation_id": "abc"})
+
+        stats = get_log_pipeline_stats()
+        assert stats["async"] is True and stats["capacity"] == 50
+
+        stop_log_pipeline()
+        assert '"message": "queued line"' in log_file.read_text()
+        assert '"correlation_id": "abc"' in log_file.read_text()
+        assert logging.getLogger("survey_api").handlers == []
+
+    def test_synchronous_setup(self):
+        setup_fastapi_logging("INFO", queue_size=0)
+        handlers = logging.getLogger("survey_api").handlers
+        assert [type(h) for h in handlers] == [logging.StreamHandler]
+        assert get_log_pipeline_stats()["async"] is False
@@ -0,0 +1,244 @@
+"""
+Tests for the bounded LRU + TTL cache.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils.lru_cache import LRUTTLCache
+
+
+class SlowLoader:
+    """Sync loader counting calls; each call takes ``delay`` seconds"""
+
+    def __init__(self, value="value", delay=0.05):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+def wait_for(condition, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class TestBasicOperations:
+    """Test bounds, expiry and metrics."""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUTTLCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.keys() == ["a", "c"]
+        assert cache.get("b") is None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_entries_expire(self):
+        cache = LRUTTLCache(default_ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_cleanup_expired_removes_entries_past_stale_window(self):
+        cache = LRUTTLCache(default_ttl=0.01, stale_ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=-20)
+        time.sleep(0.02)
+
+        assert cache.cleanup_expired() == 1
+        assert cache.keys() == ["a"]
+
+    def test_delete_where(self):
+        cache = LRUTTLCache()
+        cache.set("x1", {"client_id": "c1"})
+        cache.set("x2", {"client_id": "c2"})
+
+        assert cache.delete_where(lambda key, value: value["client_id"] == "c1") == 1
+        assert cache.keys() == ["x2"]
+
+    def test_stats_report_hit_rate(self):
+        cache = LRUTTLCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate_percent"] == 50.0
+        assert stats["size"] == 1
+
+
+class TestSingleFlight:
+    """Test coalesced loading on misses."""
+
+    def test_concurrent_sync_misses_load_once(self):
+        cache = LRUTTLCache()
+        results = []
+        calls = []
+
+        def loader():
+            calls.append(1)
+            # Hold the load until every other caller is waiting on it
+            wait_for(lambda: cache.get_stats()["coalesced"] == 9, timeout=5)
+            return "value"
+
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load("form", loader)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 10
+        assert cache.get_stats()["coalesced"] == 9
+
+    def test_loader_error_reaches_every_caller_and_is_not_cached(self):
+        cache = LRUTTLCache()
+
+        def failing():
+            time.sleep(0.02)
+            raise RuntimeError("database down")
+
+        errors = []
+
+        def call():
+            try:
+                cache.get_or_load("form", failing)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+        assert len(cache) == 0
+        assert cache.get_stats()["load_errors"] == 1
+
+    def test_load_racing_delete_is_not_stored(self):
+        cache = LRUTTLCache()
+
+        def loader():
+            cache.delete("form")
+            return "old"
+
+        assert cache.get_or_load("form", loader) == "old"
+        assert cache.get("form") is None
+
+    def test_caller_after_delete_starts_a_fresh_load(self):
+        cache = LRUTTLCache()
+        started, release = threading.Event(), threading.Event()
+        results = []
+
+        def old_loader():
+            started.set()
+            release.wait(5)
+            return "old"
+
+        leader = threading.Thread(target=lambda: results.append(cache.get_or_load("form", old_loader)))
+        leader.start()
+        started.wait(5)
+        cache.delete("form")
+
+        # Does not join the invalidated load, so it neither waits for nor gets "old"
+        assert cache.get_or_load("form", lambda: "new") == "new"
+        assert cache.get_stats()["coalesced"] == 0
+        release.set()
+        leader.join()
+
+        assert results == ["old"]
+        assert cache.get("form") == "new"
+
+    def test_force_reloads(self):
+        cache = LRUTTLCache()
+        cache.set("form", "old")
+
+        assert cache.get_or_load("form", lambda: "new", force=True) == "new"
+        assert cache.get("form") == "new"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_async_misses_load_once(self):
+        cache = LRUTTLCache()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "value"
+
+        results = await asyncio.gather(*[cache.aget_or_load("form", loader) for _ in range(10)])
+
+        assert results == ["value"] * 10
+        assert len(calls) == 1
+        assert cache.get("form") == "value"
+
+    @pytest.mark.asyncio
+    async def test_async_loader_error_propagates(self):
+        cache = LRUTTLCache()
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            cache.aget_or_load("form", loader), cache.aget_or_load("form", loader), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(cache) == 0
+
+
+class TestStaleWhileRevalidate:
+    """Test serving expired entries during a background reload."""
+
+    def test_sync_stale_value_served_while_refreshing(self):
+        cache = LRUTTLCache(stale_ttl=10)
+        cache.set("metrics", "old", ttl=-1)
+        loader = SlowLoader("new", delay=0.02)
+
+        assert cache.get_or_load("metrics", loader) == "old"
+        assert cache.get_or_load("metrics", loader) == "old"
+        assert wait_for(lambda: cache.get("metrics") == "new")
+        assert loader.calls == 1
+        assert cache.get_stats()["stale_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_async_stale_value_served_while_refreshing(self):
+        cache = LRUTTLCache(stale_ttl=10)
+        cache.set("form", "old", ttl=-1)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "new"
+
+        assert await cache.aget_or_load("form", loader) == "old"
+        assert await cache.aget_or_load("form", loader) == "old"
+        await asyncio.sleep(0.05)
+
+        assert cache.get("form") == "new"
+        assert len(calls) == 1
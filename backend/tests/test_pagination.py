@@ -0,0 +1,70 @@
+"""
+Tests for keyset cursor pagination helpers.
+"""
+
+import pytest
+
+from app.utils.pagination import NEXT, PREV, apply_keyset, decode_cursor, encode_cursor, keyset_filter, paginate_rows
+
+ORDER = [("created_at", True), ("id", True)]
+
+
+class FakeQuery:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return record
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(["2026-01-01T00:00:00+00:00", "f-1"], PREV, ORDER)
+    assert decode_cursor(cursor, ORDER) == (["2026-01-01T00:00:00+00:00", "f-1"], PREV)
+
+
+def test_cursor_for_another_sort_is_rejected():
+    cursor = encode_cursor(["Intake", "f-1"], NEXT, [("title", False), ("id", False)])
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, ORDER)
+    with pytest.raises(ValueError):
+        decode_cursor("%%%", ORDER)
+
+
+def test_keyset_filter_follows_sort_direction():
+    values = ["2026-01-01T00:00:00+00:00", "f-1"]
+    assert keyset_filter(ORDER, values, NEXT) == (
+        'created_at.lt."2026-01-01T00:00:00+00:00",'
+        'and(created_at.eq."2026-01-01T00:00:00+00:00",id.lt."f-1")'
+    )
+    assert keyset_filter([("is_default", True), ("name", False)], [True, 'A "b", c'], PREV) == (
+        'is_default.gt.true,and(is_default.eq.true,name.lt."A \\"b\\", c")'
+    )
+
+
+def test_prev_page_is_read_in_reverse():
+    query = FakeQuery()
+    _, direction = apply_keyset(query, ORDER, 10, encode_cursor(["t", "f-1"], PREV, ORDER))
+
+    assert direction == PREV
+    assert [c for c in query.calls if c[0] == "order"] == [
+        ("order", ("created_at",), {"desc": False}), ("order", ("id",), {"desc": False})
+    ]
+    assert query.calls[-1] == ("limit", (11,), {})
+
+
+def test_paginate_rows_builds_cursors():
+    rows = [{"created_at": f"t{n}", "id": f"f-{n}"} for n in (3, 2, 1)]
+
+    page, next_cursor, prev_cursor = paginate_rows(list(rows), ORDER, 2, None)
+    assert [r["id"] for r in page] == ["f-3", "f-2"]
+    assert decode_cursor(next_cursor, ORDER) == (["t2", "f-2"], NEXT)
+    assert prev_cursor is None
+
+    # Backward reads come back oldest first
+    page, next_cursor, prev_cursor = paginate_rows(list(reversed(rows)), ORDER, 2, PREV)
+    assert [r["id"] for r in page] == ["f-2", "f-1"]
+    assert decode_cursor(prev_cursor, ORDER) == (["t2", "f-2"], PREV)
+    assert decode_cursor(next_cursor, ORDER) == (["t1", "f-1"], NEXT)
@@ -0,0 +1,71 @@
+"""
+Tests for the per-event-loop asyncpg pools.
+"""
+
+import asyncio
+import threading
+
+import asyncpg
+import pytest
+
+from app.utils.pg_pool import PostgresPool
+
+
+class FakeAsyncpgPool:
+    def __init__(self):
+        self.closed = False
+        self.terminated = False
+
+    async def close(self):
+        self.closed = True
+
+    def terminate(self):
+        self.terminated = True
+
+
+@pytest.fixture
+def created(monkeypatch):
+    pools = []
+
+    async def create_pool(dsn, **kwargs):
+        pools.append(FakeAsyncpgPool())
+        return pools[-1]
+
+    monkeypatch.setattr(asyncpg, "create_pool", create_pool)
+    return pools
+
+
+def test_second_loop_gets_its_own_pool(created):
+    pool = PostgresPool(dsn="postgresql://localhost/test")
+
+    async def request_loop():
+        first = await pool.get_pool()
+        # Another thread running its own loop, like the alert monitor's asyncio.run
+        other = []
+        thread = threading.Thread(target=lambda: other.append(asyncio.run(pool.get_pool())))
+        thread.start()
+        thread.join()
+        return first, other[0], await pool.get_pool()
+
+    first, other, again = asyncio.run(request_loop())
+
+    assert first is again and first is not other
+    assert not first.terminated and not first.closed
+    assert len(created) == 2
+
+
+def test_closed_loop_pools_are_dropped_and_close_is_per_loop(created):
+    pool = PostgresPool(dsn="postgresql://localhost/test")
+    asyncio.run(pool.get_pool())
+    assert len(pool._pools) == 1
+
+    async def request_loop():
+        current = await pool.get_pool()
+        await pool.close()
+        return current
+
+    current = asyncio.run(request_loop())
+
+    assert current.closed
+    assert not created[0].closed and not created[0].terminated
+    assert pool._pools == {}
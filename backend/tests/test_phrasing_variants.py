@@ -0,0 +1,134 @@
+"""
+Tests for precomputed question phrasing variants and their runtime use.
+"""
+
+from app.utils.phrasing_variants import (
+    question_variants, pick_variant, parse_variants_response, generate_form_variants
+)
+from app.graphs.supervisors.consolidated_survey_admin_supervisor import ConsolidatedSurveyAdminSupervisor
+
+
+LLM_OUTPUT = """QUESTION_1_VARIANT_1: What should we call you?
+QUESTION_1_VARIANT_2: Who are we chatting with today?
+QUESTION_2_VARIANT_1: How many pets share your home?
+HEADLINE_1: Let's find your perfect fit!
+MESSAGE_1: A few quick answers help us tailor everything to you.
+HEADLINE_2: Almost there!
+"""
+
+
+def _question(question_id, text, variants=None, order=0, required=False):
+    question = {"question_id": question_id, "question_text": text, "question_order": order, "is_required": required}
+    if variants is not None:
+        question["phrasing_variants"] = {"question_text": text, "variants": variants}
+    return question
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        return FakeResponse(LLM_OUTPUT)
+
+
+class FakeDB:
+    def __init__(self):
+        self.question_updates = {}
+        self.engagement = None
+
+    def get_form_questions(self, form_id):
+        return [_question(1, "Name?"), _question(2, "Pets?"), _question(3, "Budget?")]
+
+    def get_client_by_form(self, form_id):
+        return {"name": "Pawsome", "industry": "pet care"}
+
+    def update_question_phrasing_variants(self, form_id, question_id, variants):
+        self.question_updates[question_id] = variants
+
+    def update_form_engagement_variants(self, form_id, variants):
+        self.engagement = variants
+
+
+class TestPhrasingVariants:
+    """Test parsing, storage and lookup of variants."""
+
+    def test_parse_variants_response(self):
+        parsed = parse_variants_response(LLM_OUTPUT)
+
+        assert parsed["questions"][1] == ["What should we call you?", "Who are we chatting with today?"]
+        assert parsed["questions"][2] == ["How many pets share your home?"]
+        assert parsed["engagement"][0] == {
+            "headline": "Let's find your perfect fit!",
+            "message": "A few quick answers help us tailor everything to you."
+        }
+        assert parsed["engagement"][1]["message"] == ""
+
+    def test_generate_form_variants_stores_per_question(self):
+        db = FakeDB()
+        llm = FakeLLM()
+
+        summary = generate_form_variants("form-1", count=2, database=db, llm=llm)
+
+        assert len(llm.calls) == 1
+        assert summary["questions_updated"] == 2
+        assert db.question_updates[1]["question_text"] == "Name?"
+        assert db.question_updates[1]["variants"] == ["What should we call you?", "Who are we chatting with today?"]
+        assert 3 not in db.question_updates
+        assert len(db.engagement) == 2
+
+    def test_variants_for_edited_question_are_ignored(self):
+        question = _question(1, "Name?", ["Who are you?"])
+        assert question_variants(question) == ["Who are you?"]
+
+        question["question_text"] = "Full name?"
+        assert question_variants(question) == []
+        assert question_variants(_question(2, "Pets?")) == []
+
+    def test_pick_variant_is_stable_per_session(self):
+        variants = ["a", "b", "c", "d"]
+
+        assert pick_variant(variants, "s-1", 7) == pick_variant(variants, "s-1", 7)
+        assert {pick_variant(variants, f"s-{i}", 7) for i in range(50)} == set(variants)
+
+
+class TestPrecomputedDecision:
+    """Test local question delivery in the survey admin supervisor."""
+
+    def _supervisor(self):
+        # Skip __init__ - no chat model is needed for local phrasing
+        return ConsolidatedSurveyAdminSupervisor.__new__(ConsolidatedSurveyAdminSupervisor)
+
+    def _analysis(self):
+        return {"risk_level": "high", "questions_asked": 2, "progress_percentage": 20.0}
+
+    def test_uses_stored_variants_without_llm(self):
+        state = {
+            "core": {"session_id": "s-1"},
+            "step_context": {"form": {"engagement_variants": [{"headline": "Nearly done!", "message": "Thanks!"}]}},
+        }
+        # Priority order, as from FormQuestionIndex.prioritized
+        questions = [
+            _question(3, "Name?", ["What should we call you?"], order=2, required=True),
+            _question(5, "Budget?", ["What budget feels right?"], order=1),
+        ]
+
+        decision = self._supervisor()._make_precomputed_decision(state, questions, self._analysis())
+
+        # High risk selects one question, the first in priority order
+        assert [q["question_id"] for q in decision["selected_questions"]] == [3]
+        assert decision["selected_questions"][0]["final_text"] == "What should we call you?"
+        assert decision["engagement_headline"] == "Nearly done!"
+        assert decision["metadata"]["phrasing_source"] == "precomputed"
+
+    def test_missing_variants_fall_back_to_llm(self):
+        state = {"core": {"session_id": "s-1"}}
+        questions = [_question(3, "Name?", order=1)]
+
+        assert self._supervisor()._make_precomputed_decision(state, questions, self._analysis()) is None
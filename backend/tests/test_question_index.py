@@ -0,0 +1,164 @@
+"""
+Tests for the shared per-form question index.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.utils.question_index import FormQuestionIndex, QuestionIndexRegistry
+
+
+QUESTIONS = [
+    {"question_id": 3, "question_text": "Budget?", "question_order": 3, "is_required": True},
+    {"question_id": 1, "question_text": "Name?", "question_order": 1, "is_required": False},
+    {"question_id": 2, "question_text": "Email?", "question_order": 2, "is_required": True},
+    {"question_text": "No id", "question_order": 4}
+]
+
+
+class CountingLoader:
+    """Sync question loader counting database reads"""
+
+    def __init__(self, questions=QUESTIONS):
+        self.questions = questions
+        self.calls = 0
+
+    def __call__(self, form_id):
+        self.calls += 1
+        return [dict(q) for q in self.questions]
+
+
+class TestFormQuestionIndex:
+    """Test index construction and set-based availability."""
+
+    def test_build_orders_and_priorities(self):
+        index = FormQuestionIndex.build("form-1", QUESTIONS, version=2)
+
+        assert index.version == 2
+        assert len(index) == 3
+        assert index.order == (1, 2, 3)
+        assert index.priority == (2, 3, 1)
+        assert index.required == frozenset({2, 3})
+
+    def test_available_filters_asked_in_form_order(self):
+        index = FormQuestionIndex.build("form-1", QUESTIONS)
+
+        assert [q["question_id"] for q in index.available([2])] == [1, 3]
+        assert [q["question_id"] for q in index.prioritized({2})] == [3, 1]
+
+    def test_index_is_immutable_and_returns_copies(self):
+        index = FormQuestionIndex.build("form-1", QUESTIONS)
+
+        with pytest.raises(TypeError):
+            index.by_id[1]["question_text"] = "changed"
+        with pytest.raises(AttributeError):
+            index.version = 5
+
+        copy = index.available(set())[0]
+        copy["phrased_text"] = "annotated"
+        assert "phrased_text" not in index.by_id[1]
+
+
+class TestQuestionIndexRegistry:
+    """Test sharing, invalidation and expiry."""
+
+    def test_loaded_once_and_shared(self):
+        registry = QuestionIndexRegistry()
+        loader = CountingLoader()
+
+        first = registry.get("form-1", loader)
+        second = registry.get("form-1", loader)
+
+        assert first is second
+        assert loader.calls == 1
+        assert registry.get_stats()["hits"] == 1
+
+    def test_invalidate_bumps_version_and_reloads(self):
+        registry = QuestionIndexRegistry()
+        loader = CountingLoader()
+        registry.get("form-1", loader)
+
+        assert registry.invalidate("form-1") == 1
+        assert registry.peek("form-1") is None
+
+        index = registry.get("form-1", loader)
+        assert index.version == 1
+        assert loader.calls == 2
+
+    def test_load_racing_invalidation_is_not_cached(self):
+        registry = QuestionIndexRegistry()
+
+        def loader(form_id):
+            # Questions are saved while the old rows are being read
+            registry.invalidate(form_id)
+            return QUESTIONS
+
+        index = registry.get("form-1", loader)
+
+        assert index.version == 0
+        assert registry.peek("form-1") is None
+        assert registry.get_stats()["stale_builds"] == 1
+
+    def test_expired_index_is_reloaded(self):
+        registry = QuestionIndexRegistry(ttl_seconds=0.01)
+        loader = CountingLoader()
+        registry.get("form-1", loader)
+
+        time.sleep(0.02)
+        registry.get("form-1", loader)
+
+        assert loader.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_async_get_uses_async_loader(self):
+        registry = QuestionIndexRegistry()
+        calls = []
+
+        async def loader(form_id):
+            calls.append(form_id)
+            await asyncio.sleep(0)
+            return QUESTIONS
+
+        index = await registry.aget("form-1", loader)
+        again = await registry.aget("form-1", loader)
+
+        assert index is again
+        assert calls == ["form-1"]
+
+
+class TestLoadAvailableQuestions:
+    """Test the survey admin hot path against a warm index."""
+
+    def test_no_database_reads_when_index_is_warm(self, monkeypatch):
+        from app import database
+        from app.graphs.supervisors import consolidated_survey_admin_supervisor as module
+        from app.graphs.supervisors.consolidated_survey_admin_supervisor import ConsolidatedSurveyAdminSupervisor
+
+        registry = QuestionIndexRegistry()
+        registry.get("form-1", CountingLoader())
+        monkeypatch.setattr(module, "question_index", registry)
+
+        class NoDB:
+            def __getattr__(self, name):
+                raise AssertionError(f"unexpected database call: {name}")
+
+        monkeypatch.setattr(database, "db", NoDB())
+
+        supervisor = ConsolidatedSurveyAdminSupervisor.__new__(ConsolidatedSurveyAdminSupervisor)
+        state = {
+            "core": {"form_id": "form-1", "session_id": "s-1"},
+            "step_context": {"asked_question_ids": [1]},
+            "question_strategy": {"asked_questions": [3]}
+        }
+
+        available = supervisor._load_available_questions(state)
+        state["step_context"]["asked_question_ids"] = [2]
+        state["question_strategy"]["asked_questions"] = []
+        in_form_order = supervisor._load_available_questions(state)
+        prioritized = supervisor._load_available_questions(state, prioritized=True)
+
+        assert [q["question_id"] for q in available] == [2]
+        assert [q["question_id"] for q in in_form_order] == [1, 3]
+        assert [q["question_id"] for q in prioritized] == [3, 1]
@@ -0,0 +1,171 @@
+"""
+Tests for the sliding-window-counter rate limiters and middleware.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware import rate_limiting
+from app.middleware.rate_limiting import InMemoryRateLimiter, RateLimitMiddleware, RedisRateLimiter
+from app.utils.config_loader import RateLimitConfig
+
+
+def make_config(**overrides):
+    values = dict(
+        enabled=True, requests_per_minute=5, burst_size=2, window_seconds=60,
+        per_ip=True, redis_enabled=False, include_headers=True
+    )
+    values.update(overrides)
+    return RateLimitConfig(**values)
+
+
+class Clock:
+    def __init__(self, now=6000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(rate_limiting.time, "time", fake.time)
+    return fake
+
+
+class TestInMemoryRateLimiter:
+    """Test limits, burst overflow and window sliding."""
+
+    def test_limit_then_burst_then_deny(self, clock):
+        limiter = InMemoryRateLimiter(make_config(requests_per_minute=5, burst_size=7))
+        results = []
+        for _ in range(8):
+            results.append(limiter.is_allowed("1.2.3.4")[0])
+            clock.now += 0.5
+
+        # 5 within the limit, burst allows up to 7 in the last 10 seconds
+        assert results == [True] * 7 + [False]
+
+    def test_headers_count_down(self, clock):
+        limiter = InMemoryRateLimiter(make_config())
+
+        _, first = limiter.is_allowed("ip")
+        _, second = limiter.is_allowed("ip")
+
+        assert first == {"limit": 5, "remaining": 4, "reset": int(clock.now + 60)}
+        assert second["remaining"] == 3
+
+    def test_identifiers_are_independent(self, clock):
+        limiter = InMemoryRateLimiter(make_config(requests_per_minute=1, burst_size=1))
+
+        assert limiter.is_allowed("a")[0]
+        assert not limiter.is_allowed("a")[0]
+        assert limiter.is_allowed("b")[0]
+
+    def test_previous_window_weight_decays(self, clock):
+        limiter = InMemoryRateLimiter(make_config(requests_per_minute=4, burst_size=0))
+        for _ in range(4):
+            assert limiter.is_allowed("ip")[0]
+        assert not limiter.is_allowed("ip")[0]
+
+        # Half-way through the next window, half of the previous count still applies
+        clock.now += 90
+        assert limiter.is_allowed("ip")[0]
+        assert limiter.is_allowed("ip")[0]
+        assert not limiter.is_allowed("ip")[0]
+
+    def test_idle_identifiers_are_evicted(self, clock):
+        limiter = InMemoryRateLimiter(make_config())
+        limiter.is_allowed("old")
+        clock.now += 500
+
+        limiter.is_allowed("new")
+
+        assert list(limiter.counters) == ["new"]
+
+
+class FakeScript:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = []
+
+    async def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class FakeRedis:
+    def __init__(self, script):
+        self.script = script
+
+    def register_script(self, source):
+        assert "HMGET" in source
+        return self.script
+
+
+class TestRedisRateLimiter:
+    """Test the Lua-backed limiter's call and fallback."""
+
+    @pytest.mark.asyncio
+    async def test_uses_script_result(self):
+        script = FakeScript(result=[1, "2.5", "6000.25"])
+        limiter = RedisRateLimiter(make_config(), redis_client=FakeRedis(script))
+
+        allowed, headers = await limiter.check("1.2.3.4")
+
+        assert allowed
+        assert headers == {"limit": 5, "remaining": 2, "reset": 6060}
+        assert script.calls == [(["rate_limit:1.2.3.4"], [60, 5, 10, 2])]
+
+    @pytest.mark.asyncio
+    async def test_denied_by_script(self):
+        limiter = RedisRateLimiter(make_config(), redis_client=FakeRedis(FakeScript(result=[0, "5.0", "6000"])))
+
+        allowed, headers = await limiter.check("ip")
+
+        assert not allowed
+        assert headers["remaining"] == 0
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_memory_when_redis_fails(self):
+        script = FakeScript(error=ConnectionError("down"))
+        limiter = RedisRateLimiter(make_config(requests_per_minute=1, burst_size=0), redis_client=FakeRedis(script))
+
+        assert (await limiter.check("ip"))[0]
+        assert not (await limiter.check("ip"))[0]
+
+
+class TestRateLimitMiddleware:
+    """Test headers and 429 responses end to end."""
+
+    def make_client(self, config):
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, config=config)
+
+        @app.get("/api/thing")
+        async def thing():
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_headers_and_429(self):
+        client = self.make_client(make_config(requests_per_minute=1, burst_size=0))
+
+        first = client.get("/api/thing")
+        second = client.get("/api/thing")
+
+        assert first.status_code == 200
+        assert first.headers["X-RateLimit-Limit"] == "1"
+        assert first.headers["X-RateLimit-Remaining"] == "0"
+        assert second.status_code == 429
+        assert second.json()["error"] == "Rate limit exceeded"
+
+    def test_redis_backend_selected_from_config(self):
+        middleware = RateLimitMiddleware(FastAPI(), config=make_config(redis_enabled=True))
+
+        assert isinstance(middleware.rate_limiter, RedisRateLimiter)
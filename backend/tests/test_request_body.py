@@ -0,0 +1,115 @@
+"""
+Tests for the shared request body cache.
+"""
+
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.middleware import request_body
+from app.middleware.input_validation import InputValidationMiddleware
+from app.middleware.request_body import CachedBodyRoute
+from app.middleware.request_limits import RequestLimitsMiddleware
+from app.utils.config_loader import SecurityConfig
+
+
+def make_config(**overrides):
+    values = dict(
+        max_input_length=5000, max_file_size=1024 * 1024, sanitize_inputs=True, auth_enabled=False,
+        jwt_expire_minutes=60, require_api_key=False, admin_key_required=False, force_https=False,
+        hsts_enabled=False, csp_enabled=False, session_timeout=3600, max_sessions_per_ip=10
+    )
+    values.update(overrides)
+    return SecurityConfig(**values)
+
+
+class StepRequest(BaseModel):
+    responses: List[Dict[str, Any]]
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    calls = []
+    real_loads = request_body._loads
+
+    def counting_loads(body):
+        calls.append(body)
+        return real_loads(body)
+
+    monkeypatch.setattr(request_body, "_loads", counting_loads)
+    return calls
+
+
+def make_app(config: SecurityConfig) -> FastAPI:
+    app = FastAPI()
+    router = APIRouter(prefix="/api/survey", route_class=CachedBodyRoute)
+
+    @router.post("/step")
+    async def step(payload: StepRequest, request: Request):
+        return {"count": len(payload.responses), "cached": request.state.json_body == payload.model_dump()}
+
+    app.include_router(router)
+    # Same order as main.py: input validation wraps request limits
+    app.add_middleware(RequestLimitsMiddleware, config=config)
+    app.add_middleware(InputValidationMiddleware, config=config)
+    return app
+
+
+class TestSharedBody:
+    """Test that middlewares and the route share one read and one parse."""
+
+    def test_body_parsed_once(self, parse_count):
+        client = TestClient(make_app(make_config()))
+        response = client.post("/api/survey/step", json={"responses": [{"question_id": 1, "answer": "Yes"}]})
+        assert response.status_code == 200
+        assert response.json() == {"count": 1, "cached": True}
+        assert len(parse_count) == 1
+
+    def test_invalid_json(self, parse_count):
+        client = TestClient(make_app(make_config()))
+        response = client.post(
+            "/api/survey/step", content=b'{"responses": [', headers={"content-type": "application/json"}
+        )
+        assert response.status_code == 400
+        assert response.json() == {"error": "Invalid JSON in request body"}
+
+    def test_oversized_chunked_body_rejected_while_streaming(self):
+        client = TestClient(make_app(make_config(max_file_size=64)))
+
+        def chunks():
+            for _ in range(10):
+                yield b'{"responses": []}    '
+
+        response = client.post("/api/survey/step", content=chunks(), headers={"content-type": "application/json"})
+        assert response.status_code == 413
+
+    def test_route_without_middleware_reads_body(self, parse_count):
+        app = FastAPI()
+        router = APIRouter(route_class=CachedBodyRoute)
+
+        @router.post("/echo")
+        async def echo(payload: StepRequest, request: Request):
+            return {"raw": len(await request.body()), "count": len(payload.responses)}
+
+        app.include_router(router)
+        response = TestClient(app).post("/echo", json={"responses": [{}, {}]})
+        assert response.status_code == 200
+        assert response.json()["count"] == 2
+        assert len(parse_count) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_body_limit_applies_to_cached_body():
+    messages = [{"type": "http.request", "body": b"x" * 10, "more_body": False}]
+
+    async def receive():
+        return messages.pop(0)
+
+    request = Request({"type": "http", "method": "POST", "headers": [], "state": {}}, receive)
+    assert await request_body.read_body(request, limit=100) == b"x" * 10
+    with pytest.raises(HTTPException) as exc:
+        await request_body.read_body(request, limit=5)
+    assert exc.value.status_code == 413
@@ -0,0 +1,150 @@
+"""
+Tests for render-time response sanitization.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.response_sanitization import (
+    ResponseSanitizationMiddleware, ResponseSanitizer, SanitizedJSONResponse
+)
+from app.utils.config_loader import SecurityConfig
+from app.utils.response_helpers import success_response
+
+
+def make_config(**overrides):
+    values = dict(
+        max_input_length=5000, max_file_size=1024 * 1024, sanitize_inputs=True, auth_enabled=False,
+        jwt_expire_minutes=60, require_api_key=False, admin_key_required=False, force_https=False,
+        hsts_enabled=False, csp_enabled=False, session_timeout=3600, max_sessions_per_ip=10
+    )
+    values.update(overrides)
+    return SecurityConfig(**values)
+
+
+def legacy_should_remove(sanitizer, key, is_admin):
+    """The rule as it was evaluated before compiling (substring scans per call)"""
+    key_lower = key.lower()
+    if key_lower in sanitizer.public_fields:
+        return False
+    if any(c in key_lower for c in {'password', 'secret', 'token', 'api_key', 'private_key'}):
+        return True
+    if is_admin and key_lower in sanitizer.allowed_admin_fields:
+        return False
+    return any(s in key_lower for s in sanitizer.sensitive_fields)
+
+
+KEYS = [
+    'password', 'userPassword', 'id', 'ID', 'client_id', 'question_id', 'lead_id', 'business_name',
+    'session_id', 'email', 'contact_email', 'phone', 'ip_address', 'credit_card', 'status', 'title',
+    'answer', 'created_at', 'keywords', 'monkey', 'validity', 'internal_id', 'settings', 'theme_config'
+]
+
+
+@pytest.fixture
+def sanitizer():
+    return ResponseSanitizer(make_config())
+
+
+class TestKeyRules:
+    """Test compiled key rules decide exactly as the per-call scans did."""
+
+    @pytest.mark.parametrize("key", KEYS)
+    def test_remove_rules_match(self, sanitizer, key):
+        for is_admin in (False, True):
+            assert sanitizer._should_remove_field(key, is_admin) == legacy_should_remove(sanitizer, key, is_admin)
+
+    @pytest.mark.parametrize("key", KEYS)
+    def test_mask_rules_match(self, sanitizer, key):
+        expected = next((m for m in sanitizer.mask_fields if m in key.lower()), None)
+        assert sanitizer._should_mask_field(key) == expected
+
+    def test_sanitize_data(self, sanitizer):
+        data = {
+            "title": "Form", "id": "abc", "email": "ada@example.com",
+            "items": [{"password": "x", "question_id": 3, "notes": "y" * 10001}]
+        }
+        assert sanitizer.sanitize_data(data) == {
+            "title": "Form", "email": "a***@e***.com",
+            "items": [{"question_id": 3, "notes": "y" * 10000 + "... [truncated]"}]
+        }
+        assert sanitizer.sanitize_data(data, is_admin=True)["id"] == "abc"
+
+    def test_rule_memo_is_bounded(self, sanitizer, monkeypatch):
+        from app.middleware import response_sanitization
+        monkeypatch.setattr(response_sanitization, "MAX_CACHED_KEY_RULES", 10)
+        for i in range(25):
+            sanitizer._should_remove_field(f"field_{i}")
+        assert len(sanitizer._key_rules) <= 10
+
+
+def make_app(config=None) -> FastAPI:
+    app = FastAPI(default_response_class=SanitizedJSONResponse)
+
+    @app.get("/api/profile")
+    async def profile():
+        return {"name": "Ada", "password": "hunter2", "email": "ada@example.com"}
+
+    @app.get("/api/helper")
+    async def helper():
+        return success_response(data={"token": "t", "title": "Hi"})
+
+    @app.get("/api/plain")
+    async def plain():
+        return JSONResponse({"secret": "s", "title": "Hi"})
+
+    @app.get("/api/stream")
+    async def stream():
+        async def events():
+            yield 'data: {"password": "visible"}\n\n'
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    app.add_middleware(ResponseSanitizationMiddleware, config=config or make_config())
+    return app
+
+
+class TestSerializationLayer:
+    """Test responses are sanitized while rendering, without re-parsing."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        self.buffered = []
+        original = ResponseSanitizationMiddleware._sanitize_body
+
+        def tracking(middleware, body, context):
+            self.buffered.append(body)
+            return original(middleware, body, context)
+
+        monkeypatch.setattr(ResponseSanitizationMiddleware, "_sanitize_body", tracking)
+        return TestClient(make_app())
+
+    def test_returned_dict_sanitized_at_render(self, client):
+        body = client.get("/api/profile").json()
+        assert body["name"] == "Ada"
+        assert "password" not in body
+        assert body["email"] == "a***@e***.com"
+        assert body["_sanitized"] is True
+        assert self.buffered == []
+
+    def test_response_helper_sanitized_at_render(self, client):
+        body = client.get("/api/helper").json()
+        assert body["data"] == {"title": "Hi"}
+        assert self.buffered == []
+
+    def test_plain_json_response_falls_back_to_buffering(self, client):
+        response = client.get("/api/plain")
+        body = response.json()
+        assert "secret" not in body and body["title"] == "Hi"
+        assert int(response.headers["content-length"]) == len(response.content)
+        assert len(self.buffered) == 1
+
+    def test_streams_pass_through(self, client):
+        response = client.get("/api/stream")
+        assert response.text == 'data: {"password": "visible"}\n\n'
+        assert self.buffered == []
+
+    def test_no_sanitizing_without_middleware(self):
+        response = SanitizedJSONResponse({"password": "x"})
+        assert response.body == b'{"password":"x"}'
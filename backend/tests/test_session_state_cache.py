@@ -0,0 +1,168 @@
+"""
+Tests for the Redis hot session state cache and its write-behind flusher.
+
+Redis is replaced with an in-memory store exposing the same methods as
+RedisSessionStore, and the database with a recorder.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from app.session_state_cache import SessionStateCache, DIRTY_SET
+
+
+class MemoryStore:
+    """In-memory stand-in for RedisSessionStore."""
+
+    def __init__(self, fail=False):
+        self.data = {}
+        self.sets = {}
+        self.fail = fail
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    async def read(self, session_id):
+        self._check()
+        return self.data.get(session_id, {})
+
+    async def write(self, session_id, data):
+        self._check()
+        self.data[session_id] = data
+
+    async def write_raw(self, session_id, payload):
+        self._check()
+        self.data[session_id] = json.loads(payload)
+
+    async def add_to_set(self, name, *members):
+        self._check()
+        self.sets.setdefault(name, set()).update(members)
+
+    async def pop_from_set(self, name, count):
+        self._check()
+        members = self.sets.get(name, set())
+        popped = [members.pop() for _ in range(min(count, len(members)))]
+        return popped
+
+
+class RecordingDB:
+    """Async database stand-in recording snapshot writes."""
+
+    def __init__(self, fail=False):
+        self.saved = []
+        self.deltas = []
+        self.fail = fail
+
+    async def save_session_snapshot(self, session_id, full_state, step, recovery_reason=None, base_id=None):
+        if self.fail:
+            raise RuntimeError("database down")
+        self.saved.append((session_id, full_state, step))
+        return {"session_id": session_id}
+
+    async def save_session_snapshot_delta(self, session_id, step, patch, base_id=None, sequence=0):
+        self.deltas.append((session_id, step, patch))
+        return {"session_id": session_id}
+
+    async def delete_session_snapshot_deltas(self, session_id):
+        self.deltas = [d for d in self.deltas if d[0] != session_id]
+
+
+class TestSessionStateCache:
+    """Test hot state reads/writes and write-behind persistence."""
+
+    @pytest.mark.asyncio
+    async def test_save_then_load_returns_state(self):
+        cache = SessionStateCache(store=MemoryStore(), database=RecordingDB())
+
+        assert await cache.save("s-1", {"core": {"step": 2}}, step=2)
+        state = await cache.load("s-1")
+        assert state["core"] == {"step": 2}
+        assert state["lead_intelligence"]["lead_status"] == "unknown"
+        assert await cache.load("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_save_does_not_touch_database(self):
+        db = RecordingDB()
+        cache = SessionStateCache(store=MemoryStore(), database=db)
+
+        await cache.save("s-1", {"core": {}}, step=1)
+
+        assert db.saved == []
+
+    @pytest.mark.asyncio
+    async def test_flush_persists_latest_state_once_per_session(self):
+        db = RecordingDB()
+        store = MemoryStore()
+        cache = SessionStateCache(store=store, database=db, flush_batch_size=1)
+
+        await cache.save("s-1", {"core": {"step": 1}}, step=1)
+        await cache.save("s-1", {"core": {"step": 2}}, step=2)
+        await cache.save("s-2", {"core": {"step": 1}}, step=1)
+
+        assert await cache.flush() == 2
+        assert sorted((sid, step) for sid, _, step in db.saved) == [("s-1", 2), ("s-2", 1)]
+        assert not store.sets[DIRTY_SET]
+        assert await cache.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_requeues_sessions(self):
+        db = RecordingDB(fail=True)
+        store = MemoryStore()
+        cache = SessionStateCache(store=store, database=db)
+
+        await cache.save("s-1", {"core": {}}, step=1)
+
+        assert await cache.flush() == 0
+        assert store.sets[DIRTY_SET] == {"s-1"}
+
+        db.fail = False
+        assert await cache.flush() == 1
+        assert db.saved[0][0] == "s-1"
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_degrade_to_miss(self):
+        cache = SessionStateCache(store=MemoryStore(fail=True), database=RecordingDB())
+
+        assert await cache.load("s-1") is None
+        assert await cache.save("s-1", {"core": {}}, step=1) is False
+        assert await cache.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_state(self):
+        db = RecordingDB()
+        cache = SessionStateCache(store=MemoryStore(), database=db, flush_interval=60)
+
+        cache.start()
+        await cache.save("s-1", {"core": {}}, step=3)
+        await cache.stop()
+
+        assert [(sid, state["core"], step) for sid, state, step in db.saved] == [("s-1", {}, 3)]
+
+    @pytest.mark.asyncio
+    async def test_later_flushes_write_deltas(self):
+        db = RecordingDB()
+        cache = SessionStateCache(store=MemoryStore(), database=db)
+
+        await cache.save("s-1", {"lead_intelligence": {"responses": [{"question_id": 1}]}}, step=1)
+        await cache.flush()
+        await cache.save("s-1", {"lead_intelligence": {"responses": [{"question_id": 1}, {"question_id": 2}]}}, step=2)
+        await cache.flush()
+
+        assert len(db.saved) == 1
+        assert db.deltas == [("s-1", 2, [
+            {"op": "append", "path": ["lead_intelligence", "responses"], "index": 1, "value": [{"question_id": 2}]}
+        ])]
+
+    @pytest.mark.asyncio
+    async def test_save_encodes_non_json_values_once(self):
+        store = MemoryStore()
+        cache = SessionStateCache(store=store, database=RecordingDB())
+        started = datetime(2026, 1, 2, 3, 4, 5)
+
+        await cache.save("s-1", {"core": {"started_at": started, "step": 1}}, step=1)
+
+        assert store.data["s-1"]["state"]["core"]["started_at"] == "2026-01-02T03:04:05"
+        assert store.data["s-1"]["step"] == 1
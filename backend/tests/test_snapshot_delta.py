@@ -0,0 +1,177 @@
+"""
+Tests for delta snapshot diffing, patching and compaction.
+"""
+
+import pytest
+
+from app.snapshot_delta import (
+    diff_state, apply_patch, rebuild_state, snapshot_base_state,
+    load_snapshot_state, persist_snapshot
+)
+
+
+def _state(responses, score=0, lead_status="unknown"):
+    return {
+        "core": {"session_id": "s-1", "step": len(responses)},
+        "question_strategy": {"asked_questions": list(range(len(responses))), "selection_history": []},
+        "lead_intelligence": {"responses": responses, "current_score": score, "lead_status": lead_status},
+    }
+
+
+class SnapshotDB:
+    """Async database stand-in keeping one base row plus delta rows."""
+
+    def __init__(self):
+        self.base = None
+        self.deltas = []
+
+    async def save_session_snapshot(self, session_id, full_state, step, recovery_reason=None, base_id=None):
+        self.base = {"session_id": session_id, "base_id": base_id, "step_number": step, "form_state": full_state}
+        return self.base
+
+    async def get_latest_session_snapshot(self, session_id):
+        return self.base
+
+    async def save_session_snapshot_delta(self, session_id, step, patch, base_id=None, sequence=0):
+        self.deltas.append({"base_id": base_id, "sequence": sequence, "step_number": step, "patch": patch})
+        return self.deltas[-1]
+
+    async def get_session_snapshot_deltas(self, session_id, base_id=None):
+        # Same selection as the real query: the base's patches in sequence (then insertion) order
+        matching = [d for d in self.deltas if d["base_id"] == base_id]
+        return sorted(matching, key=lambda d: d["sequence"])
+
+    async def delete_session_snapshot_deltas(self, session_id):
+        self.deltas = []
+
+
+class TestDiffAndPatch:
+    """Test patch generation and application."""
+
+    def test_growing_lists_become_appends(self):
+        old = _state([{"q": 1}])
+        new = _state([{"q": 1}, {"q": 2}], score=40)
+
+        patch = diff_state(old, new)
+
+        assert {"op": "append", "path": ["lead_intelligence", "responses"], "index": 1, "value": [{"q": 2}]} in patch
+        assert {"op": "set", "path": ["lead_intelligence", "current_score"], "value": 40} in patch
+        assert apply_patch(old, patch) == new
+
+    def test_removed_and_replaced_keys(self):
+        old = {"a": 1, "b": [1, 2], "c": {"d": 1}}
+        new = {"b": [3], "c": {"d": 1}}
+
+        patch = diff_state(old, new)
+
+        assert {"op": "unset", "path": ["a"]} in patch
+        assert {"op": "set", "path": ["b"], "value": [3]} in patch
+        assert apply_patch(old, patch) == new
+
+    def test_unchanged_state_has_empty_patch(self):
+        assert diff_state(_state([1]), _state([1])) == []
+
+    def test_apply_does_not_modify_input(self):
+        old = _state([1])
+        apply_patch(old, diff_state(old, _state([1, 2])))
+
+        assert old == _state([1])
+
+    def test_reapplying_append_is_idempotent(self):
+        old = _state([1])
+        patch = diff_state(old, _state([1, 2]))
+
+        assert apply_patch(apply_patch(old, patch), patch) == _state([1, 2])
+
+    def test_unknown_operation_raises(self):
+        with pytest.raises(ValueError, match="Unknown snapshot patch operation"):
+            apply_patch({}, [{"op": "move", "path": ["a"]}])
+
+    def test_snapshot_base_state_reads_form_state_column(self):
+        assert snapshot_base_state({"form_state": {"a": 1}, "step_number": 3}) == ({"a": 1}, 3)
+        assert snapshot_base_state({"full_state": {"a": 1}}) == ({"a": 1}, -1)
+        assert snapshot_base_state(None) == (None, -1)
+
+
+class TestPersistSnapshot:
+    """Test base + delta writes and compaction."""
+
+    @pytest.mark.asyncio
+    async def test_roundtrip_with_compaction(self):
+        db = SnapshotDB()
+        previous = None
+        states = [_state([{"q": i} for i in range(n)], score=n * 10) for n in range(1, 8)]
+
+        for step, state in enumerate(states, start=1):
+            previous = await persist_snapshot(db, "s-1", state, step, previous=previous, compaction_interval=3)
+            assert await load_snapshot_state(db, "s-1") == state
+
+        # Base at step 1, three deltas, compaction at step 5, then deltas for steps 6-7
+        assert db.base["step_number"] == 5
+        assert [d["step_number"] for d in db.deltas] == [6, 7]
+
+    @pytest.mark.asyncio
+    async def test_roundtrip_when_step_never_advances(self):
+        # lead_sessions.step stays 0 in the simplified flow: every write is step 0
+        db = SnapshotDB()
+        previous = None
+        states = [_state([{"q": i} for i in range(n)], score=n) for n in range(1, 6)]
+
+        for state in states:
+            previous = await persist_snapshot(db, "s-1", state, 0, previous=previous, compaction_interval=10)
+            assert await load_snapshot_state(db, "s-1") == state
+
+        assert [d["sequence"] for d in db.deltas] == [1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_patches_of_an_older_base_are_ignored(self):
+        db = SnapshotDB()
+        previous = await persist_snapshot(db, "s-1", _state([1]), 0)
+        await persist_snapshot(db, "s-1", _state([1, 2]), 0, previous=previous)
+        stale = list(db.deltas)
+
+        # New base (e.g. after a restart); the old patch survived a failed delete
+        await persist_snapshot(db, "s-1", _state([7]), 0)
+        db.deltas = stale + db.deltas
+
+        assert await load_snapshot_state(db, "s-1") == _state([7])
+
+    @pytest.mark.asyncio
+    async def test_record_without_base_id_writes_new_base(self):
+        db = SnapshotDB()
+        record = await persist_snapshot(db, "s-1", _state([1, 2]), 0, previous={"state": _state([1]), "delta_count": 1})
+
+        assert db.deltas == [] and db.base["form_state"] == _state([1, 2])
+        assert record["base_id"] == db.base["base_id"]
+
+    @pytest.mark.asyncio
+    async def test_deltas_are_smaller_than_full_state(self):
+        db = SnapshotDB()
+        responses = [{"question_id": i, "answer": "x" * 200} for i in range(20)]
+        previous = await persist_snapshot(db, "s-1", _state(responses), 20)
+
+        await persist_snapshot(db, "s-1", _state(responses + [{"question_id": 20, "answer": "y"}]), 21, previous=previous)
+
+        assert len(str(db.deltas[0]["patch"])) < len(str(db.base["form_state"])) / 10
+
+    @pytest.mark.asyncio
+    async def test_unchanged_state_writes_nothing(self):
+        db = SnapshotDB()
+        previous = await persist_snapshot(db, "s-1", _state([1]), 1)
+
+        assert await persist_snapshot(db, "s-1", _state([1]), 1, previous=previous) is previous
+        assert db.deltas == []
+
+    @pytest.mark.asyncio
+    async def test_missing_snapshot_loads_none(self):
+        assert await load_snapshot_state(SnapshotDB(), "s-1") is None
+
+
+def test_rebuild_state_applies_deltas_in_order():
+    base = {"n": 0, "items": []}
+    deltas = [
+        {"patch": [{"op": "set", "path": ["n"], "value": 1}, {"op": "append", "path": ["items"], "index": 0, "value": ["a"]}]},
+        {"patch": [{"op": "set", "path": ["n"], "value": 2}, {"op": "append", "path": ["items"], "index": 1, "value": ["b"]}]},
+    ]
+
+    assert rebuild_state(base, deltas) == {"n": 2, "items": ["a", "b"]}
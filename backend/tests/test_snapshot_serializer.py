@@ -0,0 +1,66 @@
+"""
+Tests for the typed session snapshot serializer.
+"""
+
+import json
+from datetime import datetime
+
+from app.snapshot_serializer import (
+    build_session_snapshot, encode_session_snapshot, encode_session_state_entry
+)
+
+
+def _graph_state():
+    return {
+        'core': {'session_id': 's-1', 'step': 2, 'started_at': datetime(2026, 1, 2, 3, 4, 5)},
+        'question_strategy': {
+            'asked_questions': [1, 2],
+            'current_questions': [{'question_id': 3}],
+            'selection_history': [{'step': 1}],
+            'all_questions': [{'question_id': 9}]
+        },
+        'lead_intelligence': {
+            'responses': [{'question_id': 1, 'answer': 'Yes'}],
+            'current_score': 40,
+            'lead_status': 'qualified',
+            'score_history': [10, 40]
+        },
+        'engagement': {'abandonment_risk': 0.2}
+    }
+
+
+class TestSessionSnapshotSerializer:
+    """Test snapshot building and single-pass encoding."""
+
+    def test_only_persisted_slices_are_kept(self):
+        data = build_session_snapshot(_graph_state()).model_dump()
+
+        assert set(data) == {'core', 'question_strategy', 'lead_intelligence'}
+        assert 'all_questions' not in data['question_strategy']
+        assert 'score_history' not in data['lead_intelligence']
+
+    def test_missing_slices_get_defaults(self):
+        data = build_session_snapshot({'lead_intelligence': {'lead_status': None}}).model_dump()
+
+        assert data['question_strategy']['asked_questions'] == []
+        assert data['lead_intelligence'] == {'responses': [], 'current_score': 0, 'lead_status': 'unknown'}
+
+    def test_encode_matches_previous_snapshot_shape(self):
+        encoded = encode_session_snapshot(build_session_snapshot(_graph_state()))
+
+        assert isinstance(encoded, bytes)
+        decoded = json.loads(encoded)
+        assert decoded['core']['started_at'] == '2026-01-02T03:04:05'
+        assert decoded['lead_intelligence']['current_score'] == 40
+        assert decoded['question_strategy']['asked_questions'] == [1, 2]
+
+    def test_unknown_objects_are_stringified(self):
+        class Marker:
+            def __str__(self):
+                return 'marker'
+
+        state = {'core': {'marker': Marker()}}
+        decoded = json.loads(encode_session_state_entry(build_session_snapshot(state), step=4))
+
+        assert decoded['state']['core']['marker'] == 'marker'
+        assert decoded['step'] == 4
@@ -0,0 +1,141 @@
+"""
+Tests for the /step context prefetch.
+
+The async database client is replaced with a fake whose reads sleep, so the
+tests can check that independent reads overlap instead of running in sequence.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app import step_context
+from app.step_context import prefetch_step_context, graph_step_context, context_form_questions
+from app.utils.question_index import question_index
+
+
+class FakeAsyncDB:
+    """Async database stand-in recording calls; every read takes ``delay`` seconds."""
+
+    def __init__(self, delay=0.05, session_form_id="form-1"):
+        self.delay = delay
+        self.session_form_id = session_form_id
+        self.calls = []
+
+    async def _read(self, name, value):
+        self.calls.append(name)
+        await asyncio.sleep(self.delay)
+        return value
+
+    async def get_lead_session(self, session_id):
+        return await self._read("lead_session", {
+            "session_id": session_id, "form_id": self.session_form_id, "client_id": "client-1"
+        })
+
+    async def get_latest_session_snapshot(self, session_id):
+        return await self._read("snapshot", {"full_state": {"core": {"step": 1}}})
+
+    async def get_form(self, form_id):
+        return await self._read("form", {"id": form_id, "client_id": "client-1"})
+
+    async def get_form_questions(self, form_id):
+        return await self._read("form_questions", [{"question_id": 1}, {"question_id": 2}])
+
+    async def get_asked_questions(self, session_id):
+        return await self._read("asked_questions", [1])
+
+    async def get_client(self, client_id):
+        return await self._read("client", {"id": client_id, "name": "Pawsome"})
+
+
+@pytest.fixture(autouse=True)
+def cold_question_index():
+    question_index.clear()
+    yield
+    question_index.clear()
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake = FakeAsyncDB()
+    monkeypatch.setattr(step_context, "db_async", fake)
+    return fake
+
+
+class TestPrefetchStepContext:
+    """Test concurrent prefetch of step reads."""
+
+    @pytest.mark.asyncio
+    async def test_reads_run_concurrently(self, fake_db):
+        start = time.perf_counter()
+        context = await prefetch_step_context("s-1", form_id="form-1", client_id="client-1")
+        elapsed = time.perf_counter() - start
+
+        assert sorted(fake_db.calls) == sorted([
+            "lead_session", "snapshot", "form", "form_questions", "asked_questions", "client"
+        ])
+        # Six reads of 50ms each; run concurrently they take about one read
+        assert elapsed < fake_db.delay * 3
+        assert context["lead_session"]["session_id"] == "s-1"
+        assert context["form_questions"] == [{"question_id": 1}, {"question_id": 2}]
+        assert context["asked_question_ids"] == [1]
+        assert context["client"]["name"] == "Pawsome"
+
+    @pytest.mark.asyncio
+    async def test_client_resolved_through_form_when_unknown(self, fake_db):
+        context = await prefetch_step_context("s-1", form_id="form-1")
+
+        assert context["client"] == {"id": "client-1", "name": "Pawsome"}
+        assert fake_db.calls.count("client") == 1
+
+    @pytest.mark.asyncio
+    async def test_form_taken_from_database_when_missing_from_session(self, fake_db):
+        context = await prefetch_step_context("s-1")
+
+        assert context["form"]["id"] == "form-1"
+        assert context["form_questions"]
+
+    @pytest.mark.asyncio
+    async def test_stale_session_form_is_refetched(self, monkeypatch):
+        fake = FakeAsyncDB(session_form_id="form-2")
+        monkeypatch.setattr(step_context, "db_async", fake)
+
+        context = await prefetch_step_context("s-1", form_id="form-1")
+
+        assert context["form"]["id"] == "form-2"
+
+    @pytest.mark.asyncio
+    async def test_warm_question_index_skips_questions_read(self, fake_db):
+        await prefetch_step_context("s-1", form_id="form-1")
+        fake_db.calls.clear()
+
+        context = await prefetch_step_context("s-2", form_id="form-1")
+
+        assert "form_questions" not in fake_db.calls
+        assert context["form_questions"] == [{"question_id": 1}, {"question_id": 2}]
+
+        question_index.invalidate("form-1")
+        await prefetch_step_context("s-3", form_id="form-1")
+        assert "form_questions" in fake_db.calls
+
+    @pytest.mark.asyncio
+    async def test_graph_context_excludes_snapshot_and_most_of_session(self, fake_db):
+        context = await prefetch_step_context("s-1", form_id="form-1")
+        graph_context = graph_step_context(context)
+
+        # Only the scoring columns of the session row go into graph state
+        assert graph_context["lead_session"] == {}
+        assert "snapshot" not in graph_context
+        assert graph_context["asked_question_ids"] == [1]
+
+
+def test_context_form_questions_returns_copies():
+    questions = [{"question_id": 1}]
+    state = {"step_context": {"form_questions": questions}}
+
+    copies = context_form_questions(state)
+    copies[0]["phrased_text"] = "changed"
+
+    assert "phrased_text" not in questions[0]
+    assert context_form_questions({}) is None
@@ -0,0 +1,152 @@
+"""
+Tests for the SSE streaming mode of /step.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import app.routes.survey_api as survey_api
+from app.graphs.supervisors.consolidated_survey_admin_supervisor import (
+    ConsolidatedSurveyAdminSupervisor, EngagementTokenParser, DEFAULT_ENGAGEMENT_MESSAGE
+)
+from app.utils.response_helpers import sse_event
+
+
+class FakeChunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class StreamingLLM:
+    def __init__(self, chunks, stall_after=None):
+        self.chunks = chunks
+        self.stall_after = stall_after
+        self.closed = False
+
+    async def astream(self, messages):
+        try:
+            for n, chunk in enumerate(self.chunks):
+                if n == self.stall_after:
+                    await asyncio.sleep(60)
+                yield FakeChunk(chunk)
+        finally:
+            self.closed = True
+
+
+def _supervisor(llm):
+    supervisor = ConsolidatedSurveyAdminSupervisor.__new__(ConsolidatedSurveyAdminSupervisor)
+    supervisor.name = "ConsolidatedSurveyAdminSupervisor"
+    supervisor.llm = llm
+    supervisor.timeout_seconds = 5
+    return supervisor
+
+
+STATE = {
+    'core': {'form_id': 'form-1'},
+    'step_context': {'client': {'name': 'Paws'}},
+    'frontend_response': {'questions': [{'question_id': 1, 'phrased_question': 'Who are we chatting with?'}]}
+}
+
+
+def _parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_parser_splits_fields_across_chunk_boundaries():
+    parser = EngagementTokenParser()
+    tokens = []
+    for chunk in ["HEAD", "LINE:", " Find ", "your match", "\nMESS", "AGE: Quick", " answers."]:
+        tokens += parser.feed(chunk)
+
+    assert [t["field"] for t in tokens] == ["headline", "headline", "message", "message"]
+    assert parser.fields == {"headline": "Find your match", "message": "Quick answers."}
+
+
+def test_sse_event_format():
+    assert sse_event("questions", {"a": 1}) == 'event: questions\ndata: {"a": 1}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_astream_engagement_yields_tokens_and_fills_missing_fields():
+    supervisor = _supervisor(StreamingLLM(["HEADLINE: Let's ", "find your pet"]))
+
+    tokens = [t async for t in supervisor.astream_engagement(STATE)]
+
+    assert "".join(t["token"] for t in tokens if t["field"] == "headline") == "Let's find your pet"
+    assert tokens[-1] == {"field": "message", "token": DEFAULT_ENGAGEMENT_MESSAGE}
+
+
+@pytest.mark.asyncio
+async def test_astream_engagement_stops_at_deadline_while_waiting_for_a_chunk():
+    llm = StreamingLLM(["HEADLINE: Let's ", "find your pet"], stall_after=1)
+    supervisor = _supervisor(llm)
+    supervisor.timeout_seconds = 0.05
+
+    tokens = await asyncio.wait_for(_collect(supervisor.astream_engagement(STATE)), timeout=2)
+
+    assert tokens[0] == {"field": "headline", "token": "Let's "}
+    assert tokens[-1] == {"field": "message", "token": DEFAULT_ENGAGEMENT_MESSAGE}
+    assert llm.closed
+
+
+@pytest.mark.asyncio
+async def test_astream_engagement_defaults_when_first_chunk_never_arrives():
+    supervisor = _supervisor(StreamingLLM(["HEADLINE: late"], stall_after=0))
+    supervisor.timeout_seconds = 0.05
+
+    tokens = await asyncio.wait_for(_collect(supervisor.astream_engagement(STATE)), timeout=2)
+
+    assert [t["field"] for t in tokens] == ["headline", "message"]
+    assert tokens[0]["token"] != "late"
+
+
+async def _collect(stream):
+    return [t async for t in stream]
+
+
+class FakeGraph:
+    def __init__(self, final_state):
+        self.final_state = final_state
+        self.config = None
+
+    async def astream(self, state, config, stream_mode):
+        self.config = config
+        yield "updates", {"lead_intelligence": {"lead_status": "unknown"}}
+        yield "updates", {"survey_administration": {"frontend_response": self.final_state["frontend_response"]}}
+        yield "values", self.final_state
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_questions_before_engagement(monkeypatch):
+    final_state = {
+        **STATE,
+        'frontend_response': {**STATE['frontend_response'], 'headline': '', 'engagement_pending': True}
+    }
+    graph = FakeGraph(final_state)
+    saved = []
+
+    async def save_snapshot(session_id, result):
+        saved.append(session_id)
+
+    monkeypatch.setattr(survey_api, "intelligent_survey_graph", graph)
+    monkeypatch.setattr(survey_api, "_save_step_snapshot", save_snapshot)
+    monkeypatch.setattr(
+        survey_api, "ConsolidatedSurveyAdminSupervisor",
+        lambda: _supervisor(StreamingLLM(["HEADLINE: Hi there\n", "MESSAGE: Tell us more"]))
+    )
+
+    body = "".join([event async for event in survey_api._stream_step_events("s-1", {"core": {}})])
+    events = _parse_events(body)
+
+    assert [name for name, _ in events] == ["questions", "engagement", "engagement", "complete"]
+    assert events[0][1]["nextStep"]["questions"][0]["question_id"] == 1
+    next_step = events[-1][1]["data"]["nextStep"]
+    assert (next_step["headline"], next_step["subheading"]) == ("Hi there", "Tell us more")
+    assert graph.config["configurable"]["defer_engagement"] is True
+    assert saved == ["s-1"]
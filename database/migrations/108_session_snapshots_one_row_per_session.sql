@@ -0,0 +1,19 @@
+-- Migration 108: Keep one session_snapshots row per session
+-- The hot copy of survey state now lives in Redis and is persisted write-behind,
+-- so snapshots are upserted on session_id instead of inserted on every step.
+
+-- Keep only the most recent snapshot for each session
+DELETE FROM session_snapshots older
+USING session_snapshots newer
+WHERE older.session_id = newer.session_id
+  AND (older.created_at, older.id) < (newer.created_at, newer.id);
+
+-- Track when the upserted row was last written
+ALTER TABLE session_snapshots
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+-- Upsert target (replaces the plain lookup index)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_session_snapshots_session_unique ON session_snapshots(session_id);
+DROP INDEX IF EXISTS idx_session_snapshots_session_id;
+
+COMMENT ON COLUMN session_snapshots.updated_at IS 'Last write-behind flush of the session state';
@@ -0,0 +1,25 @@
+-- Migration 109: Delta snapshots for session state
+-- session_snapshots holds the base state of each session; every persisted step
+-- after it is stored as a small patch here until the next compaction folds the
+-- patches back into the base row.
+
+CREATE TABLE IF NOT EXISTS session_snapshot_deltas (
+    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    session_id UUID REFERENCES lead_sessions(id) ON DELETE CASCADE,
+
+    -- Patch data
+    step_number INTEGER NOT NULL,
+    patch JSONB NOT NULL,
+
+    -- Metadata
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Reader fetches the deltas of one session in step order
+CREATE INDEX IF NOT EXISTS idx_session_snapshot_deltas_session_step ON session_snapshot_deltas(session_id, step_number);
+
+ALTER TABLE session_snapshot_deltas ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role full access to session_snapshot_deltas" ON session_snapshot_deltas FOR ALL USING (auth.role() = 'service_role');
+
+COMMENT ON TABLE session_snapshot_deltas IS 'Per-step patches applied on top of the session_snapshots base row';
+COMMENT ON COLUMN session_snapshot_deltas.patch IS 'List of set/append/unset operations produced by app.snapshot_delta.diff_state';
@@ -0,0 +1,15 @@
+-- Migration 110: Precomputed question phrasing variants
+-- A background job asks the LLM for several marketing rephrasings of every
+-- question once per form; the survey admin supervisor picks one locally at
+-- runtime instead of rephrasing on every step.
+
+-- {"question_text": <text the variants were generated from>, "variants": [...], "generated_at": <iso timestamp>}
+ALTER TABLE form_questions
+ADD COLUMN IF NOT EXISTS phrasing_variants JSONB DEFAULT '{}';
+
+-- [{"headline": ..., "message": ...}, ...] generated alongside the question variants
+ALTER TABLE forms
+ADD COLUMN IF NOT EXISTS engagement_variants JSONB DEFAULT '[]';
+
+COMMENT ON COLUMN form_questions.phrasing_variants IS 'Precomputed rephrasings of question_text used instead of live LLM phrasing';
+COMMENT ON COLUMN forms.engagement_variants IS 'Precomputed step headlines and messages used with precomputed question phrasings';
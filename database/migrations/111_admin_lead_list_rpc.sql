@@ -0,0 +1,87 @@
+-- Migration 111: Single-query admin lead listing
+-- GET /api/admin/leads used to read a page of lead_sessions and then query
+-- forms, tracking_data and lead_outcomes separately, applying the utm_source
+-- and converted filters in Python after pagination. This function joins the
+-- tables, applies every filter in the database and pages by keyset on
+-- (started_at, id), newest first.
+
+-- Keyset scan for one client's leads
+CREATE INDEX IF NOT EXISTS idx_lead_sessions_client_started_at ON lead_sessions(client_id, started_at DESC, id DESC);
+
+CREATE OR REPLACE FUNCTION list_admin_leads(
+    p_client_id UUID,
+    p_form_id UUID DEFAULT NULL,
+    p_status TEXT DEFAULT NULL,
+    p_utm_source TEXT DEFAULT NULL,
+    p_converted BOOLEAN DEFAULT NULL,
+    p_started_before TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_before_id UUID DEFAULT NULL,
+    p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (
+    lead_id UUID,
+    form_id UUID,
+    form_title TEXT,
+    lead_status TEXT,
+    final_score INTEGER,
+    started_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    utm_source TEXT,
+    utm_campaign TEXT,
+    utm_medium TEXT,
+    contact_info JSONB,
+    actual_conversion BOOLEAN,
+    conversion_date TIMESTAMP WITH TIME ZONE,
+    conversion_value DECIMAL(10,2),
+    conversion_type TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        ls.id,
+        ls.form_id,
+        COALESCE(f.title, 'Unknown Form'),
+        ls.lead_status,
+        ls.final_score,
+        ls.started_at,
+        ls.completed_at,
+        td.utm_source,
+        td.utm_campaign,
+        td.utm_medium,
+        lo.contact_info,
+        lo.converted,
+        lo.conversion_date,
+        lo.conversion_value,
+        lo.conversion_type
+    FROM lead_sessions ls
+    LEFT JOIN forms f ON f.id = ls.form_id
+    LEFT JOIN LATERAL (
+        SELECT t.utm_source, t.utm_campaign, t.utm_medium
+        FROM tracking_data t
+        WHERE t.session_id = ls.id
+        ORDER BY t.created_at DESC
+        LIMIT 1
+    ) td ON true
+    LEFT JOIN LATERAL (
+        SELECT o.contact_info, o.converted, o.conversion_date, o.conversion_value, o.conversion_type
+        FROM lead_outcomes o
+        WHERE o.session_id = ls.id
+        ORDER BY o.created_at DESC
+        LIMIT 1
+    ) lo ON true
+    WHERE ls.client_id = p_client_id
+      AND (p_form_id IS NULL OR ls.form_id = p_form_id)
+      AND (p_status IS NULL OR ls.lead_status = p_status)
+      AND (p_utm_source IS NULL OR td.utm_source = p_utm_source)
+      AND (p_converted IS NULL OR COALESCE(lo.converted, false) = p_converted)
+      AND (
+          p_started_before IS NULL
+          OR (p_before_id IS NULL AND ls.started_at < p_started_before)
+          OR (p_before_id IS NOT NULL AND (ls.started_at, ls.id) < (p_started_before, p_before_id))
+      )
+    ORDER BY ls.started_at DESC, ls.id DESC
+    LIMIT LEAST(GREATEST(p_limit, 1), 1000);
+$$;
+
+COMMENT ON FUNCTION list_admin_leads IS 'Admin lead list: lead_sessions joined with forms, tracking_data and lead_outcomes, filtered server-side, keyset-paged on (started_at, id) descending';
@@ -0,0 +1,115 @@
+-- Migration 112: Cursor pagination for the admin lead list
+-- GET /api/admin/leads now pages with opaque next/prev cursors. Both
+-- directions use the (client_id, started_at DESC, id DESC) index from
+-- migration 111: forward pages read rows older than the cursor newest first,
+-- backward pages read rows newer than the cursor oldest first (the API
+-- reverses them). The joined row source moves into a view so both branches
+-- share it and filters still push down into lead_sessions.
+
+DROP FUNCTION IF EXISTS list_admin_leads(UUID, UUID, TEXT, TEXT, BOOLEAN, TIMESTAMP WITH TIME ZONE, UUID, INTEGER);
+
+-- security_invoker keeps row-level security of the base tables for API roles
+CREATE OR REPLACE VIEW admin_lead_rows WITH (security_invoker = true) AS
+SELECT
+    ls.client_id,
+    ls.id AS lead_id,
+    ls.form_id,
+    COALESCE(f.title, 'Unknown Form') AS form_title,
+    ls.lead_status,
+    ls.final_score,
+    ls.started_at,
+    ls.completed_at,
+    td.utm_source,
+    td.utm_campaign,
+    td.utm_medium,
+    lo.contact_info,
+    lo.converted AS actual_conversion,
+    lo.conversion_date,
+    lo.conversion_value,
+    lo.conversion_type
+FROM lead_sessions ls
+LEFT JOIN forms f ON f.id = ls.form_id
+LEFT JOIN LATERAL (
+    SELECT t.utm_source, t.utm_campaign, t.utm_medium
+    FROM tracking_data t
+    WHERE t.session_id = ls.id
+    ORDER BY t.created_at DESC
+    LIMIT 1
+) td ON true
+LEFT JOIN LATERAL (
+    SELECT o.contact_info, o.converted, o.conversion_date, o.conversion_value, o.conversion_type
+    FROM lead_outcomes o
+    WHERE o.session_id = ls.id
+    ORDER BY o.created_at DESC
+    LIMIT 1
+) lo ON true;
+
+CREATE OR REPLACE FUNCTION list_admin_leads(
+    p_client_id UUID,
+    p_form_id UUID DEFAULT NULL,
+    p_status TEXT DEFAULT NULL,
+    p_utm_source TEXT DEFAULT NULL,
+    p_converted BOOLEAN DEFAULT NULL,
+    p_cursor_started_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_cursor_id UUID DEFAULT NULL,
+    p_reverse BOOLEAN DEFAULT false,
+    p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (
+    lead_id UUID,
+    form_id UUID,
+    form_title TEXT,
+    lead_status TEXT,
+    final_score INTEGER,
+    started_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    utm_source TEXT,
+    utm_campaign TEXT,
+    utm_medium TEXT,
+    contact_info JSONB,
+    actual_conversion BOOLEAN,
+    conversion_date TIMESTAMP WITH TIME ZONE,
+    conversion_value DECIMAL(10,2),
+    conversion_type TEXT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    -- One extra row over the largest page lets the API detect a following page
+    p_limit := LEAST(GREATEST(p_limit, 1), 1001);
+
+    IF p_reverse THEN
+        RETURN QUERY
+        SELECT r.lead_id, r.form_id, r.form_title, r.lead_status, r.final_score, r.started_at, r.completed_at,
+               r.utm_source, r.utm_campaign, r.utm_medium, r.contact_info, r.actual_conversion,
+               r.conversion_date, r.conversion_value, r.conversion_type
+        FROM admin_lead_rows r
+        WHERE r.client_id = p_client_id
+          AND (p_form_id IS NULL OR r.form_id = p_form_id)
+          AND (p_status IS NULL OR r.lead_status = p_status)
+          AND (p_utm_source IS NULL OR r.utm_source = p_utm_source)
+          AND (p_converted IS NULL OR COALESCE(r.actual_conversion, false) = p_converted)
+          AND (p_cursor_started_at IS NULL OR (r.started_at, r.lead_id) > (p_cursor_started_at, p_cursor_id))
+        ORDER BY r.started_at ASC, r.lead_id ASC
+        LIMIT p_limit;
+    ELSE
+        RETURN QUERY
+        SELECT r.lead_id, r.form_id, r.form_title, r.lead_status, r.final_score, r.started_at, r.completed_at,
+               r.utm_source, r.utm_campaign, r.utm_medium, r.contact_info, r.actual_conversion,
+               r.conversion_date, r.conversion_value, r.conversion_type
+        FROM admin_lead_rows r
+        WHERE r.client_id = p_client_id
+          AND (p_form_id IS NULL OR r.form_id = p_form_id)
+          AND (p_status IS NULL OR r.lead_status = p_status)
+          AND (p_utm_source IS NULL OR r.utm_source = p_utm_source)
+          AND (p_converted IS NULL OR COALESCE(r.actual_conversion, false) = p_converted)
+          AND (p_cursor_started_at IS NULL OR (r.started_at, r.lead_id) < (p_cursor_started_at, p_cursor_id))
+        ORDER BY r.started_at DESC, r.lead_id DESC
+        LIMIT p_limit;
+    END IF;
+END;
+$$;
+
+COMMENT ON VIEW admin_lead_rows IS 'lead_sessions joined with form title, latest tracking_data and latest lead_outcomes for the admin lead list';
+COMMENT ON FUNCTION list_admin_leads IS 'Admin lead list filtered server-side, cursor-paged on (started_at, id): forward pages newest first, p_reverse pages oldest first';
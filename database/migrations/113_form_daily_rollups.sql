@@ -0,0 +1,208 @@
+-- Migration 113: Daily analytics rollups per form and traffic source
+-- The analytics dashboard used to read every lead_sessions row of a client's
+-- forms in the date range and count them in Python. form_daily_rollups keeps
+-- one row per form, day (UTC, of started_at) and utm_source with the counters
+-- the dashboard needs. Triggers on lead_sessions and tracking_data keep it up
+-- to date as sessions start, complete and qualify; backfill_form_daily_rollups
+-- rebuilds a range from the raw tables.
+--
+-- Sessions are attributed to the utm_source of their first tracking_data row
+-- (first touch); sessions without tracking data count under ''.
+
+CREATE TABLE IF NOT EXISTS form_daily_rollups (
+    form_id UUID NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+    client_id UUID NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    utm_source TEXT NOT NULL DEFAULT '',
+    views INTEGER NOT NULL DEFAULT 0,
+    completions INTEGER NOT NULL DEFAULT 0,
+    qualified INTEGER NOT NULL DEFAULT 0,
+    completion_seconds_total DOUBLE PRECISION NOT NULL DEFAULT 0,
+    timed_completions INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (form_id, day, utm_source)
+);
+
+CREATE INDEX IF NOT EXISTS idx_form_daily_rollups_client_day ON form_daily_rollups(client_id, day);
+
+ALTER TABLE form_daily_rollups ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role full access to form_daily_rollups" ON form_daily_rollups FOR ALL USING (auth.role() = 'service_role');
+
+-- === Incremental maintenance ===
+
+-- utm_source a session is attributed to
+CREATE OR REPLACE FUNCTION rollup_utm_source(p_session_id UUID)
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE((
+        SELECT t.utm_source
+        FROM tracking_data t
+        WHERE t.session_id = p_session_id
+        ORDER BY t.created_at, t.id
+        LIMIT 1
+    ), '');
+$$;
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one session's contribution to its bucket
+CREATE OR REPLACE FUNCTION apply_session_rollup(
+    p_form_id UUID,
+    p_started_at TIMESTAMP WITH TIME ZONE,
+    p_completed BOOLEAN,
+    p_completed_at TIMESTAMP WITH TIME ZONE,
+    p_lead_status TEXT,
+    p_utm_source TEXT,
+    p_sign INTEGER
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_client_id UUID;
+    v_timed BOOLEAN := COALESCE(p_completed, false) AND p_completed_at IS NOT NULL AND p_completed_at >= p_started_at;
+BEGIN
+    IF p_form_id IS NULL OR p_started_at IS NULL THEN
+        RETURN;
+    END IF;
+
+    SELECT f.client_id INTO v_client_id FROM forms f WHERE f.id = p_form_id;
+    IF v_client_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO form_daily_rollups AS r (
+        form_id, client_id, day, utm_source,
+        views, completions, qualified, completion_seconds_total, timed_completions
+    )
+    VALUES (
+        p_form_id, v_client_id, (p_started_at AT TIME ZONE 'UTC')::date, COALESCE(p_utm_source, ''),
+        p_sign,
+        CASE WHEN COALESCE(p_completed, false) THEN p_sign ELSE 0 END,
+        CASE WHEN p_lead_status = 'yes' THEN p_sign ELSE 0 END,
+        CASE WHEN v_timed THEN p_sign * EXTRACT(EPOCH FROM p_completed_at - p_started_at) ELSE 0 END,
+        CASE WHEN v_timed THEN p_sign ELSE 0 END
+    )
+    ON CONFLICT (form_id, day, utm_source) DO UPDATE SET
+        views = r.views + EXCLUDED.views,
+        completions = r.completions + EXCLUDED.completions,
+        qualified = r.qualified + EXCLUDED.qualified,
+        completion_seconds_total = r.completion_seconds_total + EXCLUDED.completion_seconds_total,
+        timed_completions = r.timed_completions + EXCLUDED.timed_completions,
+        updated_at = NOW();
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION lead_sessions_rollup_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_utm_source TEXT;
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.form_id IS NOT DISTINCT FROM OLD.form_id
+       AND NEW.started_at IS NOT DISTINCT FROM OLD.started_at
+       AND NEW.completed IS NOT DISTINCT FROM OLD.completed
+       AND NEW.completed_at IS NOT DISTINCT FROM OLD.completed_at
+       AND NEW.lead_status IS NOT DISTINCT FROM OLD.lead_status THEN
+        RETURN NEW;
+    END IF;
+
+    v_utm_source := rollup_utm_source(COALESCE(NEW.id, OLD.id));
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_session_rollup(OLD.form_id, OLD.started_at, OLD.completed, OLD.completed_at, OLD.lead_status, v_utm_source, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_session_rollup(NEW.form_id, NEW.started_at, NEW.completed, NEW.completed_at, NEW.lead_status, v_utm_source, 1);
+        RETURN NEW;
+    END IF;
+    RETURN OLD;
+END;
+$$;
+
+-- A session's first tracking row moves it from the '' bucket to its utm_source
+CREATE OR REPLACE FUNCTION tracking_data_rollup_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    s lead_sessions%ROWTYPE;
+BEGIN
+    IF COALESCE(NEW.utm_source, '') = ''
+       OR EXISTS (SELECT 1 FROM tracking_data t WHERE t.session_id = NEW.session_id AND t.id <> NEW.id) THEN
+        RETURN NEW;
+    END IF;
+
+    SELECT * INTO s FROM lead_sessions WHERE id = NEW.session_id;
+    IF FOUND THEN
+        PERFORM apply_session_rollup(s.form_id, s.started_at, s.completed, s.completed_at, s.lead_status, '', -1);
+        PERFORM apply_session_rollup(s.form_id, s.started_at, s.completed, s.completed_at, s.lead_status, NEW.utm_source, 1);
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS lead_sessions_rollup ON lead_sessions;
+CREATE TRIGGER lead_sessions_rollup AFTER INSERT OR UPDATE ON lead_sessions FOR EACH ROW EXECUTE FUNCTION lead_sessions_rollup_trigger();
+
+-- Deletes are handled before the tracking_data rows cascade away with the session
+DROP TRIGGER IF EXISTS lead_sessions_rollup_delete ON lead_sessions;
+CREATE TRIGGER lead_sessions_rollup_delete BEFORE DELETE ON lead_sessions FOR EACH ROW EXECUTE FUNCTION lead_sessions_rollup_trigger();
+
+DROP TRIGGER IF EXISTS tracking_data_rollup ON tracking_data;
+CREATE TRIGGER tracking_data_rollup AFTER INSERT ON tracking_data FOR EACH ROW EXECUTE FUNCTION tracking_data_rollup_trigger();
+
+-- === Backfill ===
+
+-- Rebuild rollups for days in [p_start_day, p_end_day] (all days when NULL), optionally for one form
+CREATE OR REPLACE FUNCTION backfill_form_daily_rollups(
+    p_form_id UUID DEFAULT NULL,
+    p_start_day DATE DEFAULT NULL,
+    p_end_day DATE DEFAULT NULL
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    DELETE FROM form_daily_rollups r
+    WHERE (p_form_id IS NULL OR r.form_id = p_form_id)
+      AND (p_start_day IS NULL OR r.day >= p_start_day)
+      AND (p_end_day IS NULL OR r.day <= p_end_day);
+
+    INSERT INTO form_daily_rollups (
+        form_id, client_id, day, utm_source,
+        views, completions, qualified, completion_seconds_total, timed_completions
+    )
+    SELECT
+        ls.form_id,
+        f.client_id,
+        (ls.started_at AT TIME ZONE 'UTC')::date AS day,
+        rollup_utm_source(ls.id) AS utm_source,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE ls.completed),
+        COUNT(*) FILTER (WHERE ls.lead_status = 'yes'),
+        COALESCE(SUM(EXTRACT(EPOCH FROM ls.completed_at - ls.started_at))
+            FILTER (WHERE ls.completed AND ls.completed_at >= ls.started_at), 0),
+        COUNT(*) FILTER (WHERE ls.completed AND ls.completed_at >= ls.started_at)
+    FROM lead_sessions ls
+    JOIN forms f ON f.id = ls.form_id
+    WHERE f.client_id IS NOT NULL
+      AND (p_form_id IS NULL OR ls.form_id = p_form_id)
+      AND (p_start_day IS NULL OR ls.started_at >= p_start_day::timestamp AT TIME ZONE 'UTC')
+      AND (p_end_day IS NULL OR ls.started_at < (p_end_day + 1)::timestamp AT TIME ZONE 'UTC')
+    GROUP BY 1, 2, 3, 4;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$;
+
+COMMENT ON TABLE form_daily_rollups IS 'Per form, UTC day and first-touch utm_source session counters, maintained by triggers on lead_sessions and tracking_data';
+COMMENT ON FUNCTION backfill_form_daily_rollups IS 'Recompute form_daily_rollups from lead_sessions for a day range and optional form; returns rows written';
+
+-- Populate every existing day so dashboards keep their history after deploy
+SELECT backfill_form_daily_rollups();
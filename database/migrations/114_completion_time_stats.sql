@@ -0,0 +1,48 @@
+-- Migration 114: Completion time distribution for analytics
+-- Dashboards reported a fixed 120 seconds per completed survey. This function
+-- returns the real distribution of completed_at - started_at (mean and
+-- p50/p90/p99) for a client's forms, or one form, over the same UTC-day range
+-- form_daily_rollups uses. The partial index covers completed sessions only,
+-- so the aggregate is an index-only scan over the range.
+
+CREATE INDEX IF NOT EXISTS idx_lead_sessions_form_completed_times
+    ON lead_sessions(form_id, started_at) INCLUDE (completed_at)
+    WHERE completed;
+
+CREATE OR REPLACE FUNCTION completion_time_stats(
+    p_client_id UUID,
+    p_start_day DATE,
+    p_end_day DATE,
+    p_form_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    samples BIGINT,
+    mean_seconds DOUBLE PRECISION,
+    p50_seconds DOUBLE PRECISION,
+    p90_seconds DOUBLE PRECISION,
+    p99_seconds DOUBLE PRECISION
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH durations AS (
+        SELECT EXTRACT(EPOCH FROM ls.completed_at - ls.started_at)::double precision AS seconds
+        FROM lead_sessions ls
+        JOIN forms f ON f.id = ls.form_id
+        WHERE f.client_id = p_client_id
+          AND (p_form_id IS NULL OR ls.form_id = p_form_id)
+          AND ls.completed
+          AND ls.completed_at >= ls.started_at
+          AND ls.started_at >= p_start_day::timestamp AT TIME ZONE 'UTC'
+          AND ls.started_at < (p_end_day + 1)::timestamp AT TIME ZONE 'UTC'
+    )
+    SELECT
+        COUNT(*),
+        AVG(seconds),
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY seconds),
+        percentile_cont(0.9) WITHIN GROUP (ORDER BY seconds),
+        percentile_cont(0.99) WITHIN GROUP (ORDER BY seconds)
+    FROM durations;
+$$;
+
+COMMENT ON FUNCTION completion_time_stats IS 'Count, mean and p50/p90/p99 of survey completion time in seconds for a client (optionally one form) over UTC days of started_at';
@@ -0,0 +1,21 @@
+-- Migration 115: Order snapshot deltas by base snapshot and sequence
+-- Deltas were read with step_number > the base snapshot's step_number, but the
+-- step can stay the same across many writes (the simplified flow never moves
+-- lead_sessions.step past 0), so recovery returned none of them. Each base
+-- snapshot now gets a base_id; its deltas carry that id and their position in
+-- the chain, and are read by (base_id, sequence).
+
+ALTER TABLE session_snapshots
+ADD COLUMN IF NOT EXISTS base_id UUID;
+
+ALTER TABLE session_snapshot_deltas
+ADD COLUMN IF NOT EXISTS base_id UUID,
+ADD COLUMN IF NOT EXISTS sequence INTEGER NOT NULL DEFAULT 0;
+
+-- Reader fetches the deltas of one base in sequence order
+CREATE INDEX IF NOT EXISTS idx_session_snapshot_deltas_base_sequence ON session_snapshot_deltas(session_id, base_id, sequence);
+DROP INDEX IF EXISTS idx_session_snapshot_deltas_session_step;
+
+COMMENT ON COLUMN session_snapshots.base_id IS 'Identifies this base write; session_snapshot_deltas.base_id points at it';
+COMMENT ON COLUMN session_snapshot_deltas.base_id IS 'Base snapshot write this patch applies to';
+COMMENT ON COLUMN session_snapshot_deltas.sequence IS 'Position of the patch in its base''s chain (1 = first patch)';
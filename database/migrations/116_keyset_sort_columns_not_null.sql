@@ -0,0 +1,18 @@
+-- Migration 116: NOT NULL sort columns for keyset pagination
+-- The admin listings page by keyset on these columns (forms by created_at or
+-- updated_at, themes by is_default, leads by started_at). A NULL sort value
+-- cannot be placed with lt/gt comparisons, so a row holding one produced a
+-- cursor the API rejects and would be skipped by the next page's filter. All
+-- of them have defaults; existing NULLs are filled and the columns required.
+
+UPDATE forms SET created_at = COALESCE(updated_at, NOW()) WHERE created_at IS NULL;
+UPDATE forms SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE forms
+ALTER COLUMN created_at SET NOT NULL,
+ALTER COLUMN updated_at SET NOT NULL;
+
+UPDATE client_themes SET is_default = false WHERE is_default IS NULL;
+ALTER TABLE client_themes ALTER COLUMN is_default SET NOT NULL;
+
+UPDATE lead_sessions SET started_at = COALESCE(completed_at, NOW()) WHERE started_at IS NULL;
+ALTER TABLE lead_sessions ALTER COLUMN started_at SET NOT NULL;